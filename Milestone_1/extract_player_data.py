@@ -1,9 +1,12 @@
 import json
+import numpy as np
 import pandas as pd
 import argparse
 import os
 import builtins
 import math
+from dataclasses import dataclass, field
+from typing import Dict, List
 
 CSV_DIR = os.path.join(os.path.dirname(__file__), "heuristic_analysis", "csv_files")
 
@@ -85,36 +88,141 @@ def _quat_to_euler_zyx(qx, qy, qz, qw):
     return yaw, pitch, roll
 
 
-def extract_final(input_json: str, output_csv: str) -> None:
-    """
-    Convert a rrrocket JSON (from `rrrocket -n -j <replay> > <base>.json`) into a wide CSV.
-
-    - input_json: Path to the JSON file produced by rrrocket.
-    - output_csv: Path to write the aggregated gameplay CSV.
-    """
+# Fallback object ids for game-event properties when the objects table lacks them.
+_GAME_EVENT_OBJECT_FALLBACKS = {
+    "TAGame.GameEvent_Soccar_TA:SecondsRemaining": 107,  # Common id in many rrrocket outputs.
+    "TAGame.GameEvent_Soccar_TA:bOverTime": 104,
+    "TAGame.GameEvent_Soccar_TA:bBallHasBeenHit": 105,
+    "TAGame.GameEvent_Soccar_TA:bMatchEnded": 101,
+    "TAGame.GameEvent_TA:ReplicatedStateName": 73,
+}
+
+_BOOST_PROP_MARKERS = (
+    "ReplicatedBoost",
+    "ReplicatedBoostAmount",
+    "CurrentBoostAmount",
+    "ServerConfirmBoostAmount",
+    "ClientFixBoostAmount",
+)
+
+
+@dataclass
+class DecodedReplay:
+    """Everything recovered from a single walk over rrrocket `network_frames.frames`."""
+
+    properties: Dict
+    rows: List[Dict]
+    seen_players: set
+    boost_seen: int = 0
+    boost_mapped: int = 0
+    boost_rows_written: int = 0
+    clock_samples: List[Dict] = field(default_factory=list)
+    overtime_samples: List[Dict] = field(default_factory=list)
+    ball_hit_samples: List[Dict] = field(default_factory=list)
+    match_ended_samples: List[Dict] = field(default_factory=list)
+    state_name_samples: List[Dict] = field(default_factory=list)
+    boost_by_player: Dict[str, List[Dict]] = field(default_factory=dict)
+    demo_events: List[Dict] = field(default_factory=list)
+
+
+def _game_event_object_id(objects_list, name: str) -> int:
+    try:
+        return int(objects_list.index(name))
+    except ValueError:
+        return _GAME_EVENT_OBJECT_FALLBACKS[name]
+
+
+def _attr_to_seconds(attr):
+    if not isinstance(attr, dict) or not attr:
+        return None
+    if "Int" in attr:
+        try:
+            return float(attr["Int"])
+        except (TypeError, ValueError):
+            return None
+    for v in attr.values():
+        if isinstance(v, (int, float)):
+            return float(v)
+    return None
+
+
+def _extract_boost_sample_numeric(attr):
+    if not isinstance(attr, dict):
+        return None
+    for k in (
+        "boost_amount",
+        "ReplicatedBoostAmount",
+        "CurrentBoostAmount",
+        "ServerConfirmBoostAmount",
+        "ClientFixBoostAmount",
+        "Byte",
+        "Int",
+        "Float",
+    ):
+        v = attr.get(k)
+        if isinstance(v, (int, float)):
+            return float(v)
+    for v in attr.values():
+        if isinstance(v, (int, float)):
+            return float(v)
+        if isinstance(v, dict):
+            nested = _extract_boost_sample_numeric(v)
+            if nested is not None:
+                return float(nested)
+    return None
+
+
+def _active_actor_ref(attrs, val):
+    if isinstance(val, dict) and "ActiveActor" in attrs:
+        aa = attrs["ActiveActor"]
+        if aa.get("active"):
+            return aa.get("actor")
+        return None
+    if isinstance(val, int):
+        return val
+    return None
+
+
+def read_rrrocket_json(input_json: str):
+    """Load the single-line rrrocket JSON payload, or return None with a printed reason."""
     print(f"📂 Reading {input_json}...")
     try:
         with open(input_json, 'r', encoding='utf-8', errors='replace') as f:
             line = f.readline()
             if not line:
                 print("❌ Error: JSON file is empty.")
-                return
-            data = json.loads(line)
+                return None
+            return json.loads(line)
     except FileNotFoundError:
         print(f"❌ File not found: {input_json}")
         print("   Tip: Run rrrocket to produce it, e.g.\n"
               "   ./rrrocket -n -j \"/path/to/your.replay\" > <BASE>.json")
-        return
+        return None
     except Exception as e:
         print(f"❌ Error reading JSON: {e}")
-        return
+        return None
 
+
+def decode_network_frames(data: Dict) -> DecodedReplay:
+    """
+    Walk `network_frames.frames` once and emit every per-frame product the pipeline needs:
+
+    - the wide physics/input/boost rows used to build the gameplay table,
+    - clock, overtime, ball-hit, match-ended and state-name samples for replay meta,
+    - per-player boost samples and demolition events for boost/demo recovery.
+    """
     # 1. Build Decoder Ring
-    objects_list = data.get('objects', [])
+    objects_list = data.get('objects', []) or []
     object_id_to_name = {i: name for i, name in enumerate(objects_list)}
 
-    frames = data.get('network_frames', {}).get('frames', [])
+    frames = (data.get('network_frames', {}) or {}).get('frames', []) or []
     print(f"✅ Found {len(frames)} frames. Extracting COMPLETE data (Players + Ball)...")
+
+    sec_obj_id = _game_event_object_id(objects_list, "TAGame.GameEvent_Soccar_TA:SecondsRemaining")
+    overtime_obj_id = _game_event_object_id(objects_list, "TAGame.GameEvent_Soccar_TA:bOverTime")
+    ball_hit_obj_id = _game_event_object_id(objects_list, "TAGame.GameEvent_Soccar_TA:bBallHasBeenHit")
+    match_ended_obj_id = _game_event_object_id(objects_list, "TAGame.GameEvent_Soccar_TA:bMatchEnded")
+    state_name_obj_id = _game_event_object_id(objects_list, "TAGame.GameEvent_TA:ReplicatedStateName")
 
     # --- MAPPINGS ---
     pri_map = {}  # PRI_ID -> Player Name
@@ -127,17 +235,77 @@ def extract_final(input_json: str, output_csv: str) -> None:
     boost_component_ids = set()
     car_boost_state = {}
 
-    extracted_rows = []
-    seen_players = set()
-    boost_seen = 0
-    boost_mapped = 0
-    boost_rows_written = 0
+    # Time-stamped boost samples and demos resolved to player names (replay dashboard).
+    pending_boost_samples_by_component = {}
+    unresolved_demo_by_victim_actor = {}
+    boost_by_player: Dict[str, List[Dict]] = {}
+    demo_events: List[Dict] = []
+
+    out = DecodedReplay(properties=data.get('properties', {}) or {}, rows=[], seen_players=set())
+    extracted_rows = out.rows
+    seen_players = out.seen_players
+
+    def _resolve_player_from_car_actor(car_actor_id) -> str:
+        pri_id = car_pri_map.get(car_actor_id)
+        if not isinstance(pri_id, int) or pri_id < 0:
+            return ""
+        return str(pri_map.get(pri_id) or "")
+
+    def _append_boost_sample(component_actor_id, time_s: float, boost_pct: float) -> None:
+        car_id = comp_to_car_map.get(component_actor_id)
+        if isinstance(car_id, int):
+            player = _resolve_player_from_car_actor(car_id)
+            if player:
+                boost_by_player.setdefault(player, []).append({"time_s": float(time_s), "boost": float(boost_pct)})
+                return
+        pending_boost_samples_by_component.setdefault(component_actor_id, []).append(
+            {"time_s": float(time_s), "boost": float(boost_pct)}
+        )
+
+    def _flush_component_boost_samples(component_actor_id) -> None:
+        pending = pending_boost_samples_by_component.pop(component_actor_id, None)
+        if not pending:
+            return
+        car_id = comp_to_car_map.get(component_actor_id)
+        if not isinstance(car_id, int):
+            pending_boost_samples_by_component[component_actor_id] = pending
+            return
+        player = _resolve_player_from_car_actor(car_id)
+        if not player:
+            pending_boost_samples_by_component[component_actor_id] = pending
+            return
+        boost_by_player.setdefault(player, []).extend(pending)
+
+    def _flush_unresolved_demos_for_car(car_actor_id) -> None:
+        pending = unresolved_demo_by_victim_actor.pop(car_actor_id, None)
+        if not pending:
+            return
+        victim_name = _resolve_player_from_car_actor(car_actor_id)
+        for ev in pending:
+            ev["victim_player"] = victim_name
+            demo_events.append(ev)
+
+    def _record_demo(t: float, victim_id, attacker_id) -> None:
+        victim_name = _resolve_player_from_car_actor(victim_id)
+        attacker_name = _resolve_player_from_car_actor(attacker_id) if isinstance(attacker_id, int) else ""
+        ev = {
+            "time_s": float(t),
+            "victim_actor_id": int(victim_id),
+            "victim_player": str(victim_name or ""),
+            "attacker_actor_id": int(attacker_id) if isinstance(attacker_id, int) else -1,
+            "attacker_player": str(attacker_name or ""),
+        }
+        if victim_name:
+            demo_events.append(ev)
+        else:
+            unresolved_demo_by_victim_actor.setdefault(victim_id, []).append(ev)
 
     for i, frame in enumerate(frames):
         row = {'frame': i, 'time': frame.get('time', 0)}
+        t = float(frame.get('time', 0.0) or 0.0)
 
         # --- TRACK NEW ACTORS ---
-        for new_actor in frame.get('new_actors', []):
+        for new_actor in frame.get('new_actors', []) or []:
             actor_id = new_actor.get('actor_id')
             name_id = new_actor.get('object_id')
             name = object_id_to_name.get(name_id, "")
@@ -152,7 +320,7 @@ def extract_final(input_json: str, output_csv: str) -> None:
                 ball_actor_ids.add(actor_id)
 
         # --- CLEANUP ---
-        for deleted_id in frame.get('deleted_actors', []):
+        for deleted_id in frame.get('deleted_actors', []) or []:
             if deleted_id in car_pri_map:
                 del car_pri_map[deleted_id]
             if deleted_id in comp_to_car_map:
@@ -165,15 +333,34 @@ def extract_final(input_json: str, output_csv: str) -> None:
                 boost_component_candidates.discard(deleted_id)
             if deleted_id in ball_actor_ids:
                 ball_actor_ids.discard(deleted_id)
+            pending_boost_samples_by_component.pop(deleted_id, None)
+            unresolved_demo_by_victim_actor.pop(deleted_id, None)
 
         # --- PROCESS UPDATES ---
-        for actor in frame.get('updated_actors', []):
+        for actor in frame.get('updated_actors', []) or []:
             actor_id = actor.get('actor_id')
             obj_id = actor.get('object_id')
             prop_name = object_id_to_name.get(obj_id, "")
-            attrs = actor.get('attribute', {})
+            attrs = actor.get('attribute', {}) or {}
             val = next(iter(attrs.values())) if attrs else None
             actor_class = actor_class_map.get(actor_id, "")
+
+            # 0. GAME EVENT SAMPLES (clock / overtime / kickoff / state)
+            if obj_id == sec_obj_id:
+                sec = _attr_to_seconds(attrs)
+                if sec is not None:
+                    if out.clock_samples and abs(out.clock_samples[-1]["time_s"] - t) < 1e-6:
+                        out.clock_samples[-1]["seconds_remaining"] = sec
+                    else:
+                        out.clock_samples.append({"time_s": t, "seconds_remaining": sec})
+            elif obj_id == overtime_obj_id:
+                out.overtime_samples.append({"time_s": t, "is_overtime": bool(val if attrs else False)})
+            elif obj_id == ball_hit_obj_id:
+                out.ball_hit_samples.append({"time_s": t, "ball_has_been_hit": bool(val if attrs else False)})
+            elif obj_id == match_ended_obj_id:
+                out.match_ended_samples.append({"time_s": t, "match_ended": bool(val if attrs else False)})
+            elif obj_id == state_name_obj_id:
+                out.state_name_samples.append({"time_s": t, "state_name": str((val if attrs else "") or "")})
 
             # A. PLAYER MAPPING
             if "PlayerName" in prop_name and isinstance(val, str):
@@ -182,47 +369,36 @@ def extract_final(input_json: str, output_csv: str) -> None:
 
             # B. CAR LINKING
             if "Pawn:PlayerReplicationInfo" in prop_name:
+                # Ignore non-car actors which also replicate PRI pointers in some modes.
                 if "Car" not in actor_class:
                     continue
-                pri_id = None
-                if isinstance(val, dict) and "ActiveActor" in attrs:
-                    aa = attrs["ActiveActor"]
-                    if aa.get("active"):
-                        pri_id = aa.get("actor")
-                elif isinstance(val, int):
-                    pri_id = val
+                pri_id = _active_actor_ref(attrs, val)
                 if isinstance(pri_id, int) and pri_id >= 0:
                     car_pri_map[actor_id] = pri_id
+                    _flush_unresolved_demos_for_car(actor_id)
+                    for comp_actor_id, car_id in list(comp_to_car_map.items()):
+                        if car_id == actor_id:
+                            _flush_component_boost_samples(comp_actor_id)
 
             # C. BOOST LINKING
             if "CarComponent_TA:Vehicle" in prop_name:
-                car_id = None
-                if isinstance(val, dict) and "ActiveActor" in attrs:
-                    aa = attrs["ActiveActor"]
-                    if aa.get("active"):
-                        car_id = aa.get("actor")
-                elif isinstance(val, int):
-                    car_id = val
+                car_id = _active_actor_ref(attrs, val)
                 if isinstance(car_id, int) and car_id >= 0 and (
                     actor_id in boost_component_candidates
                     or "CarComponent_Boost" in actor_class
+                    or actor_id in pending_boost_samples_by_component
                 ):
                     comp_to_car_map[actor_id] = car_id
                     if actor_id in unresolved_boost_by_component:
                         car_boost_state[car_id] = unresolved_boost_by_component.pop(actor_id)
+                    _flush_component_boost_samples(actor_id)
 
             # --- D. DATA EXTRACTION ---
             # 1. BOOST AMOUNT
-            if (
-                "ReplicatedBoost" in prop_name
-                or "ReplicatedBoostAmount" in prop_name
-                or "CurrentBoostAmount" in prop_name
-                or "ServerConfirmBoostAmount" in prop_name
-                or "ClientFixBoostAmount" in prop_name
-            ):
+            if any(marker in prop_name for marker in _BOOST_PROP_MARKERS):
                 boost_component_ids.add(actor_id)
                 boost_component_candidates.add(actor_id)
-                boost_seen += 1
+                out.boost_seen += 1
                 car_id = comp_to_car_map.get(actor_id)
                 if not car_id and actor_id in car_pri_map:
                     car_id = actor_id
@@ -235,10 +411,17 @@ def extract_final(input_json: str, output_csv: str) -> None:
                 normalized_boost = _boost_to_percent(raw_boost)
                 if car_id:
                     car_boost_state[car_id] = normalized_boost
-                    boost_mapped += 1
+                    out.boost_mapped += 1
                 else:
                     unresolved_boost_by_component[actor_id] = normalized_boost
 
+                num = _extract_boost_sample_numeric(attrs)
+                if num is None and isinstance(val, (int, float)):
+                    num = float(val)
+                if num is not None:
+                    boost_pct = max(0.0, min(100.0, (num / 255.0) * 100.0 if num > 1.0 else num * 100.0))
+                    _append_boost_sample(actor_id, t, boost_pct)
+
             # 2. INPUTS
             if "ReplicatedThrottle" in prop_name:
                 name = pri_map.get(car_pri_map.get(actor_id))
@@ -316,17 +499,92 @@ def extract_final(input_json: str, output_csv: str) -> None:
                         row['Ball_vel_y'] = lvy
                         row['Ball_vel_z'] = lvz
 
+            # 4. DEMOLITIONS
+            if "ReplicatedDemolishGoalExplosion" in prop_name:
+                fx = attrs.get("DemolishFx")
+                if isinstance(fx, dict):
+                    victim_id = fx.get("victim") if fx.get("victim_flag") else None
+                    attacker_id = fx.get("attacker") if fx.get("attacker_flag") else None
+                    if isinstance(victim_id, int):
+                        _record_demo(t, victim_id, attacker_id)
+
+            if "ReplicatedDemolishExtended" in prop_name:
+                d = attrs.get("DemolishExtended")
+                if isinstance(d, dict):
+                    victim = d.get("victim")
+                    attacker = d.get("attacker")
+                    victim_id = victim.get("actor") if isinstance(victim, dict) and victim.get("active") else None
+                    attacker_id = attacker.get("actor") if isinstance(attacker, dict) and attacker.get("active") else None
+                    if isinstance(victim_id, int) and "Car" in actor_class_map.get(victim_id, ""):
+                        _record_demo(t, victim_id, attacker_id)
+
         # Persist latest known boost state once player mappings exist.
         for car_id, pri_id in list(car_pri_map.items()):
             player_name = pri_map.get(pri_id)
             if player_name and car_id in car_boost_state:
                 row[f"{player_name}_boost"] = car_boost_state[car_id]
-                boost_rows_written += 1
+                out.boost_rows_written += 1
 
         extracted_rows.append(row)
 
+    # Late flush in case some mappings are only available near end-of-file.
+    for comp_actor_id in list(pending_boost_samples_by_component.keys()):
+        _flush_component_boost_samples(comp_actor_id)
+    for victim_actor_id in list(unresolved_demo_by_victim_actor.keys()):
+        _flush_unresolved_demos_for_car(victim_actor_id)
+
+    for name, arr in boost_by_player.items():
+        arr.sort(key=lambda x: x["time_s"])
+        dedup: List[Dict] = []
+        for s in arr:
+            if dedup and abs(dedup[-1]["time_s"] - s["time_s"]) < 1e-6:
+                dedup[-1]["boost"] = float(s["boost"])
+            else:
+                dedup.append({"time_s": float(s["time_s"]), "boost": float(s["boost"])})
+        boost_by_player[name] = dedup
+    out.boost_by_player = boost_by_player
+
+    demo_events.sort(key=lambda x: x["time_s"])
+    for ev in demo_events:
+        if out.demo_events:
+            prev = out.demo_events[-1]
+            if (
+                abs(float(prev["time_s"]) - float(ev["time_s"])) < 1e-4
+                and int(prev.get("victim_actor_id", -1)) == int(ev.get("victim_actor_id", -2))
+                and int(prev.get("attacker_actor_id", -1)) == int(ev.get("attacker_actor_id", -2))
+            ):
+                continue
+        out.demo_events.append(ev)
+    return out
+
+
+def decode_rrrocket_json(input_json: str):
+    """Read and decode an rrrocket JSON file; the raw payload is released before returning."""
+    data = read_rrrocket_json(input_json)
+    if data is None:
+        return None
+    return decode_network_frames(data)
+
+
+def _rows_to_columns(rows: List[Dict]) -> Dict[str, np.ndarray]:
+    n = len(rows)
+    columns: Dict[str, np.ndarray] = {}
+    for i, row in enumerate(rows):
+        for key, value in row.items():
+            col = columns.get(key)
+            if col is None:
+                col = columns[key] = np.full(n, np.nan, dtype=np.float64)
+            if value is not None:
+                col[i] = value
+    return columns
+
+
+def _frames_to_dataframe(decoded: DecodedReplay) -> pd.DataFrame:
+    seen_players = set(decoded.seen_players)
+
     print("🔨 Building DataFrame...")
-    df = pd.DataFrame(extracted_rows)
+    columns = _rows_to_columns(decoded.rows)
+    n = len(decoded.rows)
 
     # Ensure analyzer-required baseline columns always exist.
     required_global = [
@@ -337,8 +595,8 @@ def extract_final(input_json: str, output_csv: str) -> None:
         'time', 'frame'
     ]
     for col in required_global:
-        if col not in df.columns:
-            df[col] = 0
+        if col not in columns:
+            columns[col] = np.zeros(n, dtype=np.float64)
 
     # Ensure all per-player columns expected by analyzer.py exist.
     required_suffixes = [
@@ -350,7 +608,7 @@ def extract_final(input_json: str, output_csv: str) -> None:
         '_ang_vel_x', '_ang_vel_y', '_ang_vel_z'
     ]
     if not seen_players:
-        for c in df.columns:
+        for c in columns:
             for suffix in required_suffixes:
                 if c.endswith(suffix) and not c.startswith('Ball'):
                     seen_players.add(c[:-len(suffix)])
@@ -358,15 +616,15 @@ def extract_final(input_json: str, output_csv: str) -> None:
     for player in sorted(seen_players):
         for suffix in required_suffixes:
             col = f'{player}{suffix}'
-            if col not in df.columns:
-                df[col] = 0
+            if col not in columns:
+                columns[col] = np.zeros(n, dtype=np.float64)
 
     # Sort columns to put Ball first
-    cols = list(df.columns)
+    cols = list(columns)
     for c in ['Ball_x', 'Ball_y', 'Ball_z', 'time', 'frame']:
         if c in cols:
             cols.insert(0, cols.pop(cols.index(c)))
-    df = df[cols]
+    df = pd.DataFrame({c: columns[c] for c in cols}, copy=False)
 
     print("✨ Smoothing Data (Forward Fill)...")
     # Crucial: Physics updates don't happen every frame for every object
@@ -410,16 +668,52 @@ def extract_final(input_json: str, output_csv: str) -> None:
         else:
             print(f"Boost per-player maxima: {player_max}")
     print(
-        f"Boost diagnostics: seen_updates={boost_seen}, mapped_updates={boost_mapped}, "
-        f"rows_written={boost_rows_written}"
+        f"Boost diagnostics: seen_updates={decoded.boost_seen}, mapped_updates={decoded.boost_mapped}, "
+        f"rows_written={decoded.boost_rows_written}"
     )
 
     df.drop(columns=['dt'], inplace=True)
+    # Fixed dtypes: integer frame index and jump flags, float64 for everything else.
+    int_cols = [c for c in df.columns if c == 'frame' or c.endswith('_jump')]
+    return df.astype({c: np.int64 for c in int_cols})
+
+
+def extract_frame_table(input_json: str | None = None, decoded: DecodedReplay | None = None) -> pd.DataFrame | None:
+    """
+    Return the wide per-frame gameplay table as an in-memory DataFrame without touching disk.
+
+    Pass either the rrrocket JSON path or an already `decode_rrrocket_json` result.
+    """
+    if decoded is None:
+        if input_json is None:
+            return None
+        decoded = decode_rrrocket_json(input_json)
+        if decoded is None:
+            return None
+    return _frames_to_dataframe(decoded)
+
+
+def extract_final(input_json: str, output_csv: str | None = None, decoded: DecodedReplay | None = None) -> pd.DataFrame | None:
+    """
+    Convert a rrrocket JSON (from `rrrocket -n -j <replay> > <base>.json`) into a wide CSV.
+
+    - input_json: Path to the JSON file produced by rrrocket.
+    - output_csv: Path to write the aggregated gameplay CSV; None skips the CSV sink.
+    - decoded: Optional result of `decode_rrrocket_json` to skip re-reading input_json.
+
+    Returns the frame table (see `extract_frame_table`).
+    """
+    df = extract_frame_table(input_json, decoded=decoded)
+    if df is None:
+        return None
+    if not output_csv:
+        return df
 
     output_csv = _normalize_output_csv(output_csv)
     df.to_csv(output_csv, index=False)
     print(f"💾 Saved COMPLETE data to: {output_csv}")
     print("   (Now includes Ball_x, Ball_y, Ball_z)")
+    return df
 
 
 import subprocess
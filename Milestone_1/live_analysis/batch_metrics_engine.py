@@ -0,0 +1,505 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, fields
+from multiprocessing import shared_memory
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from metrics_engine import (
+    ACTIVE_SPEED,
+    BALL_HIT_ACCEL_THRESHOLD,
+    HESITATION_DYNAMIC_ENTER_BONUS,
+    HESITATION_ENTER_THRESHOLD,
+    HESITATION_FRAME_THRESHOLD,
+    HESITATION_RECOVERY_GRACE_SECONDS,
+    HESITATION_REPOSITION_CLOSING_DIST,
+    HESITATION_REPOSITION_MAX_DECEL,
+    HESITATION_REPOSITION_MIN_LATERAL,
+    HESITATION_SETUP_WALL_Y,
+    LOW_BOOST_THRESHOLD,
+    PRESSURE_DISTANCE,
+    PRESSURE_MIN_SPEED_FOR_CLOSING,
+    PRESSURE_MIN_TOWARD_SPEED,
+    PRESSURE_NEAR_DISTANCE,
+    SUPERSONIC_SPEED,
+    HesitationTracker,
+    RecoveryTracker,
+    WhiffTracker,
+)
+
+# Per-frame series produced by compute_metrics_batch, named like LiveMetricsEngine.snapshot() keys.
+BATCH_SERIES_KEYS = [
+    "timestamp",
+    "speed",
+    "hesitation_score",
+    "hesitation_percent",
+    "boost_waste_percent",
+    "supersonic_percent",
+    "useful_supersonic_percent",
+    "pressure_percent",
+    "whiff_rate_per_min",
+    "approach_efficiency",
+    "recovery_time_avg_s",
+    "hesitation_streak_max_s",
+    "contest_suppressed_whiffs",
+    "clear_miss_under_contest",
+    "pressure_gated_frames",
+    "suppressed_whiff_flip_commit",
+    "suppressed_whiff_disengage",
+    "suppressed_whiff_bump_intent",
+    "suppressed_whiff_opponent_first_touch",
+    "suppressed_hesitation_reposition",
+    "suppressed_hesitation_setup",
+    "suppressed_hesitation_spacing",
+]
+
+
+@dataclass
+class FrameArrays:
+    times: np.ndarray  # (N,)
+    car_pos: np.ndarray  # (C, N, 3)
+    car_vel: np.ndarray  # (C, N, 3)
+    car_boost: np.ndarray  # (C, N)
+    car_wheel_contact: np.ndarray  # (C, N) bool
+    ball_pos: np.ndarray  # (N, 3)
+    ball_vel: np.ndarray  # (N, 3)
+    active_play: np.ndarray  # (N,) bool
+    car_ang_vel: Optional[np.ndarray] = None  # (C, N, 3); zeros when the source has no spin data
+
+
+_SHARED_ALIGN = 64
+
+
+def share_arrays(arrays: Dict[str, np.ndarray]) -> Tuple[shared_memory.SharedMemory, Dict[str, Any]]:
+    """
+    Copy named arrays into one shared memory block so worker processes can map them without pickling.
+
+    Returns the block (the caller owns it and must close() + unlink() it) and a picklable spec
+    for attach_arrays().
+    """
+    placed = []
+    offset = 0
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        placed.append((name, arr, offset))
+        offset += -(-arr.nbytes // _SHARED_ALIGN) * _SHARED_ALIGN
+    shm = shared_memory.SharedMemory(create=True, size=max(1, offset))
+    layout = []
+    for name, arr, off in placed:
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf, offset=off)[...] = arr
+        layout.append((name, arr.dtype.str, arr.shape, off))
+    return shm, {"name": shm.name, "layout": layout}
+
+
+def attach_arrays(spec: Dict[str, Any]) -> Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]:
+    # The arrays are views into the block; drop them before calling close() on it.
+    shm = shared_memory.SharedMemory(name=spec["name"])
+    arrays = {
+        name: np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=shm.buf, offset=off)
+        for name, dtype, shape, off in spec["layout"]
+    }
+    return shm, arrays
+
+
+def frame_arrays_dict(frames: FrameArrays) -> Dict[str, np.ndarray]:
+    return {f.name: getattr(frames, f.name) for f in fields(FrameArrays) if getattr(frames, f.name) is not None}
+
+
+def _norm3(v: np.ndarray) -> np.ndarray:
+    x, y, z = v[..., 0], v[..., 1], v[..., 2]
+    return np.sqrt(x * x + y * y + z * z)
+
+
+def _dot3(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a[..., 0] * b[..., 0] + a[..., 1] * b[..., 1] + a[..., 2] * b[..., 2]
+
+
+def _unit3(v: np.ndarray) -> np.ndarray:
+    mag = _norm3(v)
+    safe = np.where(mag <= 1e-6, 1.0, mag)[..., None]
+    return np.where((mag <= 1e-6)[..., None], 0.0, v / safe)
+
+
+def _max0(v: np.ndarray) -> np.ndarray:
+    # Same result as Python's max(0.0, v), including for -0.0.
+    return np.where(v > 0.0, v, 0.0)
+
+
+def _clip01(v: np.ndarray) -> np.ndarray:
+    return np.where(v < 0.0, 0.0, np.where(v > 1.0, 1.0, v))
+
+
+def _frame_features(frames: FrameArrays, player_index: int) -> Dict[str, np.ndarray]:
+    times = np.asarray(frames.times, dtype=np.float64)
+    n = len(times)
+    car_pos = np.asarray(frames.car_pos[player_index], dtype=np.float64)
+    car_vel = np.asarray(frames.car_vel[player_index], dtype=np.float64)
+    ball_pos = np.asarray(frames.ball_pos, dtype=np.float64)
+    ball_vel = np.asarray(frames.ball_vel, dtype=np.float64)
+    boost = np.asarray(frames.car_boost[player_index], dtype=np.float64)
+
+    speed = _norm3(car_vel)
+    dist = _norm3(car_pos - ball_pos)
+    toward = _dot3(car_vel, _unit3(ball_pos - car_pos))
+    # Python's `x ** 0.5` (C pow) is kept for bit-identical output with the scalar engine.
+    lateral = np.array([v ** 0.5 for v in _max0(speed * speed - toward * toward).tolist()], dtype=np.float64)
+    ball_speed = _norm3(ball_vel)
+
+    prev_time = np.concatenate(([np.nan], times[:-1])) if n else times
+    has_prev = np.arange(n) > 0
+    dt = np.where(has_prev & (times > prev_time), np.maximum(1e-5, times - prev_time), 1 / 60.0)
+    prev_speed = np.concatenate(([0.0], speed[:-1])) if n else speed
+    prev_dist = np.concatenate(([99999.0], dist[:-1])) if n else dist
+    prev_ball_vel = np.concatenate((np.zeros((1, 3)), ball_vel[:-1])) if n else ball_vel
+    prev_boost = np.concatenate((boost[:1], boost[:-1])) if n else boost
+
+    speed_accel = np.where(has_prev, (speed - prev_speed) / dt, 0.0)
+    closing = dist + 4.0 < prev_dist
+    moving_away = dist > prev_dist + 6.0
+
+    # Nearest other car to the ball / to this car, matching the scalar first-minimum scan.
+    others = [c for c in range(len(frames.car_pos)) if c != player_index]
+    nearest_ball = np.full(n, 99999.0)
+    nearest_self = np.full(n, 99999.0)
+    nearest_toward = np.zeros(n)
+    if others:
+        op = np.asarray(frames.car_pos[others], dtype=np.float64)
+        ov = np.asarray(frames.car_vel[others], dtype=np.float64)
+        d_ball = _norm3(op - ball_pos[None])
+        d_self = _norm3(op - car_pos[None])
+        nearest_ball = np.minimum(d_ball.min(axis=0), 99999.0)
+        best = d_self.argmin(axis=0)
+        cols = np.arange(n)
+        best_self = d_self[best, cols]
+        toward_other = _unit3(op[best, cols] - car_pos)
+        other_toward = _dot3(car_vel, toward_other) - _dot3(ov[best, cols], toward_other)
+        found = best_self < 99999.0
+        nearest_self = np.where(found, best_self, 99999.0)
+        nearest_toward = np.where(found, other_toward, 0.0)
+
+    active = (speed > ACTIVE_SPEED) | (dist < 2500.0)
+    pressure_raw = (dist < PRESSURE_DISTANCE) | (closing & (dist < 2400.0))
+    approach_intent = (
+        (toward > PRESSURE_MIN_TOWARD_SPEED)
+        | (closing & (speed > PRESSURE_MIN_SPEED_FOR_CLOSING))
+        | (dist < PRESSURE_NEAR_DISTANCE)
+    )
+    pressure = pressure_raw & approach_intent
+
+    wheels = np.asarray(frames.car_wheel_contact[player_index], dtype=bool)
+    airborne = ~wheels
+
+    # Hesitation score before the landing-grace check, which depends on loop state.
+    progress_penalty = 1.0 - _clip01(_max0(toward) / 900.0)
+    turning_penalty = _clip01(lateral / np.where(speed > 350.0, speed, 350.0))
+    acceleration_penalty = _clip01((180.0 - speed_accel) / 380.0)
+    threat_scale = _clip01((PRESSURE_DISTANCE - prev_dist) / PRESSURE_DISTANCE)
+    hes = 0.45 * progress_penalty + 0.30 * turning_penalty + 0.25 * acceleration_penalty
+    hes = hes * (0.6 + 0.4 * threat_scale)
+    hes = np.where((boost < LOW_BOOST_THRESHOLD) & (toward > 180.0), hes * 0.55, hes)
+    hes = _clip01(hes)
+    hes_eligible = active & pressure & ~airborne
+
+    repositioning = (
+        pressure
+        & (dist < HESITATION_REPOSITION_CLOSING_DIST)
+        & (lateral > HESITATION_REPOSITION_MIN_LATERAL)
+        & (speed_accel > HESITATION_REPOSITION_MAX_DECEL)
+        & (speed > 300.0)
+    )
+    wall_setup = pressure & (np.abs(car_pos[:, 1]) > HESITATION_SETUP_WALL_Y) & (speed < 900.0) & (toward > -120.0)
+    spacing_adjust = pressure & moving_away & (dist > 700.0) & (speed > 450.0) & (toward > -280.0)
+    wall_setup = wall_setup & ~repositioning
+    spacing_adjust = spacing_adjust & ~repositioning & ~wall_setup
+    hes_scaled = np.where(repositioning, hes * 0.55, np.where(wall_setup, hes * 0.45, np.where(spacing_adjust, hes * 0.5, hes)))
+    enter_threshold = np.where((toward > 180.0) | closing, HESITATION_ENTER_THRESHOLD + HESITATION_DYNAMIC_ENTER_BONUS, HESITATION_ENTER_THRESHOLD)
+
+    is_supersonic = speed > SUPERSONIC_SPEED
+    useful_supersonic = is_supersonic & (pressure | (toward > 280.0))
+
+    boost_drop = _max0(prev_boost - boost)
+    useful_context = pressure | (toward > 250.0) | (speed_accel > 120.0)
+
+    ball_accel = _norm3(ball_vel - prev_ball_vel) / np.maximum(dt, 1e-6)
+
+    if frames.car_ang_vel is not None:
+        ang_speed = _norm3(np.asarray(frames.car_ang_vel[player_index], dtype=np.float64))
+    else:
+        ang_speed = np.zeros(n)
+
+    play = np.asarray(frames.active_play, dtype=bool)
+
+    def _count(mask: np.ndarray) -> np.ndarray:
+        return np.cumsum(play & mask)
+
+    def _accum(mask: np.ndarray, values: np.ndarray) -> np.ndarray:
+        return np.cumsum(np.where(play & mask, values, 0.0))
+
+    dropped = boost_drop > 0
+    return {
+        "times": times,
+        "play": play,
+        "speed": speed,
+        "dist": dist,
+        "prev_dist": prev_dist,
+        "toward": toward,
+        "ball_speed": ball_speed,
+        "car_z": car_pos[:, 2],
+        "car_vz": car_vel[:, 2],
+        "ball_z": ball_pos[:, 2],
+        "closing": closing,
+        "moving_away": moving_away,
+        "nearest_ball": nearest_ball,
+        "nearest_self": nearest_self,
+        "nearest_toward": nearest_toward,
+        "pressure": pressure,
+        "airborne": airborne,
+        "hes_eligible": hes_eligible,
+        "hes_scaled": hes_scaled,
+        "enter_threshold": enter_threshold,
+        "suppression": np.where(
+            repositioning, 1, np.where(wall_setup, 2, np.where(spacing_adjust, 3, 0))
+        ),
+        "ball_was_hit": ball_accel > BALL_HIT_ACCEL_THRESHOLD,
+        "ang_speed": ang_speed,
+        "total_frames": _count(np.ones(n, dtype=bool)),
+        "pressure_frames": _count(pressure),
+        "pressure_gated_frames": _count(pressure_raw & ~pressure),
+        "supersonic_frames": _count(is_supersonic),
+        "useful_supersonic_frames": _count(useful_supersonic),
+        "suppressed_hesitation_reposition": _count(repositioning),
+        "suppressed_hesitation_setup": _count(wall_setup),
+        "suppressed_hesitation_spacing": _count(spacing_adjust),
+        "total_boost_used": _accum(dropped, boost_drop),
+        "wasted_boost": _accum(dropped & ~useful_context, boost_drop),
+        "approach_boost_used": _accum(dropped & closing, boost_drop),
+        "approach_progress_total": _accum(has_prev, _max0(prev_dist - dist)),
+    }
+
+
+_SUPPRESSION_REASONS = ["", "repositioning", "wall_setup", "spacing_adjust"]
+
+
+def compute_metrics_batch(
+    frames: FrameArrays,
+    player_index: int,
+    window_seconds: float = 10.0,
+) -> Tuple[Dict[str, List[Any]], List[Dict[str, Any]]]:
+    """
+    Offline equivalent of feeding every frame through LiveMetricsEngine.update() + snapshot().
+
+    Returns per-frame series keyed like the snapshot's `current` dict (see BATCH_SERIES_KEYS) and
+    the engine's final event list (newest first, capped like LiveMetricsEngine.events). Only the
+    recovery, hesitation-hysteresis and whiff state machines run per frame, stepping the same
+    RecoveryTracker, HesitationTracker and WhiffTracker as the live engine; everything else is
+    computed over whole arrays. Replays carry no latest_touch/is_demolished data, so those inputs
+    are treated as absent, as LiveMetricsEngine does when a packet has none.
+    """
+    series: Dict[str, List[Any]] = {k: [] for k in BATCH_SERIES_KEYS}
+    events: Deque[Dict[str, Any]] = deque(maxlen=120)
+    if len(frames.times) == 0 or len(frames.car_pos) <= player_index:
+        return series, list(events)
+
+    f = _frame_features(frames, player_index)
+    cols = {k: (v.tolist() if isinstance(v, np.ndarray) else v) for k, v in f.items()}
+    times = cols["times"]
+    play = cols["play"]
+    speed_l = cols["speed"]
+    dist_l = cols["dist"]
+    prev_dist_l = cols["prev_dist"]
+    toward_l = cols["toward"]
+    ball_speed_l = cols["ball_speed"]
+    car_z_l = cols["car_z"]
+    car_vz_l = cols["car_vz"]
+    ball_z_l = cols["ball_z"]
+    closing_l = cols["closing"]
+    moving_away_l = cols["moving_away"]
+    nearest_ball_l = cols["nearest_ball"]
+    nearest_self_l = cols["nearest_self"]
+    nearest_toward_l = cols["nearest_toward"]
+    pressure_l = cols["pressure"]
+    airborne_l = cols["airborne"]
+    hes_eligible_l = cols["hes_eligible"]
+    hes_scaled_l = cols["hes_scaled"]
+    enter_threshold_l = cols["enter_threshold"]
+    suppression_l = cols["suppression"]
+    ball_hit_l = cols["ball_was_hit"]
+    ang_speed_l = cols["ang_speed"]
+    total_frames_l = cols["total_frames"]
+    pressure_frames_l = cols["pressure_frames"]
+    pressure_gated_l = cols["pressure_gated_frames"]
+    supersonic_l = cols["supersonic_frames"]
+    useful_supersonic_l = cols["useful_supersonic_frames"]
+    reposition_l = cols["suppressed_hesitation_reposition"]
+    setup_l = cols["suppressed_hesitation_setup"]
+    spacing_l = cols["suppressed_hesitation_spacing"]
+    total_boost_l = cols["total_boost_used"]
+    wasted_boost_l = cols["wasted_boost"]
+    approach_boost_l = cols["approach_boost_used"]
+    approach_progress_l = cols["approach_progress_total"]
+
+    out_t = series["timestamp"]
+    out_speed = series["speed"]
+    out_hes_score = series["hesitation_score"]
+    out_hes_pct = series["hesitation_percent"]
+    out_waste = series["boost_waste_percent"]
+    out_ss = series["supersonic_percent"]
+    out_uss = series["useful_supersonic_percent"]
+    out_pressure = series["pressure_percent"]
+    out_whiff = series["whiff_rate_per_min"]
+    out_approach = series["approach_efficiency"]
+    out_recovery = series["recovery_time_avg_s"]
+    out_streak = series["hesitation_streak_max_s"]
+    out_counters = [
+        series["contest_suppressed_whiffs"],
+        series["clear_miss_under_contest"],
+        series["pressure_gated_frames"],
+        series["suppressed_whiff_flip_commit"],
+        series["suppressed_whiff_disengage"],
+        series["suppressed_whiff_bump_intent"],
+        series["suppressed_whiff_opponent_first_touch"],
+        series["suppressed_hesitation_reposition"],
+        series["suppressed_hesitation_setup"],
+        series["suppressed_hesitation_spacing"],
+    ]
+
+    whiff_rate_scale = 60.0 / max(1e-6, window_seconds)
+    zero_sample = (0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+    latest: Tuple[float, ...] | None = None
+    # Counters that only exist in active frames; inactive frames carry the last active values.
+    pressure_gated = reposition = setup = spacing = 0
+
+    hesitation_frames = 0
+    recovery = RecoveryTracker()
+    hesitation = HesitationTracker()
+    whiff = WhiffTracker()
+
+    # (event sequence number, rounded time) for whiffs, to mirror counting over the capped event deque.
+    event_seq = 0
+    whiff_log: List[Tuple[int, float]] = []
+
+    def _recent_whiffs(now: float) -> int:
+        cutoff = now - window_seconds
+        oldest_kept = event_seq - 120
+        count = 0
+        for seq, t in reversed(whiff_log):
+            if seq < oldest_kept:
+                break
+            if t >= cutoff:
+                count += 1
+        return count
+
+    for i in range(len(times)):
+        now = times[i]
+        if not play[i]:
+            hesitation.event_active = False
+            whiff.clear()
+            latest = latest if latest is not None else zero_sample
+        else:
+            speed = speed_l[i]
+            dist = dist_l[i]
+            toward = toward_l[i]
+            airborne = airborne_l[i]
+            pressure = pressure_l[i]
+            closing = closing_l[i]
+            moving_away = moving_away_l[i]
+            pressure_gated = pressure_gated_l[i]
+            reposition = reposition_l[i]
+            setup = setup_l[i]
+            spacing = spacing_l[i]
+
+            recovery.step(now, airborne, speed, toward)
+
+            if hes_eligible_l[i] and (now - recovery.last_landing_time) > HESITATION_RECOVERY_GRACE_SECONDS:
+                hesitation_score = hes_scaled_l[i]
+            else:
+                hesitation_score = 0.0
+            enter_threshold = enter_threshold_l[i]
+            if pressure and hesitation_score >= HESITATION_FRAME_THRESHOLD and hesitation_score >= enter_threshold - 0.08:
+                hesitation_frames += 1
+            event = hesitation.step(
+                now,
+                hesitation_score,
+                pressure,
+                prev_dist_l[i],
+                suppression_reason=_SUPPRESSION_REASONS[suppression_l[i]],
+                enter_threshold=enter_threshold,
+            )
+            if event is not None:
+                events.appendleft(event)
+                event_seq += 1
+
+            event = whiff.step(
+                now=now,
+                dist_to_ball=dist,
+                closing=closing,
+                moving_away=moving_away,
+                speed=speed,
+                toward_speed=toward,
+                airborne=airborne,
+                car_vz=car_vz_l[i],
+                car_z=car_z_l[i],
+                ball_z=ball_z_l[i],
+                ang_speed=ang_speed_l[i],
+                ball_speed=ball_speed_l[i],
+                ball_was_hit=ball_hit_l[i],
+                self_touched=False,
+                other_touched_recent=False,
+                nearest_other_ball=nearest_ball_l[i],
+                nearest_other_self=nearest_self_l[i],
+                nearest_other_toward_speed=nearest_toward_l[i],
+            )
+            if event is not None:
+                events.appendleft(event)
+                whiff_log.append((event_seq, event["time"]))
+                event_seq += 1
+
+            total_frames = total_frames_l[i]
+            pressure_frames = pressure_frames_l[i]
+            supersonic_frames = supersonic_l[i]
+            total_boost_used = total_boost_l[i]
+            latest = (
+                speed,
+                hesitation_score,
+                (100.0 * hesitation_frames / max(1, pressure_frames)),
+                (100.0 * wasted_boost_l[i] / max(1e-6, total_boost_used)),
+                (100.0 * supersonic_frames / max(1, total_frames)),
+                (100.0 * useful_supersonic_l[i] / max(1, supersonic_frames)),
+                (100.0 * pressure_frames / max(1, total_frames)),
+                _recent_whiffs(now) * whiff_rate_scale,
+                approach_progress_l[i] / max(1e-6, approach_boost_l[i]),
+                recovery.average_time(),
+            )
+
+        out_t.append(now)
+        out_speed.append(round(latest[0], 2))
+        out_hes_score.append(round(latest[1], 3))
+        out_hes_pct.append(round(latest[2], 2))
+        out_waste.append(round(latest[3], 2))
+        out_ss.append(round(latest[4], 2))
+        out_uss.append(round(latest[5], 2))
+        out_pressure.append(round(latest[6], 2))
+        out_whiff.append(round(latest[7], 2))
+        out_approach.append(round(latest[8], 2))
+        out_recovery.append(round(latest[9], 3))
+        out_streak.append(round(hesitation.max_streak_seconds, 3))
+        for out, v in zip(
+            out_counters,
+            (
+                whiff.contest_suppressed_whiffs,
+                whiff.clear_miss_under_contest,
+                pressure_gated,
+                whiff.suppressed_flip_commit,
+                whiff.suppressed_disengage,
+                whiff.suppressed_bump_intent,
+                whiff.suppressed_opponent_first_touch,
+                reposition,
+                setup,
+                spacing,
+            ),
+        ):
+            out.append(v)
+
+    return series, list(events)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from collections import deque
+import json
+import threading
+from typing import Any, Deque, List, Optional, Tuple
+
+# (event id, event name, serialized data)
+StreamEvent = Tuple[int, str, str]
+
+
+class EventHub:
+    """
+    Fan-out point for Server-Sent Events. publish() serializes once and appends to a short backlog;
+    every connected stream reads from the backlog with its own cursor, so a slow client never blocks
+    the publisher and a reconnecting client (Last-Event-ID) picks up what it missed while it is
+    still in the backlog.
+    """
+
+    def __init__(self, backlog: int = 256) -> None:
+        self._cond = threading.Condition()
+        self._events: Deque[StreamEvent] = deque(maxlen=max(1, int(backlog)))
+        self._next_id = 1
+        self._closed = False
+        self.subscribers = 0
+
+    def publish(self, event: str, payload: Any) -> int:
+        data = json.dumps(payload, separators=(",", ":"))
+        with self._cond:
+            event_id = self._next_id
+            self._next_id += 1
+            self._events.append((event_id, str(event), data))
+            self._cond.notify_all()
+            return event_id
+
+    def latest_id(self) -> int:
+        with self._cond:
+            return self._next_id - 1
+
+    def wait(self, after_id: int, timeout: float) -> List[StreamEvent]:
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._closed or (self._events and self._events[-1][0] > after_id),
+                timeout=max(0.0, timeout),
+            )
+            out = []
+            for item in reversed(self._events):
+                if item[0] <= after_id:
+                    break
+                out.append(item)
+            out.reverse()
+            return out
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _subscribe(self, delta: int) -> None:
+        with self._cond:
+            self.subscribers += delta
+
+
+def _format_event(event_id: int, event: str, data: str) -> bytes:
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n".encode("utf-8")
+
+
+def stream_events(handler: Any, hub: EventHub, heartbeat_s: float = 15.0) -> None:
+    """
+    Serve a text/event-stream response on a BaseHTTPRequestHandler until the client goes away or
+    the hub closes. Runs on the request's own ThreadingHTTPServer thread.
+    """
+    last_id: Optional[int] = None
+    raw_last = handler.headers.get("Last-Event-ID")
+    if raw_last:
+        try:
+            last_id = int(raw_last)
+        except ValueError:
+            last_id = None
+    # New clients start from "now" and load current state over the regular endpoints.
+    cursor = hub.latest_id() if last_id is None else last_id
+
+    handler.send_response(200)
+    handler.send_header("Content-Type", "text/event-stream")
+    handler.send_header("Cache-Control", "no-cache")
+    handler.send_header("Connection", "keep-alive")
+    handler.send_header("X-Accel-Buffering", "no")
+    handler.end_headers()
+    handler.close_connection = True
+
+    hub._subscribe(1)
+    try:
+        handler.wfile.write(b"retry: 2000\n\n")
+        handler.wfile.flush()
+        while not hub.closed:
+            events = hub.wait(cursor, heartbeat_s)
+            if hub.closed:
+                break
+            if not events:
+                handler.wfile.write(b": ping\n\n")
+            else:
+                handler.wfile.write(b"".join(_format_event(*e) for e in events))
+                cursor = events[-1][0]
+            handler.wfile.flush()
+    except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+        pass
+    finally:
+        hub._subscribe(-1)
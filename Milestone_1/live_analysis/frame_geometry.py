@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+
+def pairwise_geometry(
+    pos: np.ndarray, vel: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    Pairwise geometry over the last-but-one axis of (..., K, 3) position/velocity arrays.
+
+    dist[..., i, j]    distance between i and j
+    toward[..., i, j]  speed of i along the direction i -> j
+    closing[..., i, j] toward[i, j] minus the speed of j along the same direction
+
+    Operation order follows the scalar _norm3/_safe_unit3/_safe_dot3 helpers so every entry matches
+    them bit for bit (including the zero direction for points closer than 1e-6 and NaN passthrough).
+    Without velocities only `dist` is computed.
+    """
+    x, y, z = pos[..., 0], pos[..., 1], pos[..., 2]
+    dx = x[..., None, :] - x[..., :, None]
+    dy = y[..., None, :] - y[..., :, None]
+    dz = z[..., None, :] - z[..., :, None]
+    dist = np.sqrt(dx * dx + dy * dy + dz * dz)
+    if vel is None:
+        return dist, None, None
+    with np.errstate(divide="ignore", invalid="ignore"):
+        near = dist <= 1e-6
+        ux = np.where(near, 0.0, dx / dist)
+        uy = np.where(near, 0.0, dy / dist)
+        uz = np.where(near, 0.0, dz / dist)
+    vx, vy, vz = vel[..., 0], vel[..., 1], vel[..., 2]
+    toward = vx[..., :, None] * ux + vy[..., :, None] * uy + vz[..., :, None] * uz
+    away = vx[..., None, :] * ux + vy[..., None, :] * uy + vz[..., None, :] * uz
+    return dist, toward, toward - away
+
+
+class FrameGeometry:
+    """
+    Pairwise geometry for one packet, computed once and shared by every metrics engine analysing it.
+    Rows/columns 0..num_cars-1 are cars, row num_cars is the ball. Plain-list views (`*_rows`) sit next
+    to the arrays because the engines read single entries.
+    """
+
+    __slots__ = ("num_cars", "pos", "vel", "dist", "toward", "closing", "pos_rows", "vel_rows", "dist_rows", "toward_rows", "closing_rows")
+
+    def __init__(self, pos: np.ndarray, vel: np.ndarray):
+        self.num_cars = len(pos) - 1
+        self.pos = pos
+        self.vel = vel
+        self.dist, self.toward, self.closing = pairwise_geometry(pos, vel)
+        self.pos_rows: List[List[float]] = pos.tolist()
+        self.vel_rows: List[List[float]] = vel.tolist()
+        self.dist_rows: List[List[float]] = self.dist.tolist()
+        self.toward_rows: List[List[float]] = self.toward.tolist()
+        self.closing_rows: List[List[float]] = self.closing.tolist()
+
+    @classmethod
+    def from_packet(cls, packet: Any) -> "FrameGeometry":
+        num_cars = int(getattr(packet, "num_cars", 0))
+        rows = []
+        vels = []
+        for i in range(num_cars):
+            phys = packet.game_cars[i].physics
+            loc = phys.location
+            vel = phys.velocity
+            rows.append((float(loc.x), float(loc.y), float(loc.z)))
+            vels.append((float(vel.x), float(vel.y), float(vel.z)))
+        bphys = packet.game_ball.physics
+        rows.append((float(bphys.location.x), float(bphys.location.y), float(bphys.location.z)))
+        vels.append((float(bphys.velocity.x), float(bphys.velocity.y), float(bphys.velocity.z)))
+        return cls(np.array(rows, dtype=np.float64), np.array(vels, dtype=np.float64))
+
+    @property
+    def ball(self) -> int:
+        return self.num_cars
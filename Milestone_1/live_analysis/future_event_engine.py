@@ -4,6 +4,10 @@ from bisect import bisect_left
 from math import sqrt
 from typing import Any, Dict, List, Tuple
 
+import numpy as np
+
+from timeline_index import PLAYER_FIELDS, TimelineIndex, ensure_timeline_index, masked_min
+
 WHIFF_WINDOW_PRE_S = 0.4
 WHIFF_WINDOW_POST_S = 1.0
 WHIFF_CONTACT_RADIUS = 220.0
@@ -41,119 +45,71 @@ def _window_indices(times: List[float], center_t: float, pre_s: float, post_s: f
     return i0, i1
 
 
-def _player_frame(frame: Dict[str, Any], player: str) -> Dict[str, Any] | None:
-    for p in frame.get("players", []) or []:
-        if p.get("name") == player:
-            return p
-    return None
+def _player_columns(index: TimelineIndex, slot: int) -> Dict[str, List[float]]:
+    # Absent players read as zeros, matching the old `_player_frame(...) or {}` lookups.
+    if slot < 0:
+        zeros = [0.0] * len(index)
+        return {k: zeros for k in PLAYER_FIELDS}
+    return {k: index.player[k][:, slot].tolist() for k in PLAYER_FIELDS}
 
 
-def _nearest_opponent_stats(frame: Dict[str, Any], player: str) -> Tuple[float, float]:
-    pself = _player_frame(frame, player)
-    if not pself:
+def _nearest_opponent_stats(index: TimelineIndex, slot: int, i: int) -> Tuple[float, float]:
+    if slot < 0 or not index.present[i, slot]:
         return 99999.0, 99999.0
-    bx = float(frame.get("ball", {}).get("x", 0.0))
-    by = float(frame.get("ball", {}).get("y", 0.0))
-    bz = float(frame.get("ball", {}).get("z", 0.0))
-    sx = float(pself.get("x", 0.0))
-    sy = float(pself.get("y", 0.0))
-    sz = float(pself.get("z", 0.0))
-    nearest_self = 99999.0
-    nearest_ball = 99999.0
-    for op in frame.get("players", []) or []:
-        if op.get("name") == player:
-            continue
-        ox = float(op.get("x", 0.0))
-        oy = float(op.get("y", 0.0))
-        oz = float(op.get("z", 0.0))
-        d_self = _norm3(ox - sx, oy - sy, oz - sz)
-        d_ball = _norm3(ox - bx, oy - by, oz - bz)
-        if d_self < nearest_self:
-            nearest_self = d_self
-        if d_ball < nearest_ball:
-            nearest_ball = d_ball
-    return nearest_self, nearest_ball
-
-
-def _player_ball_dist(frame: Dict[str, Any], player: str) -> float:
-    p = _player_frame(frame, player)
-    if not p:
-        return 99999.0
-    b = frame.get("ball", {}) or {}
-    return _norm3(
-        float(p.get("x", 0.0)) - float(b.get("x", 0.0)),
-        float(p.get("y", 0.0)) - float(b.get("y", 0.0)),
-        float(p.get("z", 0.0)) - float(b.get("z", 0.0)),
-    )
+    others = index.present[i].copy()
+    others[slot] = False
+    return float(masked_min(index.slot_dist(slot, i), others)), float(masked_min(index.ball_dist[i], others))
 
 
-def _ball_speed(frame: Dict[str, Any]) -> float:
-    b = frame.get("ball", {}) or {}
-    return _norm3(float(b.get("vx", 0.0)), float(b.get("vy", 0.0)), float(b.get("vz", 0.0)))
+def _ball_speed(index: TimelineIndex, i: int) -> float:
+    return float(index.ball_speed[i])
 
 
-def _player_speed(frame: Dict[str, Any], player: str) -> float:
-    p = _player_frame(frame, player)
-    if not p:
-        return 0.0
-    return _norm3(float(p.get("vx", 0.0)), float(p.get("vy", 0.0)), float(p.get("vz", 0.0)))
+def _player_speed(p: Dict[str, List[float]], i: int) -> float:
+    return _norm3(p["vx"][i], p["vy"][i], p["vz"][i])
 
 
-def _player_ang_speed(frame: Dict[str, Any], player: str) -> float:
-    p = _player_frame(frame, player)
-    if not p:
-        return 0.0
-    return _norm3(float(p.get("wx", 0.0)), float(p.get("wy", 0.0)), float(p.get("wz", 0.0)))
+def _player_ang_speed(p: Dict[str, List[float]], i: int) -> float:
+    return _norm3(p["wx"][i], p["wy"][i], p["wz"][i])
 
 
-def _lateral_speed_to_ball(frame: Dict[str, Any], player: str) -> float:
-    p = _player_frame(frame, player)
-    if not p:
+def _lateral_speed_to_ball(index: TimelineIndex, slot: int, p: Dict[str, List[float]], i: int) -> float:
+    if slot < 0 or not index.present[i, slot]:
         return 0.0
-    b = frame.get("ball", {}) or {}
+    b = index.ball
     to_ball = (
-        float(b.get("x", 0.0)) - float(p.get("x", 0.0)),
-        float(b.get("y", 0.0)) - float(p.get("y", 0.0)),
-        float(b.get("z", 0.0)) - float(p.get("z", 0.0)),
+        float(b["x"][i]) - p["x"][i],
+        float(b["y"][i]) - p["y"][i],
+        float(b["z"][i]) - p["z"][i],
     )
     mag = _norm3(*to_ball)
     if mag <= 1e-6:
         return 0.0
     dirv = (to_ball[0] / mag, to_ball[1] / mag, to_ball[2] / mag)
-    vel = (float(p.get("vx", 0.0)), float(p.get("vy", 0.0)), float(p.get("vz", 0.0)))
+    vel = (p["vx"][i], p["vy"][i], p["vz"][i])
     toward = vel[0] * dirv[0] + vel[1] * dirv[1] + vel[2] * dirv[2]
     speed = _norm3(*vel)
     lat_sq = max(0.0, speed * speed - toward * toward)
     return lat_sq ** 0.5
 
 
-def _commit_signal(start_frame: Dict[str, Any], prev_frame: Dict[str, Any], player: str, reason: str) -> str:
-    p0 = _player_frame(start_frame, player) or {}
-    pp = _player_frame(prev_frame, player) or {}
+def _commit_signal(p: Dict[str, List[float]], ball_dist: List[float], i_start: int, i_prev: int, reason: str) -> str:
     reason_low = (reason or "").lower()
     if "flip" in reason_low:
         return "flip"
-    if int(p0.get("double_jump", 0)) > 0 or _player_ang_speed(start_frame, player) > 4.8:
+    if int(p["double_jump"][i_start]) > 0 or _player_ang_speed(p, i_start) > 4.8:
         return "flip"
-    if int(p0.get("jump", 0)) > 0 or float(p0.get("vz", 0.0)) > 240.0 or (float(p0.get("z", 0.0)) - float(pp.get("z", 0.0))) > 25.0:
+    if int(p["jump"][i_start]) > 0 or p["vz"][i_start] > 240.0 or (p["z"][i_start] - p["z"][i_prev]) > 25.0:
         return "jump"
-    d_prev = _player_ball_dist(prev_frame, player)
-    d_now = _player_ball_dist(start_frame, player)
-    if _player_speed(start_frame, player) > 800.0 and (d_prev - d_now) > 70.0:
+    d_prev = ball_dist[i_prev]
+    d_now = ball_dist[i_start]
+    if _player_speed(p, i_start) > 800.0 and (d_prev - d_now) > 70.0:
         return "fast_close_drive"
     return ""
 
 
-def _nearest_dist_in_window(timeline: List[Dict[str, Any]], i0: int, i1: int, player: str) -> float:
-    out = 99999.0
-    for i in range(i0, i1 + 1):
-        out = min(out, _player_ball_dist(timeline[i], player))
-    return out
-
-
-def _boost(frame: Dict[str, Any], player: str) -> float:
-    p = _player_frame(frame, player) or {}
-    return float(p.get("boost", 0.0))
+def _nearest_dist_in_window(ball_dist: np.ndarray, i0: int, i1: int) -> float:
+    return float(masked_min(ball_dist[i0 : i1 + 1], np.ones(i1 + 1 - i0, dtype=bool)))
 
 
 def _empty_counts() -> Dict[str, int]:
@@ -180,11 +136,17 @@ def refine_events_posthoc(
     timeline: List[Dict[str, Any]],
     player: str,
     events: List[Dict[str, Any]],
+    index: TimelineIndex | None = None,
 ) -> tuple[List[Dict[str, Any]], Dict[str, int]]:
     if not timeline or not events or not player:
         return list(events or []), _empty_counts()
 
-    times = [float(fr.get("t", 0.0)) for fr in timeline]
+    index = ensure_timeline_index(timeline, index)
+    times = index.times.tolist()
+    slot = index.slot(player)
+    p = _player_columns(index, slot)
+    ball_dist_arr = index.player_ball_dist(slot)
+    ball_dist = ball_dist_arr.tolist()
     kept: List[Dict[str, Any]] = []
     counts = _empty_counts()
     last_kept_whiff_t = -999.0
@@ -195,20 +157,16 @@ def refine_events_posthoc(
         i0, i1 = _window_indices(times, t, WHIFF_WINDOW_PRE_S, WHIFF_WINDOW_POST_S)
         ic = _nearest_idx(times, t)
         ip = max(0, i0 - 1)
-        f0 = timeline[ic]
-        f1 = timeline[i1]
-        fp = timeline[ip]
 
-        d0 = _player_ball_dist(f0, player)
-        d1 = _player_ball_dist(f1, player)
-        dmin_future = _nearest_dist_in_window(timeline, i0, i1, player)
+        d0 = ball_dist[ic]
+        d1 = ball_dist[i1]
+        dmin_future = _nearest_dist_in_window(ball_dist_arr, i0, i1)
         moving_away = d1 - d0 > 180.0
-        near_other_self, near_other_ball = _nearest_opponent_stats(f0, player)
-        near_other_ball_next = _nearest_opponent_stats(f1, player)[1]
+        near_other_self, near_other_ball = _nearest_opponent_stats(index, slot, ic)
+        near_other_ball_next = _nearest_opponent_stats(index, slot, i1)[1]
 
-        p0 = _player_frame(f0, player) or {}
-        commit = _commit_signal(f0, fp, player, str(evt.get("reason", "")))
-        wall_setup = abs(float(p0.get("y", 0.0))) > 4300.0 or float(p0.get("z", 0.0)) > 260.0
+        commit = _commit_signal(p, ball_dist, ic, ip, str(evt.get("reason", "")))
+        wall_setup = abs(p["y"][ic]) > 4300.0 or p["z"][ic] > 260.0
 
         suppressed_reason = ""
         if et == "whiff":
@@ -219,18 +177,18 @@ def refine_events_posthoc(
                 counts["suppressed_whiff_bump_intent"] += 1
                 counts["whiff_excluded_bump_demo_intent"] += 1
                 suppressed_reason = "bump_demo_intent"
-            elif moving_away and (_boost(f1, player) - _boost(f0, player)) > 8.0:
+            elif moving_away and (p["boost"][i1] - p["boost"][ic]) > 8.0:
                 counts["suppressed_whiff_disengage"] += 1
                 counts["whiff_excluded_intentional_reset"] += 1
                 suppressed_reason = "intentional_reset"
-            elif moving_away and near_other_ball_next + 80.0 < d1 and _ball_speed(f1) - _ball_speed(fp) > 220.0:
+            elif moving_away and near_other_ball_next + 80.0 < d1 and _ball_speed(index, i1) - _ball_speed(index, ip) > 220.0:
                 counts["suppressed_whiff_opponent_first_touch"] += 1
                 suppressed_reason = "opponent_first_touch"
             else:
                 counts["whiff_commit_detected_count"] += 1
                 gate_a = dmin_future > WHIFF_CONTACT_RADIUS
                 gate_b = (d1 - dmin_future) > 140.0
-                gate_c = moving_away and dmin_future > WHIFF_TOUCH_RADIUS and _player_speed(f1, player) > 260.0
+                gate_c = moving_away and dmin_future > WHIFF_TOUCH_RADIUS and _player_speed(p, i1) > 260.0
                 if gate_a:
                     counts["whiff_gateA_count"] += 1
                 if gate_b:
@@ -245,8 +203,8 @@ def refine_events_posthoc(
                 else:
                     counts["whiff_two_of_three_pass_count"] += 1
         elif et == "hesitation":
-            lat = _lateral_speed_to_ball(f0, player)
-            spd = _player_speed(f0, player)
+            lat = _lateral_speed_to_ball(index, slot, p, ic)
+            spd = _player_speed(p, ic)
             if lat > 260.0 and spd > 320.0 and (d1 - d0) < 280.0:
                 counts["suppressed_hesitation_reposition"] += 1
                 suppressed_reason = "repositioning"
@@ -294,4 +252,4 @@ def apply_whiff_rate_from_events(metrics_timeline: List[Dict[str, Any]], events:
         while k < len(whiff_times) and whiff_times[k] <= t:
             k += 1
         count = k - j
-        point["whiff_rate_per_min"] = float(count) * (60.0 / max(1e-6, float(window_s)))
+        point["whiff_rate_per_min"] = float(count) * (60.0 / max(1e-6, float(window_s)))
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import gzip
+import hashlib
+import json
+from pathlib import Path
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+import uuid
+
+try:
+    import brotli as _brotli
+except ImportError:
+    _brotli = None
+
+
+# Responses smaller than this go out as-is; compressing them costs more than it saves.
+COMPRESS_MIN_BYTES = 1024
+# Dynamic bodies are compressed per request, static assets once when they are (re)loaded.
+DYNAMIC_GZIP_LEVEL = 5
+STATIC_GZIP_LEVEL = 9
+# Already-compressed formats.
+_INCOMPRESSIBLE_PREFIXES = ("image/", "model/gltf-binary")
+
+
+def _encodings() -> Tuple[str, ...]:
+    # Server preference order for equal client q-values.
+    return ("br", "gzip") if _brotli is not None else ("gzip",)
+
+
+def compressible(content_type: str) -> bool:
+    return not str(content_type or "").startswith(_INCOMPRESSIBLE_PREFIXES)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> str:
+    """Best encoding this server can produce for an Accept-Encoding header, or "identity"."""
+    offered: Dict[str, float] = {}
+    for part in str(accept_encoding or "").split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+        offered[name] = q
+    best, best_q = "identity", 0.0
+    for enc in _encodings():
+        q = offered.get(enc, offered.get("*", 0.0))
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+def compress(body: bytes, encoding: str, level: int = DYNAMIC_GZIP_LEVEL) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    if encoding == "br" and _brotli is not None:
+        return _brotli.compress(body, quality=min(11, level + 2))
+    raise RuntimeError(f"Unsupported content encoding '{encoding}'")
+
+
+def _tag_for(etag: str, encoding: str) -> str:
+    # Each encoded representation gets its own strong validator.
+    return etag if encoding == "identity" else f'{etag[:-1]}-{encoding}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {t.strip() for t in if_none_match.split(",")}
+    if "*" in tags:
+        return True
+    tags = {t[2:] if t.startswith("W/") else t for t in tags}
+    return any(_tag_for(etag, enc) in tags for enc in ("identity",) + _encodings())
+
+
+@dataclass
+class StaticAsset:
+    data: bytes
+    content_type: str
+    etag: str
+    stamp: Tuple[int, int]
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+
+class StaticAssetCache:
+    """
+    In-process cache of static files with their precompressed variants. Entries are keyed by path and
+    revalidated against (mtime, size) on each lookup, so edits to web/ still show up without a restart.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._assets: Dict[Path, StaticAsset] = {}
+
+    def get(self, file_path: Path, content_type: str) -> Optional[StaticAsset]:
+        try:
+            st = file_path.stat()
+        except OSError:
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            asset = self._assets.get(file_path)
+        if asset is not None and asset.stamp == stamp and asset.content_type == content_type:
+            return asset
+        try:
+            data = file_path.read_bytes()
+        except OSError:
+            return None
+        asset = StaticAsset(
+            data=data,
+            content_type=content_type,
+            etag=f'"{hashlib.sha1(data).hexdigest()}"',
+            stamp=stamp,
+        )
+        if len(data) >= COMPRESS_MIN_BYTES and compressible(content_type):
+            for enc in _encodings():
+                packed = compress(data, enc, STATIC_GZIP_LEVEL)
+                if len(packed) < len(data):
+                    asset.variants[enc] = packed
+        with self._lock:
+            self._assets[file_path] = asset
+        return asset
+
+
+def send_body(
+    handler: Any,
+    body: bytes,
+    content_type: str,
+    *,
+    status: int = 200,
+    etag: Optional[str] = None,
+    variants: Optional[Dict[str, bytes]] = None,
+    cache_control: Optional[str] = None,
+) -> None:
+    """
+    Write a complete response on a BaseHTTPRequestHandler, negotiating Content-Encoding and answering
+    If-None-Match with 304 when an ETag is given. `variants` are precomputed encodings of `body`.
+    """
+    negotiable = compressible(content_type) and (bool(variants) or len(body) >= COMPRESS_MIN_BYTES)
+    encoding = choose_encoding(handler.headers.get("Accept-Encoding")) if negotiable else "identity"
+    if encoding != "identity":
+        if variants is not None:
+            packed = variants.get(encoding)
+        else:
+            packed = compress(body, encoding)
+            if len(packed) >= len(body):
+                packed = None
+        if packed is None:
+            encoding = "identity"
+        else:
+            body = packed
+
+    tag = _tag_for(etag, encoding) if etag else None
+    if etag and status == 200 and _etag_matches(handler.headers.get("If-None-Match"), etag):
+        handler.send_response(304)
+        handler.send_header("ETag", tag)
+        if negotiable:
+            handler.send_header("Vary", "Accept-Encoding")
+        if cache_control:
+            handler.send_header("Cache-Control", cache_control)
+        handler.end_headers()
+        return
+
+    handler.send_response(status)
+    handler.send_header("Content-Type", content_type)
+    handler.send_header("Content-Length", str(len(body)))
+    if encoding != "identity":
+        handler.send_header("Content-Encoding", encoding)
+    if negotiable:
+        handler.send_header("Vary", "Accept-Encoding")
+    if tag:
+        handler.send_header("ETag", tag)
+    if cache_control:
+        handler.send_header("Cache-Control", cache_control)
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+def send_static(handler: Any, cache: StaticAssetCache, file_path: Path, content_type: str) -> bool:
+    """Serve a file through the asset cache. Returns False (nothing sent) when the file is missing."""
+    asset = cache.get(file_path, content_type)
+    if asset is None:
+        return False
+    # no-cache: browsers keep the file but revalidate, which the ETag turns into a cheap 304.
+    send_body(
+        handler,
+        asset.data,
+        asset.content_type,
+        etag=asset.etag,
+        variants=asset.variants,
+        cache_control="no-cache",
+    )
+    return True
+
+
+@dataclass
+class CachedResponse:
+    version: Any
+    body: bytes
+    etag: str
+    # Encoded variants filled in on first request; None marks an encoding that did not pay off.
+    variants: Dict[str, Optional[bytes]] = field(default_factory=dict)
+
+
+class ResponseCache:
+    """
+    Encoded JSON API responses per endpoint key, reused until the store version they were built from
+    changes. Read the version before building: a body newer than its version label is harmless, an
+    older one would be served stale.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CachedResponse] = {}
+        # Versions restart with the process; the token keeps old ETags from matching new bodies.
+        self._token = uuid.uuid4().hex[:8]
+
+    def get(self, key: str, version: Any, build: Callable[[], Any]) -> CachedResponse:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry.version == version:
+            return entry
+        body = json.dumps(build()).encode("utf-8")
+        entry = CachedResponse(version=version, body=body, etag=f'"{self._token}-{key}-{version}"')
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+
+def send_cached(handler: Any, entry: CachedResponse, content_type: str = "application/json") -> None:
+    if len(entry.body) >= COMPRESS_MIN_BYTES:
+        encoding = choose_encoding(handler.headers.get("Accept-Encoding"))
+        if encoding != "identity" and encoding not in entry.variants:
+            packed = compress(entry.body, encoding)
+            entry.variants[encoding] = packed if len(packed) < len(entry.body) else None
+    # no-cache: the browser may keep the body but revalidates each poll (304 while the version holds).
+    send_body(
+        handler,
+        entry.body,
+        content_type,
+        etag=entry.etag,
+        variants=entry.variants,
+        cache_control="no-cache",
+    )
@@ -8,17 +8,23 @@ import threading
 from typing import Any, Dict
 from urllib.parse import parse_qs, urlparse
 
+from event_stream import stream_events
+from http_cache import ResponseCache, StaticAssetCache, send_body, send_cached, send_static
 from review_store import ReviewStore
 from recommendation_engine import TRAINING_CATALOG, compute_recommendations
 from mechanic_grader import grade_game_mechanics
 from state_store import StateStore
 
+METRICS_LONG_POLL_MAX_S = 25.0
+
 
 class _DashboardHandler(BaseHTTPRequestHandler):
     store: StateStore = None
     review_store: ReviewStore = None
     web_dir: Path = None
     collision_mesh_dir: Path = None
+    assets: StaticAssetCache = None
+    api_cache: ResponseCache = None
     db = None
 
     def _compute_review_mechanics(self) -> Dict[str, Any]:
@@ -34,27 +40,19 @@ class _DashboardHandler(BaseHTTPRequestHandler):
         if not tracked:
             return {}
         teams = dict((data.get("replay_meta", {}) or {}).get("player_teams", {}) or {})
-        return grade_game_mechanics(data.get("timeline", []) or [], tracked, teams)
+        return grade_game_mechanics(data.get("timeline", []) or [], tracked, teams, index=self.review_store.timeline_index())
 
     def _send_json(self, payload: Dict[str, Any], status: int = 200) -> None:
         body = json.dumps(payload).encode("utf-8")
-        self.send_response(status)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Content-Length", str(len(body)))
-        self.end_headers()
-        self.wfile.write(body)
+        send_body(self, body, "application/json", status=status)
+
+    def _send_cached(self, key: str, version: int, build) -> None:
+        # Encoded once per state version of the section the endpoint reads; identical polls reuse it.
+        send_cached(self, self.api_cache.get(key, version, build))
 
     def _send_file(self, file_name: str, content_type: str) -> None:
-        file_path = self.web_dir / file_name
-        if not file_path.exists():
+        if not send_static(self, self.assets, self.web_dir / file_name, content_type):
             self.send_error(HTTPStatus.NOT_FOUND, "Not found")
-            return
-        data = file_path.read_bytes()
-        self.send_response(HTTPStatus.OK)
-        self.send_header("Content-Type", content_type)
-        self.send_header("Content-Length", str(len(data)))
-        self.end_headers()
-        self.wfile.write(data)
 
     def do_GET(self):
         parsed = urlparse(self.path)
@@ -71,15 +69,8 @@ class _DashboardHandler(BaseHTTPRequestHandler):
             local_three = self.web_dir / "three.min.js"
             fallback_three = Path(__file__).resolve().parents[1] / "replay_dashboard" / "web" / "three.min.js"
             src = local_three if local_three.exists() else fallback_three
-            if not src.exists():
+            if not send_static(self, self.assets, src, "application/javascript; charset=utf-8"):
                 self.send_error(HTTPStatus.NOT_FOUND, "three.min.js not found")
-                return
-            data = src.read_bytes()
-            self.send_response(HTTPStatus.OK)
-            self.send_header("Content-Type", "application/javascript; charset=utf-8")
-            self.send_header("Content-Length", str(len(data)))
-            self.end_headers()
-            self.wfile.write(data)
             return
         if path.startswith("/collision_meshes/"):
             rel = path[len("/collision_meshes/") :].strip("/")
@@ -101,12 +92,7 @@ class _DashboardHandler(BaseHTTPRequestHandler):
                 content_type = "model/stl"
             elif ext == ".cmf":
                 content_type = "application/octet-stream"
-            data = file_path.read_bytes()
-            self.send_response(HTTPStatus.OK)
-            self.send_header("Content-Type", content_type)
-            self.send_header("Content-Length", str(len(data)))
-            self.end_headers()
-            self.wfile.write(data)
+            send_static(self, self.assets, file_path, content_type)
             return
 
         if path == "/api/health":
@@ -150,19 +136,26 @@ class _DashboardHandler(BaseHTTPRequestHandler):
                 return self._send_json({"ok": False, "error": str(exc)}, status=400)
         if path == "/api/recommendations/current":
             try:
-                snap = self.store.snapshot()
-                payload = snap.get("recommendations") or {}
-                return self._send_json({"ok": True, "data": payload})
+                snap = self.store.published()
+                return self._send_cached(
+                    "recommendations_current",
+                    snap.versions["recommendations"],
+                    lambda: {"ok": True, "data": snap.data["recommendations"] or {}},
+                )
             except Exception as exc:
                 return self._send_json({"ok": False, "error": str(exc)}, status=400)
         if path == "/api/mechanics/current":
             try:
-                snap = self.store.snapshot()
-                payload = snap.get("mechanics") or {}
-                if not payload:
+                snap = self.store.published()
+                if not snap.data["mechanics"]:
                     payload = self._compute_review_mechanics()
                     self.store.set_mechanics(payload)
-                return self._send_json({"ok": True, "data": payload})
+                    snap = self.store.published()
+                return self._send_cached(
+                    "mechanics_current",
+                    snap.versions["mechanics"],
+                    lambda: {"ok": True, "data": snap.data["mechanics"]},
+                )
             except Exception as exc:
                 return self._send_json({"ok": False, "error": str(exc)}, status=400)
         if path == "/api/mechanics/events":
@@ -181,18 +174,35 @@ class _DashboardHandler(BaseHTTPRequestHandler):
             scenarios = self.store.list_scenarios()
             return self._send_json({"scenarios": [{"name": s.name, "source": s.source} for s in scenarios]})
         if path == "/api/metrics/current":
-            snapshot = self.store.snapshot()
-            return self._send_json({
+            snap = self.store.published()
+            snapshot = snap.data
+            return self._send_cached("metrics_current", snap.versions["metrics"], lambda: {
                 "active_scenario": snapshot["active_scenario"],
                 "active_source": snapshot["active_source"],
                 "pending_scenario": snapshot["pending_scenario"],
                 "spawn_mode": snapshot["spawn_mode"],
                 "current": snapshot["current_metrics"],
                 "events": snapshot["events"],
+                "players": snapshot["player_metrics"],
             })
+        if path == "/api/loop/stats":
+            # Polling loop timing (tick_scheduler) and per-stage pipeline queues; refreshed about once a second.
+            return self._send_json({"ok": True, "loop_stats": self.store.snapshot()["loop_stats"]})
+        if path == "/api/events":
+            return stream_events(self, self.store.events)
+        if path == "/api/metrics/delta":
+            # ?since=<version from the last response>&wait=<seconds to hold the request for new data>
+            try:
+                since = int((qs.get("since") or ["0"])[0] or 0)
+                wait = float((qs.get("wait") or ["0"])[0] or 0.0)
+            except ValueError as exc:
+                return self._send_json({"ok": False, "error": str(exc)}, status=400)
+            if wait > 0.0:
+                self.store.wait_for_metrics(since, min(wait, METRICS_LONG_POLL_MAX_S))
+            return self._send_json(self.store.metrics_delta(since))
         if path == "/api/metrics/history":
-            snapshot = self.store.snapshot()
-            return self._send_json({"history": snapshot["history"]})
+            snap = self.store.published()
+            return self._send_cached("metrics_history", snap.versions["history"], lambda: {"history": snap.data["history"]})
         if path == "/api/review/sessions":
             return self._send_json({"ok": True, "sessions": self.review_store.list_sessions()})
         if path == "/api/review/session/current":
@@ -379,6 +389,8 @@ class DashboardServer:
         handler.review_store = self.review_store
         handler.web_dir = self.web_dir
         handler.collision_mesh_dir = self.collision_mesh_dir
+        handler.assets = StaticAssetCache()
+        handler.api_cache = ResponseCache()
         handler.db = self.db
 
         self._server = ThreadingHTTPServer((self.host, self.port), handler)
@@ -386,6 +398,7 @@ class DashboardServer:
         self._thread.start()
 
     def stop(self) -> None:
+        self.store.events.close()
         if self._server:
             self._server.shutdown()
             self._server.server_close()
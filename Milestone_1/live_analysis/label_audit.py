@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import argparse
-import gzip
 import json
 from collections import Counter, defaultdict
 from pathlib import Path
 from typing import Any, Dict, Iterable, List
 
+from session_frames import JSONL_FRAMES_FILE, count_frames
+
 
 KEYWORDS = {
     "reposition": ["reposition", "repositioning", "adjustment", "turn", "slowed", "wiggled"],
@@ -25,21 +26,10 @@ def _read_json(path: Path, fallback):
         return fallback
 
 
-def _load_frames(session_dir: Path) -> List[Dict[str, Any]]:
-    frames_path = session_dir / "frames.jsonl.gz"
-    if not frames_path.exists():
-        return []
-    out = []
-    with gzip.open(frames_path, "rt", encoding="utf-8") as fp:
-        for line in fp:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                out.append(json.loads(line))
-            except Exception:
-                continue
-    return out
+def _frame_count(session_dir: Path, manifest: Dict[str, Any]) -> int:
+    # Only the count is reported, so the columnar format never decodes frame data here.
+    frames_name = str((manifest.get("files", {}) or {}).get("frames", JSONL_FRAMES_FILE))
+    return count_frames(session_dir / frames_name)
 
 
 def _keyword_tags(note: str) -> List[str]:
@@ -67,7 +57,6 @@ def audit_session(session_dir: Path) -> Dict[str, Any]:
     labels = _read_json(session_dir / "labels.json", {})
     events = _read_json(session_dir / "events.json", [])
     manifest = _read_json(session_dir / "manifest.json", {})
-    frames = _load_frames(session_dir)
     by_id = {str(e.get("event_id", "")): e for e in events if isinstance(e, dict)}
 
     label_counts = Counter()
@@ -116,7 +105,7 @@ def audit_session(session_dir: Path) -> Dict[str, Any]:
 
     return {
         "session_id": manifest.get("session_id", session_dir.name),
-        "frame_count": len(frames),
+        "frame_count": _frame_count(session_dir, manifest),
         "event_count": len(events),
         "labeled_event_count": sum(label_counts.values()),
         "unlabeled_event_count": missing_labels,
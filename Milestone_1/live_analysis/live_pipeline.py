@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+from collections import deque
+from threading import Condition, Thread
+from typing import Any, Callable, Dict, List, Tuple
+import time
+
+from frame_geometry import FrameGeometry
+from metrics_engine import HistoryUpdate, LiveMetricsEngine
+from tick_scheduler import LatencyWindow
+
+# player_index -> (current metrics, history update, recent events), all detached from the engine.
+# The history update carries only the points added since the previous one; it is None for players
+# outside `history_indices`.
+MetricsResults = Dict[int, Tuple[Dict[str, Any], HistoryUpdate | None, List[Dict[str, Any]]]]
+
+
+def _merge_history_updates(batch: List[Tuple[Any, MetricsResults]]) -> MetricsResults:
+    # publish only sees the newest results, so their history updates must also carry the points the
+    # earlier packets in the batch added.
+    merged = dict(batch[-1][1])
+    for idx, (current, history, events) in merged.items():
+        if history is None:
+            continue
+        earlier = [r[idx][1] for _, r in batch[:-1] if idx in r and r[idx][1] is not None]
+        if earlier:
+            merged[idx] = (current, history.after(earlier), events)
+    return merged
+
+
+class PipelineStage:
+    """
+    One worker thread behind a bounded queue. put() never blocks: when the queue is full the item is
+    dropped and counted, so a slow stage cannot stall the stage feeding it.
+    With batch=True the handler gets every queued item at once (in order) instead of one at a time.
+    """
+
+    def __init__(self, name: str, handler: Callable[[Any], None], capacity: int = 256, batch: bool = False) -> None:
+        self.name = name
+        self.capacity = max(1, int(capacity))
+        self.batch = bool(batch)
+        self._handler = handler
+        self._queue: deque[Any] = deque()
+        self._cond = Condition()
+        self._closing = False
+        self._latency = LatencyWindow()
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.high_water = 0
+        self._thread = Thread(target=self._run, name=f"live-{name}", daemon=True)
+        self._thread.start()
+
+    def put(self, item: Any) -> bool:
+        with self._cond:
+            if self._closing or len(self._queue) >= self.capacity:
+                self.dropped += 1
+                return False
+            self._queue.append(item)
+            if len(self._queue) > self.high_water:
+                self.high_water = len(self._queue)
+            self._cond.notify()
+            return True
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closing:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                if self.batch:
+                    work: Any = list(self._queue)
+                    self._queue.clear()
+                    count = len(work)
+                else:
+                    work = self._queue.popleft()
+                    count = 1
+            t0 = time.perf_counter()
+            try:
+                self._handler(work)
+            except Exception as exc:
+                self.errors += 1
+                if self.errors == 1 or self.errors % 100 == 0:
+                    print(f"[live_pipeline] {self.name} stage error ({self.errors}): {exc}")
+            self._latency.add(time.perf_counter() - t0)
+            self.processed += count
+
+    def close(self) -> None:
+        # Lets the queued items finish, then stops the thread.
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            depth = len(self._queue)
+        return {
+            "queue_depth": depth,
+            "queue_high_water": self.high_water,
+            "queue_capacity": self.capacity,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            **self._latency.summary("ms"),
+        }
+
+
+class LivePipeline:
+    """
+    packet capture (caller's thread) -> metrics stage -> publish stage.
+
+    submit() only enqueues, so the polling loop never waits on metric updates, snapshotting, the
+    state store or the recorder. The metrics stage owns one LiveMetricsEngine per tracked player
+    index and hands detached results on. The publish stage calls `record(packet, results)` for every
+    packet and `publish(packet, results)` once per batch with the newest results, whose history
+    updates are merged over the whole batch. A packet dropped by a full publish queue leaves a gap
+    in the published history.
+    With track_all=True an engine is added for every car index the packets contain. When more than one
+    engine runs, the packet's FrameGeometry is computed once and shared by all of them.
+    Packets must not be reused by the caller after submit().
+    """
+
+    def __init__(
+        self,
+        player_indices: List[int],
+        window_seconds: float,
+        publish: Callable[[Any, MetricsResults], None],
+        record: Callable[[Any, MetricsResults], None] | None = None,
+        queue_size: int = 256,
+        track_all: bool = False,
+        history_indices: List[int] | None = None,
+    ) -> None:
+        self.player_indices = list(dict.fromkeys(int(i) for i in player_indices))
+        self.window_seconds = float(window_seconds)
+        self.track_all = bool(track_all)
+        # Histories are the expensive part of a snapshot; by default only the first player's is kept.
+        if history_indices is None:
+            history_indices = self.player_indices[:1]
+        self.history_indices = set(int(i) for i in history_indices)
+        self.engines = {i: LiveMetricsEngine(window_seconds=self.window_seconds) for i in self.player_indices}
+        self._publish = publish
+        self._record = record
+        self.submitted = 0
+        # Built downstream-first so each stage can hand off to the next as soon as it starts.
+        self._publish_stage = PipelineStage("publish", self._publish_batch, capacity=queue_size, batch=True)
+        self._metrics_stage = PipelineStage("metrics", self._update_metrics, capacity=queue_size)
+
+    def submit(self, packet: Any) -> bool:
+        self.submitted += 1
+        return self._metrics_stage.put(packet)
+
+    def _update_metrics(self, packet: Any) -> None:
+        results: MetricsResults = {}
+        num_cars = int(getattr(packet, "num_cars", 0) or 0)
+        # Explicit indices may lie beyond num_cars, so the engine count says nothing about coverage.
+        if self.track_all and any(i not in self.engines for i in range(num_cars)):
+            for idx in range(num_cars):
+                if idx not in self.engines:
+                    self.engines[idx] = LiveMetricsEngine(window_seconds=self.window_seconds)
+                    self.player_indices.append(idx)
+        active = [(idx, engine) for idx, engine in self.engines.items() if idx < num_cars]
+        geometry = FrameGeometry.from_packet(packet) if len(active) > 1 else None
+        for idx, engine in active:
+            engine.update(packet, player_index=idx, geometry=geometry)
+            history = engine.history_update() if idx in self.history_indices else None
+            results[idx] = (engine.current(), history, list(engine.events))
+        if results:
+            self._publish_stage.put((packet, results))
+
+    def _publish_batch(self, batch: List[Tuple[Any, MetricsResults]]) -> None:
+        if self._record is not None:
+            for packet, results in batch:
+                self._record(packet, results)
+        packet, results = batch[-1]
+        if len(batch) > 1:
+            results = _merge_history_updates(batch)
+        self._publish(packet, results)
+
+    def close(self) -> None:
+        self._metrics_stage.close()
+        self._publish_stage.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "tracked_players": list(self.player_indices),
+            "metrics": self._metrics_stage.stats(),
+            "publish": self._publish_stage.stats(),
+        }
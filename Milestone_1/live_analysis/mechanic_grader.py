@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-from math import exp, sqrt
+from math import exp
 from statistics import mean, pstdev
 from typing import Any, Dict, List, Tuple
 
+import numpy as np
+
+from timeline_index import TimelineIndex, ensure_timeline_index, norm3
+
 
 MECHANIC_ALIASES = {
     "flicking_carry_offense": "flicking",
@@ -56,14 +60,6 @@ def _canonical_mid(mid: str) -> str:
     return MECHANIC_ALIASES.get(m, m)
 
 
-def _norm3(x: float, y: float, z: float) -> float:
-    return sqrt(x * x + y * y + z * z)
-
-
-def _dot3(ax: float, ay: float, az: float, bx: float, by: float, bz: float) -> float:
-    return ax * bx + ay * by + az * bz
-
-
 def _clamp(v: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, v))
 
@@ -79,13 +75,6 @@ def _safe_float(v: Any, default: float = 0.0) -> float:
         return default
 
 
-def _player_frame(frame: Dict[str, Any], player: str) -> Dict[str, Any] | None:
-    for p in frame.get("players", []) or []:
-        if str(p.get("name", "")) == player:
-            return p
-    return None
-
-
 def _player_team(player: str, player_teams: Dict[str, Any]) -> int:
     try:
         t = int(player_teams.get(player, -1))
@@ -110,182 +99,159 @@ def _team_for_player_name(name: str, player_teams: Dict[str, Any], fallback_team
     return t if t in (0, 1) else fallback_team
 
 
-def _player_ball_dist(frame: Dict[str, Any], player: str) -> float:
-    p = _player_frame(frame, player)
-    if not p:
-        return 99999.0
-    b = frame.get("ball", {}) or {}
-    return _norm3(
-        _safe_float(p.get("x", 0.0)) - _safe_float(b.get("x", 0.0)),
-        _safe_float(p.get("y", 0.0)) - _safe_float(b.get("y", 0.0)),
-        _safe_float(p.get("z", 0.0)) - _safe_float(b.get("z", 0.0)),
-    )
+def _floor_arr(v: np.ndarray, lo: float) -> np.ndarray:
+    # max(lo, v) elementwise, keeping Python's NaN behaviour (NaN -> lo).
+    return np.where(v > lo, v, lo)
 
 
-def _ball_speed(frame: Dict[str, Any]) -> float:
-    b = frame.get("ball", {}) or {}
-    return _norm3(_safe_float(b.get("vx", 0.0)), _safe_float(b.get("vy", 0.0)), _safe_float(b.get("vz", 0.0)))
+def _clamp01_arr(v: np.ndarray) -> np.ndarray:
+    return _floor_arr(np.where(v < 1.0, v, 1.0), 0.0)
 
 
-def _player_speed(frame: Dict[str, Any], player: str) -> float:
-    p = _player_frame(frame, player)
-    if not p:
-        return 0.0
-    return _norm3(_safe_float(p.get("vx", 0.0)), _safe_float(p.get("vy", 0.0)), _safe_float(p.get("vz", 0.0)))
+def _slot_teams(index: TimelineIndex, player_teams: Dict[str, Any], fallback_team: int) -> np.ndarray:
+    return np.array([_team_for_player_name(name, player_teams, fallback_team) for name in index.players], dtype=np.int64)
 
 
-def _rel_speed_player_ball(frame: Dict[str, Any], player: str) -> float:
-    p = _player_frame(frame, player)
-    if not p:
-        return 99999.0
-    b = frame.get("ball", {}) or {}
-    return _norm3(
-        _safe_float(p.get("vx", 0.0)) - _safe_float(b.get("vx", 0.0)),
-        _safe_float(p.get("vy", 0.0)) - _safe_float(b.get("vy", 0.0)),
-        _safe_float(p.get("vz", 0.0)) - _safe_float(b.get("vz", 0.0)),
+def _best_team_ball_dist(index: TimelineIndex, player_teams: Dict[str, Any], team: int, rows: Any = slice(None)) -> np.ndarray:
+    return index.masked_min(index.ball_dist, _slot_teams(index, player_teams, team) == team, rows)
+
+
+def _nearest_opponent_dist_ball(index: TimelineIndex, slot: int, player_teams: Dict[str, Any], tracked_team: int, rows: Any = slice(None)) -> np.ndarray:
+    opp = _slot_teams(index, player_teams, tracked_team) != tracked_team
+    if slot >= 0:
+        opp[slot] = False
+    return index.masked_min(index.ball_dist, opp, rows)
+
+
+def _nearest_opponent_speed(index: TimelineIndex, slot: int, player_teams: Dict[str, Any], tracked_team: int, rows: Any = slice(None)) -> np.ndarray:
+    if slot < 0:
+        return np.zeros(len(index.times[rows]))
+    opp = _slot_teams(index, player_teams, tracked_team) != tracked_team
+    opp[slot] = False
+    d_self = index.slot_dist(slot, rows)
+    d_self = np.where(index.present[rows] & opp & (d_self < 99999.0), d_self, np.inf)
+    if d_self.shape[1] == 0:
+        return np.zeros(d_self.shape[0])
+    nearest = d_self.argmin(axis=1)
+    best_d = d_self[np.arange(len(nearest)), nearest]
+    best_speed = index.speed[rows][np.arange(len(nearest)), nearest]
+    return np.where(index.present[rows, slot] & (best_d < 99999.0), best_speed, 0.0)
+
+
+def _teammate_double_commit(
+    index: TimelineIndex,
+    slot: int,
+    player_teams: Dict[str, Any],
+    tracked_team: int,
+    tracked_d_pb: np.ndarray,
+    rows: Any = slice(None),
+) -> np.ndarray:
+    mates = _slot_teams(index, player_teams, tracked_team) == tracked_team
+    mates[slot] = False
+    d = index.ball_dist[rows]
+    close = (d <= 850.0) & (d <= tracked_d_pb[:, None] + 120.0)
+    return (close & index.present[rows] & mates).any(axis=1)
+
+
+def _rel_speed_player_ball(index: TimelineIndex, slot: int, rows: Any = slice(None)) -> np.ndarray:
+    if slot < 0:
+        return np.full(len(index.times[rows]), 99999.0)
+    p = index.player
+    b = index.ball
+    rel = norm3(
+        p["vx"][rows, slot] - b["vx"][rows],
+        p["vy"][rows, slot] - b["vy"][rows],
+        p["vz"][rows, slot] - b["vz"][rows],
     )
+    return np.where(index.present[rows, slot], rel, 99999.0)
 
 
-def _nearest_opponent_dist_ball(frame: Dict[str, Any], player: str, player_teams: Dict[str, Any], tracked_team: int) -> float:
-    b = frame.get("ball", {}) or {}
-    bx = _safe_float(b.get("x", 0.0))
-    by = _safe_float(b.get("y", 0.0))
-    bz = _safe_float(b.get("z", 0.0))
-    best = 99999.0
-    for op in frame.get("players", []) or []:
-        name = str(op.get("name", ""))
-        if name == player:
-            continue
-        if _team_for_player_name(name, player_teams, tracked_team) == tracked_team:
-            continue
-        d = _norm3(_safe_float(op.get("x", 0.0)) - bx, _safe_float(op.get("y", 0.0)) - by, _safe_float(op.get("z", 0.0)) - bz)
-        if d < best:
-            best = d
-    return best
-
-
-def _nearest_opponent_speed(frame: Dict[str, Any], player: str, player_teams: Dict[str, Any], tracked_team: int) -> float:
-    pself = _player_frame(frame, player)
-    if not pself:
-        return 0.0
-    sx = _safe_float(pself.get("x", 0.0))
-    sy = _safe_float(pself.get("y", 0.0))
-    sz = _safe_float(pself.get("z", 0.0))
-    best_d = 99999.0
-    best_speed = 0.0
-    for op in frame.get("players", []) or []:
-        name = str(op.get("name", ""))
-        if name == player:
-            continue
-        if _team_for_player_name(name, player_teams, tracked_team) == tracked_team:
-            continue
-        d = _norm3(_safe_float(op.get("x", 0.0)) - sx, _safe_float(op.get("y", 0.0)) - sy, _safe_float(op.get("z", 0.0)) - sz)
-        if d < best_d:
-            best_d = d
-            best_speed = _norm3(_safe_float(op.get("vx", 0.0)), _safe_float(op.get("vy", 0.0)), _safe_float(op.get("vz", 0.0)))
-    return best_speed
-
-
-def _best_team_ball_dist(frame: Dict[str, Any], player_teams: Dict[str, Any], team: int) -> float:
-    b = frame.get("ball", {}) or {}
-    bx = _safe_float(b.get("x", 0.0))
-    by = _safe_float(b.get("y", 0.0))
-    bz = _safe_float(b.get("z", 0.0))
-    best = 99999.0
-    for pl in frame.get("players", []) or []:
-        name = str(pl.get("name", ""))
-        if _team_for_player_name(name, player_teams, team) != team:
-            continue
-        d = _norm3(_safe_float(pl.get("x", 0.0)) - bx, _safe_float(pl.get("y", 0.0)) - by, _safe_float(pl.get("z", 0.0)) - bz)
-        if d < best:
-            best = d
-    return best
-
-
-def _teammate_double_commit(frame: Dict[str, Any], player: str, player_teams: Dict[str, Any], tracked_team: int, tracked_d_pb: float) -> bool:
-    b = frame.get("ball", {}) or {}
-    bx = _safe_float(b.get("x", 0.0))
-    by = _safe_float(b.get("y", 0.0))
-    bz = _safe_float(b.get("z", 0.0))
-    for pl in frame.get("players", []) or []:
-        name = str(pl.get("name", ""))
-        if name == player:
-            continue
-        if _team_for_player_name(name, player_teams, tracked_team) != tracked_team:
-            continue
-        d = _norm3(_safe_float(pl.get("x", 0.0)) - bx, _safe_float(pl.get("y", 0.0)) - by, _safe_float(pl.get("z", 0.0)) - bz)
-        if d <= 850.0 and d <= tracked_d_pb + 120.0:
-            return True
-    return False
+def _closing_speed_toward_ball(index: TimelineIndex, rows: Any = slice(None)) -> np.ndarray:
+    p = {k: index.player[k][rows] for k in ("x", "y", "z", "vx", "vy", "vz")}
+    b = index.ball
+    tx = b["x"][rows, None] - p["x"]
+    ty = b["y"][rows, None] - p["y"]
+    tz = b["z"][rows, None] - p["z"]
+    mag = _floor_arr(norm3(tx, ty, tz), 1e-6)
+    ux, uy, uz = tx / mag, ty / mag, tz / mag
+    return np.where(index.present[rows], p["vx"] * ux + p["vy"] * uy + p["vz"] * uz, 0.0)
+
+
+def _touch_confidence_arr(
+    bx: np.ndarray,
+    by: np.ndarray,
+    bz: np.ndarray,
+    dvx: np.ndarray,
+    dvy: np.ndarray,
+    dvz: np.ndarray,
+    px: np.ndarray,
+    py: np.ndarray,
+    pz: np.ndarray,
+) -> np.ndarray:
+    # Touch confidence from the ball position, the ball's velocity change over the touch and the
+    # player position, elementwise; 0.0 beyond 260 uu.
+    d = norm3(px - bx, py - by, pz - bz)
+    tx, ty, tz = bx - px, by - py, bz - pz
+    to_mag = _floor_arr(norm3(tx, ty, tz), 1e-6)
+    dv_mag = norm3(dvx, dvy, dvz)
+    still = dv_mag < 1e-6
+    safe_dv = np.where(still, 1.0, dv_mag)
+    align = (tx / to_mag) * (dvx / safe_dv) + (ty / to_mag) * (dvy / safe_dv) + (tz / to_mag) * (dvz / safe_dv)
+    align = np.where(still, 0.0, align)
+    prox = _clamp01_arr((260.0 - d) / 260.0)
+    align01 = _clamp01_arr((align + 1.0) * 0.5)
+    conf = _clamp01_arr(0.65 * prox + 0.35 * align01)
+    return np.where(~(d > 260.0), conf, 0.0)
+
+
+def _touch_confidence_all(index: TimelineIndex, rows: Any = slice(None)) -> np.ndarray:
+    # Touch confidence for every (frame, slot), using the ball at frame i and i + 1; `rows`
+    # selects among frames 0..n-2.
+    n = len(index)
+    if n < 2:
+        return np.zeros((0, len(index.players)))
+    i0 = np.arange(n - 1)[rows]
+    i1 = i0 + 1
+    p = index.player
+    b = index.ball
+    conf = _touch_confidence_arr(
+        b["x"][i0, None],
+        b["y"][i0, None],
+        b["z"][i0, None],
+        (b["vx"][i1] - b["vx"][i0])[:, None],
+        (b["vy"][i1] - b["vy"][i0])[:, None],
+        (b["vz"][i1] - b["vz"][i0])[:, None],
+        p["x"][i0],
+        p["y"][i0],
+        p["z"][i0],
+    )
+    return np.where(index.present[i0], conf, 0.0)
 
 
-def _find_next_idx_by_time(times: List[float], idx: int, dt: float) -> int:
-    t = times[idx] + max(0.0, dt)
-    j = idx
-    while j + 1 < len(times) and times[j] < t:
-        j += 1
-    return j
+def _ball_dir_flip_arr(ball: Dict[str, np.ndarray], i0: np.ndarray, i1: np.ndarray) -> np.ndarray:
+    # Whether the ball's velocity reversed (cos < -0.2) between frames i0 and i1, both moving >= 250 uu/s.
+    vx0, vy0, vz0 = ball["vx"][i0], ball["vy"][i0], ball["vz"][i0]
+    vx1, vy1, vz1 = ball["vx"][i1], ball["vy"][i1], ball["vz"][i1]
+    s0 = norm3(vx0, vy0, vz0)
+    s1 = norm3(vx1, vy1, vz1)
+    cos_th = (vx0 * vx1 + vy0 * vy1 + vz0 * vz1) / _floor_arr(s0 * s1, 1e-6)
+    return ~((s0 < 250.0) | (s1 < 250.0)) & (cos_th < -0.2)
 
 
-def _ball_forward_speed_to_opp(frame: Dict[str, Any], team: int) -> float:
-    vy = _safe_float((frame.get("ball", {}) or {}).get("vy", 0.0))
+def _ball_forward_speed_to_opp(ball: Dict[str, List[float]], i: int, team: int) -> float:
+    vy = ball["vy"][i]
     return vy if team == 0 else -vy
 
 
-def _ball_toward_own_goal_fast(f0: Dict[str, Any], f1: Dict[str, Any], team: int) -> bool:
-    b0 = f0.get("ball", {}) or {}
-    b1 = f1.get("ball", {}) or {}
-    y0 = _safe_float(b0.get("y", 0.0))
-    y1 = _safe_float(b1.get("y", 0.0))
-    vy1 = _safe_float(b1.get("vy", 0.0))
+def _ball_toward_own_goal_fast(ball: Dict[str, List[float]], i0: int, i1: int, team: int) -> bool:
+    y0 = ball["y"][i0]
+    y1 = ball["y"][i1]
+    vy1 = ball["vy"][i1]
     toward_own = (team == 0 and y1 < y0 - 100.0 and vy1 <= -900.0) or (team == 1 and y1 > y0 + 100.0 and vy1 >= 900.0)
-    center_lane = abs(_safe_float(b1.get("x", 0.0))) < 1800.0
+    center_lane = abs(ball["x"][i1]) < 1800.0
     return bool(toward_own and center_lane)
 
 
-def _ball_dir_flip(frame0: Dict[str, Any], frame1: Dict[str, Any]) -> bool:
-    b0 = frame0.get("ball", {}) or {}
-    b1 = frame1.get("ball", {}) or {}
-    vx0 = _safe_float(b0.get("vx", 0.0))
-    vy0 = _safe_float(b0.get("vy", 0.0))
-    vz0 = _safe_float(b0.get("vz", 0.0))
-    vx1 = _safe_float(b1.get("vx", 0.0))
-    vy1 = _safe_float(b1.get("vy", 0.0))
-    vz1 = _safe_float(b1.get("vz", 0.0))
-    s0 = _norm3(vx0, vy0, vz0)
-    s1 = _norm3(vx1, vy1, vz1)
-    if s0 < 250.0 or s1 < 250.0:
-        return False
-    cos_th = _dot3(vx0, vy0, vz0, vx1, vy1, vz1) / max(1e-6, s0 * s1)
-    return cos_th < -0.2
-
-
-def _touch_confidence(frame0: Dict[str, Any], frame1: Dict[str, Any], p: Dict[str, Any]) -> float:
-    b0 = frame0.get("ball", {}) or {}
-    b1 = frame1.get("ball", {}) or {}
-    px = _safe_float(p.get("x", 0.0))
-    py = _safe_float(p.get("y", 0.0))
-    pz = _safe_float(p.get("z", 0.0))
-    bx = _safe_float(b0.get("x", 0.0))
-    by = _safe_float(b0.get("y", 0.0))
-    bz = _safe_float(b0.get("z", 0.0))
-    d = _norm3(px - bx, py - by, pz - bz)
-    if d > 260.0:
-        return 0.0
-    dvx = _safe_float(b1.get("vx", 0.0)) - _safe_float(b0.get("vx", 0.0))
-    dvy = _safe_float(b1.get("vy", 0.0)) - _safe_float(b0.get("vy", 0.0))
-    dvz = _safe_float(b1.get("vz", 0.0)) - _safe_float(b0.get("vz", 0.0))
-    to_ball_x = bx - px
-    to_ball_y = by - py
-    to_ball_z = bz - pz
-    to_mag = max(1e-6, _norm3(to_ball_x, to_ball_y, to_ball_z))
-    dv_mag = _norm3(dvx, dvy, dvz)
-    align = 0.0 if dv_mag < 1e-6 else _dot3(to_ball_x / to_mag, to_ball_y / to_mag, to_ball_z / to_mag, dvx / dv_mag, dvy / dv_mag, dvz / dv_mag)
-    prox = _clamp01((260.0 - d) / 260.0)
-    align01 = _clamp01((align + 1.0) * 0.5)
-    return _clamp01(0.65 * prox + 0.35 * align01)
-
-
 def _add_event(events: List[Dict[str, Any]], mechanic: str, t: float, score: float, reason: str) -> None:
     q = _clamp01(score)
     label = "good" if q >= 0.66 else ("bad" if q < 0.42 else "neutral")
@@ -301,72 +267,66 @@ def _add_event(events: List[Dict[str, Any]], mechanic: str, t: float, score: flo
     )
 
 
-def _closing_speed_toward_ball(frame: Dict[str, Any], player: str) -> float:
-    p = _player_frame(frame, player)
-    if not p:
-        return 0.0
-    b = frame.get("ball", {}) or {}
-    tx = _safe_float(b.get("x", 0.0)) - _safe_float(p.get("x", 0.0))
-    ty = _safe_float(b.get("y", 0.0)) - _safe_float(p.get("y", 0.0))
-    tz = _safe_float(b.get("z", 0.0)) - _safe_float(p.get("z", 0.0))
-    mag = max(1e-6, _norm3(tx, ty, tz))
-    ux, uy, uz = tx / mag, ty / mag, tz / mag
-    vx = _safe_float(p.get("vx", 0.0))
-    vy = _safe_float(p.get("vy", 0.0))
-    vz = _safe_float(p.get("vz", 0.0))
-    return _dot3(vx, vy, vz, ux, uy, uz)
-
-
-def _ball_center_slow(frame: Dict[str, Any]) -> bool:
-    b = frame.get("ball", {}) or {}
-    bx = _safe_float(b.get("x", 0.0))
-    by = _safe_float(b.get("y", 0.0))
-    bz = _safe_float(b.get("z", 0.0))
-    dist = _norm3(bx, by, bz - 93.0)
-    return dist <= KICKOFF_CENTER_MAX_DIST and _ball_speed(frame) <= KICKOFF_BALL_SPEED_MAX
-
-
-def _first_touch_in_window(timeline: List[Dict[str, Any]], times: List[float], start_idx: int, end_t: float) -> Tuple[int, str, float]:
-    pnames = [str(p.get("name", "")) for p in (timeline[start_idx].get("players", []) or [])]
-    for i in range(start_idx, len(timeline) - 1):
-        if times[i] > end_t:
-            break
-        fr = timeline[i]
-        fr2 = timeline[min(i + 1, len(timeline) - 1)]
-        best_player = ""
-        best_conf = 0.0
-        for pn in pnames:
-            p = _player_frame(fr, pn)
-            if not p:
-                continue
-            conf = _touch_confidence(fr, fr2, p)
-            if conf > best_conf:
-                best_conf = conf
-                best_player = pn
-        if best_player and best_conf >= 0.55:
-            return i, best_player, times[i]
-    return -1, "", 0.0
-
-
-def _attempted_kickoff_before_touch(
-    timeline: List[Dict[str, Any]],
-    times: List[float],
-    player: str,
+def _ball_center_slow(index: TimelineIndex) -> np.ndarray:
+    b = index.ball
+    dist = norm3(b["x"], b["y"], b["z"] - 93.0)
+    return (dist <= KICKOFF_CENTER_MAX_DIST) & (index.ball_speed <= KICKOFF_BALL_SPEED_MAX)
+
+
+def _kickoff_window_rows(index: TimelineIndex, center_idx: List[int]) -> np.ndarray:
+    # Frames the touch scan of any window opened at `center_idx` can reach (see
+    # _first_touch_in_window); every scannable frame when times are out of order.
+    last = len(index) - 1
+    if not index.times_sorted:
+        return np.arange(max(last, 0))
+    times = index.times
+    starts = np.asarray(center_idx, dtype=np.int64)
+    end_t = np.minimum(times[-1], times[starts] + KICKOFF_WINDOW_TIMEOUT)
+    stops = np.minimum(np.searchsorted(times, end_t, side="right"), last)
+    cover = np.zeros(len(index) + 1, dtype=np.int64)
+    np.add.at(cover, starts, 1)
+    np.add.at(cover, stops, -1)
+    return np.flatnonzero(np.cumsum(cover)[:last] > 0)
+
+
+def _first_touch_in_window(
+    times: np.ndarray,
+    touch_conf: np.ndarray,
+    names: List[str],
+    slots: List[int],
     start_idx: int,
-    touch_idx: int,
-) -> bool:
+    end_t: float,
+) -> Tuple[int, int, float]:
+    # First frame from start_idx (stopping at the first frame past end_t) where the most confident
+    # of `slots` touched the ball with confidence >= 0.55; ties go to the earlier slot.
+    last = len(times) - 1
+    if not slots or start_idx >= last:
+        return -1, -1, 0.0
+    past = np.flatnonzero(times[start_idx:last] > end_t)
+    stop = start_idx + int(past[0]) if len(past) else last
+    rows = touch_conf[start_idx:stop][:, slots]
+    rows = np.where(rows > 0.0, rows, 0.0)
+    best = rows.argmax(axis=1)
+    conf = rows[np.arange(len(rows)), best]
+    named = np.array([bool(names[slot]) for slot in slots])[best]
+    hits = np.flatnonzero(named & (conf > 0.0) & (conf >= 0.55))
+    if not len(hits):
+        return -1, -1, 0.0
+    i = start_idx + int(hits[0])
+    return i, slots[int(best[hits[0]])], float(times[i])
+
+
+def _attempted_kickoff_before_touch(times: List[float], ball_dist: List[float], closing_speed: List[float]) -> bool:
+    # Inputs cover the kickoff window only, from its start frame through the touch frame.
     reached_proximity = False
     sustain = 0.0
-    last_t = times[start_idx]
-    for i in range(start_idx, max(start_idx + 1, touch_idx + 1)):
-        fr = timeline[i]
+    last_t = times[0]
+    for i in range(len(times)):
         t = times[i]
-        d = _player_ball_dist(fr, player)
-        if d <= KICKOFF_ATTEMPT_DIST:
+        if ball_dist[i] <= KICKOFF_ATTEMPT_DIST:
             reached_proximity = True
-        cs = _closing_speed_toward_ball(fr, player)
         dt = max(0.0, t - last_t)
-        if cs >= KICKOFF_ATTEMPT_CLOSING_SPEED:
+        if closing_speed[i] >= KICKOFF_ATTEMPT_CLOSING_SPEED:
             sustain += dt
         else:
             sustain = 0.0
@@ -376,33 +336,56 @@ def _attempted_kickoff_before_touch(
     return False
 
 
-def _detect_kickoff_events(timeline: List[Dict[str, Any]], times: List[float], player_teams: Dict[str, Any]) -> List[Dict[str, Any]]:
+def _detect_kickoff_events(
+    index: TimelineIndex,
+    times: List[float],
+    ball: Dict[str, List[float]],
+    player_teams: Dict[str, Any],
+) -> List[Dict[str, Any]]:
     events: List[Dict[str, Any]] = []
+    timeline = index.timeline
     if not timeline:
         return events
+    # Only frames with the ball slow at center can open a kickoff window.
+    center_idx = np.flatnonzero(_ball_center_slow(index)).tolist()
+    if not center_idx:
+        return events
+    # Touch confidence only where a kickoff window can look; other rows stay 0.0 and are never read.
+    touch_rows = _kickoff_window_rows(index, center_idx)
+    touch_conf = np.zeros((max(len(index) - 1, 0), len(index.players)))
+    touch_conf[touch_rows] = _touch_confidence_all(index, touch_rows)
+    team_best: Dict[int, List[float]] = {}
+    idx_plus_0p65s = index.lookahead(0.65)
+    idx_plus_1p2s = index.lookahead(1.20)
+    pos = 0
     i = 0
     last_kickoff_end_t = -999.0
-    while i < len(timeline):
-        fr = timeline[i]
+    while True:
+        while pos < len(center_idx) and (center_idx[pos] < i or times[center_idx[pos]] < last_kickoff_end_t):
+            pos += 1
+        if pos >= len(center_idx):
+            break
+        i = center_idx[pos]
         t = times[i]
-        if t < last_kickoff_end_t:
-            i += 1
-            continue
-        if not _ball_center_slow(fr):
-            i += 1
-            continue
         start_idx = i
         start_t = t
         end_t = min(times[-1], start_t + KICKOFF_WINDOW_TIMEOUT)
-        touch_idx, touch_player, touch_t = _first_touch_in_window(timeline, times, start_idx, end_t)
+        slots = [index.slots[str(p.get("name", ""))] for p in (timeline[start_idx].get("players", []) or [])]
+        touch_idx, touch_slot, touch_t = _first_touch_in_window(index.times, touch_conf, index.players, slots, start_idx, end_t)
         if touch_idx < 0:
             i += 1
             continue
-        players = [str(p.get("name", "")) for p in (timeline[start_idx].get("players", []) or [])]
+        touch_player = index.players[touch_slot]
+        window = slice(start_idx, touch_idx + 1)
+        closing_speed = _closing_speed_toward_ball(index, window)
         attempts = {
-            pn: _attempted_kickoff_before_touch(timeline, times, pn, start_idx, touch_idx)
-            for pn in players
-            if pn
+            index.players[slot]: _attempted_kickoff_before_touch(
+                times[window],
+                index.player_ball_dist(slot)[window].tolist(),
+                closing_speed[:, slot].tolist(),
+            )
+            for slot in slots
+            if index.players[slot]
         }
         if not any(attempts.values()):
             i = touch_idx + 1
@@ -415,16 +398,17 @@ def _detect_kickoff_events(timeline: List[Dict[str, Any]], times: List[float], p
             continue
 
         team = _team_for_player_name(touch_player, player_teams, 0)
-        j_mid = _find_next_idx_by_time(times, touch_idx, 0.65)
-        j_out = _find_next_idx_by_time(times, touch_idx, 1.20)
-        fr_mid = timeline[j_mid]
-        fr_out = timeline[j_out]
-        our_mid = _best_team_ball_dist(fr_mid, player_teams, team)
-        opp_mid = _best_team_ball_dist(fr_mid, player_teams, 1 - team)
-        our_out = _best_team_ball_dist(fr_out, player_teams, team)
-        opp_out = _best_team_ball_dist(fr_out, player_teams, 1 - team)
+        for tm in (team, 1 - team):
+            if tm not in team_best:
+                team_best[tm] = _best_team_ball_dist(index, player_teams, tm).tolist()
+        j_mid = idx_plus_0p65s[touch_idx]
+        j_out = idx_plus_1p2s[touch_idx]
+        our_mid = team_best[team][j_mid]
+        opp_mid = team_best[1 - team][j_mid]
+        our_out = team_best[team][j_out]
+        opp_out = team_best[1 - team][j_out]
         win_possession = (our_out + 120.0 < opp_out) or (our_mid + 100.0 < opp_mid)
-        safe_exit = not _ball_toward_own_goal_fast(timeline[touch_idx], fr_out, team)
+        safe_exit = not _ball_toward_own_goal_fast(ball, touch_idx, j_out, team)
         q = 0.35 + 0.4 * (1.0 if win_possession else 0.0) + 0.25 * (1.0 if safe_exit else 0.2)
         q = _clamp01(q)
         reason = "kickoff won with follow-up control" if win_possession else ("kickoff neutral but safe" if safe_exit else "kickoff lost into pressure")
@@ -437,16 +421,64 @@ def _detect_kickoff_events(timeline: List[Dict[str, Any]], times: List[float], p
     return events
 
 
-def _detect_mechanic_events(timeline: List[Dict[str, Any]], player: str, player_teams: Dict[str, Any]) -> List[Dict[str, Any]]:
+def _mechanic_conditions(
+    index: TimelineIndex,
+    slot: int,
+    team: int,
+    d_pb: np.ndarray,
+    opp_db: np.ndarray,
+    opp_speed: np.ndarray,
+    rel_v: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    # Per-frame trigger condition of each mechanic in _detect_mechanic_events, cooldowns left out;
+    # "carry" is the carry state the flick and carry detection share.
+    own_goal = _own_goal_y(team)
+    by = index.ball["y"]
+    bz = index.ball["z"]
+    py = index.player["y"][:, slot]
+    pz = index.player["z"][:, slot]
+    attacking_half = by > 200.0 if team == 0 else by < -200.0
+    defending_half = by < -300.0 if team == 0 else by > 300.0
+    return {
+        "shadow_defense": (
+            defending_half
+            & (opp_db + 120.0 < d_pb)
+            & (np.abs(py - own_goal) < np.abs(by - own_goal))
+            & (d_pb >= 500.0)
+            & (d_pb <= 1500.0)
+            & (np.abs(index.speed[:, slot] - opp_speed) < 650.0)
+        ),
+        "challenge": (d_pb <= 900.0) & (opp_db <= 900.0) & (bz <= 320.0) & (np.abs(d_pb - opp_db) <= 280.0),
+        "fifty_fifty_control": (d_pb < 300.0) & (opp_db < 300.0) & (bz < 260.0),
+        "aerial_offense": attacking_half & (pz > 150.0) & (bz > 300.0) & (d_pb < 950.0),
+        "aerial_defense": defending_half & (np.abs(by - own_goal) < 2600.0) & (pz > 150.0) & (bz > 260.0) & (d_pb < 1200.0),
+        "carry": (d_pb <= 200.0) & (bz < 250.0) & (rel_v < 700.0),
+    }
+
+
+def _next_present(present: np.ndarray) -> List[int]:
+    # For every frame, the next frame (after it) where `present` holds, or -1.
+    present_idx = np.flatnonzero(present)
+    following = np.searchsorted(present_idx, np.arange(len(present)), side="right")
+    return np.append(present_idx, -1)[following].tolist()
+
+
+def _detect_mechanic_events(
+    timeline: List[Dict[str, Any]],
+    player: str,
+    player_teams: Dict[str, Any],
+    index: TimelineIndex | None = None,
+) -> List[Dict[str, Any]]:
     if not timeline or not player:
         return []
+    index = ensure_timeline_index(timeline, index)
     team = _player_team(player, player_teams or {})
     if team not in (0, 1):
         team = 0
     own_goal = _own_goal_y(team)
     opp_goal = _opp_goal_y(team)
     events: List[Dict[str, Any]] = []
-    times = [_safe_float(fr.get("t", 0.0)) for fr in timeline]
+    times = index.times.tolist()
 
     last_t_by_mech: Dict[str, float] = {m: -9999.0 for m in MECHANICS}
     cooldown = {
@@ -462,69 +494,119 @@ def _detect_mechanic_events(timeline: List[Dict[str, Any]], player: str, player_
     carry_active = False
     carry_start_idx = 0
     carry_min_opp_dist = 99999.0
-    kickoff_events = _detect_kickoff_events(timeline, times, player_teams)
+    ball = {k: v.tolist() for k, v in index.ball.items()}
+    kickoff_events = _detect_kickoff_events(index, times, ball, player_teams)
     events.extend(kickoff_events)
     for k in kickoff_events:
         last_t_by_mech["kickoff"] = max(last_t_by_mech["kickoff"], _safe_float(k.get("time", -9999.0)))
 
-    for i, fr in enumerate(timeline):
+    slot = index.slot(player)
+    if slot < 0:
+        return events
+
+    # Per-frame inputs for the tracked player, computed once over the whole timeline.
+    jump_l = index.player["jump"][:, slot].tolist()
+    djump_l = index.player["double_jump"][:, slot].tolist()
+    d_pb_arr = index.player_ball_dist(slot)
+    d_pb_l = d_pb_arr.tolist()
+    opp_db_arr = _nearest_opponent_dist_ball(index, slot, player_teams, team)
+    opp_db_l = opp_db_arr.tolist()
+    p_speed_l = index.speed[:, slot].tolist()
+    b_speed_l = index.ball_speed.tolist()
+    opp_speed = _nearest_opponent_speed(index, slot, player_teams, team)
+    rel_v = _rel_speed_player_ball(index, slot)
+    idx_plus_0p2s = index.lookahead(0.20)
+    idx_plus_0p35s = index.lookahead(0.35)
+    idx_plus_0p6s = index.lookahead(0.60)
+    idx_plus_0p8s = index.lookahead(0.80)
+    idx_plus_0p9s = index.lookahead(0.90)
+    idx_plus_1p0s = index.lookahead(1.00)
+    idx_plus_1p2s = index.lookahead(1.20)
+    double_commit_l = _teammate_double_commit(index, slot, player_teams, team, d_pb_arr).tolist()
+    frames = np.arange(len(index))
+    b = index.ball
+    # Challenge contact: a touch (judged where the player is 0.35 s on, if still present) or a
+    # ball direction flip over those 0.35 s.
+    j_touch = np.asarray(idx_plus_0p35s, dtype=np.int64)
+    k_touch = np.where(index.present[j_touch, slot], j_touch, frames)
+    touch_conf = _touch_confidence_arr(
+        b["x"],
+        b["y"],
+        b["z"],
+        b["vx"][j_touch] - b["vx"],
+        b["vy"][j_touch] - b["vy"],
+        b["vz"][j_touch] - b["vz"],
+        index.player["x"][k_touch, slot],
+        index.player["y"][k_touch, slot],
+        index.player["z"][k_touch, slot],
+    )
+    contact_like_l = ((touch_conf >= 0.45) | _ball_dir_flip_arr(b, frames, j_touch)).tolist()
+    # 50/50 impact: direction flip or a 250 uu/s ball speed change within 0.2 s.
+    j_impact = np.asarray(idx_plus_0p2s, dtype=np.int64)
+    speed_jump = np.abs(index.ball_speed[j_impact] - index.ball_speed) > 250.0
+    fifty_impact_l = (_ball_dir_flip_arr(b, frames, j_impact) | speed_jump).tolist()
+    our_best = _best_team_ball_dist(index, player_teams, team).tolist()
+    opp_best = _best_team_ball_dist(index, player_teams, 1 - team).tolist()
+
+    cond = _mechanic_conditions(index, slot, team, d_pb_arr, opp_db_arr, opp_speed, rel_v)
+    shadow_l = cond["shadow_defense"].tolist()
+    challenge_l = cond["challenge"].tolist()
+    fifty_l = cond["fifty_fifty_control"].tolist()
+    aerial_offense_l = cond["aerial_offense"].tolist()
+    aerial_defense_l = cond["aerial_defense"].tolist()
+    carry_l = cond["carry"].tolist()
+
+    # Frames where no condition holds change nothing unless they end an active carry, so the loop
+    # visits the candidate frames plus, while carrying, the next present frame.
+    present = index.present[:, slot]
+    candidates = np.flatnonzero(present & np.logical_or.reduce(list(cond.values()))).tolist()
+    next_present = _next_present(present)
+    n_candidates = len(candidates)
+    pos = 0
+    i = -1
+    while True:
+        if carry_active:
+            i = next_present[i]
+        else:
+            while pos < n_candidates and candidates[pos] <= i:
+                pos += 1
+            i = candidates[pos] if pos < n_candidates else -1
+        if i < 0:
+            break
         t = times[i]
-        p = _player_frame(fr, player)
-        if not p:
-            continue
-        b = fr.get("ball", {}) or {}
-        py = _safe_float(p.get("y", 0.0))
-        pz = _safe_float(p.get("z", 0.0))
-        by = _safe_float(b.get("y", 0.0))
-        bz = _safe_float(b.get("z", 0.0))
-        d_pb = _player_ball_dist(fr, player)
-        opp_db = _nearest_opponent_dist_ball(fr, player, player_teams, team)
-        p_speed = _player_speed(fr, player)
-        b_speed = _ball_speed(fr)
-        attacking_half = (team == 0 and by > 200.0) or (team == 1 and by < -200.0)
-        defending_half = (team == 0 and by < -300.0) or (team == 1 and by > 300.0)
-
-        own_goal_dist_player = abs(py - own_goal)
-        own_goal_dist_ball = abs(by - own_goal)
-        goal_side = own_goal_dist_player < own_goal_dist_ball
-        opp_has_control = opp_db + 120.0 < d_pb
-        spacing_band = 500.0 <= d_pb <= 1500.0
-        opp_speed = _nearest_opponent_speed(fr, player, player_teams, team)
-        speed_match = abs(p_speed - opp_speed) < 650.0
-        if defending_half and opp_has_control and goal_side and spacing_band and speed_match and (t - last_t_by_mech["shadow_defense"]) >= cooldown["shadow_defense"]:
-            j = _find_next_idx_by_time(times, i, 1.0)
-            fr2 = timeline[j]
-            b2 = fr2.get("ball", {}) or {}
-            bx = _safe_float(b.get("x", 0.0))
-            bx2 = _safe_float(b2.get("x", 0.0))
+        by = ball["y"][i]
+        bz = ball["z"][i]
+        d_pb = d_pb_l[i]
+        opp_db = opp_db_l[i]
+        b_speed = b_speed_l[i]
+
+        if shadow_l[i] and (t - last_t_by_mech["shadow_defense"]) >= cooldown["shadow_defense"]:
+            j = idx_plus_1p0s[i]
+            bx = ball["x"][i]
+            bx2 = ball["x"][j]
             wide = abs(bx2) > abs(bx) + 220.0
-            deny_shot_lane = not _ball_toward_own_goal_fast(fr, fr2, team)
-            q = _clamp01(0.30 + 0.25 * (1.0 if goal_side else 0.0) + 0.20 * (1.0 if wide else 0.35) + 0.25 * (1.0 if deny_shot_lane else 0.2))
+            deny_shot_lane = not _ball_toward_own_goal_fast(ball, i, j, team)
+            # Goal-side positioning is part of the condition, so its 0.25 always counts.
+            q = _clamp01(0.30 + 0.25 + 0.20 * (1.0 if wide else 0.35) + 0.25 * (1.0 if deny_shot_lane else 0.2))
             _add_event(events, "shadow_defense", t, q, "goal-side shadow spacing and delay quality")
             last_t_by_mech["shadow_defense"] = t
 
-        challenge_candidate = d_pb <= 900.0 and opp_db <= 900.0 and bz <= 320.0 and abs(d_pb - opp_db) <= 280.0
-        if challenge_candidate and (t - last_t_by_mech["challenge"]) >= cooldown["challenge"]:
-            j_touch = _find_next_idx_by_time(times, i, 0.35)
-            j_mid = _find_next_idx_by_time(times, i, 0.60)
-            j_out = _find_next_idx_by_time(times, i, 1.20)
-            fr_touch = timeline[j_touch]
-            fr_mid = timeline[j_mid]
-            fr_out = timeline[j_out]
-            p_touch = _player_frame(fr_touch, player) or p
-            contact_like = _touch_confidence(fr, fr_touch, p_touch) >= 0.45 or _ball_dir_flip(fr, fr_touch)
-            if not contact_like:
+        if challenge_l[i] and (t - last_t_by_mech["challenge"]) >= cooldown["challenge"]:
+            if not contact_like_l[i]:
                 continue
-            our_mid = _best_team_ball_dist(fr_mid, player_teams, team)
-            opp_mid = _best_team_ball_dist(fr_mid, player_teams, 1 - team)
-            our_out = _best_team_ball_dist(fr_out, player_teams, team)
-            opp_out = _best_team_ball_dist(fr_out, player_teams, 1 - team)
+            j_touch = idx_plus_0p35s[i]
+            j_mid = idx_plus_0p6s[i]
+            j_out = idx_plus_1p2s[i]
+            our_mid = our_best[j_mid]
+            opp_mid = opp_best[j_mid]
+            our_out = our_best[j_out]
+            opp_out = opp_best[j_out]
             opp_had_control = opp_db + 80.0 < d_pb
             win_possession = (our_out + 120.0 < opp_out) or (our_mid + 120.0 < opp_mid)
             force_bad_touch = opp_had_control and ((opp_mid - opp_db) > 140.0 or (our_mid + 120.0 < opp_mid))
-            easy_counter = _ball_toward_own_goal_fast(fr, fr_out, team) and (opp_out + 180.0 < our_out)
-            double_commit = _teammate_double_commit(fr, player, player_teams, team, d_pb)
-            d_touch = _player_ball_dist(fr_touch, player)
+            easy_counter = _ball_toward_own_goal_fast(ball, i, j_out, team) and (opp_out + 180.0 < our_out)
+            double_commit = double_commit_l[i]
+            d_touch = d_pb_l[j_touch]
             close_gain = _clamp01((d_pb - d_touch) / max(1.0, d_pb))
             success = (win_possession or force_bad_touch) and (not easy_counter)
             q = 0.32 + 0.40 * (1.0 if success else 0.0) + 0.12 * (1.0 if win_possession else 0.0) + 0.10 * (1.0 if force_bad_touch else 0.0)
@@ -547,17 +629,12 @@ def _detect_mechanic_events(timeline: List[Dict[str, Any]], player: str, player_
             _add_event(events, "challenge", t, q, reason)
             last_t_by_mech["challenge"] = t
 
-        if d_pb < 300.0 and opp_db < 300.0 and bz < 260.0 and (t - last_t_by_mech["fifty_fifty_control"]) >= cooldown["fifty_fifty_control"]:
-            j = _find_next_idx_by_time(times, i, 0.20)
-            k = _find_next_idx_by_time(times, i, 0.80)
-            frj = timeline[j]
-            frk = timeline[k]
-            impact = _ball_dir_flip(fr, frj) or abs(_ball_speed(frj) - b_speed) > 250.0
-            if impact:
-                our_k = _best_team_ball_dist(frk, player_teams, team)
-                opp_k = _best_team_ball_dist(frk, player_teams, 1 - team)
-                b_k = frk.get("ball", {}) or {}
-                by_k = _safe_float(b_k.get("y", 0.0))
+        if fifty_l[i] and (t - last_t_by_mech["fifty_fifty_control"]) >= cooldown["fifty_fifty_control"]:
+            k = idx_plus_0p8s[i]
+            if fifty_impact_l[i]:
+                our_k = our_best[k]
+                opp_k = opp_best[k]
+                by_k = ball["y"][k]
                 own_d = abs(by_k - own_goal)
                 opp_d = abs(by_k - opp_goal)
                 if our_k + 100.0 < opp_k and (opp_d < own_d or own_d > 2600.0):
@@ -572,56 +649,47 @@ def _detect_mechanic_events(timeline: List[Dict[str, Any]], player: str, player_
                 _add_event(events, "fifty_fifty_control", t, q, reason)
                 last_t_by_mech["fifty_fifty_control"] = t
 
-        if attacking_half and pz > 150.0 and bz > 300.0 and d_pb < 950.0 and (t - last_t_by_mech["aerial_offense"]) >= cooldown["aerial_offense"]:
-            j = _find_next_idx_by_time(times, i, 0.90)
-            fr2 = timeline[j]
-            b2 = fr2.get("ball", {}) or {}
-            by2 = _safe_float(b2.get("y", 0.0))
+        if aerial_offense_l[i] and (t - last_t_by_mech["aerial_offense"]) >= cooldown["aerial_offense"]:
+            j = idx_plus_0p9s[i]
+            by2 = ball["y"][j]
             toward_opp_goal = abs(by2 - opp_goal) < abs(by - opp_goal)
-            our_out = _best_team_ball_dist(fr2, player_teams, team)
-            opp_out = _best_team_ball_dist(fr2, player_teams, 1 - team)
+            our_out = our_best[j]
+            opp_out = opp_best[j]
             retain = our_out <= opp_out + 60.0
-            q = _clamp01(0.35 + 0.30 * (1.0 if toward_opp_goal else 0.25) + 0.25 * (1.0 if retain else 0.3) + 0.10 * _clamp01(p_speed / 2100.0))
+            q = _clamp01(0.35 + 0.30 * (1.0 if toward_opp_goal else 0.25) + 0.25 * (1.0 if retain else 0.3) + 0.10 * _clamp01(p_speed_l[i] / 2100.0))
             reason = "air touch created attacking value" if q >= 0.5 else "aerial touch gave up pressure"
             _add_event(events, "aerial_offense", t, q, reason)
             last_t_by_mech["aerial_offense"] = t
 
-        threat_zone = abs(by - own_goal) < 2600.0
-        if defending_half and threat_zone and pz > 150.0 and bz > 260.0 and d_pb < 1200.0 and (t - last_t_by_mech["aerial_defense"]) >= cooldown["aerial_defense"]:
-            j = _find_next_idx_by_time(times, i, 1.00)
-            fr2 = timeline[j]
-            b2 = fr2.get("ball", {}) or {}
-            by2 = _safe_float(b2.get("y", 0.0))
-            bx = _safe_float(b.get("x", 0.0))
-            bx2 = _safe_float(b2.get("x", 0.0))
+        if aerial_defense_l[i] and (t - last_t_by_mech["aerial_defense"]) >= cooldown["aerial_defense"]:
+            j = idx_plus_1p0s[i]
+            by2 = ball["y"][j]
+            bx = ball["x"][i]
+            bx2 = ball["x"][j]
             away = abs(by2 - own_goal) > abs(by - own_goal)
             center_clear = abs(bx2) > abs(bx) + 180.0
-            double_commit = _teammate_double_commit(fr, player, player_teams, team, d_pb)
+            double_commit = double_commit_l[i]
             q = 0.35 + 0.35 * (1.0 if away else 0.2) + 0.20 * (1.0 if center_clear else 0.35) + 0.10 * (0.2 if double_commit else 1.0)
             _add_event(events, "aerial_defense", t, _clamp01(q), "aerial defensive clear quality")
             last_t_by_mech["aerial_defense"] = t
 
-        rel_v = _rel_speed_player_ball(fr, player)
-        jump = int(_safe_float(p.get("jump", 0.0)))
-        djump = int(_safe_float(p.get("double_jump", 0.0)))
-        carry_like = d_pb <= 200.0 and bz < 250.0 and rel_v < 700.0
-        if carry_like and (jump > 0 or djump > 0) and (t - last_t_by_mech["flicking"]) >= cooldown["flicking"]:
-            j = _find_next_idx_by_time(times, i, 0.35)
-            fr2 = timeline[j]
-            b2 = fr2.get("ball", {}) or {}
-            bz2 = _safe_float(b2.get("z", 0.0))
-            up_spike = (bz2 - bz) > 120.0 or (_safe_float(b2.get("vz", 0.0)) - _safe_float(b.get("vz", 0.0))) > 220.0
-            fwd0 = _ball_forward_speed_to_opp(fr, team)
-            fwd1 = _ball_forward_speed_to_opp(fr2, team)
+        in_carry_state = carry_l[i]
+        jump = int(jump_l[i])
+        djump = int(djump_l[i])
+        if in_carry_state and (jump > 0 or djump > 0) and (t - last_t_by_mech["flicking"]) >= cooldown["flicking"]:
+            j = idx_plus_0p35s[i]
+            bz2 = ball["z"][j]
+            up_spike = (bz2 - bz) > 120.0 or (ball["vz"][j] - ball["vz"][i]) > 220.0
+            fwd0 = _ball_forward_speed_to_opp(ball, i, team)
+            fwd1 = _ball_forward_speed_to_opp(ball, j, team)
             forward_spike = (fwd1 - fwd0) > 260.0
-            power = _ball_speed(fr2) > b_speed + 300.0
+            power = b_speed_l[j] > b_speed + 300.0
             if up_spike and forward_spike:
                 q = _clamp01(0.35 + 0.25 * (1.0 if power else 0.4) + 0.25 * _clamp01((fwd1 - fwd0) / 900.0) + 0.15 * _clamp01((bz2 - bz) / 240.0))
                 reason = "flick generated threatening ball launch" if q >= 0.5 else "flick lacked threat or power"
                 _add_event(events, "flicking", t, q, reason)
                 last_t_by_mech["flicking"] = t
 
-        in_carry_state = d_pb <= 200.0 and bz < 250.0 and rel_v < 700.0
         if in_carry_state:
             if not carry_active:
                 carry_active = True
@@ -635,18 +703,12 @@ def _detect_mechanic_events(timeline: List[Dict[str, Any]], player: str, player_
                 duration = max(0.0, t - t0)
                 if duration >= 1.0 and (t - last_t_by_mech["carrying_dribbling"]) >= cooldown["carrying_dribbling"]:
                     end_idx = i
-                    j = _find_next_idx_by_time(times, end_idx, 0.80)
-                    fr_end = timeline[end_idx]
-                    fr2 = timeline[j]
-                    our_end = _best_team_ball_dist(fr_end, player_teams, team)
-                    opp_end = _best_team_ball_dist(fr_end, player_teams, 1 - team)
-                    our_after = _best_team_ball_dist(fr2, player_teams, team)
-                    opp_after = _best_team_ball_dist(fr2, player_teams, 1 - team)
+                    j = idx_plus_0p8s[end_idx]
+                    our_after = our_best[j]
+                    opp_after = opp_best[j]
                     pressure_hold = carry_min_opp_dist < 900.0 and our_after <= opp_after + 80.0
                     immediate_loss = opp_after + 120.0 < our_after
-                    b_end = fr_end.get("ball", {}) or {}
-                    b_after = fr2.get("ball", {}) or {}
-                    created_play = abs(_safe_float(b_after.get("y", 0.0)) - opp_goal) < abs(_safe_float(b_end.get("y", 0.0)) - opp_goal)
+                    created_play = abs(ball["y"][j] - opp_goal) < abs(ball["y"][end_idx] - opp_goal)
                     q = 0.35 + 0.25 * _clamp01(duration / 2.4) + 0.20 * (1.0 if pressure_hold else 0.35) + 0.20 * (1.0 if created_play else 0.30)
                     if immediate_loss:
                         q -= 0.30
@@ -708,8 +770,13 @@ def _grade_one(mechanic: str, evs: List[Dict[str, Any]]) -> Dict[str, Any]:
     }
 
 
-def grade_game_mechanics(timeline: List[Dict[str, Any]], player: str, player_teams: Dict[str, Any] | None = None) -> Dict[str, Any]:
-    mechanic_events = _detect_mechanic_events(timeline or [], str(player or ""), player_teams or {})
+def grade_game_mechanics(
+    timeline: List[Dict[str, Any]],
+    player: str,
+    player_teams: Dict[str, Any] | None = None,
+    index: TimelineIndex | None = None,
+) -> Dict[str, Any]:
+    mechanic_events = _detect_mechanic_events(timeline or [], str(player or ""), player_teams or {}, index=index)
     grades: List[Dict[str, Any]] = []
     for m in MECHANICS:
         evs = [e for e in mechanic_events if str(e.get("mechanic_id", "")) == m]
@@ -741,24 +808,12 @@ def summarize_mechanic_scores(payload: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _nearest_frame_idx(timeline: List[Dict[str, Any]], t: float) -> int:
-    if not timeline:
-        return 0
-    best_i = 0
-    best_dt = abs(_safe_float(timeline[0].get("t", 0.0)) - float(t))
-    for i in range(1, len(timeline)):
-        dt = abs(_safe_float(timeline[i].get("t", 0.0)) - float(t))
-        if dt < best_dt:
-            best_dt = dt
-            best_i = i
-    return best_i
-
-
 def explain_mechanic_event(
     timeline: List[Dict[str, Any]],
     player: str,
     player_teams: Dict[str, Any] | None,
     event: Dict[str, Any],
+    index: TimelineIndex | None = None,
 ) -> Dict[str, Any]:
     timeline = timeline or []
     if not timeline:
@@ -772,28 +827,30 @@ def explain_mechanic_event(
         }
     mid = _canonical_mid(str(event.get("mechanic_id", "") or ""))
     t = _safe_float(event.get("time", 0.0))
-    i = _nearest_frame_idx(timeline, t)
+    index = ensure_timeline_index(timeline, index)
+    i = index.nearest_idx(t)
     fr = timeline[i]
     team = _player_team(player, player_teams or {})
     if team not in (0, 1):
         team = 0
     own_goal = _own_goal_y(team)
     opp_goal = _opp_goal_y(team)
-    p = _player_frame(fr, player) or {}
-    b = fr.get("ball", {}) or {}
-    j = _find_next_idx_by_time([_safe_float(x.get("t", 0.0)) for x in timeline], i, 1.0)
-    fr2 = timeline[j]
-
-    px = _safe_float(p.get("x", 0.0))
-    py = _safe_float(p.get("y", 0.0))
-    pz = _safe_float(p.get("z", 0.0))
-    bx = _safe_float(b.get("x", 0.0))
-    by = _safe_float(b.get("y", 0.0))
-    bz = _safe_float(b.get("z", 0.0))
-    d_pb = _player_ball_dist(fr, player)
-    opp_db = _nearest_opponent_dist_ball(fr, player, player_teams or {}, team)
-    p_speed = _player_speed(fr, player)
-    b_speed = _ball_speed(fr)
+    slot = index.slot(player)
+    present = slot >= 0 and bool(index.present[i, slot])
+    j = index.next_idx_by_time(i, 1.0)
+    # Only frames i and j are read below, so pull just those ball values.
+    ball = {k: {i: float(v[i]), j: float(v[j])} for k, v in index.ball.items()}
+
+    px = float(index.player["x"][i, slot]) if present else 0.0
+    py = float(index.player["y"][i, slot]) if present else 0.0
+    pz = float(index.player["z"][i, slot]) if present else 0.0
+    bx = ball["x"][i]
+    by = ball["y"][i]
+    bz = ball["z"][i]
+    d_pb = float(index.ball_dist[i, slot]) if present else 99999.0
+    opp_db = float(_nearest_opponent_dist_ball(index, slot, player_teams or {}, team, rows=[i])[0])
+    p_speed = float(index.speed[i, slot]) if present else 0.0
+    b_speed = float(index.ball_speed[i])
     q = _safe_float(event.get("quality_score", 0.5))
 
     thresholds: List[Dict[str, Any]] = []
@@ -836,10 +893,9 @@ def explain_mechanic_event(
             "If you cannot win cleanly, angle your touch so the opponent cannot launch an instant counter.",
         ]
     elif mid == "challenge":
-        fr_out = fr2
-        our_out = _best_team_ball_dist(fr_out, player_teams or {}, team)
-        opp_out = _best_team_ball_dist(fr_out, player_teams or {}, 1 - team)
-        easy_counter = _ball_toward_own_goal_fast(fr, fr_out, team) and (opp_out + 180.0 < our_out)
+        our_out = float(_best_team_ball_dist(index, player_teams or {}, team, rows=[j])[0])
+        opp_out = float(_best_team_ball_dist(index, player_teams or {}, 1 - team, rows=[j])[0])
+        easy_counter = _ball_toward_own_goal_fast(ball, i, j, team) and (opp_out + 180.0 < our_out)
         win_poss = our_out + 120.0 < opp_out
         add_thr("contest_proximity", "player and opponent both within challenge range", {"you": round(d_pb, 1), "opp": round(opp_db, 1)}, d_pb <= 900 and opp_db <= 900)
         add_thr("possession_outcome", "team gains first access after challenge", round(opp_out - our_out, 1), win_poss)
@@ -854,8 +910,8 @@ def explain_mechanic_event(
             "If you cannot win cleanly, angle contact so opponent loses control instead of breaking out.",
         ]
     elif mid == "fifty_fifty_control":
-        our_out = _best_team_ball_dist(fr2, player_teams or {}, team)
-        opp_out = _best_team_ball_dist(fr2, player_teams or {}, 1 - team)
+        our_out = float(_best_team_ball_dist(index, player_teams or {}, team, rows=[j])[0])
+        opp_out = float(_best_team_ball_dist(index, player_teams or {}, 1 - team, rows=[j])[0])
         add_thr("simultaneous_contest", "both players in contact range", {"you": round(d_pb, 1), "opp": round(opp_db, 1)}, d_pb < 300 and opp_db < 300)
         add_thr("post_5050_access", "team exits with equal or better access", round(opp_out - our_out, 1), our_out <= opp_out + 80.0)
         breakdown = [
@@ -868,8 +924,7 @@ def explain_mechanic_event(
             "Plan your landing to reach the next touch before the opponent.",
         ]
     elif mid == "aerial_offense":
-        b2 = fr2.get("ball", {}) or {}
-        by2 = _safe_float(b2.get("y", 0.0))
+        by2 = ball["y"][j]
         toward_opp = abs(by2 - opp_goal) < abs(by - opp_goal)
         add_thr("airborne_setup", "player and ball are airborne in attack", {"player_z": round(pz, 1), "ball_z": round(bz, 1)}, pz > 150 and bz > 300)
         add_thr("threat_direction", "touch moves ball toward opponent goal", round(abs(by - opp_goal) - abs(by2 - opp_goal), 1), toward_opp)
@@ -883,8 +938,7 @@ def explain_mechanic_event(
             "Recover quickly after the hit so your team keeps the next play.",
         ]
     elif mid == "aerial_defense":
-        b2 = fr2.get("ball", {}) or {}
-        by2 = _safe_float(b2.get("y", 0.0))
+        by2 = ball["y"][j]
         away = abs(by2 - own_goal) > abs(by - own_goal)
         add_thr("defensive_air_context", "airborne defensive contest", {"player_z": round(pz, 1), "ball_z": round(bz, 1)}, pz > 150 and bz > 260)
         add_thr("clear_direction", "touch sends ball away from own net", round(abs(by2 - own_goal) - abs(by - own_goal), 1), away)
@@ -911,9 +965,8 @@ def explain_mechanic_event(
             "Match attacker pace and wait for the safe challenge window.",
         ]
     elif mid == "flicking":
-        b2 = fr2.get("ball", {}) or {}
-        vz_gain = _safe_float(b2.get("vz", 0.0)) - _safe_float(b.get("vz", 0.0))
-        fwd_gain = _ball_forward_speed_to_opp(fr2, team) - _ball_forward_speed_to_opp(fr, team)
+        vz_gain = ball["vz"][j] - ball["vz"][i]
+        fwd_gain = _ball_forward_speed_to_opp(ball, j, team) - _ball_forward_speed_to_opp(ball, i, team)
         add_thr("dribble_control", "ball controlled near car before flick", {"distance": round(d_pb, 1), "ball_z": round(bz, 1)}, d_pb <= 200 and bz < 250)
         add_thr("launch_spike", "upward and forward velocity increase", {"up_gain": round(vz_gain, 1), "forward_gain": round(fwd_gain, 1)}, vz_gain > 200 and fwd_gain > 240)
         breakdown = [
@@ -926,7 +979,7 @@ def explain_mechanic_event(
             "Use flick timing when the defender commits so the touch creates immediate threat.",
         ]
     elif mid == "carrying_dribbling":
-        add_thr("carry_state", "close, low, controlled carry state", {"distance": round(d_pb, 1), "ball_z": round(bz, 1), "relative_speed": round(_rel_speed_player_ball(fr, player), 1)}, d_pb <= 200 and bz < 250)
+        add_thr("carry_state", "close, low, controlled carry state", {"distance": round(d_pb, 1), "ball_z": round(bz, 1), "relative_speed": round(float(_rel_speed_player_ball(index, slot, rows=[i])[0]), 1)}, d_pb <= 200 and bz < 250)
         breakdown = [
             {"component": "control_duration", "weight": 0.35},
             {"component": "pressure_retention", "weight": 0.35},
@@ -3,7 +3,7 @@ from __future__ import annotations
 from collections import deque
 from dataclasses import dataclass
 from math import sqrt
-from typing import Any, Deque, Dict, List, Tuple
+from typing import Any, Deque, Dict, List, Optional, Tuple
 import time
 
 SUPERSONIC_SPEED = 2200.0
@@ -65,6 +65,34 @@ class MetricSample:
     recovery_time_avg_s: float
 
 
+# History series served to the dashboard, keyed by snapshot name -> MetricSample attribute.
+HISTORY_FIELDS = (
+    ("speed", "speed"),
+    ("hesitation_score", "hesitation_score"),
+    ("hesitation_percent", "hesitation_pct"),
+    ("boost_waste_percent", "boost_waste_pct"),
+    ("supersonic_percent", "supersonic_pct"),
+    ("useful_supersonic_percent", "useful_supersonic_pct"),
+    ("pressure_percent", "pressure_pct"),
+    ("whiff_rate_per_min", "whiff_rate_per_min"),
+    ("approach_efficiency", "approach_efficiency"),
+    ("recovery_time_avg_s", "recovery_time_avg_s"),
+)
+
+
+@dataclass
+class HistoryUpdate:
+    """History points appended since the previous update, and how many points each series now keeps."""
+
+    points: Dict[str, List[Dict[str, float]]]
+    window_len: int
+
+    def after(self, earlier: List["HistoryUpdate"]) -> "HistoryUpdate":
+        # One update covering `earlier` (oldest first) followed by this one.
+        points = {key: [p for u in earlier for p in u.points.get(key, ())] + series for key, series in self.points.items()}
+        return HistoryUpdate(points, self.window_len)
+
+
 def _norm3(x: float, y: float, z: float) -> float:
     return sqrt(x * x + y * y + z * z)
 
@@ -80,6 +108,29 @@ def _safe_unit3(v: Tuple[float, float, float]) -> Tuple[float, float, float]:
     return (v[0] / mag, v[1] / mag, v[2] / mag)
 
 
+def _nearest_other_from_geometry(geometry, player_index: int):
+    # Same scan and tie-breaking as _nearest_other_geometry, read from the shared pairwise matrices.
+    nearest_other_ball = 99999.0
+    nearest_other_self = 99999.0
+    nearest_other_toward_speed = 0.0
+    nearest_other_pos = None
+    ball_col = geometry.num_cars
+    dist_rows = geometry.dist_rows
+    self_dist = dist_rows[player_index]
+    for i in range(geometry.num_cars):
+        if i == player_index:
+            continue
+        d_ball = dist_rows[i][ball_col]
+        d_self = self_dist[i]
+        if d_ball < nearest_other_ball:
+            nearest_other_ball = d_ball
+        if d_self < nearest_other_self:
+            nearest_other_self = d_self
+            nearest_other_pos = tuple(geometry.pos_rows[i])
+            nearest_other_toward_speed = geometry.closing_rows[player_index][i]
+    return nearest_other_ball, nearest_other_self, nearest_other_toward_speed, nearest_other_pos
+
+
 def _clamp01(v: float) -> float:
     if v < 0.0:
         return 0.0
@@ -88,110 +139,178 @@ def _clamp01(v: float) -> float:
     return v
 
 
-class LiveMetricsEngine:
-    def __init__(self, window_seconds: float = 10.0):
-        self.window_seconds = window_seconds
-        self.samples: Deque[MetricSample] = deque()
-        self.events: Deque[Dict[str, Any]] = deque(maxlen=120)
+class _EventWindow:
+    """Chronological (seq, time) index of one event type within the capped events deque."""
+
+    __slots__ = ("entries", "cutoff", "ordered")
+
+    def __init__(self):
+        self.entries: Deque[Tuple[int, float]] = deque()
+        self.cutoff = float("-inf")
+        self.ordered = True
+
+    def add(self, seq: int, t: float) -> None:
+        if self.entries and t < self.entries[-1][1]:
+            self.ordered = False
+        self.entries.append((seq, t))
+
+    def reset(self, entries: List[Tuple[int, float]]) -> None:
+        self.entries = deque(entries)
+        self.cutoff = float("-inf")
+        self.ordered = all(a[1] <= b[1] for a, b in zip(entries, entries[1:]))
+
+    def count(self, cutoff: float, oldest_seq: int) -> int:
+        entries = self.entries
+        # Both seq and (when ordered) time grow left to right, so anything that has left the
+        # window or been evicted from the capped deque is a prefix and can be dropped for good.
+        while entries and (entries[0][0] < oldest_seq or (self.ordered and entries[0][1] < cutoff)):
+            entries.popleft()
+        self.cutoff = cutoff
+        if self.ordered:
+            return len(entries)
+        return sum(1 for _, t in entries if t >= cutoff)
+
+
+class RecoveryTracker:
+    """
+    Recovery timing (landing to playable again) and the last landing time. Shared by LiveMetricsEngine
+    and batch_metrics_engine; step() runs once per active-play frame.
+    """
+
+    __slots__ = ("airborne_start_time", "active", "start_time", "count", "total_time", "last_landing_time")
+
+    def __init__(self):
+        self.airborne_start_time: Optional[float] = None
+        self.active = False
+        self.start_time = 0.0
+        self.count = 0
+        self.total_time = 0.0
+        self.last_landing_time = -999.0
 
-        self.total_frames = 0
-        self.active_frames = 0
-        self.pressure_frames = 0
-        self.hesitation_frames = 0
-        self.supersonic_frames = 0
-        self.useful_supersonic_frames = 0
+    def step(self, now: float, airborne: bool, speed: float, toward_speed: float) -> None:
+        if airborne and self.airborne_start_time is None:
+            self.airborne_start_time = now
 
-        self.total_boost_used = 0.0
-        self.wasted_boost = 0.0
-        self.useful_boost = 0.0
+        if not airborne and self.airborne_start_time is not None:
+            air_time = now - self.airborne_start_time
+            self.airborne_start_time = None
+            self.last_landing_time = now
+            if air_time >= 0.08:
+                self.active = True
+                self.start_time = now
 
-        self.approach_progress_total = 0.0
-        self.approach_boost_used = 0.0
+        if self.active:
+            playable = (speed > 900.0) or (toward_speed > 380.0)
+            timeout = (now - self.start_time) > 2.5
+            if playable or timeout:
+                self.count += 1
+                self.total_time += max(0.0, now - self.start_time)
+                self.active = False
 
-        self.recovery_count = 0
-        self.recovery_total_time = 0.0
+    def average_time(self) -> float:
+        return self.total_time / max(1, self.count)
 
-        self.hesitation_event_active = False
-        self.hesitation_event_start = 0.0
-        self.max_hesitation_streak_seconds = 0.0
-        self.last_landing_time = -999.0
 
-        self.prev_time = None
-        self.prev_ball_vel = (0.0, 0.0, 0.0)
-        self.prev_car_vel = (0.0, 0.0, 0.0)
-        self.prev_dist_to_ball = 99999.0
-        self.prev_speed = 0.0
-        self.prev_boost = None
-        self.prev_has_wheel_contact = None
+class HesitationTracker:
+    """
+    Hysteresis around the per-frame hesitation score: an event opens when the score reaches the enter
+    threshold under pressure and closes below HESITATION_EXIT_THRESHOLD or when pressure ends.
+    """
 
-        # Whiff classifier state
-        self.attack_active = False
-        self.attack_start_time = 0.0
-        self.attack_start_dist = 0.0
-        self.attack_min_dist = 99999.0
-        self.attack_closing_frames = 0
-        self.attack_near_frames = 0
-        self.attack_intent_frames = 0
-        self.attack_had_jump = False
-        self.attack_had_flip = False
+    __slots__ = ("event_active", "event_start", "max_streak_seconds")
+
+    def __init__(self):
+        self.event_active = False
+        self.event_start = 0.0
+        self.max_streak_seconds = 0.0
+
+    def step(
+        self,
+        now: float,
+        score: float,
+        pressure: bool,
+        distance: float,
+        suppression_reason: str = "",
+        enter_threshold: float = HESITATION_ENTER_THRESHOLD,
+    ) -> Optional[Dict[str, Any]]:
+        # Returns the hesitation event when one opens on this frame.
+        if not pressure:
+            if self.event_active:
+                self.max_streak_seconds = max(self.max_streak_seconds, now - self.event_start)
+                self.event_active = False
+            return None
+
+        event = None
+        if (not self.event_active) and score >= enter_threshold:
+            self.event_active = True
+            self.event_start = now
+            context = ["pressure"]
+            if suppression_reason:
+                context.append(f"suppression_override={suppression_reason}")
+            event = {
+                "time": round(now, 3),
+                "type": "hesitation",
+                "reason": "indecision_under_pressure",
+                "distance": round(distance, 2),
+                "confidence": round(score, 3),
+                "opportunity_score": round(score, 3),
+                "context": context,
+                "intent_flags": ["hesitation_window"],
+                "suppression_reason": suppression_reason,
+                "opportunity_blocked": False,
+            }
+
+        if self.event_active and score <= HESITATION_EXIT_THRESHOLD:
+            self.max_streak_seconds = max(self.max_streak_seconds, now - self.event_start)
+            self.event_active = False
+        return event
+
+
+class WhiffTracker:
+    """
+    Whiff classifier: an attack opens when the car commits to the ball and is tracked frame by frame.
+    When it times out or the car disengages without a confirmed touch it is scored, then either
+    returned as a whiff event or counted under the suppression rule that rejected it.
+    """
+
+    __slots__ = (
+        "attack_active",
+        "attack_start_time",
+        "attack_start_dist",
+        "attack_min_dist",
+        "attack_closing_frames",
+        "attack_near_frames",
+        "attack_intent_frames",
+        "attack_had_jump",
+        "attack_had_flip",
+        "last_whiff_time",
+        "last_confirmed_touch_time",
+        "contest_time",
+        "contest_confidence",
+        "contest_dist_to_ball",
+        "contest_suppressed_whiffs",
+        "clear_miss_under_contest",
+        "suppressed_flip_commit",
+        "suppressed_disengage",
+        "suppressed_bump_intent",
+        "suppressed_opponent_first_touch",
+    )
+
+    def __init__(self):
+        self.clear()
         self.last_whiff_time = -999.0
         self.last_confirmed_touch_time = -999.0
-        self.last_external_contested_touch_time = -999.0
-        self.last_external_contested_touch_confidence = 0.0
-        self.last_external_contested_touch_dist_to_ball = 99999.0
+        self.contest_time = -999.0
+        self.contest_confidence = 0.0
+        self.contest_dist_to_ball = 99999.0
         self.contest_suppressed_whiffs = 0
         self.clear_miss_under_contest = 0
-        self.pressure_gated_frames = 0
-        self.suppressed_whiff_flip_commit = 0
-        self.suppressed_whiff_disengage = 0
-        self.suppressed_whiff_bump_intent = 0
-        self.suppressed_whiff_opponent_first_touch = 0
-        self.suppressed_hesitation_reposition = 0
-        self.suppressed_hesitation_setup = 0
-        self.suppressed_hesitation_spacing = 0
-        self.last_other_touch_time = -999.0
-
-        # Recovery state
-        self.airborne_start_time = None
-        self.recovery_active = False
-        self.recovery_start_time = 0.0
-
-    def _prune_window(self, now: float) -> None:
-        while self.samples and now - self.samples[0].t > self.window_seconds:
-            self.samples.popleft()
+        self.suppressed_flip_commit = 0
+        self.suppressed_disengage = 0
+        self.suppressed_bump_intent = 0
+        self.suppressed_opponent_first_touch = 0
 
-    @staticmethod
-    def _is_airborne(car, car_pos: Tuple[float, float, float]) -> bool:
-        has_wheel_contact = getattr(car, "has_wheel_contact", None)
-        if has_wheel_contact is not None:
-            return not bool(has_wheel_contact)
-        return car_pos[2] > 35.0
-
-    @staticmethod
-    def _angular_velocity(car) -> Tuple[float, float, float]:
-        ang = getattr(car.physics, "angular_velocity", None)
-        if ang is None:
-            return (0.0, 0.0, 0.0)
-        return (float(getattr(ang, "x", 0.0)), float(getattr(ang, "y", 0.0)), float(getattr(ang, "z", 0.0)))
-
-    @staticmethod
-    def _self_touched_ball_recently(ball, player_index: int, now: float) -> bool:
-        latest_touch = getattr(ball, "latest_touch", None)
-        if latest_touch is None:
-            return False
-        touch_player = int(getattr(latest_touch, "player_index", -1))
-        if touch_player != player_index:
-            return False
-        touch_time = getattr(latest_touch, "time_seconds", None)
-        if touch_time is None:
-            return True
-        touch_time = float(touch_time)
-        return 0.0 <= (now - touch_time) <= WHIFF_RECENT_TOUCH_SECONDS
-
-    def _recent_confirmed_touch(self, now: float) -> bool:
-        return (now - self.last_confirmed_touch_time) <= WHIFF_RECENT_TOUCH_SECONDS
-
-    def _clear_attack(self) -> None:
+    def clear(self) -> None:
         self.attack_active = False
         self.attack_start_time = 0.0
         self.attack_start_dist = 0.0
@@ -202,44 +321,116 @@ class LiveMetricsEngine:
         self.attack_had_jump = False
         self.attack_had_flip = False
 
-    def _start_attack(self, now: float, dist_to_ball: float) -> None:
+    def _start(self, now: float, dist_to_ball: float) -> None:
+        self.clear()
         self.attack_active = True
         self.attack_start_time = now
         self.attack_start_dist = dist_to_ball
         self.attack_min_dist = dist_to_ball
-        self.attack_closing_frames = 0
-        self.attack_near_frames = 0
-        self.attack_intent_frames = 0
-        self.attack_had_jump = False
-        self.attack_had_flip = False
 
-    def _finalize_whiff_if_needed(
+    def step(
+        self,
+        *,
+        now: float,
+        dist_to_ball: float,
+        closing: bool,
+        moving_away: bool,
+        speed: float,
+        toward_speed: float,
+        airborne: bool,
+        car_vz: float,
+        car_z: float,
+        ball_z: float,
+        ang_speed: float,
+        ball_speed: float,
+        ball_was_hit: bool,
+        self_touched: bool,
+        other_touched_recent: bool,
+        nearest_other_ball: float,
+        nearest_other_self: float,
+        nearest_other_toward_speed: float,
+    ) -> Optional[Dict[str, Any]]:
+        # One active-play frame; returns the whiff event when an attack ends in one.
+        if not self.attack_active:
+            start_by_closing = closing and dist_to_ball < WHIFF_APPROACH_START_DISTANCE
+            start_by_near = dist_to_ball < WHIFF_NEAR_DISTANCE and speed > 80.0
+            start_by_air_attempt = airborne and dist_to_ball < 950.0 and (car_vz > JUMP_VEL_Z_THRESHOLD)
+            if start_by_closing or start_by_near or start_by_air_attempt:
+                self._start(now, dist_to_ball)
+
+        if self.attack_active:
+            self.attack_min_dist = min(self.attack_min_dist, dist_to_ball)
+            if closing:
+                self.attack_closing_frames += 1
+            if dist_to_ball <= WHIFF_NEAR_DISTANCE:
+                self.attack_near_frames += 1
+            if abs(toward_speed) > 140.0 or speed > 160.0 or airborne:
+                self.attack_intent_frames += 1
+            if airborne and car_vz > JUMP_VEL_Z_THRESHOLD:
+                self.attack_had_jump = True
+            if airborne and ang_speed > FLIP_ANG_VEL_THRESHOLD and speed > 280.0:
+                self.attack_had_flip = True
+
+        if ball_was_hit and self.attack_active and (not self_touched) and self.attack_min_dist <= CONTEST_MIN_ATTACK_DIST:
+            if nearest_other_ball <= CONTEST_BALL_RADIUS and nearest_other_self <= CONTEST_PLAYER_RADIUS:
+                ball_factor = _clamp01((CONTEST_BALL_RADIUS - nearest_other_ball) / CONTEST_BALL_RADIUS)
+                self_factor = _clamp01((CONTEST_PLAYER_RADIUS - nearest_other_self) / CONTEST_PLAYER_RADIUS)
+                conf = 0.55 * ball_factor + 0.45 * self_factor
+                if conf >= 0.2:
+                    self.contest_time = now
+                    self.contest_confidence = conf
+                    self.contest_dist_to_ball = self.attack_min_dist
+
+        if self_touched:
+            self.last_confirmed_touch_time = now
+            self.clear()
+        elif ball_was_hit and self.attack_active and self.attack_min_dist < WHIFF_TOUCH_SUPPRESS_DISTANCE:
+            self.last_confirmed_touch_time = now
+            self.clear()
+
+        timed_out = self.attack_active and ((now - self.attack_start_time) > WHIFF_MAX_APPROACH_SECONDS)
+        disengaged = self.attack_active and moving_away and self.attack_closing_frames > 0
+        if not (timed_out or disengaged):
+            return None
+        event = self._finalize(
+            now=now,
+            speed=speed,
+            car_z=car_z,
+            ball_z=ball_z,
+            toward_speed=toward_speed,
+            moving_away=moving_away,
+            contest_recent=(now - self.contest_time) <= CONTEST_WINDOW_SECONDS,
+            nearest_other_ball=nearest_other_ball,
+            nearest_other_self=nearest_other_self,
+            nearest_other_toward_speed=nearest_other_toward_speed,
+            ball_speed=ball_speed,
+            other_touched_recent=other_touched_recent,
+        )
+        self.clear()
+        return event
+
+    def _finalize(
         self,
         *,
         now: float,
         speed: float,
-        car_pos: Tuple[float, float, float],
-        ball_pos: Tuple[float, float, float],
+        car_z: float,
+        ball_z: float,
         toward_speed: float,
         moving_away: bool,
         contest_recent: bool,
-        contest_confidence: float,
         nearest_other_ball: float,
         nearest_other_self: float,
         nearest_other_toward_speed: float,
         ball_speed: float,
-        latest_touch_by_other_recent: bool,
-    ) -> None:
-        if not self.attack_active or self._recent_confirmed_touch(now):
-            self._clear_attack()
-            return
-
+        other_touched_recent: bool,
+    ) -> Optional[Dict[str, Any]]:
+        if (now - self.last_confirmed_touch_time) <= WHIFF_RECENT_TOUCH_SECONDS:
+            return None
         if self.attack_min_dist > WHIFF_CLOSE_MISS_DISTANCE:
-            self._clear_attack()
-            return
+            return None
         if self.attack_min_dist <= WHIFF_TOUCH_SUPPRESS_DISTANCE:
-            self._clear_attack()
-            return
+            return None
 
         attack_duration = max(1e-6, now - self.attack_start_time)
         progress = max(0.0, self.attack_start_dist - self.attack_min_dist)
@@ -247,13 +438,12 @@ class LiveMetricsEngine:
         if contest_recent:
             clear_miss_under_challenge = (
                 (self.attack_had_flip and self.attack_min_dist > 320.0)
-                or (self.attack_had_jump and car_pos[2] > ball_pos[2] + JUMP_OVER_Z_MARGIN and self.attack_min_dist > 300.0)
+                or (self.attack_had_jump and car_z > ball_z + JUMP_OVER_Z_MARGIN and self.attack_min_dist > 300.0)
                 or (progress < 100.0 and moving_away)
             )
             if not clear_miss_under_challenge:
                 self.contest_suppressed_whiffs += 1
-                self._clear_attack()
-                return
+                return None
             self.clear_miss_under_contest += 1
 
         progress_score = _clamp01(progress / 240.0)
@@ -263,14 +453,12 @@ class LiveMetricsEngine:
         opportunity_score = 0.35 * progress_score + 0.25 * near_score + 0.25 * intent_score + 0.15 * duration_score
 
         if opportunity_score < WHIFF_OPPORTUNITY_MIN:
-            self._clear_attack()
-            return
+            return None
 
         # Suppress false positives from committed flips/flicks where contact window moves away.
         if self.attack_had_flip and moving_away and (toward_speed > 120.0):
-            self.suppressed_whiff_flip_commit += 1
-            self._clear_attack()
-            return
+            self.suppressed_flip_commit += 1
+            return None
 
         # Suppress intentional disengage when ball is clearly moving away at pace.
         if (
@@ -279,9 +467,8 @@ class LiveMetricsEngine:
             and ball_speed >= WHIFF_DISENGAGE_BALL_SPEED_MIN
             and self.attack_min_dist > 260.0
         ):
-            self.suppressed_whiff_disengage += 1
-            self._clear_attack()
-            return
+            self.suppressed_disengage += 1
+            return None
 
         # Suppress bump/demo style intent when nearest opponent is target, not the ball lane.
         if (
@@ -290,24 +477,21 @@ class LiveMetricsEngine:
             and nearest_other_toward_speed > 180.0
             and moving_away
         ):
-            self.suppressed_whiff_bump_intent += 1
-            self._clear_attack()
-            return
+            self.suppressed_bump_intent += 1
+            return None
 
         # Suppress when another player touched first and removed the opportunity window.
-        if latest_touch_by_other_recent and moving_away:
-            self.suppressed_whiff_opponent_first_touch += 1
-            self._clear_attack()
-            return
+        if other_touched_recent and moving_away:
+            self.suppressed_opponent_first_touch += 1
+            return None
 
         if (now - self.last_whiff_time) <= WHIFF_COOLDOWN_SECONDS:
-            self._clear_attack()
-            return
+            return None
 
         reason = "drive_miss"
         if self.attack_had_flip:
             reason = "flip_miss"
-        elif self.attack_had_jump and car_pos[2] > ball_pos[2] + JUMP_OVER_Z_MARGIN:
+        elif self.attack_had_jump and car_z > ball_z + JUMP_OVER_Z_MARGIN:
             reason = "jump_miss"
         elif speed < 420.0 or toward_speed < 260.0:
             reason = "slow_control_miss"
@@ -316,31 +500,112 @@ class LiveMetricsEngine:
         context = []
         if speed < 600.0:
             context.append("low_speed")
-        if car_pos[2] > 120.0:
+        if car_z > 120.0:
             context.append("airborne")
         if contest_recent:
             context.append("contested_clear_miss")
         if self.attack_had_flip:
             context.append("flip_attempt")
 
-        self.events.appendleft(
-            {
-                "time": round(now, 3),
-                "type": "whiff",
-                "reason": reason,
-                "distance": round(self.attack_min_dist, 2),
-                "opportunity_score": round(opportunity_score, 3),
-                "confidence": round(confidence, 3),
-                "suppressed_by_contest": False,
-                "contest_confidence": round(contest_confidence if contest_recent else 0.0, 3),
-                "context": context,
-                "intent_flags": ["whiff_attempt"],
-                "suppression_reason": "",
-                "opportunity_blocked": False,
-            }
-        )
         self.last_whiff_time = now
-        self._clear_attack()
+        return {
+            "time": round(now, 3),
+            "type": "whiff",
+            "reason": reason,
+            "distance": round(self.attack_min_dist, 2),
+            "opportunity_score": round(opportunity_score, 3),
+            "confidence": round(confidence, 3),
+            "suppressed_by_contest": False,
+            "contest_confidence": round(self.contest_confidence if contest_recent else 0.0, 3),
+            "context": context,
+            "intent_flags": ["whiff_attempt"],
+            "suppression_reason": "",
+            "opportunity_blocked": False,
+        }
+
+
+class LiveMetricsEngine:
+    def __init__(self, window_seconds: float = 10.0):
+        self.window_seconds = window_seconds
+        self.samples: Deque[MetricSample] = deque()
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=120)
+        self._event_seq = 0
+        self._event_windows: Dict[str, _EventWindow] = {}
+        # Rounded history points, kept in lockstep with self.samples so snapshots never rebuild them.
+        self.history_points: Dict[str, Deque[Dict[str, float]]] = {key: deque() for key, _ in HISTORY_FIELDS}
+        self._history_unsent = 0
+
+        self.total_frames = 0
+        self.active_frames = 0
+        self.pressure_frames = 0
+        self.hesitation_frames = 0
+        self.supersonic_frames = 0
+        self.useful_supersonic_frames = 0
+
+        self.total_boost_used = 0.0
+        self.wasted_boost = 0.0
+        self.useful_boost = 0.0
+
+        self.approach_progress_total = 0.0
+        self.approach_boost_used = 0.0
+
+        self.recovery = RecoveryTracker()
+        self.hesitation = HesitationTracker()
+        self.whiff = WhiffTracker()
+
+        self.prev_time = None
+        self.prev_ball_vel = (0.0, 0.0, 0.0)
+        self.prev_car_vel = (0.0, 0.0, 0.0)
+        self.prev_dist_to_ball = 99999.0
+        self.prev_speed = 0.0
+        self.prev_boost = None
+        self.prev_has_wheel_contact = None
+
+        self.pressure_gated_frames = 0
+        self.suppressed_hesitation_reposition = 0
+        self.suppressed_hesitation_setup = 0
+        self.suppressed_hesitation_spacing = 0
+        self.last_other_touch_time = -999.0
+
+    def _append_sample(self, sample: MetricSample) -> None:
+        self.samples.append(sample)
+        for key, attr in HISTORY_FIELDS:
+            self.history_points[key].append({"t": sample.t, "v": round(getattr(sample, attr), 4)})
+        self._history_unsent += 1
+
+    def _prune_window(self, now: float) -> None:
+        while self.samples and now - self.samples[0].t > self.window_seconds:
+            self.samples.popleft()
+            for points in self.history_points.values():
+                points.popleft()
+
+    @staticmethod
+    def _is_airborne(car, car_pos: Tuple[float, float, float]) -> bool:
+        has_wheel_contact = getattr(car, "has_wheel_contact", None)
+        if has_wheel_contact is not None:
+            return not bool(has_wheel_contact)
+        return car_pos[2] > 35.0
+
+    @staticmethod
+    def _angular_velocity(car) -> Tuple[float, float, float]:
+        ang = getattr(car.physics, "angular_velocity", None)
+        if ang is None:
+            return (0.0, 0.0, 0.0)
+        return (float(getattr(ang, "x", 0.0)), float(getattr(ang, "y", 0.0)), float(getattr(ang, "z", 0.0)))
+
+    @staticmethod
+    def _self_touched_ball_recently(ball, player_index: int, now: float) -> bool:
+        latest_touch = getattr(ball, "latest_touch", None)
+        if latest_touch is None:
+            return False
+        touch_player = int(getattr(latest_touch, "player_index", -1))
+        if touch_player != player_index:
+            return False
+        touch_time = getattr(latest_touch, "time_seconds", None)
+        if touch_time is None:
+            return True
+        touch_time = float(touch_time)
+        return 0.0 <= (now - touch_time) <= WHIFF_RECENT_TOUCH_SECONDS
 
     @staticmethod
     def _latest_touch_by_other_recent(ball, player_index: int, now: float) -> bool:
@@ -356,7 +621,9 @@ class LiveMetricsEngine:
         return 0.0 <= (now - float(touch_time)) <= WHIFF_OPP_FIRST_TOUCH_WINDOW
 
     @staticmethod
-    def _nearest_other_geometry(packet, player_index: int, car_pos, car_vel, ball_pos):
+    def _nearest_other_geometry(packet, player_index: int, car_pos, car_vel, ball_pos, geometry=None):
+        if geometry is not None:
+            return _nearest_other_from_geometry(geometry, player_index)
         nearest_other_ball = 99999.0
         nearest_other_self = 99999.0
         nearest_other_toward_speed = 0.0
@@ -386,26 +653,6 @@ class LiveMetricsEngine:
                 nearest_other_toward_speed = _safe_dot3(car_vel, toward_other) - _safe_dot3(ov, toward_other)
         return nearest_other_ball, nearest_other_self, nearest_other_toward_speed, nearest_other_pos
 
-    def _update_recovery_state(self, *, now: float, airborne: bool, speed: float, toward_speed: float) -> None:
-        if airborne and self.airborne_start_time is None:
-            self.airborne_start_time = now
-
-        if not airborne and self.airborne_start_time is not None:
-            air_time = now - self.airborne_start_time
-            self.airborne_start_time = None
-            self.last_landing_time = now
-            if air_time >= 0.08:
-                self.recovery_active = True
-                self.recovery_start_time = now
-
-        if self.recovery_active:
-            playable = (speed > 900.0) or (toward_speed > 380.0)
-            timeout = (now - self.recovery_start_time) > 2.5
-            if playable or timeout:
-                self.recovery_count += 1
-                self.recovery_total_time += max(0.0, now - self.recovery_start_time)
-                self.recovery_active = False
-
     def _hesitation_score(
         self,
         *,
@@ -424,7 +671,7 @@ class LiveMetricsEngine:
 
         if airborne:
             return 0.0
-        if (now - self.last_landing_time) <= HESITATION_RECOVERY_GRACE_SECONDS:
+        if (now - self.recovery.last_landing_time) <= HESITATION_RECOVERY_GRACE_SECONDS:
             return 0.0
 
         progress_penalty = 1.0 - _clamp01(max(0.0, toward_speed) / 900.0)
@@ -440,73 +687,31 @@ class LiveMetricsEngine:
 
         return _clamp01(score)
 
-    def _update_hesitation_events(
-        self,
-        now: float,
-        score: float,
-        pressure: bool,
-        suppression_reason: str = "",
-        enter_threshold: float = HESITATION_ENTER_THRESHOLD,
-    ) -> None:
-        if not pressure:
-            if self.hesitation_event_active:
-                streak = now - self.hesitation_event_start
-                self.max_hesitation_streak_seconds = max(self.max_hesitation_streak_seconds, streak)
-                self.hesitation_event_active = False
-            return
-
-        if (not self.hesitation_event_active) and score >= enter_threshold:
-            self.hesitation_event_active = True
-            self.hesitation_event_start = now
-            context = ["pressure"]
-            if suppression_reason:
-                context.append(f"suppression_override={suppression_reason}")
-            self.events.appendleft(
-                {
-                    "time": round(now, 3),
-                    "type": "hesitation",
-                    "reason": "indecision_under_pressure",
-                    "distance": round(self.prev_dist_to_ball, 2),
-                    "confidence": round(score, 3),
-                    "opportunity_score": round(score, 3),
-                    "context": context,
-                    "intent_flags": ["hesitation_window"],
-                    "suppression_reason": suppression_reason,
-                    "opportunity_blocked": False,
-                }
-            )
-
-        if self.hesitation_event_active and score <= HESITATION_EXIT_THRESHOLD:
-            streak = now - self.hesitation_event_start
-            self.max_hesitation_streak_seconds = max(self.max_hesitation_streak_seconds, streak)
-            self.hesitation_event_active = False
+    def _record_event(self, event: Dict[str, Any]) -> None:
+        self.events.appendleft(event)
+        window = self._event_windows.setdefault(str(event.get("type")), _EventWindow())
+        window.add(self._event_seq, float(event.get("time", 0.0)))
+        self._event_seq += 1
 
     def _count_recent_events(self, now: float, event_type: str) -> int:
+        window = self._event_windows.get(event_type)
+        if window is None:
+            return 0
         cutoff = now - self.window_seconds
-        return len([e for e in self.events if e.get("type") == event_type and float(e.get("time", 0.0)) >= cutoff])
-
-    @staticmethod
-    def _nearest_other_distances(packet, player_index: int, car_pos: Tuple[float, float, float], ball_pos: Tuple[float, float, float]) -> Tuple[float, float]:
-        nearest_other_to_ball = 99999.0
-        nearest_other_to_self = 99999.0
-        for i in range(int(getattr(packet, "num_cars", 0))):
-            if i == player_index:
-                continue
-            oc = packet.game_cars[i]
-            op = (
-                float(oc.physics.location.x),
-                float(oc.physics.location.y),
-                float(oc.physics.location.z),
+        if not window.ordered or cutoff < window.cutoff:
+            # Game clock went backwards (or events arrived out of order): re-index from the deque.
+            newest_seq = self._event_seq - 1
+            window.reset(
+                [
+                    (newest_seq - i, float(e.get("time", 0.0)))
+                    for i, e in reversed(list(enumerate(self.events)))
+                    if e.get("type") == event_type
+                ]
             )
-            d_ball = _norm3(op[0] - ball_pos[0], op[1] - ball_pos[1], op[2] - ball_pos[2])
-            d_self = _norm3(op[0] - car_pos[0], op[1] - car_pos[1], op[2] - car_pos[2])
-            if d_ball < nearest_other_to_ball:
-                nearest_other_to_ball = d_ball
-            if d_self < nearest_other_to_self:
-                nearest_other_to_self = d_self
-        return nearest_other_to_ball, nearest_other_to_self
+        return window.count(cutoff, self._event_seq - len(self.events))
 
-    def update(self, packet, player_index: int = 0) -> None:
+    def update(self, packet, player_index: int = 0, geometry=None) -> None:
+        # geometry: optional FrameGeometry for this packet, shared when several players are tracked.
         if packet.num_cars <= player_index:
             return
 
@@ -521,20 +726,25 @@ class LiveMetricsEngine:
         ball_vel = (float(ball.physics.velocity.x), float(ball.physics.velocity.y), float(ball.physics.velocity.z))
 
         speed = _norm3(*car_vel)
-        dist_to_ball = _norm3(car_pos[0] - ball_pos[0], car_pos[1] - ball_pos[1], car_pos[2] - ball_pos[2])
+        if geometry is not None:
+            dist_to_ball = geometry.dist_rows[player_index][geometry.ball]
+        else:
+            dist_to_ball = _norm3(car_pos[0] - ball_pos[0], car_pos[1] - ball_pos[1], car_pos[2] - ball_pos[2])
 
         dt = 1 / 60.0
         if self.prev_time is not None and now > self.prev_time:
             dt = max(1e-5, now - self.prev_time)
 
-        to_ball = (ball_pos[0] - car_pos[0], ball_pos[1] - car_pos[1], ball_pos[2] - car_pos[2])
-        to_ball_dir = _safe_unit3(to_ball)
-        toward_speed = _safe_dot3(car_vel, to_ball_dir)
+        if geometry is not None:
+            toward_speed = geometry.toward_rows[player_index][geometry.ball]
+        else:
+            to_ball = (ball_pos[0] - car_pos[0], ball_pos[1] - car_pos[1], ball_pos[2] - car_pos[2])
+            toward_speed = _safe_dot3(car_vel, _safe_unit3(to_ball))
         lateral_speed_sq = max(0.0, speed * speed - toward_speed * toward_speed)
         lateral_speed = lateral_speed_sq ** 0.5
         ball_speed = _norm3(*ball_vel)
         nearest_other_ball, nearest_other_self, nearest_other_toward_speed, nearest_other_pos = self._nearest_other_geometry(
-            packet, player_index, car_pos, car_vel, ball_pos
+            packet, player_index, car_pos, car_vel, ball_pos, geometry
         )
 
         speed_accel = (speed - self.prev_speed) / dt if self.prev_time is not None else 0.0
@@ -542,11 +752,11 @@ class LiveMetricsEngine:
         moving_away = dist_to_ball > self.prev_dist_to_ball + 6.0
 
         if not active_play:
-            self.hesitation_event_active = False
-            self._clear_attack()
+            self.hesitation.event_active = False
+            self.whiff.clear()
             if self.samples:
                 latest = self.samples[-1]
-                self.samples.append(
+                self._append_sample(
                     MetricSample(
                         t=now,
                         speed=latest.speed,
@@ -562,7 +772,7 @@ class LiveMetricsEngine:
                     )
                 )
             else:
-                self.samples.append(
+                self._append_sample(
                     MetricSample(
                         t=now,
                         speed=0.0,
@@ -605,7 +815,7 @@ class LiveMetricsEngine:
             self.pressure_frames += 1
 
         airborne = self._is_airborne(car, car_pos)
-        self._update_recovery_state(now=now, airborne=airborne, speed=speed, toward_speed=toward_speed)
+        self.recovery.step(now, airborne, speed, toward_speed)
 
         hesitation_score = self._hesitation_score(
             active=active,
@@ -648,13 +858,16 @@ class LiveMetricsEngine:
         is_hesitating = pressure and hesitation_score >= HESITATION_FRAME_THRESHOLD and hesitation_score >= dynamic_enter_threshold - 0.08
         if is_hesitating:
             self.hesitation_frames += 1
-        self._update_hesitation_events(
+        hesitation_event = self.hesitation.step(
             now,
             hesitation_score,
             pressure,
+            self.prev_dist_to_ball,
             suppression_reason=suppression_reason,
             enter_threshold=dynamic_enter_threshold,
         )
+        if hesitation_event is not None:
+            self._record_event(hesitation_event)
 
         is_supersonic = speed > SUPERSONIC_SPEED
         if is_supersonic:
@@ -689,69 +902,28 @@ class LiveMetricsEngine:
         ) / max(dt, 1e-6)
         ball_was_hit = ball_accel > BALL_HIT_ACCEL_THRESHOLD
 
-        if not self.attack_active:
-            start_by_closing = closing and dist_to_ball < WHIFF_APPROACH_START_DISTANCE
-            start_by_near = dist_to_ball < WHIFF_NEAR_DISTANCE and speed > 80.0
-            start_by_air_attempt = airborne and dist_to_ball < 950.0 and (car_vel[2] > JUMP_VEL_Z_THRESHOLD)
-            if start_by_closing or start_by_near or start_by_air_attempt:
-                self._start_attack(now, dist_to_ball)
-
-        if self.attack_active:
-            self.attack_min_dist = min(self.attack_min_dist, dist_to_ball)
-            if closing:
-                self.attack_closing_frames += 1
-            if dist_to_ball <= WHIFF_NEAR_DISTANCE:
-                self.attack_near_frames += 1
-            if abs(toward_speed) > 140.0 or speed > 160.0 or airborne:
-                self.attack_intent_frames += 1
-
-            if airborne and car_vel[2] > JUMP_VEL_Z_THRESHOLD:
-                self.attack_had_jump = True
-
-            ang_vel = self._angular_velocity(car)
-            ang_speed = _norm3(*ang_vel)
-            if airborne and ang_speed > FLIP_ANG_VEL_THRESHOLD and speed > 280.0:
-                self.attack_had_flip = True
-
-        self_touched = self._self_touched_ball_recently(ball, player_index, now)
-        other_touched_recent = self._latest_touch_by_other_recent(ball, player_index, now)
-        if ball_was_hit and self.attack_active and (not self_touched) and self.attack_min_dist <= CONTEST_MIN_ATTACK_DIST:
-            nearest_other_ball, nearest_other_self = self._nearest_other_distances(packet, player_index, car_pos, ball_pos)
-            if nearest_other_ball <= CONTEST_BALL_RADIUS and nearest_other_self <= CONTEST_PLAYER_RADIUS:
-                ball_factor = _clamp01((CONTEST_BALL_RADIUS - nearest_other_ball) / CONTEST_BALL_RADIUS)
-                self_factor = _clamp01((CONTEST_PLAYER_RADIUS - nearest_other_self) / CONTEST_PLAYER_RADIUS)
-                conf = 0.55 * ball_factor + 0.45 * self_factor
-                if conf >= 0.2:
-                    self.last_external_contested_touch_time = now
-                    self.last_external_contested_touch_confidence = conf
-                    self.last_external_contested_touch_dist_to_ball = self.attack_min_dist
-
-        if self_touched:
-            self.last_confirmed_touch_time = now
-            self._clear_attack()
-        elif ball_was_hit and self.attack_active and self.attack_min_dist < WHIFF_TOUCH_SUPPRESS_DISTANCE:
-            self.last_confirmed_touch_time = now
-            self._clear_attack()
-
-        timed_out = self.attack_active and ((now - self.attack_start_time) > WHIFF_MAX_APPROACH_SECONDS)
-        disengaged = self.attack_active and moving_away and self.attack_closing_frames > 0
-        if timed_out or disengaged:
-            contest_recent = (now - self.last_external_contested_touch_time) <= CONTEST_WINDOW_SECONDS
-            self._finalize_whiff_if_needed(
-                now=now,
-                speed=speed,
-                car_pos=car_pos,
-                ball_pos=ball_pos,
-                toward_speed=toward_speed,
-                moving_away=moving_away,
-                contest_recent=contest_recent,
-                contest_confidence=self.last_external_contested_touch_confidence,
-                nearest_other_ball=nearest_other_ball,
-                nearest_other_self=nearest_other_self,
-                nearest_other_toward_speed=nearest_other_toward_speed,
-                ball_speed=ball_speed,
-                latest_touch_by_other_recent=other_touched_recent,
-            )
+        whiff_event = self.whiff.step(
+            now=now,
+            dist_to_ball=dist_to_ball,
+            closing=closing,
+            moving_away=moving_away,
+            speed=speed,
+            toward_speed=toward_speed,
+            airborne=airborne,
+            car_vz=car_vel[2],
+            car_z=car_pos[2],
+            ball_z=ball_pos[2],
+            ang_speed=_norm3(*self._angular_velocity(car)),
+            ball_speed=ball_speed,
+            ball_was_hit=ball_was_hit,
+            self_touched=self._self_touched_ball_recently(ball, player_index, now),
+            other_touched_recent=self._latest_touch_by_other_recent(ball, player_index, now),
+            nearest_other_ball=nearest_other_ball,
+            nearest_other_self=nearest_other_self,
+            nearest_other_toward_speed=nearest_other_toward_speed,
+        )
+        if whiff_event is not None:
+            self._record_event(whiff_event)
 
         hesitation_pct = (100.0 * self.hesitation_frames / max(1, self.pressure_frames))
         boost_waste_pct = (100.0 * self.wasted_boost / max(1e-6, self.total_boost_used))
@@ -763,9 +935,9 @@ class LiveMetricsEngine:
         whiff_rate_per_min = whiff_events_recent * (60.0 / max(1e-6, self.window_seconds))
 
         approach_efficiency = self.approach_progress_total / max(1e-6, self.approach_boost_used)
-        recovery_time_avg_s = self.recovery_total_time / max(1, self.recovery_count)
+        recovery_time_avg_s = self.recovery.average_time()
 
-        self.samples.append(
+        self._append_sample(
             MetricSample(
                 t=now,
                 speed=speed,
@@ -790,7 +962,7 @@ class LiveMetricsEngine:
         self.prev_boost = cur_boost
         self.prev_has_wheel_contact = getattr(car, "has_wheel_contact", None)
 
-    def snapshot(self) -> Tuple[Dict[str, Any], Dict[str, List[Dict[str, float]]], List[Dict[str, Any]]]:
+    def current(self) -> Dict[str, Any]:
         if self.samples:
             latest = self.samples[-1]
             now = latest.t
@@ -806,16 +978,16 @@ class LiveMetricsEngine:
                 "whiff_rate_per_min": round(latest.whiff_rate_per_min, 2),
                 "approach_efficiency": round(latest.approach_efficiency, 2),
                 "recovery_time_avg_s": round(latest.recovery_time_avg_s, 3),
-                "hesitation_streak_max_s": round(self.max_hesitation_streak_seconds, 3),
+                "hesitation_streak_max_s": round(self.hesitation.max_streak_seconds, 3),
                 "whiff_events_recent": self._count_recent_events(now, "whiff"),
                 "hesitation_events_recent": self._count_recent_events(now, "hesitation"),
-                "contest_suppressed_whiffs": int(self.contest_suppressed_whiffs),
-                "clear_miss_under_contest": int(self.clear_miss_under_contest),
+                "contest_suppressed_whiffs": int(self.whiff.contest_suppressed_whiffs),
+                "clear_miss_under_contest": int(self.whiff.clear_miss_under_contest),
                 "pressure_gated_frames": int(self.pressure_gated_frames),
-                "suppressed_whiff_flip_commit": int(self.suppressed_whiff_flip_commit),
-                "suppressed_whiff_disengage": int(self.suppressed_whiff_disengage),
-                "suppressed_whiff_bump_intent": int(self.suppressed_whiff_bump_intent),
-                "suppressed_whiff_opponent_first_touch": int(self.suppressed_whiff_opponent_first_touch),
+                "suppressed_whiff_flip_commit": int(self.whiff.suppressed_flip_commit),
+                "suppressed_whiff_disengage": int(self.whiff.suppressed_disengage),
+                "suppressed_whiff_bump_intent": int(self.whiff.suppressed_bump_intent),
+                "suppressed_whiff_opponent_first_touch": int(self.whiff.suppressed_opponent_first_touch),
                 "suppressed_hesitation_reposition": int(self.suppressed_hesitation_reposition),
                 "suppressed_hesitation_setup": int(self.suppressed_hesitation_setup),
                 "suppressed_hesitation_spacing": int(self.suppressed_hesitation_spacing),
@@ -847,18 +1019,19 @@ class LiveMetricsEngine:
                 "suppressed_hesitation_setup": 0,
                 "suppressed_hesitation_spacing": 0,
             }
+        return current
 
-        history = {
-            "speed": [{"t": s.t, "v": round(s.speed, 4)} for s in self.samples],
-            "hesitation_score": [{"t": s.t, "v": round(s.hesitation_score, 4)} for s in self.samples],
-            "hesitation_percent": [{"t": s.t, "v": round(s.hesitation_pct, 4)} for s in self.samples],
-            "boost_waste_percent": [{"t": s.t, "v": round(s.boost_waste_pct, 4)} for s in self.samples],
-            "supersonic_percent": [{"t": s.t, "v": round(s.supersonic_pct, 4)} for s in self.samples],
-            "useful_supersonic_percent": [{"t": s.t, "v": round(s.useful_supersonic_pct, 4)} for s in self.samples],
-            "pressure_percent": [{"t": s.t, "v": round(s.pressure_pct, 4)} for s in self.samples],
-            "whiff_rate_per_min": [{"t": s.t, "v": round(s.whiff_rate_per_min, 4)} for s in self.samples],
-            "approach_efficiency": [{"t": s.t, "v": round(s.approach_efficiency, 4)} for s in self.samples],
-            "recovery_time_avg_s": [{"t": s.t, "v": round(s.recovery_time_avg_s, 4)} for s in self.samples],
-        }
+    def history(self) -> Dict[str, List[Dict[str, float]]]:
+        return {key: list(points) for key, points in self.history_points.items()}
 
-        return current, history, list(self.events)
+    def history_update(self) -> HistoryUpdate:
+        # Only the points appended since the last call (pruned ones excluded); the consumer keeps the
+        # window itself by trimming each series to window_len.
+        n = len(self.samples)
+        start = n - min(self._history_unsent, n)
+        self._history_unsent = 0
+        points = {key: [series[i] for i in range(start, n)] for key, series in self.history_points.items()}
+        return HistoryUpdate(points, n)
+
+    def snapshot(self) -> Tuple[Dict[str, Any], Dict[str, List[Dict[str, float]]], List[Dict[str, Any]]]:
+        return self.current(), self.history(), list(self.events)
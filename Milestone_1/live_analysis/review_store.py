@@ -8,6 +8,9 @@ import gzip
 import json
 import uuid
 
+from session_frames import JSONL_FRAMES_FILE, read_frames
+from timeline_index import TimelineIndex
+
 
 SOCCAR_BOOST_PADS = [
     {"x": 0.0, "y": -4240.0, "z": 70.0, "size": "small"},
@@ -39,6 +42,7 @@ class ReviewStore:
         self._current_session_id: str = ""
         self._current_manifest: Dict[str, Any] = {}
         self._current_timeline: List[Dict[str, Any]] = []
+        self._current_index: Optional[TimelineIndex] = None
         self._current_events: List[Dict[str, Any]] = []
         self._current_labels: Dict[str, Dict[str, Any]] = {}
         self._current_metrics_timeline: List[Dict[str, Any]] = []
@@ -97,21 +101,8 @@ class ReviewStore:
             return fallback
 
     def _read_timeline(self, session_dir: Path, manifest: Dict[str, Any]) -> List[Dict[str, Any]]:
-        frames_name = manifest.get("files", {}).get("frames", "frames.jsonl.gz")
-        frames_path = session_dir / frames_name
-        if not frames_path.exists():
-            return []
-        out: List[Dict[str, Any]] = []
-        with gzip.open(frames_path, "rt", encoding="utf-8") as fp:
-            for line in fp:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    out.append(json.loads(line))
-                except Exception:
-                    continue
-        return out
+        frames_name = manifest.get("files", {}).get("frames", JSONL_FRAMES_FILE)
+        return read_frames(session_dir / frames_name)
 
     def _read_metrics(self, session_dir: Path, manifest: Dict[str, Any]) -> List[Dict[str, Any]]:
         name = manifest.get("files", {}).get("metrics_timeline", "metrics_timeline.json.gz")
@@ -160,6 +151,7 @@ class ReviewStore:
             self._current_session_id = sid
             self._current_manifest = manifest
             self._current_timeline = timeline
+            self._current_index = None
             self._current_events = events
             self._current_labels = labels
             self._current_metrics_timeline = metrics_timeline
@@ -233,6 +225,22 @@ class ReviewStore:
                 "metrics_timeline": self._current_metrics_timeline,
             }
 
+    def timeline_index(self) -> Optional[TimelineIndex]:
+        # Column index over the loaded timeline, built on first use and reused by every grading
+        # request until another session is loaded. Built outside the lock; if another session was
+        # loaded meanwhile, the index is returned but not kept.
+        with self._lock:
+            if not self._current_session_id:
+                return None
+            if self._current_index is not None:
+                return self._current_index
+            timeline = self._current_timeline
+        index = TimelineIndex(timeline)
+        with self._lock:
+            if self._current_timeline is timeline and self._current_index is None:
+                self._current_index = index
+        return index
+
     def events(self) -> List[Dict[str, Any]]:
         with self._lock:
             if not self._current_session_id:
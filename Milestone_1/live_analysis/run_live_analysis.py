@@ -27,7 +27,24 @@ def parse_args():
     parser.add_argument("--host", default="127.0.0.1")
     parser.add_argument("--port", type=int, default=8765)
     parser.add_argument("--player-index", type=int, default=0)
+    parser.add_argument(
+        "--track-player-index",
+        type=int,
+        action="append",
+        default=[],
+        help="Extra player index to analyze alongside --player-index (repeatable).",
+    )
+    parser.add_argument(
+        "--track-all-players",
+        action="store_true",
+        help="Analyze every car in the match; the dashboard gets per-player metrics.",
+    )
     parser.add_argument("--tick-rate", type=float, default=30.0)
+    parser.add_argument(
+        "--wait-for-packets",
+        action="store_true",
+        help="Block on each new game packet instead of sleeping to the next tick deadline.",
+    )
     parser.add_argument("--window-seconds", type=float, default=10.0)
     parser.add_argument("--stabilization-ticks", type=int, default=15)
     parser.add_argument("--default-scenario", default="")
@@ -42,6 +59,12 @@ def parse_args():
     parser.add_argument("--record-session", dest="record_session", action="store_true")
     parser.add_argument("--no-record-session", dest="record_session", action="store_false")
     parser.set_defaults(record_session=True)
+    parser.add_argument(
+        "--session-frames-format",
+        choices=["columnar", "jsonl"],
+        default="columnar",
+        help="Recorded frame storage: chunked binary columns (default) or the older frames.jsonl.gz.",
+    )
 
     parser.set_defaults(auto_start_match=True)
     parser.add_argument(
@@ -225,10 +248,11 @@ def main():
     _maybe_delegate_to_powershell(args)
 
     from http_server import DashboardServer
-    from metrics_engine import LiveMetricsEngine
+    from live_pipeline import LivePipeline
     from review_store import ReviewStore
     from session_recorder import SessionRecorder
     from state_store import StateStore
+    from tick_scheduler import TickScheduler
     from mechanic_grader import grade_game_mechanics, summarize_mechanic_scores
     from common.persistence import AppDB
 
@@ -246,7 +270,6 @@ def main():
         scenarios, sources = load_scenarios(extra_dir=args.scenario_root or None)
     store.set_scenarios(scenarios, sources)
 
-    metrics = LiveMetricsEngine(window_seconds=args.window_seconds)
     spawner = None
     if not args.review_only:
         from scenario_spawner import ScenarioSpawner
@@ -290,6 +313,7 @@ def main():
             tick_rate=args.tick_rate,
             tracked_player_index=args.player_index,
             enabled=bool(args.record_session),
+            frames_format=args.session_frames_format,
         )
         recorder.start()
         if recorder.enabled:
@@ -312,7 +336,58 @@ def main():
     signal.signal(signal.SIGINT, _stop)
     signal.signal(signal.SIGTERM, _stop)
 
-    sleep_s = 1.0 / max(1.0, args.tick_rate)
+    scheduler = TickScheduler(args.tick_rate)
+    wait_for_packets = bool(args.wait_for_packets) and manager is not None and hasattr(manager.game_interface, "fresh_live_data_packet")
+    if args.wait_for_packets and not args.review_only and not wait_for_packets:
+        print("[live_analysis] fresh packet wait unavailable in this RLBot version; using tick deadlines")
+    packet_timeout_ms = max(1, int(round(2000.0 * scheduler.period)))
+    last_stats_publish = 0.0
+
+    def _live_current(current):
+        # Future-aware event detection is post-session only.
+        live_current = dict(current)
+        live_current["whiff_rate_per_min"] = 0.0
+        live_current["whiff_events_recent"] = 0
+        live_current["hesitation_events_recent"] = 0
+        return live_current
+
+    def _publish_metrics(packet, results):
+        primary = results.get(args.player_index)
+        if primary is not None:
+            history = primary[1]
+            if history is None:
+                store.set_metrics(_live_current(primary[0]), {}, [], 0)
+            else:
+                store.set_metrics(_live_current(primary[0]), history.points, [], history.window_len)
+        if len(results) > 1:
+            players = {}
+            for idx, (current, _history, _events) in sorted(results.items()):
+                car = packet.game_cars[idx]
+                raw = getattr(car, "name", "")
+                if isinstance(raw, bytes):
+                    raw = raw.decode("utf-8", errors="replace")
+                players[str(idx)] = {
+                    "index": idx,
+                    "name": str(raw or "").strip() or f"player_{idx}",
+                    "team": int(getattr(car, "team", idx % 2)),
+                    "current": _live_current(current),
+                }
+            store.set_player_metrics(players)
+
+    def _record_metrics(packet, results):
+        primary = results.get(args.player_index)
+        if recorder and primary is not None:
+            recorder.record(packet, primary[0], primary[2])
+
+    pipeline = None
+    if not args.review_only:
+        pipeline = LivePipeline(
+            [args.player_index, *args.track_player_index],
+            window_seconds=args.window_seconds,
+            publish=_publish_metrics,
+            record=_record_metrics,
+            track_all=args.track_all_players,
+        )
 
     try:
         while running:
@@ -320,6 +395,12 @@ def main():
                 time.sleep(0.1)
                 continue
 
+            if wait_for_packets:
+                # Paced by the game itself: returns as soon as a newer packet exists (or on timeout).
+                packet = GameTickPacket()
+                manager.game_interface.fresh_live_data_packet(packet, packet_timeout_ms, args.player_index)
+            scheduler.start_tick()
+
             pending_name = store.pop_pending_scenario()
             if not pending_name:
                 nxt = store.pop_next_training()
@@ -337,28 +418,49 @@ def main():
 
             spawner.tick(manager.game_interface)
 
-            packet = GameTickPacket()
-            manager.game_interface.update_live_data_packet(packet)
-
-            if packet.num_cars > args.player_index:
-                metrics.update(packet, player_index=args.player_index)
-                current, history, events = metrics.snapshot()
-                # Future-aware event detection is post-session only.
-                live_current = dict(current)
-                live_current["whiff_rate_per_min"] = 0.0
-                live_current["whiff_events_recent"] = 0
-                live_current["hesitation_events_recent"] = 0
-                store.set_metrics(live_current, history, [])
-                if recorder:
-                    recorder.record(packet, current, events)
-
-            time.sleep(sleep_s)
+            if not wait_for_packets:
+                packet = GameTickPacket()
+                manager.game_interface.update_live_data_packet(packet)
+            scheduler.observe_game_time(packet.game_info.seconds_elapsed)
+
+            if packet.num_cars > 0:
+                # Metrics, dashboard publish and recording run on pipeline threads.
+                pipeline.submit(packet)
+
+            scheduler.end_tick()
+            now = time.monotonic()
+            if now - last_stats_publish >= 1.0:
+                last_stats_publish = now
+                store.set_loop_stats({**scheduler.stats(), "pipeline": pipeline.stats()})
+            if not wait_for_packets:
+                scheduler.wait()
     finally:
+        if pipeline is not None:
+            pipeline.close()
+            pst = pipeline.stats()
+            if pst["metrics"]["dropped"] or pst["publish"]["dropped"]:
+                print(
+                    f"[live_analysis] pipeline dropped {pst['metrics']['dropped']} packets before metrics, "
+                    f"{pst['publish']['dropped']} before publish"
+                )
+        if not args.review_only:
+            st = scheduler.stats()
+            print(
+                f"[live_analysis] loop: {st['achieved_hz']:.1f}/{st['target_hz']:.0f} Hz, "
+                f"p50 {st['loop_ms_p50']:.1f} ms, p99 {st['loop_ms_p99']:.1f} ms, "
+                f"{st['overruns']} overruns, {st['missed_loop_periods']} missed loop periods"
+            )
         if recorder:
             try:
                 out = recorder.finalize()
                 if out:
                     print(f"[live_analysis] session saved: {out}")
+                    rec_stats = recorder.stats()
+                    if rec_stats["frames_dropped"] or rec_stats["writer_error"]:
+                        print(
+                            f"[live_analysis] recorder dropped {rec_stats['frames_dropped']} frames "
+                            f"(queue high water {rec_stats['queue_high_water']}/{rec_stats['queue_capacity']})"
+                        )
                     profile = db.current_user() or {}
                     if profile:
                         manifest_path = Path(out) / "manifest.json"
@@ -386,26 +488,14 @@ def main():
                         except Exception:
                             pass
                         try:
-                            import gzip
-                            import json as _json
-
-                            frames_file = str((manifest.get("files", {}) or {}).get("frames", "frames.jsonl.gz"))
-                            frames_path = Path(out) / frames_file
-                            if frames_path.exists():
-                                timeline = []
-                                with gzip.open(frames_path, "rt", encoding="utf-8") as fp:
-                                    for line in fp:
-                                        line = line.strip()
-                                        if not line:
-                                            continue
-                                        try:
-                                            timeline.append(_json.loads(line))
-                                        except Exception:
-                                            continue
+                            # Grade from the recorder's in-memory columns; the frames file is not re-read.
+                            timeline_index = recorder.timeline_index
+                            if timeline_index is not None:
+                                timeline = timeline_index.timeline
                                 tracked = str(manifest.get("tracked_player_name", "") or "")
                                 player_teams = dict(manifest.get("player_teams", {}) or {})
                                 if timeline and tracked:
-                                    mech_payload = grade_game_mechanics(timeline, tracked, player_teams)
+                                    mech_payload = grade_game_mechanics(timeline, tracked, player_teams, index=timeline_index)
                                     summary.update(summarize_mechanic_scores(mech_payload))
                                     summary["mechanic_event_count"] = len((mech_payload or {}).get("mechanic_events", []) or [])
                         except Exception:
@@ -433,4 +523,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main()
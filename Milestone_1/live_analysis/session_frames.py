@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+import gzip
+import json
+import mmap
+import struct
+import zlib
+
+import numpy as np
+
+try:
+    import zstandard as _zstd
+except ImportError:
+    _zstd = None
+
+try:
+    import lz4.frame as _lz4_frame
+except ImportError:
+    _lz4_frame = None
+
+
+# Recorded session frames as compressed column chunks instead of one JSON line per tick.
+#
+# File layout: MAGIC, then chunks of
+#   <u32 header length> <JSON header> <compressed column blobs, in header order>
+# The header carries the chunk's frame count, codec, player/team table (player columns are
+# (frames, players) in that table's order) and [name, dtype, shape, nbytes] per column, so a
+# reader can skip the columns it does not need. A chunk cut short by a crash is ignored.
+# Positions and velocities are stored as float64 so they read back exactly; rotations, angular
+# velocity and boost are float32 (about 7 significant digits), which is below what the analysis uses.
+# "players.order" keeps each car's position in its frame's player list, so frames read back with
+# their players in capture order rather than slot order.
+
+COLUMNAR_FRAMES_FILE = "frames.rlsf"
+JSONL_FRAMES_FILE = "frames.jsonl.gz"
+MAGIC = b"RLSF\x01"
+DEFAULT_CHUNK_FRAMES = 1024
+
+FRAME_FIELDS = (
+    ("idx", "<i8"),
+    ("t", "<f8"),
+    ("clock_s", "<f8"),
+    ("is_overtime", "|b1"),
+    ("is_kickoff_pause", "|b1"),
+)
+SCORE_FIELDS = ("blue", "orange")
+BALL_FIELDS = ("x", "y", "z", "vx", "vy", "vz", "wx", "wy", "wz", "pitch", "yaw", "roll", "qx", "qy", "qz", "qw")
+PLAYER_FLOAT_FIELDS = BALL_FIELDS + ("boost",)
+PLAYER_FLAG_FIELDS = ("is_demolished", "has_wheel_contact")
+_FLOAT64_FIELDS = frozenset(("x", "y", "z", "vx", "vy", "vz"))
+
+_HEADER_LEN = struct.Struct("<I")
+
+
+def _codecs() -> Dict[str, tuple]:
+    out = {"zlib": (lambda b: zlib.compress(b, 1), zlib.decompress)}
+    if _lz4_frame is not None:
+        out["lz4"] = (_lz4_frame.compress, _lz4_frame.decompress)
+    if _zstd is not None:
+        out["zstd"] = (_zstd.ZstdCompressor(level=3).compress, _zstd.ZstdDecompressor().decompress)
+    return out
+
+
+_CODECS = _codecs()
+
+
+def default_codec() -> str:
+    for name in ("zstd", "lz4", "zlib"):
+        if name in _CODECS:
+            return name
+    return "zlib"
+
+
+def _player_keys(players: List[Dict[str, Any]]) -> List[tuple[str, int]]:
+    # (name, n-th car with that name in the frame), so same-named cars keep separate slots.
+    seen: Dict[str, int] = {}
+    out = []
+    for p in players:
+        name = str(p.get("name", ""))
+        out.append((name, seen.get(name, 0)))
+        seen[name] = seen.get(name, 0) + 1
+    return out
+
+
+def _float_dtype(key: str) -> str:
+    return "<f8" if key in _FLOAT64_FIELDS else "<f4"
+
+
+def _encode_chunk(frames: List[Dict[str, Any]], codec: str) -> bytes:
+    n = len(frames)
+    slots: Dict[tuple[str, int], int] = {}
+    teams: List[int] = []
+    for fr in frames:
+        players = fr.get("players", []) or []
+        for key, p in zip(_player_keys(players), players):
+            if key not in slots:
+                slots[key] = len(slots)
+                teams.append(int(p.get("team", 0) or 0))
+
+    columns: List[tuple[str, np.ndarray]] = []
+    for key, dtype in FRAME_FIELDS:
+        columns.append((key, np.array([fr.get(key, 0) for fr in frames], dtype=dtype)))
+    scores = [fr.get("scores", {}) or {} for fr in frames]
+    for key in SCORE_FIELDS:
+        columns.append((f"scores.{key}", np.array([s.get(key, 0) for s in scores], dtype="<i4")))
+    balls = [fr.get("ball", {}) or {} for fr in frames]
+    ball = np.array([[b.get(k, 0.0) for k in BALL_FIELDS] for b in balls], dtype="<f8").reshape(n, len(BALL_FIELDS))
+    for col, key in enumerate(BALL_FIELDS):
+        columns.append((f"ball.{key}", np.ascontiguousarray(ball[:, col], dtype=_float_dtype(key))))
+
+    width = len(slots)
+    present = np.zeros((n, width), dtype=bool)
+    order = np.full((n, width), -1, dtype="<i2")
+    values = np.zeros((n, width, len(PLAYER_FLOAT_FIELDS)), dtype="<f8")
+    flags = np.zeros((n, width, len(PLAYER_FLAG_FIELDS)), dtype=bool)
+    for i, fr in enumerate(frames):
+        players = fr.get("players", []) or []
+        for pos, (key, p) in enumerate(zip(_player_keys(players), players)):
+            slot = slots[key]
+            present[i, slot] = True
+            order[i, slot] = pos
+            values[i, slot] = [p.get(k, 0.0) for k in PLAYER_FLOAT_FIELDS]
+            flags[i, slot] = [bool(p.get(k, False)) for k in PLAYER_FLAG_FIELDS]
+    columns.append(("players.present", present))
+    columns.append(("players.order", order))
+    for col, key in enumerate(PLAYER_FLOAT_FIELDS):
+        columns.append((f"players.{key}", np.ascontiguousarray(values[:, :, col], dtype=_float_dtype(key))))
+    for col, key in enumerate(PLAYER_FLAG_FIELDS):
+        columns.append((f"players.{key}", np.ascontiguousarray(flags[:, :, col])))
+
+    compress = _CODECS[codec][0]
+    blobs = [compress(arr.tobytes()) for _, arr in columns]
+    header = {
+        "frames": n,
+        "codec": codec,
+        "players": [{"name": name, "team": team} for (name, _), team in zip(slots, teams)],
+        "columns": [[key, arr.dtype.str, list(arr.shape), len(blob)] for (key, arr), blob in zip(columns, blobs)],
+    }
+    head = json.dumps(header, ensure_ascii=True, separators=(",", ":")).encode("utf-8")
+    return b"".join([_HEADER_LEN.pack(len(head)), head, *blobs])
+
+
+class ColumnarFrameWriter:
+    def __init__(self, path: Path, chunk_frames: int = DEFAULT_CHUNK_FRAMES, codec: str | None = None) -> None:
+        self.path = Path(path)
+        self.chunk_frames = max(1, int(chunk_frames))
+        self.codec = codec or default_codec()
+        if self.codec not in _CODECS:
+            raise RuntimeError(f"Frame codec '{self.codec}' is not available (install zstandard or lz4).")
+        self._pending: List[Dict[str, Any]] = []
+        self._fp = open(self.path, "wb")
+        self._fp.write(MAGIC)
+
+    def write(self, frame: Dict[str, Any]) -> None:
+        self._pending.append(frame)
+        if len(self._pending) >= self.chunk_frames:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            self._fp.write(_encode_chunk(self._pending, self.codec))
+            self._pending = []
+        self._fp.flush()
+
+    def close(self) -> None:
+        if self._fp is None:
+            return
+        self.flush()
+        self._fp.close()
+        self._fp = None
+
+
+class JsonlFrameWriter:
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._fp = gzip.open(self.path, "wt", encoding="utf-8")
+
+    def write(self, frame: Dict[str, Any]) -> None:
+        self._fp.write(json.dumps(frame, ensure_ascii=True) + "\n")
+
+    def close(self) -> None:
+        if self._fp is None:
+            return
+        self._fp.close()
+        self._fp = None
+
+
+def frames_file_name(frames_format: str) -> str:
+    return JSONL_FRAMES_FILE if frames_format == "jsonl" else COLUMNAR_FRAMES_FILE
+
+
+def open_frame_writer(path: Path, frames_format: str = "columnar", chunk_frames: int = DEFAULT_CHUNK_FRAMES):
+    if frames_format == "jsonl":
+        return JsonlFrameWriter(path)
+    if frames_format != "columnar":
+        raise RuntimeError(f"Unknown frames format '{frames_format}'.")
+    return ColumnarFrameWriter(path, chunk_frames=chunk_frames)
+
+
+def is_columnar(path: Path) -> bool:
+    try:
+        with open(path, "rb") as fp:
+            return fp.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _iter_chunk_views(buf: Any) -> Iterator[tuple[Dict[str, Any], int]]:
+    # Yields (header, offset of the first column blob) for every complete chunk.
+    pos = len(MAGIC)
+    size = len(buf)
+    while pos + _HEADER_LEN.size <= size:
+        (head_len,) = _HEADER_LEN.unpack_from(buf, pos)
+        start = pos + _HEADER_LEN.size
+        if start + head_len > size:
+            return
+        try:
+            header = json.loads(bytes(buf[start : start + head_len]).decode("utf-8"))
+        except ValueError:
+            return
+        body = start + head_len
+        end = body + sum(int(c[3]) for c in header.get("columns", []))
+        if end > size:
+            return
+        yield header, body
+        pos = end
+
+
+def iter_frame_chunks(path: Path, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Decode a columnar frames file chunk by chunk.
+
+    Each item is {"frames": n, "players": [{"name", "team"}...], "columns": {name: ndarray}};
+    only the requested columns are decompressed (all of them when `columns` is None).
+    """
+    wanted = set(columns) if columns is not None else None
+    with open(path, "rb") as fp:
+        if fp.read(len(MAGIC)) != MAGIC:
+            raise RuntimeError(f"Not a columnar frames file: {path}")
+        fp.seek(0, 2)
+        if fp.tell() <= len(MAGIC):
+            return
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                for header, pos in _iter_chunk_views(view):
+                    codec = str(header.get("codec", "zlib"))
+                    if codec not in _CODECS:
+                        raise RuntimeError(f"Frames were written with '{codec}', which is not installed here.")
+                    decompress = _CODECS[codec][1]
+                    out: Dict[str, np.ndarray] = {}
+                    for name, dtype, shape, nbytes in header.get("columns", []):
+                        if wanted is None or name in wanted:
+                            raw = decompress(view[pos : pos + nbytes])
+                            out[name] = np.frombuffer(raw, dtype=dtype).reshape(shape)
+                        pos += nbytes
+                    yield {"frames": int(header.get("frames", 0)), "players": header.get("players", []), "columns": out}
+            finally:
+                view.release()
+
+
+def _chunk_frames(chunk: Dict[str, Any]) -> List[Dict[str, Any]]:
+    n = chunk["frames"]
+    cols = {k: v.tolist() for k, v in chunk["columns"].items()}
+    players = [(str(p.get("name", "")), int(p.get("team", 0))) for p in chunk["players"]]
+    frame_cols = [(key, cols[key]) for key, _ in FRAME_FIELDS]
+    ball_cols = [(key, cols[f"ball.{key}"]) for key in BALL_FIELDS]
+    player_cols = [(key, cols[f"players.{key}"]) for key in PLAYER_FLOAT_FIELDS + PLAYER_FLAG_FIELDS]
+    present = cols["players.present"]
+    # Files written before "players.order" existed read back in slot order.
+    order = cols.get("players.order")
+    blue = cols["scores.blue"]
+    orange = cols["scores.orange"]
+    out: List[Dict[str, Any]] = []
+    for i in range(n):
+        slots = [slot for slot in range(len(players)) if present[i][slot]]
+        if order is not None:
+            slots.sort(key=order[i].__getitem__)
+        frame_players = []
+        for slot in slots:
+            name, team = players[slot]
+            p = {"name": name, "team": team}
+            for key, vals in player_cols:
+                p[key] = vals[i][slot]
+            frame_players.append(p)
+        frame = {
+            "idx": cols["idx"][i],
+            "t": cols["t"][i],
+            "ball": {key: vals[i] for key, vals in ball_cols},
+            "players": frame_players,
+            "scores": {"blue": blue[i], "orange": orange[i]},
+        }
+        for key, vals in frame_cols:
+            if key not in frame:
+                frame[key] = vals[i]
+        out.append(frame)
+    return out
+
+
+def _read_jsonl_frames(path: Path) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    with gzip.open(path, "rt", encoding="utf-8") as fp:
+        for line in fp:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                out.append(json.loads(line))
+            except Exception:
+                continue
+    return out
+
+
+def read_frames(path: Path) -> List[Dict[str, Any]]:
+    # Frame dicts in the recorder's capture layout, from either the columnar or the JSONL format.
+    path = Path(path)
+    if not path.exists():
+        return []
+    if not is_columnar(path):
+        return _read_jsonl_frames(path)
+    out: List[Dict[str, Any]] = []
+    for chunk in iter_frame_chunks(path):
+        out.extend(_chunk_frames(chunk))
+    return out
+
+
+def count_frames(path: Path) -> int:
+    path = Path(path)
+    if not path.exists():
+        return 0
+    if not is_columnar(path):
+        return len(_read_jsonl_frames(path))
+    return sum(chunk["frames"] for chunk in iter_frame_chunks(path, columns=()))
+
+
+def export_jsonl(src: Path, dst: Path) -> int:
+    frames = read_frames(src)
+    writer = JsonlFrameWriter(dst)
+    try:
+        for fr in frames:
+            writer.write(fr)
+    finally:
+        writer.close()
+    return len(frames)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export a recorded session's frames as JSONL (gzip).")
+    parser.add_argument("src", help="frames.rlsf (or frames.jsonl.gz) file, or a session directory")
+    parser.add_argument("dst", nargs="?", default="", help="output .jsonl.gz path (default: next to the source)")
+    args = parser.parse_args()
+
+    src = Path(args.src)
+    if src.is_dir():
+        manifest_path = src / "manifest.json"
+        name = COLUMNAR_FRAMES_FILE
+        if manifest_path.exists():
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            name = str((manifest.get("files", {}) or {}).get("frames", name))
+        src = src / name
+    dst = Path(args.dst) if args.dst else src.with_name(JSONL_FRAMES_FILE)
+    if dst.resolve() == src.resolve():
+        raise RuntimeError("Source is already a JSONL frames file.")
+    count = export_jsonl(src, dst)
+    print(f"[session_frames] wrote {count} frames to {dst}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,16 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from math import cos, sin
 from pathlib import Path
-from threading import Lock
+from collections import deque
+from threading import Condition, Lock, Thread
 from typing import Any, Dict, List, Optional
 import gzip
 import json
+import time
 
 from future_event_engine import apply_whiff_rate_from_events, refine_events_posthoc
+from session_frames import frames_file_name, open_frame_writer
+from timeline_index import TimelineColumns, TimelineIndex
 import uuid
 
 
@@ -54,6 +58,50 @@ def _car_name(car: Any, idx: int) -> str:
     return name or f"player_{idx}"
 
 
+def _physics_values(physics: Any) -> tuple:
+    loc = getattr(physics, "location", None)
+    vel = getattr(physics, "velocity", None)
+    ang = getattr(physics, "angular_velocity", None)
+    rot = getattr(physics, "rotation", None)
+    return (
+        getattr(loc, "x", 0.0),
+        getattr(loc, "y", 0.0),
+        getattr(loc, "z", 0.0),
+        getattr(vel, "x", 0.0),
+        getattr(vel, "y", 0.0),
+        getattr(vel, "z", 0.0),
+        getattr(ang, "x", 0.0),
+        getattr(ang, "y", 0.0),
+        getattr(ang, "z", 0.0),
+        getattr(rot, "pitch", 0.0),
+        getattr(rot, "yaw", 0.0),
+        getattr(rot, "roll", 0.0),
+    )
+
+
+def _physics_fields(values: tuple) -> Dict[str, float]:
+    x, y, z, vx, vy, vz, wx, wy, wz, pitch, yaw, roll = (_safe_float(v) for v in values)
+    qx, qy, qz, qw = _quat_from_euler(pitch, yaw, roll)
+    return {
+        "x": x,
+        "y": y,
+        "z": z,
+        "vx": vx,
+        "vy": vy,
+        "vz": vz,
+        "wx": wx,
+        "wy": wy,
+        "wz": wz,
+        "pitch": pitch,
+        "yaw": yaw,
+        "roll": roll,
+        "qx": qx,
+        "qy": qy,
+        "qz": qz,
+        "qw": qw,
+    }
+
+
 @dataclass
 class RecorderPaths:
     session_dir: Path
@@ -72,15 +120,21 @@ class SessionRecorder:
         tick_rate: float,
         tracked_player_index: int,
         enabled: bool = True,
+        frames_format: str = "columnar",
+        queue_frames: int = 1024,
+        write_batch_frames: int = 64,
     ) -> None:
         self.enabled = bool(enabled)
+        self.frames_format = str(frames_format)
+        self.queue_frames = max(1, int(queue_frames))
+        self.write_batch_frames = max(1, int(write_batch_frames))
         self.session_root = Path(session_root)
         self.tick_rate = float(tick_rate)
         self.tracked_player_index = int(tracked_player_index)
         self.session_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
         self.paths = RecorderPaths(
             session_dir=self.session_root / self.session_id,
-            frames_file=self.session_root / self.session_id / "frames.jsonl.gz",
+            frames_file=self.session_root / self.session_id / frames_file_name(self.frames_format),
             events_file=self.session_root / self.session_id / "events.json",
             labels_file=self.session_root / self.session_id / "labels.json",
             metrics_file=self.session_root / self.session_id / "metrics_timeline.json.gz",
@@ -89,7 +143,7 @@ class SessionRecorder:
         self._lock = Lock()
         self._started = False
         self._finalized = False
-        self._frames_fp = None
+        self._frames_writer = None
         self._frame_count = 0
         self._frame_times: List[float] = []
         self._players: List[str] = []
@@ -98,6 +152,20 @@ class SessionRecorder:
         self._events: List[Dict[str, Any]] = []
         self._event_seen: set[str] = set()
         self._metrics_timeline: List[Dict[str, Any]] = []
+        # (idx, raw packet values) wait here for the writer thread, which builds the frame dicts and does
+        # all encoding/compression/IO.
+        self._queue: deque[tuple] = deque()
+        self._queue_cond = Condition()
+        self._writer_thread: Thread | None = None
+        self._writer_closing = False
+        self._writer_error = ""
+        self._frames_written = 0
+        self._frames_dropped = 0
+        self._queue_high_water = 0
+        self._last_drop_warning = 0.0
+        # In-memory columns of every written frame, so finalize never re-reads the frames file.
+        self._columns = TimelineColumns()
+        self.timeline_index: TimelineIndex | None = None
 
     def start(self) -> None:
         if not self.enabled:
@@ -106,7 +174,9 @@ class SessionRecorder:
             if self._started:
                 return
             self.paths.session_dir.mkdir(parents=True, exist_ok=True)
-            self._frames_fp = gzip.open(self.paths.frames_file, "wt", encoding="utf-8")
+            self._frames_writer = open_frame_writer(self.paths.frames_file, self.frames_format)
+            self._writer_thread = Thread(target=self._writer_loop, name="session-recorder-writer", daemon=True)
+            self._writer_thread.start()
             if not self.paths.labels_file.exists():
                 self.paths.labels_file.write_text("{}", encoding="utf-8")
             self._started = True
@@ -123,111 +193,137 @@ class SessionRecorder:
             pass
         return {"blue": blue, "orange": orange}
 
-    def _capture_frame(self, packet: Any) -> Dict[str, Any]:
-        now = _safe_float(getattr(getattr(packet, "game_info", None), "seconds_elapsed", 0.0))
+    def _capture_raw(self, packet: Any) -> tuple:
+        # Runs on the caller's thread: copy the packet's values out and leave all conversion to the writer.
         game_info = getattr(packet, "game_info", None)
-        ball = getattr(packet, "game_ball", None)
-        bp = getattr(getattr(ball, "physics", None), "location", None)
-        bv = getattr(getattr(ball, "physics", None), "velocity", None)
-        ba = getattr(getattr(ball, "physics", None), "angular_velocity", None)
-        brot = getattr(getattr(ball, "physics", None), "rotation", None)
-        bpitch = _safe_float(getattr(brot, "pitch", 0.0))
-        byaw = _safe_float(getattr(brot, "yaw", 0.0))
-        broll = _safe_float(getattr(brot, "roll", 0.0))
-        bqx, bqy, bqz, bqw = _quat_from_euler(bpitch, byaw, broll)
+        cars = []
+        for i in range(_safe_int(getattr(packet, "num_cars", 0))):
+            car = packet.game_cars[i]
+            cars.append(
+                (
+                    _car_name(car, i),
+                    getattr(car, "team", i % 2),
+                    _physics_values(getattr(car, "physics", None)),
+                    getattr(car, "boost", 0.0),
+                    bool(getattr(car, "is_demolished", False)),
+                    bool(getattr(car, "has_wheel_contact", False)),
+                )
+            )
+        return (
+            _safe_float(getattr(game_info, "seconds_elapsed", 0.0)),
+            _physics_values(getattr(getattr(packet, "game_ball", None), "physics", None)),
+            cars,
+            self._capture_scores(packet),
+            getattr(game_info, "game_time_remaining", 0.0),
+            bool(getattr(game_info, "is_overtime", False)),
+            bool(getattr(game_info, "is_kickoff_pause", False)),
+        )
 
+    def _build_frame(self, idx: int, raw: tuple) -> Dict[str, Any]:
+        # Writer thread only; finalize reads the player bookkeeping after joining it.
+        now, ball, cars, scores, clock_s, is_overtime, is_kickoff_pause = raw
         players: List[Dict[str, Any]] = []
-        num_cars = _safe_int(getattr(packet, "num_cars", 0))
-        tracked_name = ""
-        for i in range(num_cars):
-            car = packet.game_cars[i]
-            physics = getattr(car, "physics", None)
-            loc = getattr(physics, "location", None)
-            vel = getattr(physics, "velocity", None)
-            ang = getattr(physics, "angular_velocity", None)
-            rot = getattr(physics, "rotation", None)
-            pitch = _safe_float(getattr(rot, "pitch", 0.0))
-            yaw = _safe_float(getattr(rot, "yaw", 0.0))
-            roll = _safe_float(getattr(rot, "roll", 0.0))
-            qx, qy, qz, qw = _quat_from_euler(pitch, yaw, roll)
-            name = _car_name(car, i)
+        for i, (name, team, physics, boost, is_demolished, has_wheel_contact) in enumerate(cars):
             if i == self.tracked_player_index:
-                tracked_name = name
-            team = _safe_int(getattr(car, "team", i % 2))
+                self._tracked_player_name = name
+            team = _safe_int(team)
             self._player_teams[name] = team
             players.append(
                 {
                     "name": name,
                     "team": team,
-                    "x": _safe_float(getattr(loc, "x", 0.0)),
-                    "y": _safe_float(getattr(loc, "y", 0.0)),
-                    "z": _safe_float(getattr(loc, "z", 0.0)),
-                    "vx": _safe_float(getattr(vel, "x", 0.0)),
-                    "vy": _safe_float(getattr(vel, "y", 0.0)),
-                    "vz": _safe_float(getattr(vel, "z", 0.0)),
-                    "wx": _safe_float(getattr(ang, "x", 0.0)),
-                    "wy": _safe_float(getattr(ang, "y", 0.0)),
-                    "wz": _safe_float(getattr(ang, "z", 0.0)),
-                    "pitch": pitch,
-                    "yaw": yaw,
-                    "roll": roll,
-                    "qx": qx,
-                    "qy": qy,
-                    "qz": qz,
-                    "qw": qw,
-                    "boost": _safe_float(getattr(car, "boost", 0.0)),
-                    "is_demolished": bool(getattr(car, "is_demolished", False)),
-                    "has_wheel_contact": bool(getattr(car, "has_wheel_contact", False)),
+                    **_physics_fields(physics),
+                    "boost": _safe_float(boost),
+                    "is_demolished": is_demolished,
+                    "has_wheel_contact": has_wheel_contact,
                 }
             )
-
         self._players = [p["name"] for p in players]
-        if tracked_name:
-            self._tracked_player_name = tracked_name
         return {
-            "idx": self._frame_count,
+            "idx": idx,
             "t": now,
-            "ball": {
-                "x": _safe_float(getattr(bp, "x", 0.0)),
-                "y": _safe_float(getattr(bp, "y", 0.0)),
-                "z": _safe_float(getattr(bp, "z", 0.0)),
-                "vx": _safe_float(getattr(bv, "x", 0.0)),
-                "vy": _safe_float(getattr(bv, "y", 0.0)),
-                "vz": _safe_float(getattr(bv, "z", 0.0)),
-                "wx": _safe_float(getattr(ba, "x", 0.0)),
-                "wy": _safe_float(getattr(ba, "y", 0.0)),
-                "wz": _safe_float(getattr(ba, "z", 0.0)),
-                "pitch": bpitch,
-                "yaw": byaw,
-                "roll": broll,
-                "qx": bqx,
-                "qy": bqy,
-                "qz": bqz,
-                "qw": bqw,
-            },
+            "ball": _physics_fields(ball),
             "players": players,
-            "scores": self._capture_scores(packet),
-            "clock_s": _safe_float(getattr(game_info, "game_time_remaining", 0.0)),
-            "is_overtime": bool(getattr(game_info, "is_overtime", False)),
-            "is_kickoff_pause": bool(getattr(game_info, "is_kickoff_pause", False)),
+            "scores": scores,
+            "clock_s": _safe_float(clock_s),
+            "is_overtime": is_overtime,
+            "is_kickoff_pause": is_kickoff_pause,
         }
 
     def _event_key(self, evt: Dict[str, Any]) -> str:
         t = round(_safe_float(evt.get("time", 0.0)), 3)
         return f"{evt.get('type','event')}|{evt.get('reason','')}|{t}|{round(_safe_float(evt.get('distance', 0.0)), 2)}"
 
+    def _writer_loop(self) -> None:
+        while True:
+            with self._queue_cond:
+                if not self._writer_closing and len(self._queue) < self.write_batch_frames:
+                    self._queue_cond.wait(timeout=0.25)
+                batch = list(self._queue)
+                self._queue.clear()
+                closing = self._writer_closing
+            if batch and not self._writer_error:
+                try:
+                    for idx, raw in batch:
+                        frame = self._build_frame(idx, raw)
+                        self._frames_writer.write(frame)
+                        self._columns.append(frame)
+                    self._frames_written += len(batch)
+                except Exception as exc:
+                    self._writer_error = str(exc)
+                    print(f"[session_recorder] frame writer failed, dropping further frames: {exc}")
+            if closing and not batch:
+                break
+        try:
+            self._frames_writer.close()
+        except Exception as exc:
+            self._writer_error = self._writer_error or str(exc)
+
+    def _enqueue_frame(self, item: tuple) -> bool:
+        with self._queue_cond:
+            if self._writer_error or len(self._queue) >= self.queue_frames:
+                self._frames_dropped += 1
+                dropped = self._frames_dropped
+            else:
+                self._queue.append(item)
+                depth = len(self._queue)
+                if depth > self._queue_high_water:
+                    self._queue_high_water = depth
+                if depth >= self.write_batch_frames:
+                    self._queue_cond.notify()
+                return True
+        now = time.monotonic()
+        if dropped == 1 or now - self._last_drop_warning >= 5.0:
+            self._last_drop_warning = now
+            print(f"[session_recorder] writer behind, dropped {dropped} frames so far (queue {self.queue_frames})")
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._queue_cond:
+            return {
+                "frames_recorded": self._frame_count,
+                "frames_written": self._frames_written,
+                "frames_dropped": self._frames_dropped,
+                "queue_depth": len(self._queue),
+                "queue_high_water": self._queue_high_water,
+                "queue_capacity": self.queue_frames,
+                "writer_error": self._writer_error,
+            }
+
     def record(self, packet: Any, current_metrics: Dict[str, Any], events: List[Dict[str, Any]]) -> None:
         if not self.enabled:
             return
+        raw = self._capture_raw(packet)
+        now = raw[0]
         with self._lock:
             if not self._started or self._finalized:
                 return
-            frame = self._capture_frame(packet)
-            self._frames_fp.write(json.dumps(frame, ensure_ascii=True) + "\n")
-            self._frame_count += 1
-            self._frame_times.append(_safe_float(frame.get("t", 0.0)))
+            if self._enqueue_frame((self._frame_count, raw)):
+                # Dropped frames are left out of the file entirely, so frame idx stays contiguous.
+                self._frame_count += 1
+                self._frame_times.append(now)
 
-            pt = _safe_float(current_metrics.get("timestamp", frame["t"]))
+            pt = _safe_float(current_metrics.get("timestamp", now))
             metric_point = {"t": pt}
             for k, v in current_metrics.items():
                 if isinstance(v, (int, float)):
@@ -239,7 +335,7 @@ class SessionRecorder:
                 if key in self._event_seen:
                     continue
                 self._event_seen.add(key)
-                evt_time = _safe_float(evt.get("time", frame["t"]))
+                evt_time = _safe_float(evt.get("time", now))
                 self._events.append(
                     {
                         "event_id": f"evt_{len(self._events)+1:05d}",
@@ -287,26 +383,24 @@ class SessionRecorder:
             if not self._started or self._finalized:
                 return self.paths.session_dir
             self._finalized = True
-            if self._frames_fp is not None:
-                self._frames_fp.close()
-                self._frames_fp = None
+            if self._writer_thread is not None:
+                with self._queue_cond:
+                    self._writer_closing = True
+                    self._queue_cond.notify()
+                self._writer_thread.join()
+                self._writer_thread = None
+                self._frames_writer = None
 
-            timeline: List[Dict[str, Any]] = []
             try:
-                with gzip.open(self.paths.frames_file, "rt", encoding="utf-8") as fp:
-                    for line in fp:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        try:
-                            timeline.append(json.loads(line))
-                        except Exception:
-                            continue
-            except Exception:
-                timeline = []
+                self.timeline_index = self._columns.to_index()
+            except Exception as exc:
+                print(f"[session_recorder] in-memory timeline unavailable: {exc}")
+                self.timeline_index = None
+            self._columns = TimelineColumns()
+            timeline = self.timeline_index.timeline if self.timeline_index is not None else []
 
             if timeline and self._tracked_player_name:
-                refined, counts = refine_events_posthoc(timeline, self._tracked_player_name, self._events)
+                refined, counts = refine_events_posthoc(timeline, self._tracked_player_name, self._events, index=self.timeline_index)
                 self._events = refined
                 apply_whiff_rate_from_events(self._metrics_timeline, self._events, window_s=10.0)
                 for p in self._metrics_timeline:
@@ -334,6 +428,8 @@ class SessionRecorder:
                 "player_teams": self._player_teams,
                 "frame_count": self._frame_count,
                 "duration_s": duration_s,
+                "frames_format": self.frames_format,
+                "recording": self.stats(),
                 "files": {
                     "frames": self.paths.frames_file.name,
                     "events": self.paths.events_file.name,
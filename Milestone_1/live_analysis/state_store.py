@@ -1,9 +1,19 @@
 ﻿from __future__ import annotations
 
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Deque, Dict, List, Mapping, Optional, Tuple
 import threading
 
+from event_stream import EventHub
+
+# (metrics version, newest history time, store version) per set_metrics, kept for delta cursors;
+# ~1 min at 30 Hz.
+METRIC_MARKS = 2048
+
 
 @dataclass
 class ScenarioRef:
@@ -27,45 +37,167 @@ class SharedState:
     training_queue: List[Dict[str, Any]] = field(default_factory=list)
     active_focus: str = ""
     active_bot_profile: str = ""
+    loop_stats: Dict[str, Any] = field(default_factory=dict)
+    player_metrics: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError("published state is read-only")
+
+
+class _FrozenDict(dict):
+    # A dict that refuses in-place changes. Still a dict, so json.dumps and == work unchanged.
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
+
+
+class _FrozenList(list):
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+
+def _freeze(value: Any) -> Any:
+    # Read-only copy of a JSON-like value, so neither the caller that handed it over nor a reader of a
+    # snapshot can change a published version in place.
+    if isinstance(value, (_FrozenDict, _FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return _FrozenDict((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return _FrozenList(_freeze(v) for v in value)
+    if isinstance(value, tuple):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _history_last_t(history: Dict[str, List[Dict[str, Any]]]) -> Optional[float]:
+    for points in history.values():
+        if points:
+            return float(points[-1].get("t", 0.0))
+    return None
+
+
+def _points_after(points: List[Dict[str, Any]], t: float) -> List[Dict[str, Any]]:
+    # History is time ordered, so new points are a suffix; walk back from the end.
+    j = len(points)
+    while j > 0 and float(points[j - 1].get("t", 0.0)) > t:
+        j -= 1
+    return points[j:]
+
+
+# Sections with their own version, so a response cache keyed on one is not dropped by every metrics
+# tick. "metrics" covers /api/metrics/current (values, players, scenario and spawn fields).
+STATE_SECTIONS = ("metrics", "history", "mechanics", "recommendations")
+# Finer versions inside "metrics", so metrics deltas leave out the parts that did not change:
+# "current" (values and events), "players" and "scenario" (scenario and spawn fields).
+DELTA_SECTIONS = ("current", "players", "scenario")
+
+
+class StateSnapshot:
+    """
+    One published version of the store. Never mutated after publishing: writers build the next one
+    and swap the reference, so readers take it without locking. Nested values are frozen by the
+    setters, so they cannot change under a reader either. `versions` holds the store version at which
+    each section last changed.
+    """
+
+    __slots__ = ("version", "data", "versions")
+
+    def __init__(self, version: int, data: Dict[str, Any], versions: Dict[str, int]):
+        self.version = version
+        self.data: Mapping[str, Any] = MappingProxyType(data)
+        self.versions: Mapping[str, int] = MappingProxyType(versions)
 
 
 class StateStore:
     def __init__(self):
+        # Writers serialize on the lock; readers only load self._published.
         self._lock = threading.Lock()
+        self._metrics_changed = threading.Condition(self._lock)
+        self._metrics_version = 0
+        self._metric_marks: Deque[Tuple[int, Optional[float], int]] = deque(maxlen=METRIC_MARKS)
         self._state = SharedState()
+        # The metric history window, assembled here from the new points each set_metrics brings.
+        self._history_series: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._version = 0
+        self._section_versions = {name: 0 for name in STATE_SECTIONS + DELTA_SECTIONS}
+        self._published = StateSnapshot(0, self._build_snapshot_locked(), dict(self._section_versions))
+        # Server-Sent Events: "metrics" deltas per publish, "mechanics" when a grade lands.
+        self.events = EventHub()
 
-    def set_scenarios(self, scenarios: Dict[str, Dict[str, Any]], sources: Dict[str, str]) -> None:
+    @contextmanager
+    def _mutate(self, *sections: str):
+        # Lock for a state change and publish the next snapshot once it is made; `sections` names the
+        # STATE_SECTIONS / DELTA_SECTIONS the change touches.
         with self._lock:
-            self._state.scenarios = scenarios
-            self._state.scenario_sources = sources
+            yield
+            self._publish_locked(sections)
+
+    def _publish_locked(self, sections) -> None:
+        self._version += 1
+        for name in sections:
+            self._section_versions[name] = self._version
+        self._published = StateSnapshot(self._version, self._build_snapshot_locked(), dict(self._section_versions))
+
+    def _build_snapshot_locked(self) -> Dict[str, Any]:
+        # Containers are shared with _state; the setters freeze them and replace rather than mutate them.
+        active_source = None
+        if self._state.active_scenario:
+            active_source = self._state.scenario_sources.get(self._state.active_scenario, "unknown")
+        return {
+            "active_scenario": self._state.active_scenario,
+            "active_source": active_source,
+            "pending_scenario": self._state.pending_scenario,
+            "spawn_mode": self._state.spawn_mode,
+            "profile": self._state.current_user,
+            "current_metrics": self._state.current_metrics,
+            "history": self._state.metric_history,
+            "events": self._state.event_log,
+            "recommendations": self._state.recommendations,
+            "mechanics": self._state.mechanics,
+            "training_queue": self._state.training_queue,
+            "active_focus": self._state.active_focus,
+            "active_bot_profile": self._state.active_bot_profile,
+            "loop_stats": self._state.loop_stats,
+            "player_metrics": self._state.player_metrics,
+        }
+
+    def set_scenarios(self, scenarios: Dict[str, Dict[str, Any]], sources: Dict[str, str]) -> None:
+        with self._mutate("metrics", "scenario"):
+            self._state.scenarios = _freeze(scenarios)
+            self._state.scenario_sources = _freeze(sources)
 
     def set_spawn_mode(self, spawn_mode: str) -> None:
-        with self._lock:
+        with self._mutate("metrics", "scenario"):
             self._state.spawn_mode = spawn_mode
 
     def set_current_user(self, user: Dict[str, Any]) -> None:
-        with self._lock:
-            self._state.current_user = dict(user or {})
+        with self._mutate():
+            self._state.current_user = _freeze(dict(user or {}))
 
     def set_recommendations(self, payload: Dict[str, Any]) -> None:
-        with self._lock:
-            self._state.recommendations = dict(payload or {})
+        with self._mutate("recommendations"):
+            self._state.recommendations = _freeze(dict(payload or {}))
 
     def set_mechanics(self, payload: Dict[str, Any]) -> None:
-        with self._lock:
-            self._state.mechanics = dict(payload or {})
+        with self._mutate("mechanics"):
+            self._state.mechanics = _freeze(dict(payload or {}))
+        self.events.publish("mechanics", {"ready": bool(payload)})
 
     def queue_training(self, *, focus_id: str, bot_profile: str, scenario_ids: List[str]) -> None:
-        with self._lock:
+        with self._mutate():
             clean_ids = [str(x) for x in (scenario_ids or []) if str(x).strip()]
+            queue = list(self._state.training_queue)
             for sid in clean_ids:
-                self._state.training_queue.append(
-                    {
-                        "focus_id": str(focus_id or ""),
-                        "bot_profile": str(bot_profile or ""),
-                        "scenario_id": sid,
-                    }
+                queue.append(
+                    _FrozenDict(
+                        focus_id=str(focus_id or ""),
+                        bot_profile=str(bot_profile or ""),
+                        scenario_id=sid,
+                    )
                 )
+            self._state.training_queue = _FrozenList(queue)
             self._state.active_focus = str(focus_id or "")
             self._state.active_bot_profile = str(bot_profile or "")
 
@@ -81,51 +213,146 @@ class StateStore:
             return self._state.scenarios.get(name)
 
     def queue_scenario(self, name: str) -> bool:
-        with self._lock:
+        with self._mutate("metrics", "scenario"):
             if name not in self._state.scenarios:
                 return False
             self._state.pending_scenario = name
             return True
 
     def pop_pending_scenario(self) -> Optional[str]:
-        with self._lock:
+        # Polled every tick: only publish a new snapshot when there is something to pop.
+        if self._published.data["pending_scenario"] is None:
+            return None
+        with self._mutate("metrics", "scenario"):
             name = self._state.pending_scenario
             self._state.pending_scenario = None
             return name
 
     def pop_next_training(self) -> Optional[Dict[str, Any]]:
-        with self._lock:
+        if not self._published.data["training_queue"]:
+            return None
+        with self._mutate():
             if not self._state.training_queue:
                 return None
-            return self._state.training_queue.pop(0)
+            item = self._state.training_queue[0]
+            self._state.training_queue = _FrozenList(self._state.training_queue[1:])
+            return item
 
     def set_active_scenario(self, name: str) -> None:
-        with self._lock:
+        with self._mutate("metrics", "scenario"):
             self._state.active_scenario = name
 
-    def set_metrics(self, current_metrics: Dict[str, Any], history: Dict[str, List[Dict[str, Any]]], events: List[Dict[str, Any]]) -> None:
+    def set_metrics(
+        self,
+        current_metrics: Dict[str, Any],
+        new_points: Dict[str, List[Dict[str, Any]]],
+        events: List[Dict[str, Any]],
+        window_len: int,
+    ) -> None:
+        """
+        Publish current metrics. `new_points` holds only the history points added since the previous
+        call; each series is then trimmed to its newest `window_len` points (the engine's window).
+        """
         with self._lock:
-            self._state.current_metrics = current_metrics
-            self._state.metric_history = history
-            self._state.event_log = events
+            self._state.current_metrics = _freeze(current_metrics)
+            self._state.event_log = _freeze(events)
+            sections = ["metrics", "current"]
+            changed = False
+            for key, points in new_points.items():
+                if points:
+                    # Each point is frozen once, on arrival; the published lists are rebuilt from them.
+                    self._history_series.setdefault(key, deque()).extend(_freeze(p) for p in points)
+                    changed = True
+            for series in self._history_series.values():
+                while len(series) > window_len:
+                    series.popleft()
+                    changed = True
+            if changed:
+                # Only rebuilt when a point was added or trimmed; otherwise "history" keeps its version.
+                self._state.metric_history = _FrozenDict(
+                    (key, _FrozenList(series)) for key, series in self._history_series.items()
+                )
+                sections.append("history")
+            last_t = _history_last_t(self._state.metric_history)
+            if self._metric_marks and last_t is not None:
+                prev_t = self._metric_marks[-1][1]
+                if prev_t is not None and last_t < prev_t:
+                    # Game clock went backwards (new match): old cursors no longer line up.
+                    self._metric_marks.clear()
+            self._publish_locked(sections)
+            self._metrics_version += 1
+            version = self._metrics_version
+            self._metric_marks.append((version, last_t, self._version))
+            self._metrics_changed.notify_all()
+            if self.events.subscribers:
+                # Built and sent under the store lock, so each event describes exactly its version and
+                # events go out in version order. Only what changed; a stream that missed a version
+                # catches up via /api/metrics/delta.
+                self.events.publish("metrics", self._metrics_delta_locked(version - 1))
+
+    def wait_for_metrics(self, since: int, timeout: float) -> int:
+        # Long-poll helper: blocks until the version moves past `since` or the timeout passes.
+        with self._metrics_changed:
+            self._metrics_changed.wait_for(lambda: self._metrics_version != since, timeout=max(0.0, timeout))
+            return self._metrics_version
 
-    def snapshot(self) -> Dict[str, Any]:
+    def metrics_delta(self, since: int) -> Dict[str, Any]:
+        """
+        Metrics published after version `since`: only the parts whose section version moved since
+        then ("current" and "events", "players", the scenario/spawn fields, and "history" with
+        "window_start"), with history reduced to the points newer than that version. Unknown or
+        expired cursors (and since=0) get everything, with reset=True.
+        """
         with self._lock:
+            return self._metrics_delta_locked(since)
+
+    def _metrics_delta_locked(self, since: int) -> Dict[str, Any]:
+        marks = self._metric_marks
+        cursor = None
+        if since > 0 and marks:
+            k = bisect_left(marks, (since,))
+            if k < len(marks) and marks[k][0] == since:
+                cursor = marks[k]
+        versions = self._section_versions
+        out: Dict[str, Any] = {"version": self._metrics_version, "reset": cursor is None}
+        if cursor is None or versions["scenario"] > cursor[2]:
             active_source = None
             if self._state.active_scenario:
                 active_source = self._state.scenario_sources.get(self._state.active_scenario, "unknown")
-            return {
-                "active_scenario": self._state.active_scenario,
-                "active_source": active_source,
-                "pending_scenario": self._state.pending_scenario,
-                "spawn_mode": self._state.spawn_mode,
-                "profile": dict(self._state.current_user or {}),
-                "current_metrics": self._state.current_metrics,
-                "history": self._state.metric_history,
-                "events": self._state.event_log,
-                "recommendations": dict(self._state.recommendations or {}),
-                "mechanics": dict(self._state.mechanics or {}),
-                "training_queue": list(self._state.training_queue),
-                "active_focus": self._state.active_focus,
-                "active_bot_profile": self._state.active_bot_profile,
-            }
+            out["active_scenario"] = self._state.active_scenario
+            out["active_source"] = active_source
+            out["pending_scenario"] = self._state.pending_scenario
+            out["spawn_mode"] = self._state.spawn_mode
+        if cursor is None or versions["current"] > cursor[2]:
+            out["current"] = self._state.current_metrics
+            out["events"] = self._state.event_log
+        if cursor is None or versions["players"] > cursor[2]:
+            out["players"] = self._state.player_metrics
+        if cursor is None or versions["history"] > cursor[2]:
+            history = self._state.metric_history
+            if cursor is None or cursor[1] is None:
+                out["history"] = {key: list(points) for key, points in history.items()}
+            else:
+                out["history"] = {key: _points_after(points, cursor[1]) for key, points in history.items()}
+            window_start = None
+            for points in history.values():
+                if points:
+                    window_start = points[0].get("t")
+                    break
+            out["window_start"] = window_start
+        return out
+
+    def set_player_metrics(self, players: Dict[str, Dict[str, Any]]) -> None:
+        with self._mutate("metrics", "players"):
+            self._state.player_metrics = _freeze(players)
+
+    def set_loop_stats(self, stats: Dict[str, Any]) -> None:
+        with self._mutate():
+            self._state.loop_stats = _freeze(dict(stats or {}))
+
+    def snapshot(self) -> Mapping[str, Any]:
+        # Read-only view of the latest published state; taken without the lock.
+        return self._published.data
+
+    def published(self) -> StateSnapshot:
+        return self._published
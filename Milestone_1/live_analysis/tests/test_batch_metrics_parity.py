@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+MILESTONE_DIR = Path(__file__).resolve().parents[2]
+for sub in ("", "live_analysis", "replay_dashboard"):
+    path = str(MILESTONE_DIR / sub) if sub else str(MILESTONE_DIR)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from batch_metrics_engine import FrameArrays, compute_metrics_batch
+from metrics_engine import LiveMetricsEngine
+from replay_loader import DEBUG_METRIC_KEYS, METRIC_KEYS
+from replay_packet_adapter import ReplayPacketBuilder
+
+
+def _synthetic_frames(seed: int, n: int = 1500, num_players: int = 4) -> tuple[pd.DataFrame, list[str]]:
+    # Ball hits (velocity kicks), jumps, boost pickups, paused stretches and uneven/duplicate timestamps.
+    rng = np.random.default_rng(seed)
+    times = np.cumsum(rng.choice([1 / 30, 1 / 30, 1 / 60, 0.0, 1 / 15], n))
+    ball = np.zeros((n, 3))
+    ball_vel = np.zeros((n, 3))
+    pos = np.array([0.0, 0.0, 93.0])
+    vel = np.zeros(3)
+    for i in range(n):
+        if rng.random() < 0.02:
+            vel = rng.normal(0, 1500, 3)
+            vel[2] = abs(vel[2]) * 0.3
+        vel *= 0.995
+        pos = pos + vel / 30
+        pos[2] = max(93.0, pos[2])
+        pos[:2] = np.clip(pos[:2], -4000, 4000)
+        vel[2] -= 20
+        ball[i] = pos
+        ball_vel[i] = vel
+    cols = {
+        "time": times,
+        "Ball_x": ball[:, 0],
+        "Ball_y": ball[:, 1],
+        "Ball_z": ball[:, 2],
+        "Ball_vel_x": ball_vel[:, 0],
+        "Ball_vel_y": ball_vel[:, 1],
+        "Ball_vel_z": ball_vel[:, 2],
+    }
+    players = []
+    for p in range(num_players):
+        car = rng.uniform(-3000, 3000, 3)
+        car[2] = 17.0
+        car_vel = np.zeros(3)
+        boost = 100.0
+        xs = np.zeros((n, 3))
+        vs = np.zeros((n, 3))
+        boosts = np.zeros(n)
+        for i in range(n):
+            to_ball = ball[i] - car
+            d = np.linalg.norm(to_ball) + 1e-9
+            mode = (i // int(rng.integers(60, 200))) % 3
+            acc = to_ball / d * rng.uniform(500, 2500) if mode != 2 else rng.normal(0, 1500, 3)
+            car_vel = car_vel * 0.985 + acc / 30
+            ground = np.linalg.norm(car_vel[:2])
+            if ground > 2300:
+                car_vel[:2] *= 2300 / ground
+            if rng.random() < 0.01:
+                car_vel[2] = rng.uniform(300, 900)
+            car_vel[2] -= 650 / 30
+            car = car + car_vel / 30
+            if car[2] < 17:
+                car[2] = 17.0
+                car_vel[2] = 0.0
+            if rng.random() < 0.3 and boost > 0:
+                boost = max(0.0, boost - rng.uniform(0, 2))
+            if rng.random() < 0.01:
+                boost = min(100.0, boost + rng.choice([12, 100]))
+            xs[i] = car
+            vs[i] = car_vel
+            boosts[i] = boost
+        name = f"P{p}"
+        players.append(name)
+        for a, axis in enumerate("xyz"):
+            cols[f"{name}_{axis}"] = xs[:, a]
+            cols[f"{name}_vel_{axis}"] = vs[:, a]
+        cols[f"{name}_boost"] = boosts
+    active = np.ones(n, dtype=int)
+    for start in rng.integers(0, n, 6):
+        active[start : start + int(rng.integers(30, 200))] = 0
+    cols["active_play"] = active
+    return pd.DataFrame(cols), players
+
+
+def _packets(frames: FrameArrays):
+    # GameTickPacket look-alikes carrying exactly what FrameArrays holds.
+    num_cars = len(frames.car_pos)
+    for i in range(len(frames.times)):
+        cars = []
+        for c in range(num_cars):
+            cars.append(
+                SimpleNamespace(
+                    physics=SimpleNamespace(
+                        location=SimpleNamespace(x=frames.car_pos[c, i, 0], y=frames.car_pos[c, i, 1], z=frames.car_pos[c, i, 2]),
+                        velocity=SimpleNamespace(x=frames.car_vel[c, i, 0], y=frames.car_vel[c, i, 1], z=frames.car_vel[c, i, 2]),
+                        angular_velocity=SimpleNamespace(
+                            x=frames.car_ang_vel[c, i, 0], y=frames.car_ang_vel[c, i, 1], z=frames.car_ang_vel[c, i, 2]
+                        ),
+                    ),
+                    boost=frames.car_boost[c, i],
+                    has_wheel_contact=bool(frames.car_wheel_contact[c, i]),
+                )
+            )
+        ball = SimpleNamespace(
+            physics=SimpleNamespace(
+                location=SimpleNamespace(x=frames.ball_pos[i, 0], y=frames.ball_pos[i, 1], z=frames.ball_pos[i, 2]),
+                velocity=SimpleNamespace(x=frames.ball_vel[i, 0], y=frames.ball_vel[i, 1], z=frames.ball_vel[i, 2]),
+            ),
+            latest_touch=None,
+        )
+        active = bool(frames.active_play[i])
+        info = SimpleNamespace(seconds_elapsed=frames.times[i], active_play=active, is_round_active=active)
+        yield SimpleNamespace(num_cars=num_cars, game_cars=cars, game_ball=ball, game_info=info)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_batch_metrics_match_scalar_engine(seed: int) -> None:
+    df, players = _synthetic_frames(seed)
+    frames = FrameArrays(**ReplayPacketBuilder(df=df, players=players).frame_arrays())
+    # Occasional spin spikes so the flip-commit path runs; replays themselves carry no spin data.
+    rng = np.random.default_rng(100 + seed)
+    spin = np.zeros_like(frames.car_vel)
+    spikes = rng.random(spin.shape[:2]) < 0.02
+    spin[spikes] = rng.normal(0, 6.0, (int(spikes.sum()), 3))
+    frames.car_ang_vel = spin
+
+    keys = ["timestamp"] + METRIC_KEYS + DEBUG_METRIC_KEYS
+    for player_index in range(len(players)):
+        engine = LiveMetricsEngine(window_seconds=10.0)
+        scalar = None
+        for packet in _packets(frames):
+            engine.update(packet, player_index=player_index)
+            current = engine.current()
+            if scalar is None:
+                scalar = {k: [] for k in keys if k in current}
+            for k in scalar:
+                scalar[k].append(current[k])
+        _, _, scalar_events = engine.snapshot()
+
+        series, events = compute_metrics_batch(frames, player_index, window_seconds=10.0)
+        assert set(METRIC_KEYS) <= set(scalar)
+        for k, values in scalar.items():
+            assert series[k] == values, f"player {player_index}: series '{k}' differs"
+        assert events == scalar_events, f"player {player_index}: events differ"
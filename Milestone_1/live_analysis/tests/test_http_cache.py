@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import gzip
+import io
+import os
+
+import pytest
+
+import test_batch_metrics_parity  # noqa: F401  (puts live_analysis on sys.path)
+
+import http_cache
+from http_cache import ResponseCache, StaticAssetCache, choose_encoding, send_cached, send_static
+
+
+class _Handler:
+    # Just enough of BaseHTTPRequestHandler for send_body.
+    def __init__(self, **headers: str) -> None:
+        self.headers = {k.replace("_", "-"): v for k, v in headers.items()}
+        self.status = None
+        self.sent: dict[str, str] = {}
+        self.wfile = io.BytesIO()
+
+    def send_response(self, status: int) -> None:
+        self.status = status
+
+    def send_header(self, key: str, value: str) -> None:
+        self.sent[key] = value
+
+    def end_headers(self) -> None:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def _gzip_only(monkeypatch) -> None:
+    # Same negotiation whether or not brotli happens to be installed.
+    monkeypatch.setattr(http_cache, "_brotli", None)
+
+
+def test_choose_encoding_q_values() -> None:
+    assert choose_encoding(None) == "identity"
+    assert choose_encoding("") == "identity"
+    assert choose_encoding("gzip") == "gzip"
+    assert choose_encoding("GZip ; q=0.5") == "gzip"
+    assert choose_encoding("gzip;q=0") == "identity"
+    assert choose_encoding("gzip;q=bogus") == "identity"
+    assert choose_encoding("deflate, br") == "identity"
+    assert choose_encoding("*") == "gzip"
+    # An explicit entry overrides the wildcard.
+    assert choose_encoding("*;q=1, gzip;q=0") == "identity"
+
+
+def test_choose_encoding_prefers_higher_q(monkeypatch) -> None:
+    monkeypatch.setattr(http_cache, "_brotli", object())
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("gzip;q=1, br;q=0.4") == "gzip"
+
+
+def test_cached_response_etag_and_304() -> None:
+    cache = ResponseCache()
+    payload = {"values": list(range(500))}
+    entry = cache.get("metrics", 3, lambda: payload)
+    assert cache.get("metrics", 3, lambda: pytest.fail("rebuilt at the same version")) is entry
+
+    first = _Handler(Accept_Encoding="gzip")
+    send_cached(first, entry)
+    assert first.status == 200
+    assert first.sent["Content-Encoding"] == "gzip"
+    assert gzip.decompress(first.wfile.getvalue()) == entry.body
+    tag = first.sent["ETag"]
+    assert tag != entry.etag
+
+    # Both the encoded tag and the plain one revalidate, weak or not.
+    for if_none_match in (tag, entry.etag, f"W/{tag}", f'"other", {entry.etag}', "*"):
+        again = _Handler(Accept_Encoding="gzip", If_None_Match=if_none_match)
+        send_cached(again, entry)
+        assert again.status == 304
+        assert again.wfile.getvalue() == b""
+
+    newer = cache.get("metrics", 4, lambda: payload)
+    stale = _Handler(Accept_Encoding="gzip", If_None_Match=tag)
+    send_cached(stale, newer)
+    assert stale.status == 200 and stale.sent["ETag"] != tag
+
+
+def test_static_asset_revalidates_after_mtime_change(tmp_path) -> None:
+    path = tmp_path / "app.js"
+    path.write_text("let a = 1;\n" * 200)
+    cache = StaticAssetCache()
+    first = cache.get(path, "application/javascript")
+    assert "gzip" in first.variants
+    assert cache.get(path, "application/javascript") is first
+
+    handler = _Handler(If_None_Match=first.etag)
+    assert send_static(handler, cache, path, "application/javascript")
+    assert handler.status == 304
+
+    # Same size, new contents and mtime: the cache reloads and the old ETag stops matching.
+    path.write_text("let b = 2;\n" * 200)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    second = cache.get(path, "application/javascript")
+    assert second is not first and second.etag != first.etag
+    handler = _Handler(If_None_Match=first.etag)
+    assert send_static(handler, cache, path, "application/javascript")
+    assert handler.status == 200
+    assert handler.wfile.getvalue() == path.read_bytes()
+
+    path.unlink()
+    assert not send_static(_Handler(), cache, path, "application/javascript")
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import hashlib
+import json
+
+import pytest
+
+from test_batch_metrics_parity import _synthetic_frames
+
+from mechanic_grader import grade_game_mechanics
+from replay_loader import _build_timeline
+from timeline_index import TimelineColumns, TimelineIndex
+
+# sha256 of the sorted-key JSON grading payload per player, recorded from the per-frame scan the
+# index/candidate-frame version replaced. A deliberate grading change has to update these.
+EXPECTED_DIGESTS = {
+    "sorted": {
+        "P0": "84ad671365fee0c13153fda298edc816bc1c84d71aeec15f2f136d3aa15875e3",
+        "P1": "072a15a64d7a4835c5cf2dbea5f4eca274167a86f666808575c818edc5186573",
+        "P2": "78ba56b8a6c44f83c2a0226fa34d34d6aff7dc41ff76e42925ee9b5d924c53d8",
+        "P3": "b5412b33146944086d7d14cd8507836b23e07387571b3b8e6d8a8a7f9f3203bd",
+    },
+    "unsorted": {
+        "P0": "401dac57e79fe9e77f9b5c0b165110cb2f5ebfdc71630395bb927cb5222e73b2",
+        "P1": "ea42143f6201f857da6cd4dccf7a1e13f971290d0a031fdcca20d5b4b9cd3dc9",
+        "P2": "66144162e85f3286b36cf695346a06236658f92ad625f89a794f8dc79d107a27",
+        "P3": "32594affe72242d610e9a7d73358c861e10c6b7c4b7b853c6cbb94b14ebdc0c1",
+    },
+}
+
+
+def _set_player(frame: dict, name: str, **values: float) -> None:
+    for p in frame["players"]:
+        if p["name"] == name:
+            p.update(values)
+
+
+def _timeline(unsorted: bool) -> tuple[list[dict], dict, list[str]]:
+    df, players = _synthetic_frames(11, n=6000, num_players=4)
+    timeline = _build_timeline(df, players)
+    # Kickoffs: ball parked at center, one car driving in and hitting it.
+    for start, name, sign in ((400, players[0], -1), (2500, players[2], 1), (4200, players[1], -1)):
+        for k in range(40):
+            timeline[start + k]["ball"].update(x=0.0, y=0.0, z=93.0, vx=0.0, vy=0.0, vz=0.0)
+            _set_player(timeline[start + k], name, x=0.0, y=float(sign * (1500 - 36 * k)), z=17.0, vx=0.0, vy=float(-sign * 1100), vz=0.0)
+        for k in range(40, 80):
+            timeline[start + k]["ball"].update(x=0.0, y=float(-sign * (k - 40) * 30), z=93.0, vx=0.0, vy=float(-sign * 900), vz=0.0)
+    # Carries ending in a flick for the first player.
+    for start in range(800, 5600, 900):
+        for k in range(45):
+            frame = timeline[start + k]
+            lifted = k >= 30
+            frame["ball"].update(
+                x=500.0,
+                y=float(100 + k * 10),
+                z=100.0 + (k - 29) * 40 if lifted else 100.0,
+                vx=0.0,
+                vy=900.0 if lifted else 0.0,
+                vz=500.0 if lifted else 0.0,
+            )
+            _set_player(frame, players[0], x=500.0, y=float(k * 10), z=17.0, vx=0.0, vy=300.0, vz=0.0, jump=1 if k == 28 else 0)
+    # A player missing from some frames, and a value the recorder could not read.
+    for k in range(1500, 1520):
+        timeline[k]["players"] = [p for p in timeline[k]["players"] if p["name"] != players[3]]
+    timeline[1600]["players"][0]["x"] = None
+    if unsorted:
+        # Clock glitches inside a kickoff window, a carry and open play.
+        for k, shift in ((2510, 30.0), (4230, -1.5), (1720, 30.0), (3300, -1.5)):
+            timeline[k]["t"] += shift
+    teams = {name: (0 if i < 2 else 1) for i, name in enumerate(players)}
+    return timeline, teams, players
+
+
+def _digest(payload: dict) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+@pytest.mark.parametrize("variant", ["sorted", "unsorted"])
+def test_indexed_grading_matches_recorded_scan(variant: str) -> None:
+    timeline, teams, players = _timeline(variant == "unsorted")
+    index = TimelineIndex(timeline)
+    assert index.times_sorted == (variant == "sorted")
+    for name in players:
+        payload = grade_game_mechanics(timeline, name, teams, index=index)
+        assert payload["mechanic_events"]
+        assert _digest(payload) == EXPECTED_DIGESTS[variant][name]
+
+
+def test_dict_and_column_index_grade_identically() -> None:
+    timeline, teams, players = _timeline(False)
+    columns = TimelineColumns()
+    for frame in timeline:
+        columns.append(frame)
+    column_index = columns.to_index()
+    for name in players:
+        from_dicts = grade_game_mechanics(timeline, name, teams)
+        from_columns = grade_game_mechanics(column_index.timeline, name, teams, index=column_index)
+        assert from_columns["mechanic_events"] == from_dicts["mechanic_events"]
+        assert from_columns["game_mechanics"] == from_dicts["game_mechanics"]
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import numpy as np
+
+from test_batch_metrics_parity import _packets, _synthetic_frames
+
+from batch_metrics_engine import FrameArrays
+from live_pipeline import _merge_history_updates
+from metrics_engine import LiveMetricsEngine
+from replay_packet_adapter import ReplayPacketBuilder
+from state_store import StateStore
+
+
+def _frames(seed: int) -> FrameArrays:
+    df, players = _synthetic_frames(seed, n=900, num_players=2)
+    frames = FrameArrays(**ReplayPacketBuilder(df=df, players=players).frame_arrays())
+    frames.car_ang_vel = np.zeros_like(frames.car_vel)
+    return frames
+
+
+def test_store_assembles_engine_history_from_updates() -> None:
+    # A short window so the engine prunes while updates are still arriving.
+    engine = LiveMetricsEngine(window_seconds=2.0)
+    store = StateStore()
+    rng = np.random.default_rng(3)
+    pending = []
+    checked = 0
+    for packet in _packets(_frames(4)):
+        engine.update(packet, player_index=0)
+        pending.append((packet, {0: (engine.current(), engine.history_update(), [])}))
+        # Publish after uneven batches, the way the publish stage drains its queue.
+        if rng.random() < 0.4:
+            _, results = pending[-1]
+            if len(pending) > 1:
+                results = _merge_history_updates(pending)
+            history = results[0][1]
+            store.set_metrics(results[0][0], history.points, [], history.window_len)
+            pending = []
+            assert store.snapshot()["history"] == engine.history()
+            checked += 1
+    assert checked > 100
+
+
+def test_history_update_carries_only_new_points() -> None:
+    engine = LiveMetricsEngine(window_seconds=10.0)
+    packets = _packets(_frames(5))
+    for _ in range(50):
+        engine.update(next(packets), player_index=0)
+    first = engine.history_update()
+    assert all(len(points) == first.window_len for points in first.points.values())
+    assert all(points == [] for points in engine.history_update().points.values())
+    engine.update(next(packets), player_index=0)
+    update = engine.history_update()
+    assert update.window_len == first.window_len + 1
+    assert update.points == {key: [points[-1]] for key, points in engine.history().items()}
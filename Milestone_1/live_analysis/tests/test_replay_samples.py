@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import numpy as np
+
+import test_batch_metrics_parity  # noqa: F401  (puts replay_dashboard on sys.path)
+
+from replay_loader import _SampleIndex, _score_at_time, _values_at_times
+
+
+def test_sample_lookups_sort_out_of_order_samples() -> None:
+    samples = [
+        {"time_s": 10.0, "seconds_remaining": 290.0},
+        {"time_s": 30.0, "seconds_remaining": 270.0},
+        {"time_s": 20.0, "seconds_remaining": 280.0},
+    ]
+    times = np.array([5.0, 10.0, 19.9, 20.0, 25.0, 31.0])
+    got = _values_at_times(samples, times, "seconds_remaining", 300.0, float)
+    np.testing.assert_array_equal(got, [300.0, 290.0, 290.0, 280.0, 280.0, 270.0])
+
+
+def test_score_at_time_uses_prebuilt_index() -> None:
+    index = _SampleIndex(
+        [
+            {"time_s": 0.0, "blue": 0, "orange": 0},
+            {"time_s": 95.0, "blue": 1, "orange": 1},
+            {"time_s": 40.0, "blue": 1, "orange": 0},
+        ]
+    )
+    assert [s["time_s"] for s in index.samples] == [0.0, 40.0, 95.0]
+    assert _score_at_time(index, -1.0) == (0, 0)
+    assert _score_at_time(index, 40.0) == (1, 0)
+    assert _score_at_time(index, 94.9) == (1, 0)
+    assert _score_at_time(index, 200.0) == (1, 1)
+    assert _score_at_time(_SampleIndex([]), 5.0) == (0, 0)
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+
+import test_batch_metrics_parity  # noqa: F401  (puts live_analysis on sys.path)
+
+from session_frames import (
+    BALL_FIELDS,
+    PLAYER_FLAG_FIELDS,
+    PLAYER_FLOAT_FIELDS,
+    ColumnarFrameWriter,
+    count_frames,
+    iter_frame_chunks,
+    read_frames,
+)
+
+_EXACT = ("x", "y", "z", "vx", "vy", "vz")
+
+
+def _physics(rng: random.Random) -> dict:
+    return {k: rng.uniform(-4000.0, 4000.0) for k in BALL_FIELDS}
+
+
+def _frames(n: int) -> list[dict]:
+    rng = random.Random(7)
+    names = [("Alpha", 0), ("Bravo", 0), ("Charlie", 1), ("Delta", 1)]
+    frames = []
+    for i in range(n):
+        roster = list(names)
+        # Capture order changes between frames, and one car drops out for a stretch.
+        rng.shuffle(roster)
+        if 10 <= i < 14:
+            roster = [r for r in roster if r[0] != "Delta"]
+        players = [
+            {
+                "name": name,
+                "team": team,
+                **_physics(rng),
+                "boost": rng.uniform(0.0, 100.0),
+                "is_demolished": rng.random() < 0.1,
+                "has_wheel_contact": rng.random() < 0.5,
+            }
+            for name, team in roster
+        ]
+        frames.append(
+            {
+                "idx": i,
+                "t": 1000.0 + i / 120.0,
+                "ball": _physics(rng),
+                "players": players,
+                "scores": {"blue": i // 20, "orange": 1},
+                "clock_s": 300.0 - i / 120.0,
+                "is_overtime": False,
+                "is_kickoff_pause": i < 3,
+            }
+        )
+    return frames
+
+
+def _assert_frames_match(got: list[dict], want: list[dict]) -> None:
+    assert len(got) == len(want)
+    for g, w in zip(got, want):
+        for key in ("idx", "t", "clock_s", "is_overtime", "is_kickoff_pause", "scores"):
+            assert g[key] == w[key]
+        for key in BALL_FIELDS:
+            if key in _EXACT:
+                assert g["ball"][key] == w["ball"][key]
+            else:
+                assert g["ball"][key] == pytest.approx(w["ball"][key], rel=1e-6)
+        assert [(p["name"], p["team"]) for p in g["players"]] == [(p["name"], p["team"]) for p in w["players"]]
+        for gp, wp in zip(g["players"], w["players"]):
+            for key in PLAYER_FLOAT_FIELDS:
+                if key in _EXACT:
+                    assert gp[key] == wp[key]
+                else:
+                    assert gp[key] == pytest.approx(wp[key], rel=1e-6)
+            for key in PLAYER_FLAG_FIELDS:
+                assert gp[key] == wp[key]
+
+
+def test_columnar_round_trip(tmp_path) -> None:
+    frames = _frames(40)
+    path = tmp_path / "frames.rlsf"
+    writer = ColumnarFrameWriter(path, chunk_frames=16)
+    for fr in frames:
+        writer.write(fr)
+    writer.close()
+
+    assert count_frames(path) == 40
+    _assert_frames_match(read_frames(path), frames)
+
+
+def test_truncated_final_chunk_is_dropped(tmp_path) -> None:
+    frames = _frames(40)
+    path = tmp_path / "frames.rlsf"
+    writer = ColumnarFrameWriter(path, chunk_frames=16)
+    for fr in frames:
+        writer.write(fr)
+    writer.close()
+
+    # A crash mid-write leaves the last chunk (frames 32..39) cut short.
+    data = path.read_bytes()
+    path.write_bytes(data[: len(data) - 10])
+    assert count_frames(path) == 32
+    _assert_frames_match(read_frames(path), frames[:32])
+
+
+def test_positions_and_velocities_stored_as_float64(tmp_path) -> None:
+    path = tmp_path / "frames.rlsf"
+    writer = ColumnarFrameWriter(path)
+    for fr in _frames(5):
+        writer.write(fr)
+    writer.close()
+
+    (chunk,) = list(iter_frame_chunks(path))
+    for key in _EXACT:
+        assert chunk["columns"][f"ball.{key}"].dtype == np.dtype("<f8")
+        assert chunk["columns"][f"players.{key}"].dtype == np.dtype("<f8")
+    assert chunk["columns"]["players.boost"].dtype == np.dtype("<f4")
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+import test_batch_metrics_parity  # noqa: F401  (puts live_analysis on sys.path)
+
+from state_store import StateStore
+
+
+def _point(t: float) -> dict:
+    return {"t": t, "v": t * 2.0}
+
+
+def test_delta_omits_sections_that_did_not_change() -> None:
+    store = StateStore()
+    store.set_scenarios({"kickoff": {}}, {"kickoff": "builtin"})
+    store.set_player_metrics({"Alpha": {"speed": 1.0}})
+    store.set_metrics({"speed": 1.0}, {"speed": [_point(0.0)]}, [], 10)
+
+    full = store.metrics_delta(0)
+    assert full["reset"] is True
+    assert full["players"] == {"Alpha": {"speed": 1.0}}
+    assert full["history"] == {"speed": [_point(0.0)]}
+
+    store.set_metrics({"speed": 2.0}, {"speed": [_point(1.0)]}, [], 10)
+    delta = store.metrics_delta(1)
+    assert delta["version"] == 2 and delta["reset"] is False
+    assert delta["current"] == {"speed": 2.0}
+    assert delta["history"] == {"speed": [_point(1.0)]}
+    assert "players" not in delta and "active_scenario" not in delta
+
+    # No new points: history keeps its section version and drops out of the delta.
+    history_version = store.published().versions["history"]
+    store.set_metrics({"speed": 3.0}, {"speed": []}, [], 10)
+    assert store.published().versions["history"] == history_version
+    delta = store.metrics_delta(2)
+    assert "history" not in delta and "window_start" not in delta
+
+    store.queue_scenario("kickoff")
+    store.set_metrics({"speed": 4.0}, {}, [], 10)
+    delta = store.metrics_delta(3)
+    assert delta["pending_scenario"] == "kickoff"
+    assert "players" not in delta
+
+
+def test_stream_events_match_their_version() -> None:
+    store = StateStore()
+    store.events.subscribers = 1
+    for k in range(5):
+        store.set_metrics({"speed": float(k)}, {"speed": [_point(float(k))]}, [], 3)
+        if k == 2:
+            store.set_player_metrics({"Alpha": {"speed": float(k)}})
+    events = [json.loads(data) for _, name, data in store.events.wait(0, 0.0) if name == "metrics"]
+    assert [e["version"] for e in events] == [1, 2, 3, 4, 5]
+    for k, event in enumerate(events):
+        assert event["current"] == {"speed": float(k)}
+        assert event["history"] == {"speed": [_point(float(k))]}
+    # Players changed between versions 3 and 4, so only that event carries them.
+    assert [("players" in e) for e in events[1:]] == [False, False, True, False]
+
+
+def test_snapshot_does_not_change_after_later_writes() -> None:
+    store = StateStore()
+    current = {"speed": 1.0, "flags": {"air": False}}
+    players = {"Alpha": {"speed": 1.0}}
+    store.set_metrics(current, {"speed": [_point(0.0)]}, [{"type": "whiff"}], 2)
+    store.set_player_metrics(players)
+    store.set_mechanics({"mechanic_events": [{"t": 1.0}]})
+    snap = store.snapshot()
+    before = json.loads(json.dumps(dict(snap)))
+
+    # The caller keeps mutating what it handed over, and the store moves on.
+    current["speed"] = 9.0
+    current["flags"]["air"] = True
+    players["Alpha"]["speed"] = 9.0
+    for k in range(1, 4):
+        store.set_metrics({"speed": float(k)}, {"speed": [_point(float(k))]}, [], 2)
+    store.set_player_metrics({"Bravo": {}})
+    store.set_mechanics({})
+    assert json.loads(json.dumps(dict(snap))) == before
+
+    # Readers cannot change it in place either.
+    for mutate in (
+        lambda: snap["current_metrics"].__setitem__("speed", 0.0),
+        lambda: snap["current_metrics"]["flags"].update(air=None),
+        lambda: snap["history"]["speed"].append(_point(5.0)),
+        lambda: snap["history"]["speed"][0].pop("t"),
+        lambda: snap["mechanics"]["mechanic_events"].clear(),
+    ):
+        with pytest.raises(TypeError):
+            mutate()
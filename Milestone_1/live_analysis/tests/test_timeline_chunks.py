@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+import math
+import struct
+
+import numpy as np
+import pytest
+
+from test_batch_metrics_parity import _synthetic_frames
+
+from replay_loader import _build_timeline
+from timeline_chunks import (
+    CHUNK_FRAMES,
+    FLOAT_DECIMALS,
+    MAX_CHUNK_FRAMES,
+    frame_range,
+    pack_chunk_f32,
+    timeline_chunk,
+    timeline_fields,
+    timeline_times,
+)
+
+
+def _timeline() -> tuple[list[dict], list[str]]:
+    df, players = _synthetic_frames(3, n=120, num_players=3)
+    timeline = _build_timeline(df, players)
+    # One player missing from a few frames, the way dropped cars appear in recorded replays.
+    for k in range(40, 45):
+        timeline[k]["players"] = [p for p in timeline[k]["players"] if p["name"] != players[1]]
+    timeline[41]["is_goal_pause"] = True
+    return timeline, players
+
+
+def _unpack(blob: bytes) -> tuple[dict, dict]:
+    (head_len,) = struct.unpack_from("<I", blob, 0)
+    header = json.loads(blob[4 : 4 + head_len].decode("utf-8"))
+    count = header["count"]
+    body = np.frombuffer(blob, dtype="<f4", offset=4 + head_len)
+    assert body.size == len(header["columns"]) * count
+    columns = {tuple(col): body[i * count : (i + 1) * count] for i, col in enumerate(header["columns"])}
+    return header, columns
+
+
+def test_pack_chunk_f32_layout() -> None:
+    timeline, players = _timeline()
+    fields = timeline_fields(timeline)
+    chunk = timeline_chunk(timeline, players, 30, 60, fields)
+    blob = pack_chunk_f32(chunk, {"session_id": "s1"})
+
+    (head_len,) = struct.unpack_from("<I", blob, 0)
+    # Float32 data starts 4-byte aligned so clients can view it without copying.
+    assert (4 + head_len) % 4 == 0
+    header, columns = _unpack(blob)
+    assert header["i0"] == 30 and header["i1"] == 60 and header["count"] == 30
+    assert header["session_id"] == "s1"
+
+    expected = [["t"]]
+    expected += [["frame", k] for k in fields["frame"]]
+    expected += [["ball", k] for k in fields["ball"]]
+    expected += [["players", name, k] for name in players for k in fields["player"]]
+    assert header["columns"] == expected
+
+    np.testing.assert_array_equal(columns[("t",)], np.asarray([fr["t"] for fr in timeline[30:60]], dtype="<f4"))
+    ball_x = [round(fr["ball"]["x"], FLOAT_DECIMALS) for fr in timeline[30:60]]
+    np.testing.assert_array_equal(columns[("ball", "x")], np.asarray(ball_x, dtype="<f4"))
+    # Booleans travel as 0/1.
+    goal_pause = columns[("frame", "is_goal_pause")]
+    assert goal_pause[41 - 30] == 1.0
+    assert set(np.unique(goal_pause).tolist()) == {0.0, 1.0}
+
+
+def test_pack_chunk_f32_absent_player_is_nan() -> None:
+    timeline, players = _timeline()
+    fields = timeline_fields(timeline)
+    _, columns = _unpack(pack_chunk_f32(timeline_chunk(timeline, players, 30, 60, fields)))
+    for key in fields["player"]:
+        absent = columns[("players", players[1], key)]
+        assert all(math.isnan(v) for v in absent[10:15])
+        assert not any(math.isnan(v) for v in absent[:10])
+        assert not any(math.isnan(v) for v in columns[("players", players[0], key)])
+
+
+def test_frame_range_by_index() -> None:
+    times = [i / 30.0 for i in range(100)]
+    assert frame_range(times, i0=10, i1=20) == (10, 20)
+    assert frame_range(times) == (0, min(100, CHUNK_FRAMES))
+    assert frame_range(times, i0=90) == (90, 100)
+    # Out-of-range and inverted requests clamp to an empty or partial window instead of failing.
+    assert frame_range(times, i0=-5, i1=3) == (0, 3)
+    assert frame_range(times, i0=150, i1=200) == (100, 100)
+    assert frame_range(times, i0=40, i1=30) == (40, 40)
+
+
+def test_frame_range_by_time() -> None:
+    times = [i / 30.0 for i in range(100)]
+    # Inclusive at both ends: frames with t0 <= t <= t1.
+    assert frame_range(times, t0=times[10], t1=times[20]) == (10, 21)
+    assert frame_range(times, t0=0.5) == (15, 100)
+    assert frame_range(times, t1=-1.0) == (0, 0)
+    # A time window wins over indices.
+    assert frame_range(times, i0=0, i1=5, t0=times[50], t1=times[60]) == (50, 61)
+
+
+def test_frame_range_clamps_to_max_chunk_frames() -> None:
+    times = [i / 30.0 for i in range(MAX_CHUNK_FRAMES + 500)]
+    assert frame_range(times, i0=100, i1=len(times)) == (100, 100 + MAX_CHUNK_FRAMES)
+    assert frame_range(times, t0=0.0) == (0, MAX_CHUNK_FRAMES)
+
+
+def test_timeline_chunk_projects_fields() -> None:
+    timeline, players = _timeline()
+    fields = timeline_fields(timeline)
+    lo, hi = frame_range(timeline_times(timeline), i0=38, i1=46)
+    chunk = timeline_chunk(timeline, players, lo, hi, fields, ["ball.x", "player.boost", "frame"])
+    assert chunk["i0"] == 38 and chunk["i1"] == 46 and len(chunk["t"]) == 8
+    assert list(chunk["ball"]) == ["x"]
+    assert chunk["frame"].keys() == set(fields["frame"])
+    assert all(list(cols) == ["boost"] for cols in chunk["players"].values())
+    assert chunk["ball"]["x"] == [round(fr["ball"]["x"], FLOAT_DECIMALS) for fr in timeline[38:46]]
+    # The player missing from frames 40..44 reads as null there.
+    assert chunk["players"][players[1]]["boost"][2:7] == [None] * 5
+    with pytest.raises(RuntimeError):
+        timeline_chunk(timeline, players, lo, hi, fields, ["ball.nope"])
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Callable, Dict
+import time
+
+
+def _percentile(sorted_vals: list, q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return float(sorted_vals[k])
+
+
+class LatencyWindow:
+    # Recent durations (seconds in, milliseconds out) for percentile reporting.
+
+    def __init__(self, window: int = 300) -> None:
+        self._values: deque[float] = deque(maxlen=max(2, int(window)))
+
+    def add(self, seconds: float) -> None:
+        self._values.append(seconds)
+
+    def summary(self, prefix: str) -> Dict[str, float]:
+        ms = sorted(1000.0 * x for x in self._values)
+        return {
+            f"{prefix}_p50": round(_percentile(ms, 0.50), 3),
+            f"{prefix}_p95": round(_percentile(ms, 0.95), 3),
+            f"{prefix}_p99": round(_percentile(ms, 0.99), 3),
+            f"{prefix}_max": round(ms[-1], 3) if ms else 0.0,
+        }
+
+
+class TickScheduler:
+    """
+    Fixed-rate loop pacing against absolute deadlines (start + k * period), so work time does not
+    stretch the period. An overrun moves the next deadline past "now" instead of bursting to catch up.
+    Also tracks loop time, achieved rate and game-clock gaps for the dashboard.
+    """
+
+    def __init__(
+        self,
+        tick_rate: float,
+        window: int = 300,
+        clock: Callable[[], float] = time.perf_counter,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.tick_rate = max(1.0, float(tick_rate))
+        self.period = 1.0 / self.tick_rate
+        self._clock = clock
+        self._sleep = sleep
+        self._next_deadline: float | None = None
+        self._tick_start: float | None = None
+        self._loop_times = LatencyWindow(window)
+        self._tick_starts: deque[float] = deque(maxlen=max(2, int(window)))
+        self._last_game_time: float | None = None
+        self.ticks = 0
+        self.overruns = 0
+        self.missed_deadlines = 0
+        self.missed_loop_periods = 0
+        self.stale_packets = 0
+
+    def start_tick(self) -> None:
+        now = self._clock()
+        self._tick_start = now
+        self._tick_starts.append(now)
+        if self._next_deadline is None:
+            self._next_deadline = now + self.period
+
+    def end_tick(self) -> float:
+        if self._tick_start is None:
+            return 0.0
+        elapsed = self._clock() - self._tick_start
+        self._loop_times.add(elapsed)
+        self._tick_start = None
+        self.ticks += 1
+        return elapsed
+
+    def wait(self) -> None:
+        now = self._clock()
+        if self._next_deadline is None:
+            self._next_deadline = now + self.period
+        if now < self._next_deadline:
+            self._sleep(self._next_deadline - now)
+            self._next_deadline += self.period
+            return
+        # Overran this slot: count the slots that passed and aim for the first one still ahead.
+        behind = int((now - self._next_deadline) / self.period)
+        self.overruns += 1
+        self.missed_deadlines += behind
+        self._next_deadline += (behind + 1) * self.period
+
+    def observe_game_time(self, seconds_elapsed: float) -> None:
+        # Game-clock gaps: no advance means the same physics state was read twice; an advance of
+        # several loop periods means the loop missed polls in between. Counted in loop periods, not
+        # physics ticks: at any rate below 120 Hz every poll already spans several game ticks.
+        try:
+            t = float(seconds_elapsed)
+        except Exception:
+            return
+        last = self._last_game_time
+        self._last_game_time = t
+        if last is None:
+            return
+        dt = t - last
+        if dt <= 0.0:
+            self.stale_packets += 1
+        else:
+            self.missed_loop_periods += max(0, int(round(dt / self.period)) - 1)
+
+    def stats(self) -> Dict[str, Any]:
+        starts = self._tick_starts
+        achieved = 0.0
+        if len(starts) >= 2 and starts[-1] > starts[0]:
+            achieved = (len(starts) - 1) / (starts[-1] - starts[0])
+        return {
+            "target_hz": round(self.tick_rate, 3),
+            "achieved_hz": round(achieved, 3),
+            **self._loop_times.summary("loop_ms"),
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "missed_deadlines": self.missed_deadlines,
+            "missed_loop_periods": self.missed_loop_periods,
+            "stale_packets": self.stale_packets,
+        }
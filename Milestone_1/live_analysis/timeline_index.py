@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import math
+from array import array
+from collections.abc import Sequence
+from operator import itemgetter
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from frame_geometry import pairwise_geometry
+
+PLAYER_FIELDS = ("x", "y", "z", "vx", "vy", "vz", "wx", "wy", "wz", "boost", "jump", "double_jump")
+BALL_FIELDS = ("x", "y", "z", "vx", "vy", "vz")
+
+
+def _to_float(v: Any) -> float:
+    try:
+        return float(v)
+    except Exception:
+        return 0.0
+
+
+def _float_column(values: List[Any]) -> np.ndarray:
+    try:
+        out = np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        # Missing/None/garbage values read as 0.0, same as the per-frame helpers always did.
+        return np.array([_to_float(v) for v in values], dtype=np.float64)
+    # np.array turns None into NaN; re-read those entries so None still means 0.0.
+    for i in np.flatnonzero(np.isnan(out)):
+        out[i] = _to_float(values[i])
+    return out
+
+
+def _float_table(rows: List[Tuple[Any, ...]], width: int) -> np.ndarray:
+    try:
+        out = np.array(rows, dtype=np.float64).reshape(len(rows), width)
+    except (TypeError, ValueError):
+        return np.array([[_to_float(v) for v in row] for row in rows], dtype=np.float64).reshape(len(rows), width)
+    for i in np.flatnonzero(np.isnan(out).any(axis=1)):
+        out[i] = [_to_float(v) for v in rows[i]]
+    return out
+
+
+def norm3(x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+    return np.sqrt(x * x + y * y + z * z)
+
+
+def masked_min(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    # Row-wise min over valid entries, or the 99999 "nobody" sentinel; like the `if d < best`
+    # scans this replaces, NaN never wins.
+    return np.where(valid & (values < 99999.0), values, 99999.0).min(axis=-1, initial=99999.0)
+
+
+class TimelineIndex:
+    """
+    Column view of a replay/session timeline (list of frame dicts with "t", "ball" and "players").
+
+    Every player name gets a fixed slot, so per-player values live in aligned (frames, slots)
+    arrays instead of being looked up by scanning frame["players"]. Values a frame does not carry
+    read as 0.0; `present` tells whether the player appears in that frame at all.
+    """
+
+    def __init__(self, timeline: List[Dict[str, Any]]):
+        self.timeline = timeline
+        self.slots: Dict[str, int] = {}
+        frame_players: List[Dict[str, Dict[str, Any]]] = []
+        for fr in timeline:
+            by_name: Dict[str, Dict[str, Any]] = {}
+            for p in fr.get("players", []) or []:
+                name = str(p.get("name", ""))
+                by_name.setdefault(name, p)
+                self.slots.setdefault(name, len(self.slots))
+            frame_players.append(by_name)
+        self.players: List[str] = list(self.slots)
+
+        n = len(timeline)
+        self.times = _float_column([fr.get("t", 0.0) for fr in timeline])
+        balls = [fr.get("ball", {}) or {} for fr in timeline]
+        self.ball: Dict[str, np.ndarray] = {k: _float_column([b.get(k, 0.0) for b in balls]) for k in BALL_FIELDS}
+
+        self.present = np.zeros((n, len(self.players)), dtype=bool)
+        self.player: Dict[str, np.ndarray] = {k: np.zeros((n, len(self.players))) for k in PLAYER_FIELDS}
+        absent = (0.0,) * len(PLAYER_FIELDS)
+        get_fields = itemgetter(*PLAYER_FIELDS)
+        for slot, name in enumerate(self.players):
+            rows = [m.get(name) for m in frame_players]
+            self.present[:, slot] = [r is not None for r in rows]
+            try:
+                values = [get_fields(r) if r is not None else absent for r in rows]
+            except KeyError:
+                values = [tuple(r.get(k, 0.0) for k in PLAYER_FIELDS) if r is not None else absent for r in rows]
+            table = _float_table(values, len(PLAYER_FIELDS))
+            for col, k in enumerate(PLAYER_FIELDS):
+                self.player[k][:, slot] = table[:, col]
+        self._derive()
+
+    @classmethod
+    def from_columns(
+        cls,
+        timeline: List[Dict[str, Any]],
+        times: np.ndarray,
+        ball: Dict[str, np.ndarray],
+        players: Dict[str, Dict[str, np.ndarray]],
+        present: np.ndarray | None = None,
+    ) -> "TimelineIndex":
+        # For callers that built `timeline` from column arrays in the first place (replay loader,
+        # session recorder): same index without walking the frame dicts. Without `present`, every
+        # player is in every frame.
+        self = cls.__new__(cls)
+        self.timeline = timeline
+        self.slots = {name: slot for slot, name in enumerate(players)}
+        self.players = list(players)
+        n = len(timeline)
+        self.times = np.asarray(times, dtype=np.float64)
+        self.ball = {k: np.asarray(ball[k], dtype=np.float64) for k in BALL_FIELDS}
+        self.present = np.ones((n, len(self.players)), dtype=bool) if present is None else np.asarray(present, dtype=bool)
+        self.player = {
+            k: np.column_stack([np.asarray(players[name][k], dtype=np.float64) for name in self.players])
+            if self.players
+            else np.zeros((n, 0))
+            for k in PLAYER_FIELDS
+        }
+        self._derive()
+        return self
+
+    def column_arrays(self) -> Dict[str, np.ndarray]:
+        # Source columns under flat names, for rebuilding the index in another process.
+        out = {"times": self.times, "present": self.present}
+        out.update({f"ball_{k}": v for k, v in self.ball.items()})
+        out.update({f"player_{k}": v for k, v in self.player.items()})
+        return out
+
+    @classmethod
+    def from_column_arrays(cls, players: List[str], arrays: Dict[str, np.ndarray]) -> "TimelineIndex":
+        # Inverse of column_arrays(), over a ColumnTimeline: no frame dicts are rebuilt.
+        timeline = ColumnTimeline(len(arrays["times"]))
+        index = cls.from_columns(
+            timeline,
+            arrays["times"],
+            {k: arrays[f"ball_{k}"] for k in BALL_FIELDS},
+            {name: {k: arrays[f"player_{k}"][:, slot] for k in PLAYER_FIELDS} for slot, name in enumerate(players)},
+            arrays["present"],
+        )
+        timeline.index = index
+        return index
+
+    def _derive(self) -> None:
+        b = self.ball
+        p = self.player
+        self.ball_speed = norm3(b["vx"], b["vy"], b["vz"])
+        self.speed = norm3(p["vx"], p["vy"], p["vz"])
+        self.ball_dist = norm3(p["x"] - b["x"][:, None], p["y"] - b["y"][:, None], p["z"] - b["z"][:, None])
+        # Replay/session clocks only move forward; anything else (or NaN) takes the linear-scan paths.
+        self.times_sorted = bool(np.all(self.times[1:] >= self.times[:-1]))
+        self._lookahead: Dict[float, List[int]] = {}
+        self._pair_dist: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.timeline)
+
+    def slot(self, player: str) -> int:
+        return self.slots.get(player, -1)
+
+    def player_ball_dist(self, slot: int) -> np.ndarray:
+        if slot < 0:
+            return np.full(len(self), 99999.0)
+        return np.where(self.present[:, slot], self.ball_dist[:, slot], 99999.0)
+
+    @property
+    def pair_dist(self) -> np.ndarray:
+        # (frames, slots + 1, slots + 1) distances between every player slot and the ball (last slot),
+        # built on first use and kept so later grading/refinement passes index it by frame.
+        if self._pair_dist is None:
+            p = self.player
+            b = self.ball
+            pos = np.stack(
+                [
+                    np.concatenate([p[k], b[k][:, None]], axis=1)
+                    for k in ("x", "y", "z")
+                ],
+                axis=-1,
+            )
+            self._pair_dist = pairwise_geometry(pos)[0]
+        return self._pair_dist
+
+    def slot_dist(self, slot: int, rows: Any = slice(None)) -> np.ndarray:
+        # Distance from `slot` to every player slot, (frames, slots) for the selected rows.
+        return self.pair_dist[rows, slot, : len(self.players)]
+
+    def next_idx_by_time(self, idx: int, dt: float) -> int:
+        # First frame at or after `idx` whose time reaches times[idx] + dt (last frame if none does).
+        times = self.times
+        t = float(times[idx]) + max(0.0, dt)
+        if self.times_sorted:
+            return max(idx, min(int(np.searchsorted(times, t, side="left")), len(times) - 1))
+        j = idx
+        while j + 1 < len(times) and times[j] < t:
+            j += 1
+        return j
+
+    def lookahead(self, dt: float) -> List[int]:
+        # next_idx_by_time(i, dt) for every frame, built once per offset and kept on the index.
+        out = self._lookahead.get(dt)
+        if out is None:
+            n = len(self.times)
+            if self.times_sorted and n:
+                j = np.searchsorted(self.times, self.times + max(0.0, dt), side="left")
+                out = np.minimum(np.maximum(j, np.arange(n)), n - 1).tolist()
+            else:
+                out = [self.next_idx_by_time(i, dt) for i in range(n)]
+            self._lookahead[dt] = out
+        return out
+
+    def nearest_idx(self, t: float) -> int:
+        # Frame whose time is closest to `t`; ties go to the earliest frame.
+        times = self.times
+        n = len(times)
+        if not n:
+            return 0
+        t = float(t)
+        if self.times_sorted and math.isfinite(t):
+            right = int(np.searchsorted(times, t, side="left"))
+            if right <= 0:
+                return 0
+            # First frame carrying the closest earlier timestamp (duplicates resolve to the earliest).
+            left = int(np.searchsorted(times, times[right - 1], side="left"))
+            if right >= n or abs(float(times[left]) - t) <= abs(float(times[right]) - t):
+                return left
+            return right
+        best_i = 0
+        best_dt = abs(float(times[0]) - t)
+        for i in range(1, n):
+            dt = abs(float(times[i]) - t)
+            if dt < best_dt:
+                best_dt = dt
+                best_i = i
+        return best_i
+
+    def masked_min(self, values: np.ndarray, slot_mask: np.ndarray, rows: Any = slice(None)) -> np.ndarray:
+        # Per frame, the smallest value over the masked slots present in that frame.
+        return masked_min(values[rows], self.present[rows] & slot_mask)
+
+
+def ensure_timeline_index(timeline: List[Dict[str, Any]], index: TimelineIndex | None = None) -> TimelineIndex:
+    if index is not None and index.timeline is timeline:
+        return index
+    return TimelineIndex(timeline)
+
+
+class ColumnTimeline(Sequence):
+    """
+    Read-only timeline over a column-built index. Frames are materialized on access with the
+    fields the index carries ("t", "ball", "players"), players in slot order.
+    """
+
+    def __init__(self, n: int):
+        self._n = n
+        self.index: TimelineIndex | None = None
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        if not isinstance(i, int):
+            raise TypeError("ColumnTimeline only supports integer indexing")
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        index = self.index
+        players = []
+        for slot, name in enumerate(index.players):
+            if index.present[i, slot]:
+                p = {"name": name}
+                for k in PLAYER_FIELDS:
+                    p[k] = float(index.player[k][i, slot])
+                players.append(p)
+        return {
+            "t": float(index.times[i]),
+            "ball": {k: float(v[i]) for k, v in index.ball.items()},
+            "players": players,
+        }
+
+
+class TimelineColumns:
+    """Append-only frame columns (timeline frame dicts in, compact arrays kept) for a TimelineIndex."""
+
+    def __init__(self) -> None:
+        self.times = array("d")
+        self.ball = {k: array("d") for k in BALL_FIELDS}
+        self.slots: Dict[str, int] = {}
+        self.player: List[Dict[str, array]] = []
+        self.present: List[array] = []
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def append(self, frame: Dict[str, Any]) -> None:
+        n = len(self.times)
+        self.times.append(_to_float(frame.get("t", 0.0)))
+        ball = frame.get("ball", {}) or {}
+        for k, col in self.ball.items():
+            col.append(_to_float(ball.get(k, 0.0)))
+        seen = set()
+        for p in frame.get("players", []) or []:
+            name = str(p.get("name", ""))
+            if name in seen:
+                continue
+            seen.add(name)
+            slot = self.slots.get(name)
+            if slot is None:
+                # Late joiners are padded as absent for the frames before they showed up.
+                slot = self.slots[name] = len(self.player)
+                self.player.append({k: array("d", bytes(8 * n)) for k in PLAYER_FIELDS})
+                self.present.append(array("b", bytes(n)))
+            cols = self.player[slot]
+            for k in PLAYER_FIELDS:
+                cols[k].append(_to_float(p.get(k, 0.0)))
+            self.present[slot].append(1)
+        if len(seen) < len(self.player):
+            for name, slot in self.slots.items():
+                if name not in seen:
+                    for col in self.player[slot].values():
+                        col.append(0.0)
+                    self.present[slot].append(0)
+
+    def to_index(self) -> TimelineIndex:
+        n = len(self.times)
+        timeline = ColumnTimeline(n)
+        names = list(self.slots)
+        players = {name: {k: np.frombuffer(col, dtype=np.float64) for k, col in self.player[slot].items()} for name, slot in self.slots.items()}
+        present = np.zeros((n, len(names)), dtype=bool)
+        for slot in range(len(names)):
+            present[:, slot] = np.frombuffer(self.present[slot], dtype=np.int8) != 0
+        # Copies, so the arrays stay valid (and appendable) after the index is built.
+        ball = {k: np.frombuffer(col, dtype=np.float64).copy() for k, col in self.ball.items()}
+        times = np.frombuffer(self.times, dtype=np.float64).copy()
+        index = TimelineIndex.from_columns(timeline, times, ball, players, present)
+        timeline.index = index
+        return index
@@ -63,6 +63,13 @@ let reviewEvents = [];
 let reviewLabels = {};
 let selectedEventId = "";
 let selectedReviewPlayer = "";
+const LIVE_LONG_POLL_S = 10;
+const LIVE_MIN_POLL_MS = 100;
+let liveMetricsVersion = 0;
+const liveHistory = {};
+let liveLatest = null;
+let liveRenderPending = false;
+let liveCatchUp = null;
 
 let renderer = null;
 let scene = null;
@@ -116,6 +123,10 @@ function drawSeries(canvasId, series, color) {
   ctx.stroke();
 }
 
+function sleepMs(ms) {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
 async function fetchJson(url, init = undefined) {
   const res = await fetch(url, init);
   const data = await res.json();
@@ -271,9 +282,7 @@ async function applyScenario() {
   });
 }
 
-async function refreshCurrent() {
-  const data = await fetchJson("/api/metrics/current");
-
+function renderCurrent(data) {
   statusEl.textContent = "Connected";
   activeScenarioEl.textContent = `Active: ${data.active_scenario || "none"}`;
   activeSourceEl.textContent = `Source: ${data.active_source || "n/a"}`;
@@ -304,10 +313,24 @@ async function refreshCurrent() {
   }
 }
 
-async function refreshHistory() {
-  const data = await fetchJson("/api/metrics/history");
-  const h = data.history || {};
+function mergeHistory(data) {
+  // Delta responses carry only new points; keep the window locally and trim to the server's window.
+  if (data.reset) {
+    for (const key of Object.keys(liveHistory)) delete liveHistory[key];
+  }
+  const windowStart = data.window_start;
+  for (const [key, points] of Object.entries(data.history || {})) {
+    const series = liveHistory[key] || (liveHistory[key] = []);
+    for (const p of points) series.push(p);
+    if (windowStart !== null && windowStart !== undefined) {
+      let drop = 0;
+      while (drop < series.length && series[drop].t < windowStart) drop += 1;
+      if (drop) series.splice(0, drop);
+    }
+  }
+}
 
+function renderHistory(h) {
   drawSeries("speedChart", h.speed, "#4ec1ff");
   drawSeries("hesitationChart", h.hesitation_percent, "#ff7a5c");
   drawSeries("hesitationScoreChart", h.hesitation_score, "#ff5c96");
@@ -903,13 +926,70 @@ async function markMissed(type) {
   buildReviewEventList();
 }
 
-async function tickLive() {
-  if (activeTab !== "live") return;
+function applyLiveDelta(data) {
+  liveMetricsVersion = Number(data.version || 0);
+  mergeHistory(data);
+  // Deltas leave out the sections that did not change since our version; keep the previous values.
+  liveLatest = data.reset || !liveLatest ? data : { ...liveLatest, ...data };
+  if (liveRenderPending) return;
+  liveRenderPending = true;
+  requestAnimationFrame(() => {
+    liveRenderPending = false;
+    if (activeTab !== "live" || !liveLatest) return;
+    renderCurrent(liveLatest);
+    renderHistory(liveHistory);
+  });
+}
+
+async function tickLive(waitS = LIVE_LONG_POLL_S) {
   try {
-    await refreshCurrent();
-    await refreshHistory();
+    const data = await fetchJson(`/api/metrics/delta?since=${liveMetricsVersion}&wait=${waitS}`);
+    applyLiveDelta(data);
   } catch (_err) {
     statusEl.textContent = "Disconnected";
+    await sleepMs(1000);
+  }
+}
+
+function catchUpLive() {
+  // A stream event skipped a version (reconnect, backlog overflow): fetch everything since our cursor.
+  if (liveCatchUp) return;
+  liveCatchUp = tickLive(0).finally(() => {
+    liveCatchUp = null;
+  });
+}
+
+function startLiveStream() {
+  // Server-Sent Events: the server pushes each metrics delta as it is published.
+  const stream = new EventSource("/api/events");
+  stream.addEventListener("metrics", (ev) => {
+    const data = JSON.parse(ev.data);
+    if (!data.reset && Number(data.version) - 1 !== liveMetricsVersion) {
+      catchUpLive();
+      return;
+    }
+    applyLiveDelta(data);
+  });
+  stream.addEventListener("mechanics", () => {
+    loadMechanicsCurrent().catch(() => {});
+  });
+  stream.onerror = () => {
+    statusEl.textContent = "Disconnected";
+  };
+}
+
+async function liveLoop() {
+  await tickLive(0);
+  if (window.EventSource) {
+    startLiveStream();
+    return;
+  }
+  // Long-poll fallback: each request returns as soon as newer metrics exist, so updates follow the
+  // tick rate and responses only carry the samples since the previous one.
+  for (;;) {
+    const started = performance.now();
+    if (activeTab === "live") await tickLive();
+    await sleepMs(Math.max(0, LIVE_MIN_POLL_MS - (performance.now() - started)));
   }
 }
 
@@ -1015,16 +1095,14 @@ loadCurrentProfile()
   .then(() => refreshRecommendations().catch(() => {}))
   .then(() => loadMechanicsCurrent().catch(() => {}))
   .then(() => loadScenarios())
-  .then(() => tickLive())
   .catch(() => {
     statusEl.textContent = "Disconnected";
-  });
-
-setInterval(tickLive, 250);
+  })
+  .then(() => liveLoop());
 setInterval(() => {
   if (activeTab === "live") {
     loadScenarios().catch(() => {});
   }
 }, 5000);
 
-requestAnimationFrame(reviewAnimate);
+requestAnimationFrame(reviewAnimate);
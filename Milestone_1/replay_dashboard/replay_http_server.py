@@ -11,12 +11,17 @@ import re
 from urllib.parse import parse_qs, urlparse
 
 from replay_state_store import DuplicateReplayError, ReplayStateStore
+from event_stream import stream_events
+from http_cache import ResponseCache, StaticAssetCache, send_body, send_cached, send_static
+from timeline_chunks import pack_chunk_f32
 
 
 class _ReplayDashboardHandler(BaseHTTPRequestHandler):
     store: ReplayStateStore = None
     web_dir: Path = None
     collision_mesh_dir: Path = None
+    assets: StaticAssetCache = None
+    api_cache: ResponseCache = None
 
     @staticmethod
     def _discover_replay_folder() -> Path:
@@ -54,23 +59,19 @@ class _ReplayDashboardHandler(BaseHTTPRequestHandler):
 
     def _send_json(self, payload: Dict[str, Any], status: int = 200) -> None:
         body = json.dumps(payload).encode("utf-8")
-        self.send_response(status)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Content-Length", str(len(body)))
-        self.end_headers()
-        self.wfile.write(body)
+        send_body(self, body, "application/json", status=status)
+
+    def _send_cached(self, key: str, section: str, build) -> None:
+        # Encoded once per section version (read before building, so a body is never older than its key).
+        version = self.store.state_version(section)
+        send_cached(self, self.api_cache.get(key, version, build))
+
+    def _send_bytes(self, body: bytes, content_type: str) -> None:
+        send_body(self, body, content_type)
 
     def _send_file(self, file_name: str, content_type: str) -> None:
-        file_path = self.web_dir / file_name
-        if not file_path.exists():
+        if not send_static(self, self.assets, self.web_dir / file_name, content_type):
             self.send_error(HTTPStatus.NOT_FOUND, "Not found")
-            return
-        data = file_path.read_bytes()
-        self.send_response(HTTPStatus.OK)
-        self.send_header("Content-Type", content_type)
-        self.send_header("Content-Length", str(len(data)))
-        self.end_headers()
-        self.wfile.write(data)
 
     def _parse_upload(self) -> tuple[str, bytes]:
         content_type = self.headers.get("Content-Type", "")
@@ -132,12 +133,7 @@ class _ReplayDashboardHandler(BaseHTTPRequestHandler):
                 content_type = "image/png"
             elif ext in (".jpg", ".jpeg"):
                 content_type = "image/jpeg"
-            data = file_path.read_bytes()
-            self.send_response(HTTPStatus.OK)
-            self.send_header("Content-Type", content_type)
-            self.send_header("Content-Length", str(len(data)))
-            self.end_headers()
-            self.wfile.write(data)
+            send_static(self, self.assets, file_path, content_type)
             return
         if path.startswith("/collision_meshes/"):
             rel = path[len("/collision_meshes/") :].strip("/")
@@ -159,12 +155,7 @@ class _ReplayDashboardHandler(BaseHTTPRequestHandler):
                 content_type = "model/stl"
             elif ext == ".cmf":
                 content_type = "application/octet-stream"
-            data = file_path.read_bytes()
-            self.send_response(HTTPStatus.OK)
-            self.send_header("Content-Type", content_type)
-            self.send_header("Content-Length", str(len(data)))
-            self.end_headers()
-            self.wfile.write(data)
+            send_static(self, self.assets, file_path, content_type)
             return
         if path == "/styles.css":
             return self._send_file("styles.css", "text/css; charset=utf-8")
@@ -185,20 +176,25 @@ class _ReplayDashboardHandler(BaseHTTPRequestHandler):
                 return self._send_json({"ok": False, "error": str(exc)}, status=400)
         if path == "/api/recommendations/current":
             try:
-                data = self.store.current_recommendations()
-                return self._send_json({"ok": True, "data": data})
+                return self._send_cached(
+                    "recommendations_current",
+                    "recommendations",
+                    lambda: {"ok": True, "data": self.store.current_recommendations()},
+                )
             except Exception as exc:
                 return self._send_json({"ok": False, "error": str(exc)}, status=400)
         if path == "/api/mechanics/current":
             try:
-                data = self.store.current_mechanics()
-                return self._send_json({"ok": True, "data": data})
+                return self._send_cached(
+                    "mechanics_current", "mechanics", lambda: {"ok": True, "data": self.store.current_mechanics()}
+                )
             except Exception as exc:
                 return self._send_json({"ok": False, "error": str(exc)}, status=400)
         if path == "/api/mechanics/events":
             try:
-                data = self.store.mechanic_events()
-                return self._send_json({"ok": True, "events": data})
+                return self._send_cached(
+                    "mechanics_events", "mechanics", lambda: {"ok": True, "events": self.store.mechanic_events()}
+                )
             except Exception as exc:
                 return self._send_json({"ok": False, "error": str(exc)}, status=400)
         if path == "/api/profile/history":
@@ -214,13 +210,44 @@ class _ReplayDashboardHandler(BaseHTTPRequestHandler):
             except Exception as exc:
                 return self._send_json({"ok": False, "error": str(exc)}, status=400)
         if path == "/api/replay/status":
-            return self._send_json(self.store.status_snapshot())
+            return self._send_cached("replay_status", "status", self.store.status_snapshot)
+        if path == "/api/events":
+            return stream_events(self, self.store.events)
         if path == "/api/replay/players":
             players = self.store.list_players()
             return self._send_json({"players": players})
         if path == "/api/replay/session":
             try:
-                data = self.store.replay_session_data()
+                return self._send_cached(
+                    "replay_session", "session", lambda: {"ok": True, "data": self.store.replay_session_data()}
+                )
+            except Exception as exc:
+                return self._send_json({"ok": False, "error": str(exc)}, status=400)
+        if path == "/api/replay/session/header":
+            try:
+                return self._send_cached(
+                    "replay_session_header", "session", lambda: {"ok": True, "data": self.store.replay_session_header()}
+                )
+            except Exception as exc:
+                return self._send_json({"ok": False, "error": str(exc)}, status=400)
+        if path == "/api/replay/timeline":
+            # ?i0=&i1= (frame indices, half-open) or ?t0=&t1= (seconds), optional fields=ball,player.x,...
+            # and format=f32 for the packed Float32 form (see timeline_chunks.pack_chunk_f32).
+            try:
+                def _arg(name: str, cast):
+                    raw = (qs.get(name, [""])[0] or "").strip()
+                    return cast(raw) if raw else None
+
+                fields = [f.strip() for f in (qs.get("fields", [""])[0] or "").split(",") if f.strip()]
+                data = self.store.replay_timeline_chunk(
+                    i0=_arg("i0", int),
+                    i1=_arg("i1", int),
+                    t0=_arg("t0", float),
+                    t1=_arg("t1", float),
+                    fields=fields or None,
+                )
+                if (qs.get("format", [""])[0] or "").strip().lower() == "f32":
+                    return self._send_bytes(pack_chunk_f32(data), "application/octet-stream")
                 return self._send_json({"ok": True, "data": data})
             except Exception as exc:
                 return self._send_json({"ok": False, "error": str(exc)}, status=400)
@@ -460,11 +487,14 @@ class ReplayDashboardServer:
         handler.store = self.store
         handler.web_dir = self.web_dir
         handler.collision_mesh_dir = self.collision_mesh_dir
+        handler.assets = StaticAssetCache()
+        handler.api_cache = ResponseCache()
         self._server = ThreadingHTTPServer((self.host, self.port), handler)
         self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
         self._thread.start()
 
     def stop(self) -> None:
+        self.store.events.close()
         if self._server:
             self._server.shutdown()
             self._server.server_close()
@@ -7,11 +7,13 @@ import tempfile
 import uuid
 import sys
 import io
+import os
 import contextlib
-import json
-from bisect import bisect_right
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 
 HERE = Path(__file__).resolve().parent
@@ -22,9 +24,16 @@ for _p in (MILESTONE_ROOT, LIVE_ANALYSIS_DIR, HERE):
     if _ps not in sys.path:
         sys.path.insert(0, _ps)
 
-from extract_player_data import CSV_DIR, _resolve_rrrocket_path, _run_rrrocket_to_json, extract_final
-from metrics_engine import LiveMetricsEngine
+from extract_player_data import (
+    DecodedReplay,
+    _resolve_rrrocket_path,
+    _run_rrrocket_to_json,
+    decode_rrrocket_json,
+    extract_frame_table,
+)
+from batch_metrics_engine import FrameArrays, attach_arrays, compute_metrics_batch, frame_arrays_dict, share_arrays
 from future_event_engine import apply_whiff_rate_from_events, refine_events_posthoc
+from timeline_index import BALL_FIELDS, PLAYER_FIELDS, TimelineIndex, ensure_timeline_index
 
 from replay_packet_adapter import ReplayPacketBuilder
 
@@ -113,29 +122,70 @@ class ReplaySession:
     duration_s: float
     metrics_by_player: Dict[str, List[Dict]] = field(default_factory=dict)
     events_by_player: Dict[str, List[Dict]] = field(default_factory=dict)
+    timeline_index: TimelineIndex | None = field(default=None, repr=False)
 
 
-def _sample_value_at_time(samples: List[Dict], t: float, key: str, default):
-    if not samples:
-        return default
-    cur = default
-    for s in samples:
-        if float(s.get("time_s", 0.0)) <= float(t):
-            cur = s.get(key, cur)
-        else:
-            break
-    return cur
+class _SampleIndex:
+    """Time-sorted view over a `{"time_s": ..., key: ...}` sample list for O(log n) lookups."""
 
+    __slots__ = ("samples", "times")
 
-def _seconds_remaining_at_time(samples: List[Dict], t: float, default: float = 300.0) -> float:
-    try:
-        return max(0.0, float(_sample_value_at_time(samples, t, "seconds_remaining", default)))
-    except Exception:
-        return float(default)
+    def __init__(self, samples: List[Dict] | None):
+        # Stable, so samples sharing a timestamp keep their recorded order.
+        self.samples = sorted(samples or [], key=lambda s: float(s.get("time_s", 0.0)))
+        self.times = np.array([float(s.get("time_s", 0.0)) for s in self.samples], dtype=np.float64)
 
+    def position(self, t: float) -> int:
+        return bisect_right(self.times, float(t)) - 1
 
-def _bool_at_time(samples: List[Dict], t: float, key: str, default: bool = False) -> bool:
-    return bool(_sample_value_at_time(samples, t, key, default))
+    def positions(self, times: np.ndarray) -> np.ndarray:
+        return np.searchsorted(self.times, times, side="right") - 1
+
+    def values(self, key: str, default, cast=None) -> List:
+        out = []
+        cur = default
+        for s in self.samples:
+            cur = s.get(key, cur)
+            if cast is None:
+                out.append(cur)
+                continue
+            try:
+                out.append(cast(cur))
+            except Exception:
+                out.append(cast(default))
+        return out
+
+
+def _as_sample_index(samples) -> _SampleIndex:
+    return samples if isinstance(samples, _SampleIndex) else _SampleIndex(samples)
+
+
+def _values_at_times(samples, times: np.ndarray, key: str, default, cast) -> np.ndarray:
+    idx = _as_sample_index(samples)
+    if not idx.samples:
+        return np.full(len(times), cast(default))
+    vals = np.array(idx.values(key, default, cast=cast) + [cast(default)])
+    # Position -1 (before the first sample) indexes the trailing default.
+    return vals[idx.positions(times)]
+
+
+def _window_mask(times: np.ndarray, windows: List[Dict], start_key: str, end_key: str) -> np.ndarray:
+    n = len(times)
+    if not windows or not n:
+        return np.zeros(n, dtype=bool)
+    order = np.argsort(times, kind="stable")
+    sorted_times = times[order]
+    starts = np.array([float(w.get(start_key, 0.0)) for w in windows], dtype=np.float64)
+    ends = np.array([float(w.get(end_key, 0.0)) for w in windows], dtype=np.float64)
+    keep = starts < ends
+    lo = np.searchsorted(sorted_times, starts[keep], side="left")
+    hi = np.searchsorted(sorted_times, ends[keep], side="left")
+    depth = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(depth, lo, 1)
+    np.add.at(depth, hi, -1)
+    mask = np.empty(n, dtype=bool)
+    mask[order] = np.cumsum(depth[:n]) > 0
+    return mask
 
 
 def _build_kickoff_pause_windows(
@@ -154,11 +204,8 @@ def _build_kickoff_pause_windows(
     for ks in starts:
         if ks > float(timeline_end_t):
             continue
-        first_hit = None
-        for ht in hit_times:
-            if ht >= ks:
-                first_hit = ht
-                break
+        hit_pos = bisect_left(hit_times, ks)
+        first_hit = hit_times[hit_pos] if hit_pos < len(hit_times) else None
         if first_hit is None:
             ke = min(float(timeline_end_t), ks + timeout_s)
         else:
@@ -189,46 +236,45 @@ def _build_inactive_windows(goal_pause_windows: List[Dict], kickoff_windows: Lis
     return merged
 
 
-def _score_at_time(score_samples: List[Dict], t: float) -> Tuple[int, int]:
-    if not score_samples:
+def _score_at_time(score_index: _SampleIndex, t: float) -> Tuple[int, int]:
+    if not score_index.samples:
         return 0, 0
-    blue = int(score_samples[0].get("blue", 0) or 0)
-    orange = int(score_samples[0].get("orange", 0) or 0)
-    for s in score_samples:
-        if float(s.get("time_s", 0.0)) <= float(t):
-            blue = int(s.get("blue", blue) or blue)
-            orange = int(s.get("orange", orange) or orange)
-        else:
-            break
-    return blue, orange
+    s = score_index.samples[max(0, score_index.position(t))]
+    return int(s.get("blue", 0) or 0), int(s.get("orange", 0) or 0)
+
+
+_PAUSED_STATE_MARKERS = ("countdown", "post", "replay", "ended", "inactive", "pregame")
 
 
 def _annotate_df_game_state(df: pd.DataFrame, replay_meta: Dict) -> pd.DataFrame:
     out = df.copy()
-    times = pd.to_numeric(out["time"], errors="coerce").fillna(0.0).to_list()
+    times = pd.to_numeric(out["time"], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
     clock_samples = list(replay_meta.get("clock_samples", []) or [])
     goal_windows = list(replay_meta.get("goal_pause_windows", []) or [])
     kickoff_windows = list(replay_meta.get("kickoff_pause_windows", []) or [])
     overtime_samples = list(replay_meta.get("overtime_samples", []) or [])
     inactive_windows = list(replay_meta.get("inactive_windows", []) or [])
     state_name_samples = list(replay_meta.get("state_name_samples", []) or [])
-    out["seconds_remaining"] = [float(_seconds_remaining_at_time(clock_samples, t)) for t in times]
-    out["is_overtime"] = [1 if _bool_at_time(overtime_samples, t, "is_overtime", False) else 0 for t in times]
-    out["is_goal_pause"] = [0] * len(times)
-    out["is_kickoff_pause"] = [0] * len(times)
-    out["is_inactive_phase"] = [0] * len(times)
-    for i, t in enumerate(times):
-        gp = any(float(w.get("pause_start_s", 0.0)) <= t < float(w.get("pause_end_s", 0.0)) for w in goal_windows)
-        kp = any(float(w.get("start_s", 0.0)) <= t < float(w.get("end_s", 0.0)) for w in kickoff_windows)
-        ip = any(float(w.get("start_s", 0.0)) <= t < float(w.get("end_s", 0.0)) for w in inactive_windows)
-        st = str(_sample_value_at_time(state_name_samples, t, "state_name", "") or "").lower()
-        paused_state = any(k in st for k in ("countdown", "post", "replay", "ended", "inactive", "pregame"))
-        if paused_state:
-            ip = True
-        out.at[i, "is_goal_pause"] = 1 if gp else 0
-        out.at[i, "is_kickoff_pause"] = 1 if kp else 0
-        out.at[i, "is_inactive_phase"] = 1 if ip else 0
-    out["active_play"] = ((out["is_goal_pause"] == 0) & (out["is_kickoff_pause"] == 0) & (out["is_inactive_phase"] == 0)).astype(int)
+
+    seconds_remaining = _values_at_times(clock_samples, times, "seconds_remaining", 300.0, float)
+    out["seconds_remaining"] = np.maximum(0.0, seconds_remaining)
+    out["is_overtime"] = _values_at_times(overtime_samples, times, "is_overtime", False, bool).astype(np.int64)
+
+    gp = _window_mask(times, goal_windows, "pause_start_s", "pause_end_s")
+    kp = _window_mask(times, kickoff_windows, "start_s", "end_s")
+    ip = _window_mask(times, inactive_windows, "start_s", "end_s")
+    paused_state = _values_at_times(
+        state_name_samples,
+        times,
+        "state_name",
+        "",
+        lambda v: any(k in str(v or "").lower() for k in _PAUSED_STATE_MARKERS),
+    )
+    ip = ip | paused_state
+    out["is_goal_pause"] = gp.astype(np.int64)
+    out["is_kickoff_pause"] = kp.astype(np.int64)
+    out["is_inactive_phase"] = ip.astype(np.int64)
+    out["active_play"] = (~(gp | kp | ip)).astype(np.int64)
     return out
 
 
@@ -244,62 +290,127 @@ def _discover_players(df: pd.DataFrame) -> List[str]:
     return sorted(set(players))
 
 
+_TIMELINE_BALL_FIELDS = [
+    ("x", "Ball_x", None),
+    ("y", "Ball_y", None),
+    ("z", "Ball_z", None),
+    ("qx", "Ball_rot_x", 0.0),
+    ("qy", "Ball_rot_y", 0.0),
+    ("qz", "Ball_rot_z", 0.0),
+    ("qw", "Ball_rot_w", 1.0),
+    ("wx", "Ball_ang_vel_x", 0.0),
+    ("wy", "Ball_ang_vel_y", 0.0),
+    ("wz", "Ball_ang_vel_z", 0.0),
+    ("vx", "Ball_vel_x", 0.0),
+    ("vy", "Ball_vel_y", 0.0),
+    ("vz", "Ball_vel_z", 0.0),
+]
+
+# (timeline key, column suffix, default when the column is missing, kind)
+_TIMELINE_PLAYER_FIELDS = [
+    ("x", "_x", None, "float"),
+    ("y", "_y", None, "float"),
+    ("z", "_z", None, "float"),
+    ("boost", "_boost", 0.0, "float"),
+    ("steer", "_steer", 0.0, "float"),
+    ("throttle", "_throttle", 0.0, "float"),
+    ("jump", "_jump", 0, "int"),
+    ("double_jump", "_double_jump", 0, "int"),
+    ("handbrake", "_handbrake", 0, "int"),
+    ("qx", "_rot_x", 0.0, "float"),
+    ("qy", "_rot_y", 0.0, "float"),
+    ("qz", "_rot_z", 0.0, "float"),
+    ("qw", "_rot_w", 1.0, "float"),
+    ("yaw", "_yaw", 0.0, "float"),
+    ("pitch", "_pitch", 0.0, "float"),
+    ("roll", "_roll", 0.0, "float"),
+    ("wx", "_ang_vel_x", 0.0, "float"),
+    ("wy", "_ang_vel_y", 0.0, "float"),
+    ("wz", "_ang_vel_z", 0.0, "float"),
+    ("vx", "_vel_x", 0.0, "float"),
+    ("vy", "_vel_y", 0.0, "float"),
+    ("vz", "_vel_z", 0.0, "float"),
+]
+
+_TIMELINE_FLAG_FIELDS = [
+    ("is_overtime", 0),
+    ("is_goal_pause", 0),
+    ("is_kickoff_pause", 0),
+    ("is_inactive_phase", 0),
+    ("active_play", 1),
+]
+
+
+def _column_values(df: pd.DataFrame, col: str, default, kind: str = "float") -> List:
+    n = len(df)
+    if col not in df.columns:
+        if default is None:
+            raise KeyError(col)
+        if kind == "bool":
+            default = bool(default)
+        else:
+            default = float(default) if kind == "float" else int(default)
+        return [default] * n
+    arr = df[col].to_numpy(dtype=np.float64)
+    if kind == "int":
+        return arr.astype(np.int64).tolist()
+    if kind == "bool":
+        return (arr.astype(np.int64) != 0).tolist()
+    return arr.tolist()
+
+
+def _column_array(df: pd.DataFrame, col: str, default, kind: str = "float") -> np.ndarray:
+    # Float64 twin of _column_values (ints truncated the same way) for the timeline index.
+    if col not in df.columns:
+        if default is None:
+            raise KeyError(col)
+        return np.full(len(df), float(int(default) if kind == "int" else default))
+    arr = df[col].to_numpy(dtype=np.float64)
+    if kind == "int":
+        return arr.astype(np.int64).astype(np.float64)
+    return arr
+
+
+def _build_timeline_index(df: pd.DataFrame, players: List[str], timeline: List[Dict]) -> TimelineIndex:
+    ball_specs = {key: (col, default) for key, col, default in _TIMELINE_BALL_FIELDS}
+    player_specs = {key: (suffix, default, kind) for key, suffix, default, kind in _TIMELINE_PLAYER_FIELDS}
+    ball = {k: _column_array(df, *ball_specs[k]) for k in BALL_FIELDS}
+    player_cols: Dict[str, Dict[str, np.ndarray]] = {}
+    for p in players:
+        if p in player_cols:
+            continue
+        cols = {}
+        for k in PLAYER_FIELDS:
+            suffix, default, kind = player_specs[k]
+            cols[k] = _column_array(df, f"{p}{suffix}", default, kind)
+        player_cols[p] = cols
+    return TimelineIndex.from_columns(timeline, _column_array(df, "time", None), ball, player_cols)
+
+
 def _build_timeline(df: pd.DataFrame, players: List[str]) -> List[Dict]:
+    # Pull every column once as a flat list, then assemble frames row-wise from the lists.
+    times = _column_values(df, "time", None)
+    seconds_remaining = _column_values(df, "seconds_remaining", 0.0)
+    flags = [(key, _column_values(df, key, default, "bool")) for key, default in _TIMELINE_FLAG_FIELDS]
+    ball_cols = [(key, _column_values(df, col, default)) for key, col, default in _TIMELINE_BALL_FIELDS]
+    player_cols = [
+        (p, [(key, _column_values(df, f"{p}{suffix}", default, kind)) for key, suffix, default, kind in _TIMELINE_PLAYER_FIELDS])
+        for p in players
+    ]
+
     out: List[Dict] = []
-    for _, row in df.iterrows():
-        frame = {
-            "t": float(row["time"]),
-            "seconds_remaining": float(row.get("seconds_remaining", 0.0)),
-            "is_overtime": bool(int(row.get("is_overtime", 0) or 0)),
-            "is_goal_pause": bool(int(row.get("is_goal_pause", 0) or 0)),
-            "is_kickoff_pause": bool(int(row.get("is_kickoff_pause", 0) or 0)),
-            "is_inactive_phase": bool(int(row.get("is_inactive_phase", 0) or 0)),
-            "active_play": bool(int(row.get("active_play", 1) or 0)),
-            "ball": {
-                "x": float(row["Ball_x"]),
-                "y": float(row["Ball_y"]),
-                "z": float(row["Ball_z"]),
-                "qx": float(row.get("Ball_rot_x", 0.0)),
-                "qy": float(row.get("Ball_rot_y", 0.0)),
-                "qz": float(row.get("Ball_rot_z", 0.0)),
-                "qw": float(row.get("Ball_rot_w", 1.0)),
-                "wx": float(row.get("Ball_ang_vel_x", 0.0)),
-                "wy": float(row.get("Ball_ang_vel_y", 0.0)),
-                "wz": float(row.get("Ball_ang_vel_z", 0.0)),
-                "vx": float(row.get("Ball_vel_x", 0.0)),
-                "vy": float(row.get("Ball_vel_y", 0.0)),
-                "vz": float(row.get("Ball_vel_z", 0.0)),
-            },
-            "players": [],
-        }
-        for p in players:
-            frame["players"].append(
-                {
-                    "name": p,
-                    "x": float(row[f"{p}_x"]),
-                    "y": float(row[f"{p}_y"]),
-                    "z": float(row[f"{p}_z"]),
-                    "boost": float(row.get(f"{p}_boost", 0.0)),
-                    "steer": float(row.get(f"{p}_steer", 0.0)),
-                    "throttle": float(row.get(f"{p}_throttle", 0.0)),
-                    "jump": int(row.get(f"{p}_jump", 0)),
-                    "double_jump": int(row.get(f"{p}_double_jump", 0)),
-                    "handbrake": int(row.get(f"{p}_handbrake", 0)),
-                    "qx": float(row.get(f"{p}_rot_x", 0.0)),
-                    "qy": float(row.get(f"{p}_rot_y", 0.0)),
-                    "qz": float(row.get(f"{p}_rot_z", 0.0)),
-                    "qw": float(row.get(f"{p}_rot_w", 1.0)),
-                    "yaw": float(row.get(f"{p}_yaw", 0.0)),
-                    "pitch": float(row.get(f"{p}_pitch", 0.0)),
-                    "roll": float(row.get(f"{p}_roll", 0.0)),
-                    "wx": float(row.get(f"{p}_ang_vel_x", 0.0)),
-                    "wy": float(row.get(f"{p}_ang_vel_y", 0.0)),
-                    "wz": float(row.get(f"{p}_ang_vel_z", 0.0)),
-                    "vx": float(row.get(f"{p}_vel_x", 0.0)),
-                    "vy": float(row.get(f"{p}_vel_y", 0.0)),
-                    "vz": float(row.get(f"{p}_vel_z", 0.0)),
-                }
-            )
+    for i in range(len(times)):
+        frame = {"t": times[i], "seconds_remaining": seconds_remaining[i]}
+        for key, vals in flags:
+            frame[key] = vals[i]
+        frame["ball"] = {key: vals[i] for key, vals in ball_cols}
+        players_out = []
+        for p, cols in player_cols:
+            pf = {"name": p}
+            for key, vals in cols:
+                pf[key] = vals[i]
+            players_out.append(pf)
+        frame["players"] = players_out
         out.append(frame)
     return out
 
@@ -321,11 +432,8 @@ def _parse_replay_date_iso(v: Any) -> str:
     return ""
 
 
-def _extract_replay_meta(json_path: Path, timeline_start_t: float, timeline_end_t: float) -> Dict:
-    try:
-        with open(json_path, "r", encoding="utf-8", errors="replace") as f:
-            payload = json.loads(f.readline())
-    except Exception:
+def _extract_replay_meta(decoded: DecodedReplay | None, timeline_start_t: float, timeline_end_t: float) -> Dict:
+    if decoded is None:
         return {
             "map_name": "",
             "team_scores_final": {"blue": 0, "orange": 0},
@@ -344,8 +452,7 @@ def _extract_replay_meta(json_path: Path, timeline_start_t: float, timeline_end_
             "replay_date_iso": "",
         }
 
-    props = payload.get("properties", {}) or {}
-    frames = (payload.get("network_frames", {}) or {}).get("frames", []) or []
+    props = decoded.properties or {}
 
     goals = []
     player_teams: Dict[str, int] = {}
@@ -375,85 +482,12 @@ def _extract_replay_meta(json_path: Path, timeline_start_t: float, timeline_end_
         except Exception:
             continue
 
-    # Pull authoritative countdown updates and score updates from replay frames.
-    objects = payload.get("objects", []) or []
-    sec_obj_id = None
-    overtime_obj_id = None
-    ball_hit_obj_id = None
-    match_ended_obj_id = None
-    state_name_obj_id = None
-    try:
-        sec_obj_id = int(objects.index("TAGame.GameEvent_Soccar_TA:SecondsRemaining"))
-    except ValueError:
-        sec_obj_id = 107  # Common id in many rrrocket outputs.
-    try:
-        overtime_obj_id = int(objects.index("TAGame.GameEvent_Soccar_TA:bOverTime"))
-    except ValueError:
-        overtime_obj_id = 104
-    try:
-        ball_hit_obj_id = int(objects.index("TAGame.GameEvent_Soccar_TA:bBallHasBeenHit"))
-    except ValueError:
-        ball_hit_obj_id = 105
-    try:
-        match_ended_obj_id = int(objects.index("TAGame.GameEvent_Soccar_TA:bMatchEnded"))
-    except ValueError:
-        match_ended_obj_id = 101
-    try:
-        state_name_obj_id = int(objects.index("TAGame.GameEvent_TA:ReplicatedStateName"))
-    except ValueError:
-        state_name_obj_id = 73
-
-    def _to_seconds(attr: dict) -> float | None:
-        if not isinstance(attr, dict) or not attr:
-            return None
-        if "Int" in attr:
-            try:
-                return float(attr["Int"])
-            except (TypeError, ValueError):
-                return None
-        for v in attr.values():
-            if isinstance(v, (int, float)):
-                return float(v)
-        return None
-
-    clock_samples: List[Dict] = []
-    overtime_samples: List[Dict] = []
-    ball_hit_samples: List[Dict] = []
-    match_ended_samples: List[Dict] = []
-    state_name_samples: List[Dict] = []
-    for fr in frames:
-        t = float(fr.get("time", 0.0) or 0.0)
-        for u in fr.get("updated_actors", []) or []:
-            oid = int(u.get("object_id", -1))
-            if oid == sec_obj_id:
-                sec = _to_seconds(u.get("attribute"))
-                if sec is None:
-                    continue
-                if clock_samples and abs(clock_samples[-1]["time_s"] - t) < 1e-6:
-                    clock_samples[-1]["seconds_remaining"] = sec
-                else:
-                    clock_samples.append({"time_s": t, "seconds_remaining": sec})
-                continue
-            if oid == overtime_obj_id:
-                attr = u.get("attribute", {}) or {}
-                raw = next(iter(attr.values())) if attr else False
-                overtime_samples.append({"time_s": t, "is_overtime": bool(raw)})
-                continue
-            if oid == ball_hit_obj_id:
-                attr = u.get("attribute", {}) or {}
-                raw = next(iter(attr.values())) if attr else False
-                ball_hit_samples.append({"time_s": t, "ball_has_been_hit": bool(raw)})
-                continue
-            if oid == match_ended_obj_id:
-                attr = u.get("attribute", {}) or {}
-                raw = next(iter(attr.values())) if attr else False
-                match_ended_samples.append({"time_s": t, "match_ended": bool(raw)})
-                continue
-            if oid == state_name_obj_id:
-                attr = u.get("attribute", {}) or {}
-                raw = next(iter(attr.values())) if attr else ""
-                state_name_samples.append({"time_s": t, "state_name": str(raw or "")})
-                continue
+    # Countdown, overtime and kickoff samples are collected during the shared frame decode.
+    clock_samples: List[Dict] = list(decoded.clock_samples)
+    overtime_samples: List[Dict] = list(decoded.overtime_samples)
+    ball_hit_samples: List[Dict] = list(decoded.ball_hit_samples)
+    match_ended_samples: List[Dict] = list(decoded.match_ended_samples)
+    state_name_samples: List[Dict] = list(decoded.state_name_samples)
     # Build scoreboard timeline from official goal list so it only changes on goals.
     score_samples: List[Dict] = [{"time_s": float(timeline_start_t), "blue": 0, "orange": 0}]
     blue = 0
@@ -467,6 +501,7 @@ def _extract_replay_meta(json_path: Path, timeline_start_t: float, timeline_end_
         else:
             continue
         score_samples.append({"time_s": float(g["time_s"]), "blue": blue, "orange": orange})
+    score_index = _SampleIndex(score_samples)
     goal_pause_windows: List[Dict] = []
     for s in score_samples[1:]:
         gs = float(s.get("time_s", 0.0))
@@ -504,7 +539,7 @@ def _extract_replay_meta(json_path: Path, timeline_start_t: float, timeline_end_
             break
     tie_at_zero = False
     if zero_clock_t is not None:
-        b0, o0 = _score_at_time(score_samples, zero_clock_t)
+        b0, o0 = _score_at_time(score_index, zero_clock_t)
         tie_at_zero = b0 == o0
     if zero_clock_t is not None and tie_at_zero:
         for s in overtime_samples:
@@ -540,309 +575,132 @@ def _extract_replay_meta(json_path: Path, timeline_start_t: float, timeline_end_
     }
 
 
-def _extract_boost_and_demo_from_json(json_path: Path) -> tuple[Dict[str, List[Dict]], List[Dict]]:
-    try:
-        with open(json_path, "r", encoding="utf-8", errors="replace") as f:
-            payload = json.loads(f.readline())
-    except Exception:
-        return {}, []
-
-    objects = payload.get("objects", []) or []
-    frames = (payload.get("network_frames", {}) or {}).get("frames", []) or []
-    object_id_to_name = {i: n for i, n in enumerate(objects)}
-
-    pri_map: Dict[int, str] = {}
-    car_pri_map: Dict[int, int] = {}
-    comp_to_car_map: Dict[int, int] = {}
-    actor_class_map: Dict[int, str] = {}
-    boost_component_candidates: set[int] = set()
-    unresolved_boost_by_component: Dict[int, List[Dict]] = {}
-    unresolved_demo_by_victim_actor: Dict[int, List[Dict]] = {}
-    boost_by_player: Dict[str, List[Dict]] = {}
-    demo_events: List[Dict] = []
-
-    def _extract_numeric(attr: dict) -> float | None:
-        if not isinstance(attr, dict):
-            return None
-        for k in (
-            "boost_amount",
-            "ReplicatedBoostAmount",
-            "CurrentBoostAmount",
-            "ServerConfirmBoostAmount",
-            "ClientFixBoostAmount",
-            "Byte",
-            "Int",
-            "Float",
-        ):
-            v = attr.get(k)
-            if isinstance(v, (int, float)):
-                return float(v)
-        for v in attr.values():
-            if isinstance(v, (int, float)):
-                return float(v)
-            if isinstance(v, dict):
-                nested = _extract_numeric(v)
-                if nested is not None:
-                    return float(nested)
-        return None
-
-    def _resolve_player_from_car_actor(car_actor_id: int) -> str:
-        pri_id = car_pri_map.get(car_actor_id)
-        if not isinstance(pri_id, int) or pri_id < 0:
-            return ""
-        return str(pri_map.get(pri_id) or "")
-
-    def _append_boost_for_component(component_actor_id: int, time_s: float, boost_pct: float) -> None:
-        car_id = comp_to_car_map.get(component_actor_id)
-        if isinstance(car_id, int):
-            player = _resolve_player_from_car_actor(car_id)
-            if player:
-                boost_by_player.setdefault(player, []).append({"time_s": float(time_s), "boost": float(boost_pct)})
-                return
-        unresolved_boost_by_component.setdefault(component_actor_id, []).append(
-            {"time_s": float(time_s), "boost": float(boost_pct)}
-        )
-
-    def _flush_component_boost(component_actor_id: int) -> None:
-        pending = unresolved_boost_by_component.pop(component_actor_id, None)
-        if not pending:
-            return
-        car_id = comp_to_car_map.get(component_actor_id)
-        if not isinstance(car_id, int):
-            unresolved_boost_by_component[component_actor_id] = pending
-            return
-        player = _resolve_player_from_car_actor(car_id)
-        if not player:
-            unresolved_boost_by_component[component_actor_id] = pending
-            return
-        out = boost_by_player.setdefault(player, [])
-        out.extend(pending)
-
-    def _flush_unresolved_demos_for_car(car_actor_id: int) -> None:
-        pending = unresolved_demo_by_victim_actor.pop(car_actor_id, None)
-        if not pending:
-            return
-        victim_name = _resolve_player_from_car_actor(car_actor_id)
-        for ev in pending:
-            ev["victim_player"] = victim_name
-            demo_events.append(ev)
-
-    for fr in frames:
-        t = float(fr.get("time", 0.0) or 0.0)
-
-        for new_actor in fr.get("new_actors", []) or []:
-            actor_id = int(new_actor.get("actor_id", -1))
-            object_id = int(new_actor.get("object_id", -1))
-            actor_class = object_id_to_name.get(object_id, "")
-            actor_class_map[actor_id] = actor_class
-            if "CarComponent_Boost" in actor_class:
-                boost_component_candidates.add(actor_id)
-
-        for deleted in fr.get("deleted_actors", []) or []:
-            did = int(deleted)
-            car_pri_map.pop(did, None)
-            comp_to_car_map.pop(did, None)
-            boost_component_candidates.discard(did)
-            unresolved_boost_by_component.pop(did, None)
-            unresolved_demo_by_victim_actor.pop(did, None)
-
-        for up in fr.get("updated_actors", []) or []:
-            actor_id = int(up.get("actor_id", -1))
-            object_id = int(up.get("object_id", -1))
-            prop_name = object_id_to_name.get(object_id, "")
-            attrs = up.get("attribute", {}) or {}
-            val = next(iter(attrs.values())) if attrs else None
-            actor_class = actor_class_map.get(actor_id, "")
-
-            if "PlayerName" in prop_name and isinstance(val, str):
-                pri_map[actor_id] = val
-
-            if "Pawn:PlayerReplicationInfo" in prop_name:
-                actor_class = actor_class_map.get(actor_id, "")
-                # Ignore non-car actors which also replicate PRI pointers in some modes.
-                if "Car" not in actor_class:
-                    continue
-                pri_id = None
-                if isinstance(val, dict) and "ActiveActor" in attrs:
-                    aa = attrs["ActiveActor"]
-                    if aa.get("active"):
-                        pri_id = aa.get("actor")
-                elif isinstance(val, int):
-                    pri_id = val
-                if isinstance(pri_id, int) and pri_id >= 0:
-                    car_pri_map[actor_id] = pri_id
-                    _flush_unresolved_demos_for_car(actor_id)
-                    for comp_actor_id, car_id in list(comp_to_car_map.items()):
-                        if car_id == actor_id:
-                            _flush_component_boost(comp_actor_id)
-
-            if "CarComponent_TA:Vehicle" in prop_name:
-                car_id = None
-                if isinstance(val, dict) and "ActiveActor" in attrs:
-                    aa = attrs["ActiveActor"]
-                    if aa.get("active"):
-                        car_id = aa.get("actor")
-                elif isinstance(val, int):
-                    car_id = val
-                if isinstance(car_id, int) and car_id >= 0 and (
-                    "CarComponent_Boost" in actor_class or actor_id in boost_component_candidates or actor_id in unresolved_boost_by_component
-                ):
-                    comp_to_car_map[actor_id] = car_id
-                    _flush_component_boost(actor_id)
-
-            if (
-                "ReplicatedBoost" in prop_name
-                or "ReplicatedBoostAmount" in prop_name
-                or "CurrentBoostAmount" in prop_name
-                or "ServerConfirmBoostAmount" in prop_name
-                or "ClientFixBoostAmount" in prop_name
-            ):
-                num = _extract_numeric(attrs)
-                if num is None:
-                    if isinstance(val, (int, float)):
-                        num = float(val)
-                    else:
-                        continue
-                boost_pct = max(0.0, min(100.0, (num / 255.0) * 100.0 if num > 1.0 else num * 100.0))
-                boost_component_candidates.add(actor_id)
-                _append_boost_for_component(actor_id, t, boost_pct)
-
-            if "ReplicatedDemolishGoalExplosion" in prop_name:
-                fx = attrs.get("DemolishFx")
-                if not isinstance(fx, dict):
-                    continue
-                victim_id = None
-                attacker_id = None
-                if fx.get("victim_flag"):
-                    victim_id = fx.get("victim")
-                if fx.get("attacker_flag"):
-                    attacker_id = fx.get("attacker")
-                if not isinstance(victim_id, int):
-                    continue
-                victim_name = _resolve_player_from_car_actor(victim_id)
-                attacker_name = _resolve_player_from_car_actor(attacker_id) if isinstance(attacker_id, int) else ""
-                ev = {
-                    "time_s": float(t),
-                    "victim_actor_id": int(victim_id),
-                    "victim_player": str(victim_name or ""),
-                    "attacker_actor_id": int(attacker_id) if isinstance(attacker_id, int) else -1,
-                    "attacker_player": str(attacker_name or ""),
-                }
-                if victim_name:
-                    demo_events.append(ev)
-                else:
-                    unresolved_demo_by_victim_actor.setdefault(victim_id, []).append(ev)
-
-            if "ReplicatedDemolishExtended" in prop_name:
-                d = attrs.get("DemolishExtended")
-                if not isinstance(d, dict):
-                    continue
-                victim = d.get("victim")
-                attacker = d.get("attacker")
-                victim_id = victim.get("actor") if isinstance(victim, dict) and victim.get("active") else None
-                attacker_id = attacker.get("actor") if isinstance(attacker, dict) and attacker.get("active") else None
-                if not isinstance(victim_id, int):
-                    continue
-                victim_class = actor_class_map.get(victim_id, "")
-                if "Car" not in victim_class:
-                    continue
-                victim_name = _resolve_player_from_car_actor(victim_id)
-                attacker_name = _resolve_player_from_car_actor(attacker_id) if isinstance(attacker_id, int) else ""
-                ev = {
-                    "time_s": float(t),
-                    "victim_actor_id": int(victim_id),
-                    "victim_player": str(victim_name or ""),
-                    "attacker_actor_id": int(attacker_id) if isinstance(attacker_id, int) else -1,
-                    "attacker_player": str(attacker_name or ""),
-                }
-                if victim_name:
-                    demo_events.append(ev)
-                else:
-                    unresolved_demo_by_victim_actor.setdefault(victim_id, []).append(ev)
-
-    # Late flush in case some mappings are only available near end-of-file.
-    for comp_actor_id in list(unresolved_boost_by_component.keys()):
-        _flush_component_boost(comp_actor_id)
-    for victim_actor_id in list(unresolved_demo_by_victim_actor.keys()):
-        _flush_unresolved_demos_for_car(victim_actor_id)
-
-    for name, arr in boost_by_player.items():
-        arr.sort(key=lambda x: x["time_s"])
-        dedup: List[Dict] = []
-        for s in arr:
-            if dedup and abs(dedup[-1]["time_s"] - s["time_s"]) < 1e-6:
-                dedup[-1]["boost"] = float(s["boost"])
-            else:
-                dedup.append({"time_s": float(s["time_s"]), "boost": float(s["boost"])})
-        boost_by_player[name] = dedup
-    demo_events.sort(key=lambda x: x["time_s"])
-    dedup_demo: List[Dict] = []
-    for ev in demo_events:
-        if dedup_demo:
-            prev = dedup_demo[-1]
-            if (
-                abs(float(prev["time_s"]) - float(ev["time_s"])) < 1e-4
-                and int(prev.get("victim_actor_id", -1)) == int(ev.get("victim_actor_id", -2))
-                and int(prev.get("attacker_actor_id", -1)) == int(ev.get("attacker_actor_id", -2))
-            ):
-                continue
-        dedup_demo.append(ev)
-    demo_events = dedup_demo
-    return boost_by_player, demo_events
+def _metric_points(series: Dict[str, List]) -> List[Dict]:
+    keys = METRIC_KEYS + DEBUG_METRIC_KEYS
+    columns = [(k, series.get(k)) for k in keys]
+    out: List[Dict] = []
+    for i, t in enumerate(series.get("timestamp", [])):
+        point = {"t": float(t)}
+        for k, vals in columns:
+            point[k] = float(vals[i]) if vals is not None else 0.0
+        out.append(point)
+    return out
 
 
-def _compute_metrics_for_player(df: pd.DataFrame, players: List[str], player: str, timeline: List[Dict] | None = None) -> tuple[List[Dict], List[Dict]]:
+def _refine_player_metrics(
+    timeline: List[Dict] | None,
+    player: str,
+    timeline_metrics: List[Dict],
+    events: List[Dict],
+    index: TimelineIndex | None = None,
+) -> List[Dict]:
+    if not timeline:
+        return events
+    events, counts = refine_events_posthoc(timeline, player, events, index=index)
+    apply_whiff_rate_from_events(timeline_metrics, events, window_s=10.0)
+    for pt in timeline_metrics:
+        for k, v in counts.items():
+            pt[k] = float(v)
+    return events
+
+
+def _compute_metrics_for_player(
+    df: pd.DataFrame,
+    players: List[str],
+    player: str,
+    timeline: List[Dict] | None = None,
+    builder: ReplayPacketBuilder | None = None,
+    index: TimelineIndex | None = None,
+) -> tuple[List[Dict], List[Dict]]:
     if player not in players:
         raise RuntimeError(f"Unknown player '{player}'")
-    builder = ReplayPacketBuilder(df=df, players=players)
-    p_idx = players.index(player)
-    engine = LiveMetricsEngine(window_seconds=10.0)
-    timeline_metrics: List[Dict] = []
-    for i in range(len(df)):
-        packet = builder.build(i)
-        engine.update(packet, player_index=p_idx)
-        current, _, _ = engine.snapshot()
-        point = {"t": float(current.get("timestamp", float(df.iloc[i]["time"])))}
-        for k in METRIC_KEYS:
-            point[k] = float(current.get(k, 0.0))
-        for k in DEBUG_METRIC_KEYS:
-            point[k] = float(current.get(k, 0.0))
-        timeline_metrics.append(point)
-    _, _, events = engine.snapshot()
-    if timeline:
-        events, counts = refine_events_posthoc(timeline, player, events)
-        apply_whiff_rate_from_events(timeline_metrics, events, window_s=10.0)
-        for pt in timeline_metrics:
-            for k, v in counts.items():
-                pt[k] = float(v)
+    if builder is None:
+        builder = ReplayPacketBuilder(df=df, players=players)
+    series, events = compute_metrics_batch(FrameArrays(**builder.frame_arrays()), players.index(player), window_seconds=10.0)
+    timeline_metrics = _metric_points(series)
+    events = _refine_player_metrics(timeline, player, timeline_metrics, events, index=index)
     return timeline_metrics, events
 
 
-def _compute_metrics_for_all_players(df: pd.DataFrame, players: List[str]) -> tuple[Dict[str, List[Dict]], Dict[str, List[Dict]]]:
-    if not players:
+def _player_metrics_worker(
+    spec: Dict, player: str, player_index: int, index_players: List[str] | None
+) -> tuple[List[Dict], List[Dict]]:
+    # Runs in a pool process: map the parent's frame arrays instead of receiving a pickled copy, then
+    # refine against an index rebuilt from the shared timeline columns ("index_*").
+    shm, arrays = attach_arrays(spec)
+    try:
+        frames = FrameArrays(**{k: v for k, v in arrays.items() if not k.startswith("index_")})
+        series, events = compute_metrics_batch(frames, player_index, window_seconds=10.0)
+        timeline_metrics = _metric_points(series)
+        if index_players is not None:
+            # Copied out of the block: the index and its ColumnTimeline reference each other, so
+            # they may outlive this call and must not hold views into memory that gets closed.
+            index_arrays = {k[len("index_"):]: np.array(v) for k, v in arrays.items() if k.startswith("index_")}
+            index = TimelineIndex.from_column_arrays(index_players, index_arrays)
+            events = _refine_player_metrics(index.timeline, player, timeline_metrics, events, index=index)
+    finally:
+        frames = arrays = None
+        shm.close()
+    return timeline_metrics, events
+
+
+def _metrics_worker_count(workers: int | None, player_count: int) -> int:
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return max(1, min(int(workers), player_count))
+
+
+def _compute_metrics_for_all_players(
+    df: pd.DataFrame,
+    players: List[str],
+    timeline: List[Dict] | None = None,
+    workers: int | None = None,
+    targets: List[str] | None = None,
+    index: TimelineIndex | None = None,
+) -> tuple[Dict[str, List[Dict]], Dict[str, List[Dict]]]:
+    targets = [p for p in players if targets is None or p in targets]
+    if not targets:
         return {}, {}
-    builder = ReplayPacketBuilder(df=df, players=players)
-    engines = [LiveMetricsEngine(window_seconds=10.0) for _ in players]
-    timeline_by_player: Dict[str, List[Dict]] = {p: [] for p in players}
-    events_by_player: Dict[str, List[Dict]] = {p: [] for p in players}
-
-    for i in range(len(df)):
-        packet = builder.build(i)
-        row_time = float(df.iloc[i]["time"])
-        for p_idx, player in enumerate(players):
-            engine = engines[p_idx]
-            engine.update(packet, player_index=p_idx)
-            current, _, _ = engine.snapshot()
-            point = {"t": float(current.get("timestamp", row_time))}
-            for k in METRIC_KEYS:
-                point[k] = float(current.get(k, 0.0))
-            for k in DEBUG_METRIC_KEYS:
-                point[k] = float(current.get(k, 0.0))
-            timeline_by_player[player].append(point)
-
-    for p_idx, player in enumerate(players):
-        _, _, events = engines[p_idx].snapshot()
+    if timeline:
+        index = ensure_timeline_index(timeline, index)
+    frames = FrameArrays(**ReplayPacketBuilder(df=df, players=players).frame_arrays())
+    results: Dict[str, tuple[List[Dict], List[Dict]]] = {}
+    worker_count = _metrics_worker_count(workers, len(targets))
+    if worker_count > 1:
+        shm = None
+        try:
+            shared = frame_arrays_dict(frames)
+            index_players = None
+            if timeline:
+                shared.update({f"index_{k}": v for k, v in index.column_arrays().items()})
+                index_players = list(index.players)
+            shm, spec = share_arrays(shared)
+            with ProcessPoolExecutor(max_workers=worker_count) as pool:
+                futures = {
+                    player: pool.submit(_player_metrics_worker, spec, player, players.index(player), index_players)
+                    for player in targets
+                }
+                results = {player: fut.result() for player, fut in futures.items()}
+        except (OSError, RuntimeError) as exc:
+            # No shared memory or process pool available here (or a worker died); fall back to in-process.
+            print(f"[replay_loader] parallel metrics unavailable, running serially: {exc}")
+            results = {}
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+    timeline_by_player: Dict[str, List[Dict]] = {}
+    events_by_player: Dict[str, List[Dict]] = {}
+    for player in targets:
+        if player in results:
+            timeline_metrics, events = results[player]
+        else:
+            series, events = compute_metrics_batch(frames, players.index(player), window_seconds=10.0)
+            timeline_metrics = _metric_points(series)
+            events = _refine_player_metrics(timeline, player, timeline_metrics, events, index=index)
         events_by_player[player] = events
+        timeline_by_player[player] = timeline_metrics
     return timeline_by_player, events_by_player
 
 
@@ -865,22 +723,22 @@ def load_replay_bytes(file_name: str, data: bytes, rrrocket_override: str | None
         if not ok:
             raise RuntimeError("rrrocket failed to parse replay.")
 
-        out_csv_name = f"{session_id}.csv"
         with contextlib.redirect_stdout(io.StringIO()):
-            extract_final(str(json_path), out_csv_name)
-
-        csv_path = Path(CSV_DIR) / out_csv_name
-        if not csv_path.exists():
-            raise RuntimeError("CSV extraction failed.")
+            decoded = decode_rrrocket_json(str(json_path))
+        if decoded is None:
+            raise RuntimeError("Could not read rrrocket JSON output.")
+        with contextlib.redirect_stdout(io.StringIO()):
+            df = extract_frame_table(decoded=decoded)
+        if df is None:
+            raise RuntimeError("Frame extraction failed.")
 
-        df = pd.read_csv(csv_path)
         replay_meta = _extract_replay_meta(
-            json_path,
+            decoded,
             float(df["time"].iloc[0]) if len(df) else 0.0,
             float(df["time"].iloc[-1]) if len(df) else 0.0,
         )
-        json_boost_by_player, demo_events = _extract_boost_and_demo_from_json(json_path)
-        replay_meta["demo_events"] = demo_events
+        json_boost_by_player = decoded.boost_by_player
+        replay_meta["demo_events"] = decoded.demo_events
 
         players = _discover_players(df)
         norm_json_boost = {_normalize_player_name(k): v for k, v in json_boost_by_player.items()}
@@ -926,14 +784,15 @@ def load_replay_bytes(file_name: str, data: bytes, rrrocket_override: str | None
 
     for c in ["time", "Ball_x", "Ball_y", "Ball_z"]:
         if c not in df.columns:
-            raise RuntimeError(f"Missing required column in extracted CSV: {c}")
+            raise RuntimeError(f"Missing required column in extracted frame table: {c}")
 
     players = _discover_players(df)
     if not players:
-        raise RuntimeError("No player position columns found in extracted replay CSV.")
+        raise RuntimeError("No player position columns found in extracted replay frames.")
 
     df = _annotate_df_game_state(df, replay_meta)
     timeline = _build_timeline(df, players)
+    timeline_index = _build_timeline_index(df, players, timeline)
     duration_s = float(df["time"].iloc[-1] - df["time"].iloc[0]) if len(df) > 1 else 0.0
 
     return ReplaySession(
@@ -945,20 +804,40 @@ def load_replay_bytes(file_name: str, data: bytes, rrrocket_override: str | None
         replay_meta=replay_meta,
         df=df,
         duration_s=duration_s,
+        timeline_index=timeline_index,
     )
 
 
+def session_timeline_index(session: ReplaySession) -> TimelineIndex:
+    # Built once per session (and again only if the timeline list is swapped out).
+    session.timeline_index = ensure_timeline_index(session.timeline or [], session.timeline_index)
+    return session.timeline_index
+
+
 def ensure_player_metrics(session: ReplaySession, player: str) -> None:
     if player in session.metrics_by_player and player in session.events_by_player:
         return
-    metrics, events = _compute_metrics_for_player(session.df, session.players, player, timeline=session.timeline)
+    metrics, events = _compute_metrics_for_player(
+        session.df,
+        session.players,
+        player,
+        timeline=session.timeline,
+        index=session_timeline_index(session),
+    )
     session.metrics_by_player[player] = metrics
     session.events_by_player[player] = events
 
 
-def ensure_all_player_metrics(session: ReplaySession) -> None:
-    if session.players and len(session.metrics_by_player) == len(session.players) and len(session.events_by_player) == len(session.players):
-        return
-    timelines, events = _compute_metrics_for_all_players(session.df, session.players)
-    session.metrics_by_player = timelines
-    session.events_by_player = events
+def compute_player_metrics(
+    session: ReplaySession, players: List[str], workers: int | None = None
+) -> tuple[Dict[str, List[Dict]], Dict[str, List[Dict]]]:
+    # Refined metrics/events for `players` without storing them on the session.
+    return _compute_metrics_for_all_players(
+        session.df,
+        session.players,
+        timeline=session.timeline,
+        workers=workers,
+        targets=players,
+        index=session_timeline_index(session),
+    )
+
@@ -1,77 +1,82 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from types import SimpleNamespace
-from typing import List
+from dataclasses import dataclass, field
+from typing import Dict, List
 
+import numpy as np
 import pandas as pd
 
 
-def _vec(x: float, y: float, z: float) -> SimpleNamespace:
-    return SimpleNamespace(x=float(x), y=float(y), z=float(z))
+def _float_array(df: pd.DataFrame, col: str, default: float) -> np.ndarray:
+    if col not in df.columns:
+        return np.full(len(df), float(default))
+    return df[col].to_numpy(dtype=np.float64)
+
+
+def _flag_array(df: pd.DataFrame, col: str, default: int) -> np.ndarray:
+    if col not in df.columns:
+        return np.full(len(df), bool(default))
+    return df[col].fillna(0).to_numpy(dtype=np.float64).astype(np.int64) != 0
+
+
+def _velocity(df: pd.DataFrame, vel_col: str, pos: np.ndarray, dt: np.ndarray) -> np.ndarray:
+    if vel_col in df.columns:
+        return df[vel_col].to_numpy(dtype=np.float64)
+    # Finite difference against the previous frame; the first frame has no motion.
+    delta = np.diff(pos, prepend=pos[:1]) if len(pos) else pos
+    return delta / dt
 
 
 @dataclass
 class ReplayPacketBuilder:
+    """
+    Extracts a replay frame table into whole-replay NumPy arrays once, velocities included (one
+    vectorized finite difference where the table has no vel columns). Replay metrics run through
+    batch_metrics_engine over these arrays; nothing feeds replay frames to LiveMetricsEngine as
+    packets any more, so there is no per-frame packet view.
+    """
+
     df: pd.DataFrame
     players: List[str]
+    _arrays: Dict[str, np.ndarray] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        df = self.df
+        n = len(df)
+        times = df["time"].to_numpy(dtype=np.float64)
+        dt = np.diff(times, prepend=times[:1]) if n else times
+        if n:
+            dt[0] = 1.0 / 30.0
+        dt = np.where(dt <= 1e-6, 1.0 / 30.0, dt)
+
+        car_pos = np.zeros((len(self.players), n, 3))
+        car_vel = np.zeros((len(self.players), n, 3))
+        car_boost = np.zeros((len(self.players), n))
+        for c, player in enumerate(self.players):
+            for a, axis in enumerate(("x", "y", "z")):
+                car_pos[c, :, a] = df[f"{player}_{axis}"].to_numpy(dtype=np.float64)
+                car_vel[c, :, a] = _velocity(df, f"{player}_vel_{axis}", car_pos[c, :, a], dt)
+            car_boost[c] = _float_array(df, f"{player}_boost", 0.0)
+        car_wheel_contact = car_pos[:, :, 2] <= 35.0
+
+        ball_pos = np.zeros((n, 3))
+        ball_vel = np.zeros((n, 3))
+        for a, axis in enumerate(("x", "y", "z")):
+            ball_pos[:, a] = df[f"Ball_{axis}"].to_numpy(dtype=np.float64)
+            ball_vel[:, a] = _velocity(df, f"Ball_vel_{axis}", ball_pos[:, a], dt)
+        active_play = _flag_array(df, "active_play", 1)
+
+        self._arrays = {
+            "times": times,
+            "car_pos": car_pos,
+            "car_vel": car_vel,
+            "car_boost": car_boost,
+            "car_wheel_contact": car_wheel_contact,
+            "ball_pos": ball_pos,
+            "ball_vel": ball_vel,
+            "active_play": active_play,
+        }
 
-    def build(self, idx: int):
-        row = self.df.iloc[idx]
-        prev_idx = max(0, idx - 1)
-        prev = self.df.iloc[prev_idx]
-
-        dt = float(row["time"] - prev["time"]) if idx > 0 else 1.0 / 30.0
-        if dt <= 1e-6:
-            dt = 1.0 / 30.0
-
-        cars = []
-        for player in self.players:
-            px, py, pz = float(row[f"{player}_x"]), float(row[f"{player}_y"]), float(row[f"{player}_z"])
-            ppx, ppy, ppz = float(prev[f"{player}_x"]), float(prev[f"{player}_y"]), float(prev[f"{player}_z"])
-            vx = float(row.get(f"{player}_vel_x", (px - ppx) / dt))
-            vy = float(row.get(f"{player}_vel_y", (py - ppy) / dt))
-            vz = float(row.get(f"{player}_vel_z", (pz - ppz) / dt))
-            has_wheel_contact = pz <= 35.0
-            boost = float(row.get(f"{player}_boost", 0.0))
-
-            cars.append(
-                SimpleNamespace(
-                    physics=SimpleNamespace(
-                        location=_vec(px, py, pz),
-                        velocity=_vec(vx, vy, vz),
-                        angular_velocity=_vec(0.0, 0.0, 0.0),
-                    ),
-                    boost=boost,
-                    has_wheel_contact=has_wheel_contact,
-                )
-            )
-
-        bx, by, bz = float(row["Ball_x"]), float(row["Ball_y"]), float(row["Ball_z"])
-        pbx, pby, pbz = float(prev["Ball_x"]), float(prev["Ball_y"]), float(prev["Ball_z"])
-        bvx = float(row.get("Ball_vel_x", (bx - pbx) / dt))
-        bvy = float(row.get("Ball_vel_y", (by - pby) / dt))
-        bvz = float(row.get("Ball_vel_z", (bz - pbz) / dt))
-
-        ball = SimpleNamespace(
-            physics=SimpleNamespace(
-                location=_vec(bx, by, bz),
-                velocity=_vec(bvx, bvy, bvz),
-                angular_velocity=_vec(0.0, 0.0, 0.0),
-            ),
-            latest_touch=None,
-        )
-
-        return SimpleNamespace(
-            num_cars=len(cars),
-            game_cars=cars,
-            game_ball=ball,
-            game_info=SimpleNamespace(
-                seconds_elapsed=float(row["time"]),
-                seconds_remaining=float(row.get("seconds_remaining", 0.0)),
-                is_kickoff_pause=bool(int(row.get("is_kickoff_pause", 0) or 0)),
-                is_overtime=bool(int(row.get("is_overtime", 0) or 0)),
-                is_round_active=bool(int(row.get("active_play", 1) or 0)),
-                active_play=bool(int(row.get("active_play", 1) or 0)),
-            ),
-        )
+    def frame_arrays(self) -> Dict[str, np.ndarray]:
+        """Whole-replay arrays (see batch_metrics_engine.FrameArrays) for offline metric backends."""
+        return dict(self._arrays)
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from typing import Any, Dict, Optional
 import threading
+import time
 import uuid
 import traceback
 import hashlib
@@ -20,8 +22,18 @@ for _p in (HERE, MILESTONE_ROOT, LIVE_ANALYSIS_DIR):
     if _ps not in sys.path:
         sys.path.insert(0, _ps)
 
-from replay_loader import DEBUG_METRIC_KEYS, METRIC_KEYS, ReplaySession, ensure_player_metrics, load_replay_bytes
+from replay_loader import (
+    DEBUG_METRIC_KEYS,
+    METRIC_KEYS,
+    ReplaySession,
+    compute_player_metrics,
+    ensure_player_metrics,
+    load_replay_bytes,
+    session_timeline_index,
+)
 from common.persistence import AppDB
+from event_stream import EventHub
+from timeline_chunks import CHUNK_FRAMES, frame_range, timeline_chunk, timeline_fields, timeline_times
 from recommendation_engine import compute_recommendations
 from mechanic_grader import grade_game_mechanics, summarize_mechanic_scores, explain_mechanic_event
 from llm_event_explainer import maybe_rewrite_explanation
@@ -34,6 +46,22 @@ class DuplicateReplayError(RuntimeError):
         self.existing_replay_name = str(existing_replay_name or "")
 
 
+# Parts of the store the HTTP layer caches responses for, each with its own version:
+#   status          -> /api/replay/status
+#   session         -> /api/replay/session and /session/header (session + analysis flags)
+#   mechanics       -> /api/mechanics/current and /events
+#   recommendations -> /api/recommendations/current
+REPLAY_SECTIONS = ("status", "session", "mechanics", "recommendations")
+
+
+def _changed(new: Any, old: Any) -> bool:
+    if new is old:
+        return False
+    if isinstance(new, (str, int, float, bool, type(None))):
+        return new != old
+    return True
+
+
 @dataclass
 class ReplayJobState:
     session_id: str = ""
@@ -76,10 +104,27 @@ class ReplaySharedState:
 
 
 class ReplayStateStore:
-    def __init__(self, *, db: AppDB):
+    def __init__(self, *, db: AppDB, precompute_workers: int = 0):
         self._lock = threading.Lock()
         self._state = ReplaySharedState()
         self._db = db
+        # > 0: compute every player's metrics right after a replay loads, over this many processes.
+        self.precompute_workers = max(0, int(precompute_workers))
+        # (session_id, player) pairs the precompute is working on; analysis waits for those rather than
+        # computing the same player a second time.
+        self._precomputing: set[tuple[str, str]] = set()
+        self._precompute_done = threading.Condition(self._lock)
+        # Server-Sent Events: "status" on job/metrics/analysis changes, "mechanics" when a grade lands.
+        self.events = EventHub()
+        self._pushed_status: Dict[str, Any] = {}
+        self._pushed_mechanics: Dict[str, Any] = {}
+        # Store version at which each REPLAY_SECTIONS entry last changed; the HTTP response cache
+        # keys encoded payloads on these.
+        self._version = 0
+        self._section_versions = {name: 0 for name in REPLAY_SECTIONS}
+        self._section_marks = self._section_marks_locked()
+        # (session_id, frame times, field names) for the loaded session's chunked timeline API.
+        self._timeline_meta: tuple[str, list[float], Dict[str, list[str]]] | None = None
         self._artifact_root = Path(__file__).resolve().parents[2] / "artifacts" / "replay_library"
         self._artifact_root.mkdir(parents=True, exist_ok=True)
 
@@ -131,14 +176,14 @@ class ReplayStateStore:
     def login_profile(self, *, username: str, rank_tier: str, platform: str, aliases: list[str] | None = None) -> Dict[str, Any]:
         profile = self._db.upsert_user(username=username, rank_tier=rank_tier, platform=platform, aliases=aliases)
         removed = int(self._db.prune_duplicate_replay_names(user_id=int(profile["id"])) or 0)
-        with self._lock:
+        with self._mutate():
             self._state.current_user = dict(profile)
             self._state.last_duplicate_cleanup_removed = removed
         return profile
 
     def logout_profile(self) -> None:
         self._db.clear_active_user()
-        with self._lock:
+        with self._mutate():
             self._state.current_user = {}
             self._state.recommendations = {}
             self._state.mechanics = {}
@@ -146,7 +191,7 @@ class ReplayStateStore:
     def refresh_recommendations(self) -> Dict[str, Any]:
         profile = self._require_user()
         payload = compute_recommendations(self._db, int(profile["id"]), window_size=5)
-        with self._lock:
+        with self._mutate():
             self._state.recommendations = dict(payload or {})
         return payload
 
@@ -158,7 +203,7 @@ class ReplayStateStore:
         if not profile:
             return {}
         payload = compute_recommendations(self._db, int(profile["id"]), window_size=5)
-        with self._lock:
+        with self._mutate():
             self._state.recommendations = dict(payload or {})
         return payload
 
@@ -167,8 +212,9 @@ class ReplayStateStore:
             if self._state.current_user:
                 return dict(self._state.current_user)
         profile = self._db.current_user() or {}
-        with self._lock:
-            self._state.current_user = dict(profile)
+        if profile:
+            with self._mutate():
+                self._state.current_user = dict(profile)
         return dict(profile)
 
     def _require_user(self) -> Dict[str, Any]:
@@ -267,7 +313,7 @@ class ReplayStateStore:
                 existing_replay_name=str(match.get("replay_name", "")),
             )
         session_id = uuid.uuid4().hex
-        with self._lock:
+        with self._mutate():
             self._set_job(
                 session_id=session_id,
                 status="parsing",
@@ -298,7 +344,7 @@ class ReplayStateStore:
         def _run():
             nonlocal session_id
             try:
-                with self._lock:
+                with self._mutate():
                     self._state.job.status = "parsing"
                     self._state.job.progress = 0.25
                     self._state.job.message = "Running rrrocket parser..."
@@ -311,13 +357,13 @@ class ReplayStateStore:
                 replay_dir.mkdir(parents=True, exist_ok=True)
                 replay_path = replay_dir / Path(file_name).name
                 replay_path.write_bytes(data)
-                with self._lock:
+                with self._mutate():
                     self._state.job.checklist["replay_parsed"] = True
                     self._state.job.checklist["timeline_ready"] = True
                     self._state.job.progress = max(self._state.job.progress, 0.8)
                     self._state.job.message = "Replay parsed and timeline built."
 
-                with self._lock:
+                with self._mutate():
                     target_player = ""
                     try:
                         names = [str(profile.get("username", "") or "")]
@@ -400,9 +446,11 @@ class ReplayStateStore:
                         replay_blob=data,
                         summary=summary,
                     )
+                if self.precompute_workers > 0:
+                    self._precompute_player_metrics(session)
             except Exception as exc:
                 trace = traceback.format_exc()
-                with self._lock:
+                with self._mutate():
                     self._set_job(
                         session_id=session_id,
                         status="error",
@@ -417,6 +465,69 @@ class ReplayStateStore:
         thread.start()
         return session_id
 
+    def _precompute_player_metrics(self, session: ReplaySession) -> None:
+        # Players already computing (analysis got there first) stay with that job; anything that
+        # fails here is computed again on demand.
+        with self._mutate():
+            if self._state.session is not session:
+                return
+            targets = [
+                p
+                for p in session.players
+                if not (p in session.metrics_by_player and p in session.events_by_player)
+                and (self._state.player_metric_jobs.get(p) or {}).get("status") != "computing"
+            ]
+            for p in targets:
+                self._state.player_metric_jobs[p] = {"status": "computing", "message": "Precomputing metrics...", "error": ""}
+                self._precomputing.add((session.session_id, p))
+            if targets:
+                self._update_metric_counts_locked(session)
+        if not targets:
+            return
+
+        started = time.perf_counter()
+        timelines: Dict[str, Any] = {}
+        events: Dict[str, Any] = {}
+        error = ""
+        try:
+            timelines, events = compute_player_metrics(session, targets, workers=self.precompute_workers)
+        except Exception as exc:
+            error = str(exc)
+            print(f"[replay_state_store] metric precompute failed: {exc}")
+        with self._mutate():
+            current = self._state.session is session
+            for p in targets:
+                self._precomputing.discard((session.session_id, p))
+                if p in timelines and p in events:
+                    session.metrics_by_player[p] = timelines[p]
+                    session.events_by_player[p] = events[p]
+                    job = {"status": "ready", "message": "Metrics ready.", "error": ""}
+                else:
+                    job = {"status": "error", "message": "Metric computation failed.", "error": error}
+                if current:
+                    self._state.player_metric_jobs[p] = job
+            if current:
+                self._update_metric_counts_locked(session)
+            self._precompute_done.notify_all()
+        if not error:
+            print(
+                f"[replay_state_store] precomputed metrics for {len(targets)} players "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+
+    def _update_metric_counts_locked(self, session: ReplaySession) -> None:
+        ready = sum(1 for p in session.players if p in session.metrics_by_player and p in session.events_by_player)
+        self._state.metrics_ready_count = ready
+        self._state.metrics_total_count = len(session.players)
+        if self._state.metrics_status != "live":
+            self._state.metrics_status = "ready" if ready >= len(session.players) else "computing"
+
+    def _ensure_player_metrics(self, session: ReplaySession, player: str) -> None:
+        with self._lock:
+            while (session.session_id, player) in self._precomputing:
+                self._precompute_done.wait()
+        ensure_player_metrics(session, player)
+
     def library_sessions(self) -> Dict[str, Any]:
         profile = self._require_user()
         removed = int(self._db.prune_duplicate_replay_names(user_id=int(profile["id"])) or 0)
@@ -447,30 +558,85 @@ class ReplayStateStore:
             return self.start_processing(file_name=Path(fallback_name).name, data=bytes(blob), persist_to_library=False)
         raise RuntimeError("Saved replay not found in artifact path, replay folders, or DB backup.")
 
+    @contextmanager
+    def _mutate(self):
+        # Lock for a state change clients may be waiting on; pushes events for whatever changed.
+        with self._lock:
+            yield
+            marks = self._bump_sections_locked()
+            self._notify_locked(dict(marks["status"][0]))
+
+    def state_version(self, section: str) -> int:
+        return self._section_versions[section]
+
+    def _section_marks_locked(self) -> Dict[str, tuple]:
+        # What each section's payload is built from. Session, mechanics and recommendations objects are
+        # replaced rather than edited in place, so identity tells whether they changed; the session is
+        # never compared by value (its dataclass eq would walk the whole timeline).
+        st = self._state
+        return {
+            "status": (self._status_locked(),),
+            "session": (st.session, st.analysis_player, st.analysis_locked, st.analysis_ready, bool(st.mechanics)),
+            "mechanics": (st.mechanics, st.session, st.analysis_player, st.analysis_ready),
+            "recommendations": (st.recommendations, st.current_user),
+        }
+
+    def _bump_sections_locked(self) -> Dict[str, tuple]:
+        marks = self._section_marks_locked()
+        prev = self._section_marks
+        changed = [
+            name
+            for name, mark in marks.items()
+            if (mark != prev[name] if name == "status" else any(_changed(a, b) for a, b in zip(mark, prev[name])))
+        ]
+        self._section_marks = marks
+        if changed:
+            self._version += 1
+            for name in changed:
+                self._section_versions[name] = self._version
+        return marks
+
+    def _notify_locked(self, status: Dict[str, Any]) -> None:
+        status["player_metrics"] = {p: dict(job) for p, job in self._state.player_metric_jobs.items()}
+        if status != self._pushed_status:
+            self._pushed_status = status
+            self.events.publish("status", status)
+        mechanics = self._state.mechanics
+        if mechanics is not self._pushed_mechanics:
+            self._pushed_mechanics = mechanics
+            if mechanics:
+                self.events.publish(
+                    "mechanics",
+                    {"ready": True, "session_id": self._state.job.session_id, "player": self._state.analysis_player},
+                )
+
     def status_snapshot(self) -> Dict[str, Any]:
         with self._lock:
-            j = self._state.job
-            return {
-                "session_id": j.session_id,
-                "status": j.status,
-                "progress": j.progress,
-                "message": j.message,
-                "error": j.error,
-                "replay_name": j.replay_name,
-                "ready": j.ready,
-                "phase": j.phase,
-                "checklist": dict(j.checklist or {}),
-                "duplicate": dict(j.duplicate or {}),
-                "metrics_status": self._state.metrics_status,
-                "metrics_error": self._state.metrics_error,
-                "metrics_ready_count": self._state.metrics_ready_count,
-                "metrics_total_count": self._state.metrics_total_count,
-                "analysis_player": self._state.analysis_player,
-                "analysis_locked": self._state.analysis_locked,
-                "analysis_ready": self._state.analysis_ready,
-                "analysis_error": self._state.analysis_error,
-                "profile": dict(self._state.current_user or {}),
-            }
+            return self._status_locked()
+
+    def _status_locked(self) -> Dict[str, Any]:
+        j = self._state.job
+        return {
+            "session_id": j.session_id,
+            "status": j.status,
+            "progress": j.progress,
+            "message": j.message,
+            "error": j.error,
+            "replay_name": j.replay_name,
+            "ready": j.ready,
+            "phase": j.phase,
+            "checklist": dict(j.checklist or {}),
+            "duplicate": dict(j.duplicate or {}),
+            "metrics_status": self._state.metrics_status,
+            "metrics_error": self._state.metrics_error,
+            "metrics_ready_count": self._state.metrics_ready_count,
+            "metrics_total_count": self._state.metrics_total_count,
+            "analysis_player": self._state.analysis_player,
+            "analysis_locked": self._state.analysis_locked,
+            "analysis_ready": self._state.analysis_ready,
+            "analysis_error": self._state.analysis_error,
+            "profile": dict(self._state.current_user or {}),
+        }
 
     def list_players(self) -> list[str]:
         with self._lock:
@@ -497,8 +663,58 @@ class ReplayStateStore:
                 "mechanics_ready": bool(self._state.mechanics),
             }
 
-    def select_analysis_player(self, player: str) -> None:
+    def _session_timeline_meta_locked(self, session: ReplaySession) -> tuple[list[float], Dict[str, list[str]]]:
+        # Built once per session, under the lock so concurrent chunk requests do not race the swap.
+        meta = self._timeline_meta
+        if meta is None or meta[0] != session.session_id:
+            meta = (session.session_id, timeline_times(session.timeline), timeline_fields(session.timeline))
+            self._timeline_meta = meta
+        return meta[1], meta[2]
+
+    def replay_session_header(self) -> Dict[str, Any]:
+        # Session without frames: the viewer gets frame times here and streams frames by range.
         with self._lock:
+            session = self._state.session
+            if not session:
+                raise RuntimeError("No replay loaded yet.")
+            header = {
+                "session_id": session.session_id,
+                "replay_name": session.replay_name,
+                "players": session.players,
+                "duration_s": session.duration_s,
+                "boost_pads": session.boost_pads,
+                "replay_meta": session.replay_meta,
+                "analysis_player": self._state.analysis_player,
+                "analysis_locked": self._state.analysis_locked,
+                "analysis_ready": self._state.analysis_ready,
+                "mechanics_ready": bool(self._state.mechanics),
+            }
+            times, fields = self._session_timeline_meta_locked(session)
+        header.update({"frame_count": len(times), "times": times, "fields": fields, "chunk_frames": CHUNK_FRAMES})
+        return header
+
+    def replay_timeline_chunk(
+        self,
+        *,
+        i0: int | None = None,
+        i1: int | None = None,
+        t0: float | None = None,
+        t1: float | None = None,
+        fields: list[str] | None = None,
+    ) -> Dict[str, Any]:
+        with self._lock:
+            session = self._state.session
+            if not session:
+                raise RuntimeError("No replay loaded yet.")
+            times, all_fields = self._session_timeline_meta_locked(session)
+        lo, hi = frame_range(times, i0=i0, i1=i1, t0=t0, t1=t1)
+        chunk = timeline_chunk(session.timeline, list(session.players), lo, hi, all_fields, fields)
+        chunk["session_id"] = session.session_id
+        chunk["frame_count"] = len(times)
+        return chunk
+
+    def select_analysis_player(self, player: str) -> None:
+        with self._mutate():
             session = self._state.session
             if not session:
                 raise RuntimeError("No replay loaded yet.")
@@ -513,7 +729,7 @@ class ReplayStateStore:
                 self._state.player_metric_jobs[player] = {"status": "idle", "message": "Not started.", "error": ""}
 
     def run_selected_analysis(self) -> None:
-        with self._lock:
+        with self._mutate():
             session = self._state.session
             if not session:
                 raise RuntimeError("No replay loaded yet.")
@@ -526,16 +742,16 @@ class ReplayStateStore:
             self._state.analysis_ready = False
             self._state.player_metric_jobs[player] = {"status": "computing", "message": "Computing future-aware metrics...", "error": ""}
         try:
-            ensure_player_metrics(session, player)
+            self._ensure_player_metrics(session, player)
         except Exception as exc:
-            with self._lock:
+            with self._mutate():
                 self._state.player_metric_jobs[player] = {"status": "error", "message": "Metric computation failed.", "error": str(exc)}
                 self._state.metrics_status = "error"
                 self._state.metrics_error = str(exc)
                 self._state.analysis_error = str(exc)
                 self._state.analysis_ready = False
             raise
-        with self._lock:
+        with self._mutate():
             self._state.player_metric_jobs[player] = {"status": "ready", "message": "Metrics ready.", "error": ""}
             self._state.metrics_ready_count = 1
             self._state.metrics_total_count = 1
@@ -543,7 +759,7 @@ class ReplayStateStore:
             self._state.analysis_ready = True
             self._state.analysis_locked = True
         mech_payload = self._compute_mechanics_for_selected_player(session, player)
-        with self._lock:
+        with self._mutate():
             self._state.mechanics = mech_payload
         self._persist_analysis_summary(session, player, mech_payload)
 
@@ -558,7 +774,7 @@ class ReplayStateStore:
             }
 
     def start_player_metrics(self, player: str) -> None:
-        with self._lock:
+        with self._mutate():
             session = self._state.session
             if not session:
                 raise RuntimeError("No replay loaded yet.")
@@ -603,12 +819,13 @@ class ReplayStateStore:
                     "metrics_timeline": session.metrics_by_player[player],
                     "events": session.events_by_player[player],
                 }
+        with self._mutate():
             self._state.player_metric_jobs[player] = {"status": "computing", "message": "Computing metrics...", "error": ""}
 
         try:
-            ensure_player_metrics(session, player)
+            self._ensure_player_metrics(session, player)
         except Exception as exc:
-            with self._lock:
+            with self._mutate():
                 self._state.player_metric_jobs[player] = {
                     "status": "error",
                     "message": "Metric computation failed.",
@@ -616,13 +833,9 @@ class ReplayStateStore:
                 }
             raise
 
-        with self._lock:
+        with self._mutate():
             self._state.player_metric_jobs[player] = {"status": "ready", "message": "Metrics ready.", "error": ""}
-            ready = sum(1 for p in session.players if p in session.metrics_by_player and p in session.events_by_player)
-            self._state.metrics_ready_count = ready
-            self._state.metrics_total_count = len(session.players)
-            if self._state.metrics_status != "live":
-                self._state.metrics_status = "ready" if ready >= len(session.players) else "computing"
+            self._update_metric_counts_locked(session)
             return {
                 "session_id": session.session_id,
                 "replay_name": session.replay_name,
@@ -636,7 +849,7 @@ class ReplayStateStore:
             teams = dict((session.replay_meta or {}).get("player_teams", {}) or {})
         except Exception:
             teams = {}
-        return grade_game_mechanics(session.timeline or [], player, teams)
+        return grade_game_mechanics(session.timeline or [], player, teams, index=session_timeline_index(session))
 
     def _persist_analysis_summary(self, session: ReplaySession, player: str, mechanics_payload: Dict[str, Any]) -> None:
         profile = self.current_profile()
@@ -691,7 +904,7 @@ class ReplayStateStore:
         if not session or not player or not ready:
             return {}
         payload = self._compute_mechanics_for_selected_player(session, player)
-        with self._lock:
+        with self._mutate():
             self._state.mechanics = dict(payload or {})
         self._persist_analysis_summary(session, player, payload)
         return payload
@@ -704,7 +917,7 @@ class ReplayStateStore:
         if not session or not player or not ready:
             raise RuntimeError("Run analysis for the selected player first.")
         payload = self._compute_mechanics_for_selected_player(session, player)
-        with self._lock:
+        with self._mutate():
             self._state.mechanics = dict(payload or {})
         self._persist_analysis_summary(session, player, payload)
         return payload
@@ -743,7 +956,7 @@ class ReplayStateStore:
             teams = dict((session.replay_meta or {}).get("player_teams", {}) or {})
         except Exception:
             teams = {}
-        det = explain_mechanic_event(session.timeline or [], player, teams, target)
+        det = explain_mechanic_event(session.timeline or [], player, teams, target, index=session_timeline_index(session))
         llm = {"enabled": False, "text": "", "error": ""}
         if include_llm:
             llm = maybe_rewrite_explanation(det)
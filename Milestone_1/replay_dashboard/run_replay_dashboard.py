@@ -23,6 +23,12 @@ def parse_args():
     parser.add_argument("--host", default="127.0.0.1")
     parser.add_argument("--port", type=int, default=8775)
     parser.add_argument("--no-browser", action="store_true")
+    parser.add_argument(
+        "--precompute-metrics-workers",
+        type=int,
+        default=0,
+        help="Compute all players' metrics after each replay load using this many processes (0 = on demand only).",
+    )
     return parser.parse_args()
 
 
@@ -47,7 +53,7 @@ def main():
 
     args = parse_args()
     db = AppDB()
-    store = ReplayStateStore(db=db)
+    store = ReplayStateStore(db=db, precompute_workers=args.precompute_metrics_workers)
     server = ReplayDashboardServer(store=store, host=args.host, port=args.port)
     server.start()
 
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+import json
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Frames per chunk the viewer asks for by default (~10 s of a 30 Hz replay timeline), and the most
+# one request may return.
+CHUNK_FRAMES = 300
+MAX_CHUNK_FRAMES = 3600
+# Decimal places kept for float columns; the 3D player only needs render precision.
+FLOAT_DECIMALS = 4
+
+
+def timeline_fields(timeline: Sequence[Dict[str, Any]]) -> Dict[str, List[str]]:
+    # Field names by group, taken from the first frame that carries each group.
+    frame_keys: List[str] = []
+    ball_keys: List[str] = []
+    player_keys: List[str] = []
+    for fr in timeline:
+        if not frame_keys:
+            frame_keys = [k for k in fr.keys() if k not in ("t", "ball", "players")]
+        if not ball_keys and fr.get("ball"):
+            ball_keys = list(fr["ball"].keys())
+        if not player_keys:
+            for p in fr.get("players") or []:
+                player_keys = [k for k in p.keys() if k != "name"]
+                break
+        if frame_keys and ball_keys and player_keys:
+            break
+    return {"frame": frame_keys, "ball": ball_keys, "player": player_keys}
+
+
+def timeline_times(timeline: Sequence[Dict[str, Any]]) -> List[float]:
+    out = []
+    for fr in timeline:
+        try:
+            out.append(float(fr.get("t", 0.0)))
+        except Exception:
+            out.append(0.0)
+    return out
+
+
+def frame_range(
+    times: List[float],
+    *,
+    i0: Optional[int] = None,
+    i1: Optional[int] = None,
+    t0: Optional[float] = None,
+    t1: Optional[float] = None,
+) -> Tuple[int, int]:
+    # Half-open frame range [i0, i1) from indices or a time window (frames with t0 <= t <= t1),
+    # clamped to the timeline and to MAX_CHUNK_FRAMES.
+    n = len(times)
+    if t0 is not None or t1 is not None:
+        lo = 0 if t0 is None else bisect_left(times, float(t0))
+        hi = n if t1 is None else bisect_right(times, float(t1))
+    else:
+        lo = 0 if i0 is None else int(i0)
+        hi = lo + CHUNK_FRAMES if i1 is None else int(i1)
+    lo = max(0, min(n, lo))
+    hi = max(lo, min(n, hi, lo + MAX_CHUNK_FRAMES))
+    return lo, hi
+
+
+def _round(v: Any) -> Any:
+    if isinstance(v, float):
+        return round(v, FLOAT_DECIMALS)
+    return v
+
+
+def _select(fields: Dict[str, List[str]], wanted: Optional[List[str]]) -> Dict[str, List[str]]:
+    # `wanted` entries: "ball" / "player" / "frame" for a whole group, or "ball.x", "player.boost", ...
+    if not wanted:
+        return fields
+    out: Dict[str, List[str]] = {"frame": [], "ball": [], "player": []}
+    for item in wanted:
+        group, _, key = item.partition(".")
+        if group not in fields:
+            raise RuntimeError(f"Unknown timeline field '{item}'")
+        if not key:
+            out[group] = list(fields[group])
+        elif key in fields[group]:
+            if key not in out[group]:
+                out[group].append(key)
+        else:
+            raise RuntimeError(f"Unknown timeline field '{item}'")
+    return out
+
+
+def timeline_chunk(
+    timeline: Sequence[Dict[str, Any]],
+    players: List[str],
+    lo: int,
+    hi: int,
+    fields: Dict[str, List[str]],
+    wanted: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Frames [lo, hi) as columns: {"t": [...], "frame": {key: [...]}, "ball": {key: [...]},
+    "players": {name: {key: [...]}}}. A player missing from a frame reads as null in every column.
+    """
+    sel = _select(fields, wanted)
+    frames = timeline[lo:hi]
+    frame_cols: Dict[str, List[Any]] = {k: [] for k in sel["frame"]}
+    ball_cols: Dict[str, List[Any]] = {k: [] for k in sel["ball"]}
+    player_cols: Dict[str, Dict[str, List[Any]]] = {name: {k: [] for k in sel["player"]} for name in players}
+    times: List[Any] = []
+    for fr in frames:
+        times.append(fr.get("t", 0.0))
+        for k, col in frame_cols.items():
+            col.append(_round(fr.get(k)))
+        ball = fr.get("ball") or {}
+        for k, col in ball_cols.items():
+            col.append(_round(ball.get(k)))
+        by_name = {p.get("name"): p for p in fr.get("players") or []}
+        for name, cols in player_cols.items():
+            p = by_name.get(name)
+            for k, col in cols.items():
+                col.append(None if p is None else _round(p.get(k)))
+    return {
+        "i0": lo,
+        "i1": hi,
+        "t": times,
+        "frame": frame_cols,
+        "ball": ball_cols,
+        "players": player_cols,
+    }
+
+
+def pack_chunk_f32(chunk: Dict[str, Any], extra: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Binary form of a timeline_chunk() result for typed-array clients:
+
+        uint32 LE  header length H
+        H bytes    JSON header, space-padded so the data starts 4-byte aligned
+        float32 LE one block of `count` values per entry of header["columns"], in order
+
+    Columns are ["t"], ["frame", key], ["ball", key] or ["players", name, key]. Booleans are 0/1 and
+    missing values (e.g. a player absent from a frame) are NaN.
+    """
+    columns: List[List[str]] = [["t"]]
+    data: List[Any] = [chunk["t"]]
+    for group in ("frame", "ball"):
+        for key, col in chunk[group].items():
+            columns.append([group, key])
+            data.append(col)
+    for name, cols in chunk["players"].items():
+        for key, col in cols.items():
+            columns.append(["players", name, key])
+            data.append(col)
+    count = int(chunk["i1"]) - int(chunk["i0"])
+    header = {k: v for k, v in chunk.items() if k not in ("t", "frame", "ball", "players")}
+    header.update(extra or {})
+    header.update({"count": count, "columns": columns})
+    head = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    head += b" " * (-(len(head) + 4) % 4)
+    body = np.array(data, dtype=np.float64).reshape(len(columns), count).astype("<f4")
+    return struct.pack("<I", len(head)) + head + body.tobytes()
@@ -122,6 +122,15 @@ let liveMetricPoint = null;
 let liveSeekSupported = true;
 let liveSeekFailureCount = 0;
 let fallbackMetricsInFlight = false;
+let serverEvents = null;
+const TIMELINE_CHUNKS_KEPT = 8;
+let timelineChunkFrames = 300;
+// Chunk index -> unpacked column chunk (unpackTimelineChunk); frames are read straight from the columns.
+let timelineChunks = new Map();
+let timelineChunksInFlight = new Set();
+let timelineChunkToken = 0;
+const statusWaiters = [];
+const STATUS_EVENT_TIMEOUT_MS = 5000;
 let zoomScale = 1.0;
 let analysisLocked = false;
 let currentProfile = null;
@@ -1758,91 +1767,127 @@ function interpPosWithVelocity(p0, p1, v0, v1, alpha, dt) {
   return hermite(p0, v0, p1, v1, alpha, dt);
 }
 
-function interpCarPosition(p0, p1, alpha) {
-  const dx = Number(p1.x || 0) - Number(p0.x || 0);
-  const dy = Number(p1.y || 0) - Number(p0.y || 0);
-  const dz = Number(p1.z || 0) - Number(p0.z || 0);
+function interpCarPosition(x0, y0, z0, x1, y1, z1, alpha) {
+  x0 = Number(x0 || 0);
+  y0 = Number(y0 || 0);
+  z0 = Number(z0 || 0);
+  x1 = Number(x1 || 0);
+  y1 = Number(y1 || 0);
+  z1 = Number(z1 || 0);
+  const dx = x1 - x0;
+  const dy = y1 - y0;
+  const dz = z1 - z0;
   const dist = Math.sqrt(dx * dx + dy * dy + dz * dz);
   if (dist > TELEPORT_DIST_THRESHOLD) {
-    return {
-      x: Number(p1.x || 0),
-      y: Number(p1.y || 0),
-      z: Number(p1.z || 0),
-    };
+    return { x: x1, y: y1, z: z1 };
   }
   return {
-    x: interpolate(Number(p0.x || 0), Number(p1.x || 0), alpha),
-    y: interpolate(Number(p0.y || 0), Number(p1.y || 0), alpha),
-    z: interpolate(Number(p0.z || 0), Number(p1.z || 0), alpha),
+    x: interpolate(x0, x1, alpha),
+    y: interpolate(y0, y1, alpha),
+    z: interpolate(z0, z1, alpha),
   };
 }
 
+function timelineChunkAt(idx) {
+  // Loaded column chunk holding frame `idx`, or null while it is still streaming in.
+  const chunk = timelineChunks.get(Math.floor(idx / timelineChunkFrames));
+  return chunk && idx >= chunk.i0 && idx < chunk.i0 + chunk.count ? chunk : null;
+}
+
+function chunkPlayerColumns(chunk, name, row) {
+  // A player's columns in `chunk`, or null when the player is absent from that row (NaN columns).
+  const cols = chunk.players[name];
+  const presence = chunk.presence[name];
+  return cols && presence && !Number.isNaN(presence[row]) ? cols : null;
+}
+
+function timelinePlayerValue(idx, name, key) {
+  // One player field at frame `idx`; NaN while the frame is not loaded or the player is absent.
+  const chunk = timelineChunkAt(idx);
+  const col = chunk?.players[name]?.[key];
+  return col ? col[idx - chunk.i0] : NaN;
+}
+
 function getInterpolatedFrame(t) {
+  // Reads the two bracketing frames straight from the typed-array chunk columns.
   const idx = findFrameIndexAtOrBeforeTime(t);
-  const f0 = replayData.timeline[idx];
+  ensureTimelineAround(idx);
   const nidx = Math.min(idx + 1, replayData.timeline.length - 1);
-  const f1 = replayData.timeline[nidx];
-  const dt = Math.max(1e-6, f1.t - f0.t);
-  const alpha = clamp((t - f0.t) / dt, 0, 1);
+  const c0 = timelineChunkAt(idx);
+  const c1 = timelineChunkAt(nidx);
+  if (!c0 || !c1) return null;
+  const j0 = idx - c0.i0;
+  const j1 = nidx - c1.i0;
+  // Frame times come from the session header at full precision; chunk times are Float32.
+  const t0 = replayData.timeline[idx].t;
+  const t1 = replayData.timeline[nidx].t;
+  const dt = Math.max(1e-6, t1 - t0);
+  const alpha = clamp((t - t0) / dt, 0, 1);
 
   const players = replayData.players.map((name) => {
-    const idxByName = playerIdxMap.get(name) ?? 0;
-    const p0 = (f0.players && f0.players[idxByName]) ? f0.players[idxByName] : (f0.players || []).find((p) => p.name === name) || { name };
-    const p1 = (f1.players && f1.players[idxByName]) ? f1.players[idxByName] : (f1.players || []).find((p) => p.name === name) || p0;
-    const vx0 = Number.isFinite(p0.vx) ? p0.vx : 0;
-    const vy0 = Number.isFinite(p0.vy) ? p0.vy : 0;
-    const vz0 = Number.isFinite(p0.vz) ? p0.vz : 0;
-    const vx1 = Number.isFinite(p1.vx) ? p1.vx : vx0;
-    const vy1 = Number.isFinite(p1.vy) ? p1.vy : vy0;
-    const vz1 = Number.isFinite(p1.vz) ? p1.vz : vz0;
-    const pos = interpCarPosition(p0, p1, alpha);
+    // Absent from the first frame reads as all-missing; absent from the second holds the first.
+    const cols0 = chunkPlayerColumns(c0, name, j0);
+    const cols1 = chunkPlayerColumns(c1, name, j1);
+    const p0 = (key) => (cols0 && cols0[key] ? cols0[key][j0] : undefined);
+    const p1 = cols1 ? (key) => (cols1[key] ? cols1[key][j1] : undefined) : p0;
+    const vx0 = Number.isFinite(p0("vx")) ? p0("vx") : 0;
+    const vy0 = Number.isFinite(p0("vy")) ? p0("vy") : 0;
+    const vz0 = Number.isFinite(p0("vz")) ? p0("vz") : 0;
+    const vx1 = Number.isFinite(p1("vx")) ? p1("vx") : vx0;
+    const vy1 = Number.isFinite(p1("vy")) ? p1("vy") : vy0;
+    const vz1 = Number.isFinite(p1("vz")) ? p1("vz") : vz0;
+    const pos = interpCarPosition(p0("x"), p0("y"), p0("z"), p1("x"), p1("y"), p1("z"), alpha);
+    const q0 = (key, fallback) => (Number.isFinite(p0(key)) ? p0(key) : fallback);
+    const q1 = (key, fallback) => (Number.isFinite(p1(key)) ? p1(key) : q0(key, fallback));
     return {
       name,
       x: pos.x,
       y: pos.y,
       z: pos.z,
-      boost: interpolate(p0.boost ?? 0, p1.boost ?? 0, alpha),
-      steer: interpolate(p0.steer ?? 0, p1.steer ?? 0, alpha),
-      throttle: interpolate(p0.throttle ?? 0, p1.throttle ?? 0, alpha),
-      handbrake: Math.round(interpolate(p0.handbrake ?? 0, p1.handbrake ?? 0, alpha)),
-      jump: Math.round(interpolate(p0.jump ?? 0, p1.jump ?? 0, alpha)),
-      double_jump: Math.round(interpolate(p0.double_jump ?? 0, p1.double_jump ?? 0, alpha)),
-      qx0: Number.isFinite(p0.qx) ? p0.qx : 0,
-      qy0: Number.isFinite(p0.qy) ? p0.qy : 0,
-      qz0: Number.isFinite(p0.qz) ? p0.qz : 0,
-      qw0: Number.isFinite(p0.qw) ? p0.qw : 1,
-      qx1: Number.isFinite(p1.qx) ? p1.qx : (Number.isFinite(p0.qx) ? p0.qx : 0),
-      qy1: Number.isFinite(p1.qy) ? p1.qy : (Number.isFinite(p0.qy) ? p0.qy : 0),
-      qz1: Number.isFinite(p1.qz) ? p1.qz : (Number.isFinite(p0.qz) ? p0.qz : 0),
-      qw1: Number.isFinite(p1.qw) ? p1.qw : (Number.isFinite(p0.qw) ? p0.qw : 1),
-      yaw: lerpAngle(Number(p0.yaw || 0), Number(p1.yaw || p0.yaw || 0), alpha),
+      boost: interpolate(p0("boost") ?? 0, p1("boost") ?? 0, alpha),
+      steer: interpolate(p0("steer") ?? 0, p1("steer") ?? 0, alpha),
+      throttle: interpolate(p0("throttle") ?? 0, p1("throttle") ?? 0, alpha),
+      handbrake: Math.round(interpolate(p0("handbrake") ?? 0, p1("handbrake") ?? 0, alpha)),
+      jump: Math.round(interpolate(p0("jump") ?? 0, p1("jump") ?? 0, alpha)),
+      double_jump: Math.round(interpolate(p0("double_jump") ?? 0, p1("double_jump") ?? 0, alpha)),
+      qx0: q0("qx", 0),
+      qy0: q0("qy", 0),
+      qz0: q0("qz", 0),
+      qw0: q0("qw", 1),
+      qx1: q1("qx", 0),
+      qy1: q1("qy", 0),
+      qz1: q1("qz", 0),
+      qw1: q1("qw", 1),
+      yaw: lerpAngle(Number(p0("yaw") || 0), Number(p1("yaw") || p0("yaw") || 0), alpha),
       vx: interpolate(vx0, vx1, alpha),
       vy: interpolate(vy0, vy1, alpha),
       vz: interpolate(vz0, vz1, alpha),
     };
   });
 
-  const bvx0 = Number.isFinite(f0.ball.vx) ? f0.ball.vx : 0;
-  const bvy0 = Number.isFinite(f0.ball.vy) ? f0.ball.vy : 0;
-  const bvz0 = Number.isFinite(f0.ball.vz) ? f0.ball.vz : 0;
-  const bvx1 = Number.isFinite(f1.ball.vx) ? f1.ball.vx : bvx0;
-  const bvy1 = Number.isFinite(f1.ball.vy) ? f1.ball.vy : bvy0;
-  const bvz1 = Number.isFinite(f1.ball.vz) ? f1.ball.vz : bvz0;
+  const b0 = (key, fallback) => (Number.isFinite(c0.ball[key]?.[j0]) ? c0.ball[key][j0] : fallback);
+  const b1 = (key, fallback) => (Number.isFinite(c1.ball[key]?.[j1]) ? c1.ball[key][j1] : b0(key, fallback));
+  const bvx0 = b0("vx", 0);
+  const bvy0 = b0("vy", 0);
+  const bvz0 = b0("vz", 0);
+  const bvx1 = b1("vx", 0);
+  const bvy1 = b1("vy", 0);
+  const bvz1 = b1("vz", 0);
   return {
     idx,
     t,
     ball: {
-      x: interpPosWithVelocity(f0.ball.x, f1.ball.x, bvx0, bvx1, alpha, dt),
-      y: interpPosWithVelocity(f0.ball.y, f1.ball.y, bvy0, bvy1, alpha, dt),
-      z: interpPosWithVelocity(f0.ball.z, f1.ball.z, bvz0, bvz1, alpha, dt),
-      qx0: Number.isFinite(f0.ball.qx) ? f0.ball.qx : 0,
-      qy0: Number.isFinite(f0.ball.qy) ? f0.ball.qy : 0,
-      qz0: Number.isFinite(f0.ball.qz) ? f0.ball.qz : 0,
-      qw0: Number.isFinite(f0.ball.qw) ? f0.ball.qw : 1,
-      qx1: Number.isFinite(f1.ball.qx) ? f1.ball.qx : (Number.isFinite(f0.ball.qx) ? f0.ball.qx : 0),
-      qy1: Number.isFinite(f1.ball.qy) ? f1.ball.qy : (Number.isFinite(f0.ball.qy) ? f0.ball.qy : 0),
-      qz1: Number.isFinite(f1.ball.qz) ? f1.ball.qz : (Number.isFinite(f0.ball.qz) ? f0.ball.qz : 0),
-      qw1: Number.isFinite(f1.ball.qw) ? f1.ball.qw : (Number.isFinite(f0.ball.qw) ? f0.ball.qw : 1),
+      x: interpPosWithVelocity(c0.ball.x?.[j0], c1.ball.x?.[j1], bvx0, bvx1, alpha, dt),
+      y: interpPosWithVelocity(c0.ball.y?.[j0], c1.ball.y?.[j1], bvy0, bvy1, alpha, dt),
+      z: interpPosWithVelocity(c0.ball.z?.[j0], c1.ball.z?.[j1], bvz0, bvz1, alpha, dt),
+      qx0: b0("qx", 0),
+      qy0: b0("qy", 0),
+      qz0: b0("qz", 0),
+      qw0: b0("qw", 1),
+      qx1: b1("qx", 0),
+      qy1: b1("qy", 0),
+      qz1: b1("qz", 0),
+      qw1: b1("qw", 1),
       vx: interpolate(bvx0, bvx1, alpha),
       vy: interpolate(bvy0, bvy1, alpha),
       vz: interpolate(bvz0, bvz1, alpha),
@@ -1991,11 +2036,8 @@ function updateNameTags(interpFrame) {
       if (Number.isFinite(metaBoost)) boostVal = Number(metaBoost);
     }
     if (!Number.isFinite(boostVal) || boostVal <= 0) {
-      const f = replayData?.timeline?.[currentFrame];
-      if (f?.players) {
-        const fp = f.players.find((x) => x.name === p.name);
-        if (fp && Number.isFinite(Number(fp.boost))) boostVal = Number(fp.boost);
-      }
+      const frameBoost = timelinePlayerValue(currentFrame, p.name, "boost");
+      if (Number.isFinite(frameBoost)) boostVal = frameBoost;
     }
     el.textContent = `${p.name} | boost ${fmt(boostVal, 0)}`;
   }
@@ -2047,6 +2089,10 @@ function updateEventsAtTime(t) {
 function renderAtTime(t) {
   if (!replayData || !replayData.timeline?.length) return;
   const interpFrame = getInterpolatedFrame(t);
+  if (!interpFrame) {
+    // Frames for this time are still streaming in; the chunk load flags a re-render.
+    return;
+  }
   currentFrame = interpFrame.idx;
   currentReplayTimeS = interpFrame.t;
 
@@ -2241,8 +2287,13 @@ function animate(tsMs) {
   }
 
   if (playing && camAnchorPos && replayData?.timeline?.length) {
-    const fp = replayData.timeline[Math.max(0, Math.min(currentFrame, replayData.timeline.length - 1))]?.players?.find((p) => p.name === selectedPlayer);
-    if (fp) {
+    const frameIdx = Math.max(0, Math.min(currentFrame, replayData.timeline.length - 1));
+    const fp = {
+      x: timelinePlayerValue(frameIdx, selectedPlayer, "x"),
+      y: timelinePlayerValue(frameIdx, selectedPlayer, "y"),
+      z: timelinePlayerValue(frameIdx, selectedPlayer, "z"),
+    };
+    if (Number.isFinite(fp.x) && Number.isFinite(fp.y) && Number.isFinite(fp.z)) {
       const cpos = rlToScene(fp);
       const dist = camera.position.distanceTo(cpos);
       if (dist > 8000) {
@@ -2262,6 +2313,40 @@ async function fetchJson(url, opts) {
   return res.json();
 }
 
+function ensureServerEvents() {
+  // Server-Sent Events: job/metrics status and mechanics-ready pushes replace timer polling.
+  if (serverEvents || !window.EventSource) return;
+  serverEvents = new EventSource("/api/events");
+  serverEvents.addEventListener("status", (ev) => {
+    const status = JSON.parse(ev.data);
+    for (const resolve of statusWaiters.splice(0)) resolve(status);
+  });
+  serverEvents.addEventListener("mechanics", (ev) => {
+    const info = JSON.parse(ev.data);
+    if (info.ready && replayData && info.session_id === replayData.session_id) {
+      loadCurrentMechanics().catch(() => {});
+    }
+  });
+}
+
+function waitForStatusEvent(fallbackMs) {
+  // Resolves with the next pushed status, or null after fallbackMs (the caller then re-fetches).
+  ensureServerEvents();
+  const timeoutMs = serverEvents ? STATUS_EVENT_TIMEOUT_MS : fallbackMs;
+  return new Promise((resolve) => {
+    const waiter = (status) => {
+      clearTimeout(timer);
+      resolve(status);
+    };
+    const timer = setTimeout(() => {
+      const i = statusWaiters.indexOf(waiter);
+      if (i >= 0) statusWaiters.splice(i, 1);
+      resolve(null);
+    }, timeoutMs);
+    statusWaiters.push(waiter);
+  });
+}
+
 function ensureSceneInitialized() {
   if (sceneInitialized) return;
   if (typeof THREE === "undefined") {
@@ -2811,7 +2896,7 @@ async function ensureLegacyMetricsForPlayer(player) {
       const s = st?.data?.status;
       if (s === "ready") break;
       if (s === "error") throw new Error(st?.data?.error || "metric computation failed");
-      await new Promise((r) => setTimeout(r, 250));
+      await waitForStatusEvent(250);
     }
     const dataRes = await fetchJson(`/api/replay/player_metrics/data?player=${encodeURIComponent(player)}`);
     if (!dataRes?.ok) throw new Error(dataRes?.error || "metric data failed");
@@ -2895,8 +2980,9 @@ async function runAnalysisForSelectedPlayer(player) {
 }
 
 async function pollStatusUntilReady() {
+  ensureServerEvents();
+  let status = await fetchJson("/api/replay/status");
   while (true) {
-    const status = await fetchJson("/api/replay/status");
     setProgress(status.progress || 0, status.message || "");
     setLoadingState({
       title: "Preparing Replay",
@@ -2908,7 +2994,7 @@ async function pollStatusUntilReady() {
     statusText.textContent = status.error ? `Error: ${status.error}` : status.message;
     if (status.status === "ready") return true;
     if (status.status === "error") return false;
-    await new Promise((r) => setTimeout(r, 600));
+    status = (await waitForStatusEvent(600)) || (await fetchJson("/api/replay/status"));
   }
 }
 
@@ -2958,19 +3044,92 @@ function populatePlayerSelect() {
   }
 }
 
+function resetTimelineChunks(chunkFrames) {
+  timelineChunkFrames = Math.max(1, Number(chunkFrames || 300));
+  timelineChunks = new Map();
+  timelineChunksInFlight = new Set();
+  timelineChunkToken += 1;
+}
+
+function unpackTimelineChunk(buf) {
+  // Binary chunk (format=f32): uint32 header length, JSON header, then one Float32 block per column.
+  // Columns are wrapped as Float32Array views over the response buffer, nothing is parsed per value.
+  const headLen = new DataView(buf).getUint32(0, true);
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buf, 4, headLen)));
+  const count = Number(header.count || 0);
+  // `presence` keeps each player's first column: NaN there means the player is absent from that frame.
+  const chunk = { ...header, count, t: null, frame: {}, ball: {}, players: {}, presence: {} };
+  let offset = 4 + headLen;
+  for (const col of header.columns || []) {
+    const values = new Float32Array(buf, offset, count);
+    offset += count * 4;
+    if (col[0] === "t") chunk.t = values;
+    else if (col[0] === "players") {
+      if (!chunk.players[col[1]]) {
+        chunk.players[col[1]] = {};
+        chunk.presence[col[1]] = values;
+      }
+      chunk.players[col[1]][col[2]] = values;
+    } else chunk[col[0]][col[1]] = values;
+  }
+  return chunk;
+}
+
+async function fetchTimelineChunk(i0, i1) {
+  const res = await fetch(`/api/replay/timeline?i0=${i0}&i1=${i1}&format=f32`);
+  if (!res.ok) {
+    const payload = await res.json().catch(() => null);
+    throw new Error(payload?.error || "timeline chunk failed");
+  }
+  return unpackTimelineChunk(await res.arrayBuffer());
+}
+
+async function loadTimelineChunk(k) {
+  if (!replayData || timelineChunks.has(k) || timelineChunksInFlight.has(k)) return;
+  const i0 = k * timelineChunkFrames;
+  if (i0 >= replayData.timeline.length) return;
+  const token = timelineChunkToken;
+  timelineChunksInFlight.add(k);
+  try {
+    const chunk = await fetchTimelineChunk(i0, i0 + timelineChunkFrames);
+    if (token !== timelineChunkToken || !replayData) return;
+    timelineChunks.set(k, chunk);
+    needsRender = true;
+  } finally {
+    if (token === timelineChunkToken) timelineChunksInFlight.delete(k);
+  }
+}
+
+function ensureTimelineAround(idx) {
+  // Keep the chunk under the playhead plus its neighbours; drop chunks far from it.
+  if (!replayData?.timeline?.length) return;
+  const k = Math.floor(idx / timelineChunkFrames);
+  for (const c of [k, k + 1, k - 1]) {
+    if (c >= 0) loadTimelineChunk(c).catch(() => {});
+  }
+  if (timelineChunks.size <= TIMELINE_CHUNKS_KEPT) return;
+  for (const c of [...timelineChunks.keys()]) {
+    if (Math.abs(c - k) <= 2) continue;
+    timelineChunks.delete(c);
+  }
+}
+
 async function loadReplaySession() {
-  const payload = await fetchJson("/api/replay/session");
+  const payload = await fetchJson("/api/replay/session/header");
   if (!payload.ok) throw new Error(payload.error || "Failed to fetch replay session.");
   liveSeekSupported = false;
   liveSeekFailureCount = 0;
 
   const session = payload.data;
+  resetTimelineChunks(session.chunk_frames);
   replayData = {
     session_id: session.session_id,
     replay_name: session.replay_name,
     players: session.players || [],
     duration_s: session.duration_s || 0,
-    timeline: session.timeline || [],
+    // Frame stubs carry only `t`; the chunks around the playhead are streamed in as columns by
+    // ensureTimelineAround and read through timelineChunkAt.
+    timeline: (session.times || []).map((t) => ({ t })),
     boost_pads: session.boost_pads || [],
     replay_meta: session.replay_meta || {},
     metrics_timeline: [],
@@ -3019,7 +3178,7 @@ async function loadReplaySession() {
 
   buildScenePlayers(replayData.players);
   addBoostPads(replayData.boost_pads);
-  await tryLoadArenaCollisionMeshes();
+  await Promise.all([tryLoadArenaCollisionMeshes(), loadTimelineChunk(0)]);
   updateTagStyles();
   setControlsEnabled(true);
   renderAtTime(currentReplayTimeS);